@@ -0,0 +1,138 @@
+"""Benchmark history reads with and without the history indexes.
+
+Builds a SQLite database with ``--rows`` test duration samples spread over
+``--runs`` workflow runs, then times ``load_test_duration_history`` and a single
+metric lookup before and after creating ``HISTORY_INDEXES``.
+
+    python benchmarks/history_indexes.py --rows 10000000 --runs 2000
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from ci_hunter.github.client import WorkflowRun
+from ci_hunter.storage import (
+    HISTORY_INDEXES,
+    METRIC_KIND_TEST,
+    TEST_DURATIONS_TABLE,
+    Storage,
+    StorageConfig,
+)
+
+REPO = "acme/bench"
+CREATED_AT = "2024-01-01T00:00:00Z"
+BATCH_SIZE = 50_000
+
+
+def _populate(storage: Storage, rows: int, runs: int) -> None:
+    storage.save_workflow_runs(
+        REPO,
+        [
+            WorkflowRun(
+                id=run_id,
+                run_number=run_id,
+                status="completed",
+                conclusion="success",
+                created_at=CREATED_AT,
+                updated_at="2024-01-01T00:00:00Z",
+                head_sha=f"sha-{run_id}",
+            )
+            for run_id in range(1, runs + 1)
+        ],
+    )
+    tests_per_run = max(1, rows // runs)
+    with storage._session() as backend:
+        metric_ids = storage._resolve_metric_ids(
+            backend, METRIC_KIND_TEST, [f"tests.test_{index}" for index in range(tests_per_run)]
+        )
+    batch = []
+    for index in range(rows):
+        run_id = index // tests_per_run % runs + 1
+        batch.append(
+            (
+                REPO,
+                run_id,
+                metric_ids[f"tests.test_{index % tests_per_run}"],
+                1.0 + index % 7,
+                run_id,
+                CREATED_AT,
+            )
+        )
+        if len(batch) >= BATCH_SIZE:
+            _insert(storage, batch)
+            batch = []
+    if batch:
+        _insert(storage, batch)
+    storage._backend.commit()
+
+
+def _insert(storage: Storage, batch: list[tuple[str, int, int, float, int, str]]) -> None:
+    storage._backend.executemany(
+        f"INSERT OR REPLACE INTO {TEST_DURATIONS_TABLE} "
+        "(repo, run_id, metric_id, duration_seconds, run_number, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        batch,
+    )
+
+
+def _drop_indexes(storage: Storage) -> None:
+    for index_name, _table, _columns in HISTORY_INDEXES:
+        storage._backend.execute(f"DROP INDEX IF EXISTS {index_name}")
+    storage._backend.commit()
+
+
+def _create_indexes(storage: Storage) -> None:
+    for index_name, table, columns in HISTORY_INDEXES:
+        storage._backend.execute(
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({', '.join(columns)})"
+        )
+    storage._backend.execute("ANALYZE")
+    storage._backend.commit()
+
+
+def _time(label: str, func) -> None:
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<32} {elapsed:8.3f}s  ({len(result)} rows)")
+
+
+def _run_queries(storage: Storage, window: int) -> None:
+    _time("full history", lambda: storage.list_test_durations(REPO))
+    _time(f"last {window} runs per test", lambda: storage.list_test_durations(REPO, last_n=window))
+    _time(
+        "single test lookup",
+        lambda: storage._backend.execute(
+            f"SELECT run_number, duration_seconds FROM {TEST_DURATIONS_TABLE} "
+            "WHERE repo = ? AND metric_id = ? ORDER BY run_number",
+            (REPO, storage._metric_ids[(METRIC_KIND_TEST, "tests.test_0")]),
+        ),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--runs", type=int, default=2_000)
+    parser.add_argument("--window", type=int, default=21)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Storage(StorageConfig(database_url=str(Path(tmp) / "bench.db")))
+        _drop_indexes(storage)
+        print(f"populating {args.rows} test durations over {args.runs} runs")
+        _populate(storage, args.rows, args.runs)
+
+        print("without history indexes")
+        _run_queries(storage, args.window)
+        _create_indexes(storage)
+        print("with history indexes")
+        _run_queries(storage, args.window)
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark analysis latency from raw history versus ``metric_rollups``.
+
+Ingests ``--runs`` workflow runs with ``--tests`` test durations each into a
+SQLite database that maintains rollups, then times ``analyze_repo_runs`` with
+``use_rollups=False`` (raw history) and ``use_rollups=True``.
+
+    python benchmarks/metric_rollups.py --runs 2000 --tests 200
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from ci_hunter.analyze import analyze_repo_runs
+from ci_hunter.github.client import WorkflowRun
+from ci_hunter.junit import TestDuration
+from ci_hunter.storage import Storage, StorageConfig
+
+REPO = "acme/bench"
+CREATED_AT = "2024-01-01T00:00:00Z"
+
+
+def _populate(storage: Storage, runs: int, tests: int) -> None:
+    rng = random.Random(0)
+    storage.save_workflow_runs(
+        REPO,
+        [
+            WorkflowRun(
+                id=run_id,
+                run_number=run_id,
+                status="completed",
+                conclusion="success",
+                created_at=CREATED_AT,
+                updated_at="2024-01-01T00:01:00Z",
+                head_sha=f"sha-{run_id}",
+            )
+            for run_id in range(1, runs + 1)
+        ],
+    )
+    with storage.batch():
+        for run_id in range(1, runs + 1):
+            storage.save_test_durations(
+                REPO,
+                run_id,
+                [
+                    TestDuration(name=f"tests.test_{index}", duration_seconds=rng.uniform(1, 2))
+                    for index in range(tests)
+                ],
+            )
+
+
+def _time(label: str, storage: Storage, history_window: int | None, use_rollups: bool) -> None:
+    started = time.perf_counter()
+    result = analyze_repo_runs(
+        storage,
+        REPO,
+        min_delta_pct=0.2,
+        history_window=history_window,
+        use_rollups=use_rollups,
+    )
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<28} {elapsed:8.3f}s  ({len(result.test_regressions)} test regressions)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=2_000)
+    parser.add_argument("--tests", type=int, default=200)
+    parser.add_argument("--rollup-window", type=int, default=64)
+    parser.add_argument("--history-window", type=int, default=21)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Storage(
+            StorageConfig(
+                database_url=str(Path(tmp) / "bench.db"),
+                rollup_window=args.rollup_window,
+            )
+        )
+        print(f"populating {args.runs} runs x {args.tests} tests")
+        _populate(storage, args.runs, args.tests)
+        for history_window in (args.history_window, None):
+            print(f"history_window={history_window}")
+            _time("raw history", storage, history_window, use_rollups=False)
+            _time("metric_rollups", storage, history_window, use_rollups=True)
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
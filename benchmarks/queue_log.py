@@ -0,0 +1,64 @@
+"""Benchmark dequeue cost against a large backlog: JSONL queue file versus ``JobLog``.
+
+Fills each queue with ``--backlog`` jobs, then times ``--claims`` claim-and-ack
+rounds of ``--batch`` jobs. The JSONL file is rewritten on every claim, so its
+cost grows with the backlog; the segmented log reads only the claimed records.
+
+    python benchmarks/queue_log.py --backlog 100000 --claims 200 --batch 1
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from ci_hunter.job_queue_file import ack_job, claim_jobs, render_jobs
+from ci_hunter.job_queue_log import FSYNC_NEVER, JobLog
+from ci_hunter.queue import AnalysisJob
+
+
+def _jobs(count: int) -> list[AnalysisJob]:
+    return [
+        AnalysisJob(repo="acme/bench", pr_number=number, commit=f"sha-{number}", branch="main")
+        for number in range(1, count + 1)
+    ]
+
+
+def _time_file(directory: Path, jobs: list[AnalysisJob], claims: int, batch: int) -> float:
+    path = directory / "queue.jsonl"
+    path.write_text(render_jobs(jobs), encoding="utf-8")
+    started = time.perf_counter()
+    for _ in range(claims):
+        for claim in claim_jobs(path, batch, visibility_timeout_seconds=60):
+            ack_job(path, claim)
+    return time.perf_counter() - started
+
+
+def _time_log(directory: Path, jobs: list[AnalysisJob], claims: int, batch: int) -> float:
+    log = JobLog(directory / "queue", fsync=FSYNC_NEVER)
+    log.append_jobs(jobs)
+    started = time.perf_counter()
+    for _ in range(claims):
+        for claim in log.claim_jobs("default", batch, visibility_timeout_seconds=60):
+            log.ack_job("default", claim)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backlog", type=int, default=100_000)
+    parser.add_argument("--claims", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=1)
+    args = parser.parse_args()
+
+    jobs = _jobs(args.backlog)
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{args.claims} claims of {args.batch} from a backlog of {args.backlog}")
+        for label, timer in (("jsonl queue file", _time_file), ("segmented log", _time_log)):
+            elapsed = timer(Path(tmp), jobs, args.claims, args.batch)
+            print(f"  {label:<18} {elapsed:8.3f}s  ({elapsed / args.claims * 1000:.2f} ms/claim)")
+
+
+if __name__ == "__main__":
+    main()
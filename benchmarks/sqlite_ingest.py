@@ -0,0 +1,110 @@
+"""Benchmark SQLite timing ingestion with and without the tuned pragmas.
+
+Saves ``--runs`` workflow runs, each with ``--steps`` step durations and
+``--tests`` test durations/outcomes, through the public ``Storage.save_*`` API:
+once with SQLite defaults (rollback journal, ``synchronous=FULL``), once with
+the default ``SQLiteTuning`` profile, and once more with every run's timings
+saved inside a single ``Storage.batch()``.
+
+    python benchmarks/sqlite_ingest.py --runs 500 --tests 500
+"""
+from __future__ import annotations
+
+import argparse
+from contextlib import nullcontext
+import tempfile
+import time
+from pathlib import Path
+
+from ci_hunter.github.client import WorkflowRun
+from ci_hunter.junit import TestDuration, TestOutcome
+from ci_hunter.steps import StepDuration
+from ci_hunter.storage import SQLiteTuning, Storage, StorageConfig
+
+REPO = "acme/bench"
+SQLITE_DEFAULTS = SQLiteTuning(
+    journal_mode=None,
+    synchronous=None,
+    wal_autocheckpoint_pages=None,
+    mmap_size_bytes=None,
+    cache_size_kib=None,
+    temp_store=None,
+    cached_statements=128,
+)
+
+
+def _ingest(
+    database_path: Path,
+    tuning: SQLiteTuning,
+    runs: int,
+    steps: int,
+    tests: int,
+    *,
+    batched: bool = False,
+) -> float:
+    storage = Storage(StorageConfig(database_url=str(database_path), sqlite=tuning))
+    step_names = [f"build/Step {index}" for index in range(steps)]
+    test_names = [f"tests.module_{index}::test_case" for index in range(tests)]
+    started = time.perf_counter()
+    storage.save_workflow_runs(
+        REPO,
+        [
+            WorkflowRun(
+                id=run_id,
+                run_number=run_id,
+                status="completed",
+                conclusion="success",
+                created_at="2024-01-01T00:00:00Z",
+                updated_at="2024-01-01T00:00:00Z",
+                head_sha=f"sha-{run_id}",
+            )
+            for run_id in range(1, runs + 1)
+        ],
+    )
+    with storage.batch() if batched else nullcontext():
+        for run_id in range(1, runs + 1):
+            _save_run(storage, run_id, step_names, test_names)
+    elapsed = time.perf_counter() - started
+    storage.close()
+    return elapsed
+
+
+def _save_run(storage: Storage, run_id: int, step_names: list[str], test_names: list[str]) -> None:
+    storage.save_step_durations(
+        REPO, run_id, [StepDuration(name=name, duration_seconds=1.0) for name in step_names]
+    )
+    storage.save_test_durations(
+        REPO, run_id, [TestDuration(name=name, duration_seconds=0.1) for name in test_names]
+    )
+    storage.save_test_outcomes(
+        REPO, run_id, [TestOutcome(name=name, outcome="passed") for name in test_names]
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=500)
+    parser.add_argument("--steps", type=int, default=30)
+    parser.add_argument("--tests", type=int, default=500)
+    args = parser.parse_args()
+
+    rows = args.runs * (args.steps + 2 * args.tests)
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, tuning, batched in (
+            ("sqlite defaults", SQLITE_DEFAULTS, False),
+            ("tuned", SQLiteTuning(), False),
+            ("tuned + batch", SQLiteTuning(), True),
+        ):
+            elapsed = _ingest(
+                Path(tmp) / f"{label}.db",
+                tuning,
+                args.runs,
+                args.steps,
+                args.tests,
+                batched=batched,
+            )
+            print(f"{label:<16} {elapsed:8.3f}s  ({rows / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
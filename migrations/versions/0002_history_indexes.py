@@ -0,0 +1,52 @@
+"""Indexes for run-ordered and per-metric history queries.
+
+Revision ID: 0002_history_indexes
+Revises: 0001_initial_schema
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0002_history_indexes"
+down_revision = "0001_initial_schema"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_workflow_runs_repo_run_number",
+        "workflow_runs",
+        ["repo", "run_number"],
+    )
+    # Covers the (repo, run_id) join from timing tables without a heap lookup for run_number.
+    op.create_index(
+        "ix_workflow_runs_repo_run_id_run_number",
+        "workflow_runs",
+        ["repo", "run_id", "run_number"],
+    )
+    op.create_index(
+        "ix_step_durations_repo_step_name_run_id",
+        "step_durations",
+        ["repo", "step_name", "run_id", "duration_seconds"],
+    )
+    op.create_index(
+        "ix_test_durations_repo_test_name_run_id",
+        "test_durations",
+        ["repo", "test_name", "run_id", "duration_seconds"],
+    )
+    op.create_index(
+        "ix_test_outcomes_repo_test_name_run_id",
+        "test_outcomes",
+        ["repo", "test_name", "run_id", "outcome"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_test_outcomes_repo_test_name_run_id", table_name="test_outcomes")
+    op.drop_index("ix_test_durations_repo_test_name_run_id", table_name="test_durations")
+    op.drop_index("ix_step_durations_repo_step_name_run_id", table_name="step_durations")
+    op.drop_index("ix_workflow_runs_repo_run_id_run_number", table_name="workflow_runs")
+    op.drop_index("ix_workflow_runs_repo_run_number", table_name="workflow_runs")
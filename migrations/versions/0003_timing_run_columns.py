@@ -0,0 +1,66 @@
+"""Denormalize run_number and created_at onto timing tables.
+
+Revision ID: 0003_timing_run_columns
+Revises: 0002_history_indexes
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0003_timing_run_columns"
+down_revision = "0002_history_indexes"
+branch_labels = None
+depends_on = None
+
+TIMING_TABLES = (
+    ("step_durations", "step_name", "duration_seconds"),
+    ("test_durations", "test_name", "duration_seconds"),
+    ("test_outcomes", "test_name", "outcome"),
+)
+
+
+def upgrade() -> None:
+    for table, name_column, value_column in TIMING_TABLES:
+        op.add_column(table, sa.Column("run_number", sa.BigInteger(), nullable=True))
+        op.add_column(table, sa.Column("created_at", sa.Text(), nullable=True))
+        op.execute(
+            f"""
+            UPDATE {table} AS metrics
+            SET run_number = runs.run_number,
+                created_at = runs.created_at
+            FROM workflow_runs AS runs
+            WHERE runs.repo = metrics.repo
+              AND runs.run_id = metrics.run_id
+            """
+        )
+        # Every row has a parent run (foreign key), so the backfill leaves no NULLs.
+        op.alter_column(table, "run_number", nullable=False)
+        op.alter_column(table, "created_at", nullable=False)
+        op.drop_index(f"ix_{table}_repo_{name_column}_run_id", table_name=table)
+        op.create_index(
+            f"ix_{table}_repo_{name_column}_run_number",
+            table,
+            ["repo", name_column, "run_number", value_column],
+        )
+    # History reads no longer join workflow_runs on (repo, run_id).
+    op.drop_index("ix_workflow_runs_repo_run_id_run_number", table_name="workflow_runs")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_workflow_runs_repo_run_id_run_number",
+        "workflow_runs",
+        ["repo", "run_id", "run_number"],
+    )
+    for table, name_column, value_column in reversed(TIMING_TABLES):
+        op.drop_index(f"ix_{table}_repo_{name_column}_run_number", table_name=table)
+        op.create_index(
+            f"ix_{table}_repo_{name_column}_run_id",
+            table,
+            ["repo", name_column, "run_id", value_column],
+        )
+        op.drop_column(table, "created_at")
+        op.drop_column(table, "run_number")
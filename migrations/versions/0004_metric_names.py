@@ -0,0 +1,93 @@
+"""Intern step and test names into a metric_names dictionary table.
+
+Revision ID: 0004_metric_names
+Revises: 0003_timing_run_columns
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0004_metric_names"
+down_revision = "0003_timing_run_columns"
+branch_labels = None
+depends_on = None
+
+TIMING_TABLES = (
+    ("step_durations", "step_name", "duration_seconds", "step"),
+    ("test_durations", "test_name", "duration_seconds", "test"),
+    ("test_outcomes", "test_name", "outcome", "test"),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "metric_names",
+        sa.Column("metric_id", sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column("kind", sa.Text(), nullable=False),
+        sa.Column("name", sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint("metric_id", name="pk_metric_names"),
+        sa.UniqueConstraint("kind", "name", name="uq_metric_names_kind_name"),
+    )
+    for table, name_column, value_column, kind in TIMING_TABLES:
+        op.execute(
+            f"""
+            INSERT INTO metric_names (kind, name)
+            SELECT DISTINCT '{kind}', {name_column} FROM {table}
+            ON CONFLICT (kind, name) DO NOTHING
+            """
+        )
+        op.add_column(table, sa.Column("metric_id", sa.BigInteger(), nullable=True))
+        op.execute(
+            f"""
+            UPDATE {table} AS metrics
+            SET metric_id = names.metric_id
+            FROM metric_names AS names
+            WHERE names.kind = '{kind}'
+              AND names.name = metrics.{name_column}
+            """
+        )
+        op.alter_column(table, "metric_id", nullable=False)
+        op.drop_index(f"ix_{table}_repo_{name_column}_run_number", table_name=table)
+        op.drop_constraint(f"pk_{table}", table, type_="primary")
+        op.drop_column(table, name_column)
+        op.create_primary_key(f"pk_{table}", table, ["repo", "run_id", "metric_id"])
+        op.create_foreign_key(
+            f"fk_{table}_metric_names",
+            table,
+            "metric_names",
+            ["metric_id"],
+            ["metric_id"],
+        )
+        op.create_index(
+            f"ix_{table}_repo_metric_id_run_number",
+            table,
+            ["repo", "metric_id", "run_number", value_column],
+        )
+
+
+def downgrade() -> None:
+    for table, name_column, value_column, _kind in reversed(TIMING_TABLES):
+        op.add_column(table, sa.Column(name_column, sa.Text(), nullable=True))
+        op.execute(
+            f"""
+            UPDATE {table} AS metrics
+            SET {name_column} = names.name
+            FROM metric_names AS names
+            WHERE names.metric_id = metrics.metric_id
+            """
+        )
+        op.alter_column(table, name_column, nullable=False)
+        op.drop_index(f"ix_{table}_repo_metric_id_run_number", table_name=table)
+        op.drop_constraint(f"fk_{table}_metric_names", table, type_="foreignkey")
+        op.drop_constraint(f"pk_{table}", table, type_="primary")
+        op.drop_column(table, "metric_id")
+        op.create_primary_key(f"pk_{table}", table, ["repo", "run_id", name_column])
+        op.create_index(
+            f"ix_{table}_repo_{name_column}_run_number",
+            table,
+            ["repo", name_column, "run_number", value_column],
+        )
+    op.drop_table("metric_names")
@@ -0,0 +1,159 @@
+"""Optionally partition timing tables by run month.
+
+Runs only when CI_HUNTER_PARTITION_TIMINGS is set (see ci_hunter.migration_config);
+otherwise the revision is recorded without changes. Converting rewrites every
+timing table, so run it in a maintenance window.
+
+Revision ID: 0005_timing_partitions
+Revises: 0004_metric_names
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+from ci_hunter.migration_config import partition_timings_enabled
+
+# revision identifiers, used by Alembic.
+revision = "0005_timing_partitions"
+down_revision = "0004_metric_names"
+branch_labels = None
+depends_on = None
+
+TIMING_TABLES = (
+    ("step_durations", "duration_seconds", "DOUBLE PRECISION"),
+    ("test_durations", "duration_seconds", "DOUBLE PRECISION"),
+    ("test_outcomes", "outcome", "TEXT"),
+)
+# Months of empty partitions created past the current month.
+MONTHS_AHEAD = 3
+
+
+def partition_name(table: str, year: int, month: int) -> str:
+    return f"{table}_p{year:04d}{month:02d}"
+
+
+def _next_month(year: int, month: int) -> tuple[int, int]:
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def _is_partitioned(table: str) -> bool:
+    relkind = op.get_bind().execute(
+        sa.text("SELECT relkind FROM pg_class WHERE relname = :name AND pg_table_is_visible(oid)"),
+        {"name": table},
+    ).scalar()
+    return relkind == "p"
+
+
+def _partition_months(table: str) -> list[tuple[int, int]]:
+    rows = op.get_bind().execute(
+        sa.text(f"SELECT DISTINCT substr(created_at, 1, 7) FROM {table}_unpartitioned")
+    )
+    months = {(int(value[:4]), int(value[5:7])) for (value,) in rows}
+    now = datetime.now(timezone.utc)
+    year, month = now.year, now.month
+    for _ in range(MONTHS_AHEAD + 1):
+        months.add((year, month))
+        year, month = _next_month(year, month)
+    return sorted(months)
+
+
+def _copy_columns(value_column: str) -> str:
+    return f"repo, run_id, metric_id, {value_column}, run_number, created_at"
+
+
+def upgrade() -> None:
+    if not partition_timings_enabled():
+        return
+    for table, value_column, value_type in TIMING_TABLES:
+        if _is_partitioned(table):
+            continue
+        op.execute(f"ALTER TABLE {table} RENAME TO {table}_unpartitioned")
+        op.execute(
+            f"ALTER TABLE {table}_unpartitioned "
+            f"RENAME CONSTRAINT pk_{table} TO pk_{table}_unpartitioned"
+        )
+        op.execute(
+            f"ALTER INDEX ix_{table}_repo_metric_id_run_number "
+            f"RENAME TO ix_{table}_repo_metric_id_run_number_unpartitioned"
+        )
+        # Unique keys on a partitioned table must include the partition key.
+        op.execute(
+            f"""
+            CREATE TABLE {table} (
+                repo TEXT NOT NULL,
+                run_id BIGINT NOT NULL,
+                metric_id BIGINT NOT NULL,
+                {value_column} {value_type} NOT NULL,
+                run_number BIGINT NOT NULL,
+                created_at TEXT NOT NULL,
+                CONSTRAINT pk_{table} PRIMARY KEY (repo, run_id, metric_id, created_at),
+                CONSTRAINT fk_{table}_workflow_runs FOREIGN KEY (repo, run_id)
+                    REFERENCES workflow_runs (repo, run_id),
+                CONSTRAINT fk_{table}_metric_names FOREIGN KEY (metric_id)
+                    REFERENCES metric_names (metric_id)
+            ) PARTITION BY RANGE (created_at)
+            """
+        )
+        for year, month in _partition_months(table):
+            next_year, next_month = _next_month(year, month)
+            op.execute(
+                f"CREATE TABLE {partition_name(table, year, month)} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{year:04d}-{month:02d}-01') "
+                f"TO ('{next_year:04d}-{next_month:02d}-01')"
+            )
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        columns = _copy_columns(value_column)
+        op.execute(
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {table}_unpartitioned"
+        )
+        op.drop_table(f"{table}_unpartitioned")
+        op.create_index(
+            f"ix_{table}_repo_metric_id_run_number",
+            table,
+            ["repo", "metric_id", "run_number", value_column],
+        )
+
+
+def downgrade() -> None:
+    for table, value_column, value_type in reversed(TIMING_TABLES):
+        if not _is_partitioned(table):
+            continue
+        op.execute(f"ALTER TABLE {table} RENAME TO {table}_partitioned")
+        op.execute(
+            f"ALTER TABLE {table}_partitioned "
+            f"RENAME CONSTRAINT pk_{table} TO pk_{table}_partitioned"
+        )
+        op.execute(
+            f"ALTER INDEX ix_{table}_repo_metric_id_run_number "
+            f"RENAME TO ix_{table}_repo_metric_id_run_number_partitioned"
+        )
+        op.execute(
+            f"""
+            CREATE TABLE {table} (
+                repo TEXT NOT NULL,
+                run_id BIGINT NOT NULL,
+                metric_id BIGINT NOT NULL,
+                {value_column} {value_type} NOT NULL,
+                run_number BIGINT NOT NULL,
+                created_at TEXT NOT NULL,
+                CONSTRAINT pk_{table} PRIMARY KEY (repo, run_id, metric_id),
+                CONSTRAINT fk_{table}_workflow_runs FOREIGN KEY (repo, run_id)
+                    REFERENCES workflow_runs (repo, run_id),
+                CONSTRAINT fk_{table}_metric_names FOREIGN KEY (metric_id)
+                    REFERENCES metric_names (metric_id)
+            )
+            """
+        )
+        columns = _copy_columns(value_column)
+        op.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {table}_partitioned")
+        # Dropping the parent drops its partitions.
+        op.drop_table(f"{table}_partitioned")
+        op.create_index(
+            f"ix_{table}_repo_metric_id_run_number",
+            table,
+            ["repo", "metric_id", "run_number", value_column],
+        )
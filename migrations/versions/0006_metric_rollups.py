@@ -0,0 +1,40 @@
+"""Add the metric_rollups table of per-(repo, metric) rolling aggregates.
+
+Revision ID: 0006_metric_rollups
+Revises: 0005_timing_partitions
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0006_metric_rollups"
+down_revision = "0005_timing_partitions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Rows are filled on ingest once StorageConfig.rollup_window is set, or by
+    # Storage.rebuild_metric_rollups for existing history.
+    op.create_table(
+        "metric_rollups",
+        sa.Column("repo", sa.Text(), nullable=False),
+        sa.Column("metric_id", sa.BigInteger(), nullable=False),
+        sa.Column("recent", sa.Text(), nullable=False),
+        sa.Column("sample_count", sa.BigInteger(), nullable=False),
+        sa.Column("value_sum", sa.Float(), nullable=False),
+        sa.Column("sketch", sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["metric_id"],
+            ["metric_names.metric_id"],
+            name="fk_metric_rollups_metric_names",
+        ),
+        sa.PrimaryKeyConstraint("repo", "metric_id", name="pk_metric_rollups"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("metric_rollups")
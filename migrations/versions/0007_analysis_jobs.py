@@ -0,0 +1,42 @@
+"""Add the analysis_jobs table backing Storage's job queue.
+
+Revision ID: 0007_analysis_jobs
+Revises: 0006_metric_rollups
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0007_analysis_jobs"
+down_revision = "0006_metric_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "analysis_jobs",
+        sa.Column("job_id", sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column("repo", sa.Text(), nullable=False),
+        sa.Column("pr_number", sa.BigInteger(), nullable=False),
+        sa.Column("commit_sha", sa.Text(), nullable=True),
+        sa.Column("branch", sa.Text(), nullable=True),
+        # Epoch seconds; claims push it forward by the visibility timeout.
+        sa.Column("visible_at", sa.Float(), nullable=False),
+        sa.Column("lease_token", sa.Text(), nullable=True),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint("job_id", name="pk_analysis_jobs"),
+    )
+    op.create_index(
+        "ix_analysis_jobs_visible_at_job_id",
+        "analysis_jobs",
+        ["visible_at", "job_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_analysis_jobs_visible_at_job_id", table_name="analysis_jobs")
+    op.drop_table("analysis_jobs")
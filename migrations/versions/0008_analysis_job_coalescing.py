@@ -0,0 +1,37 @@
+"""Coalesce waiting analysis jobs per pull request.
+
+Adds analysis_jobs.coalesced, the number of older jobs for the same
+(repo, pr_number) a waiting job replaced, and the index enqueue uses to find
+that waiting job.
+
+Revision ID: 0008_analysis_job_coalescing
+Revises: 0007_analysis_jobs
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0008_analysis_job_coalescing"
+down_revision = "0007_analysis_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "analysis_jobs",
+        sa.Column("coalesced", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.create_index(
+        "ix_analysis_jobs_repo_pr_number",
+        "analysis_jobs",
+        ["repo", "pr_number"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_analysis_jobs_repo_pr_number", table_name="analysis_jobs")
+    op.drop_column("analysis_jobs", "coalesced")
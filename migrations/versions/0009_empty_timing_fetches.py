@@ -0,0 +1,36 @@
+"""Record timing fetches that succeeded but returned no rows.
+
+Completed runs without logs or test reports are then skipped by later syncs
+instead of being downloaded again every time.
+
+Revision ID: 0009_empty_timing_fetches
+Revises: 0008_analysis_job_coalescing
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0009_empty_timing_fetches"
+down_revision = "0008_analysis_job_coalescing"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "empty_timing_fetches",
+        sa.Column("repo", sa.Text(), nullable=False),
+        sa.Column("run_id", sa.BigInteger(), nullable=False),
+        # The timing table the fetch would have filled, e.g. "step_durations".
+        sa.Column("timing_table", sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint(
+            "repo", "run_id", "timing_table", name="pk_empty_timing_fetches"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("empty_timing_fetches")
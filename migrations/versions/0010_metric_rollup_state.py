@@ -0,0 +1,32 @@
+"""Track per repo whether metric rollups cover its raw step/test history.
+
+Analysis checks this flag instead of recounting raw rows before it reads
+rollups. Rollups that existed before this revision start out of sync until
+``Storage.rebuild_metric_rollups`` runs.
+
+Revision ID: 0010_metric_rollup_state
+Revises: 0009_empty_timing_fetches
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0010_metric_rollup_state"
+down_revision = "0009_empty_timing_fetches"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "metric_rollup_state",
+        sa.Column("repo", sa.Text(), primary_key=True),
+        sa.Column("in_sync", sa.Boolean(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("metric_rollup_state")
@@ -0,0 +1,35 @@
+"""Track runs that were re-run after their timings were stored.
+
+Incremental syncs flag each timing table of a stored run whose ``updated_at``
+moved; the timings are fetched again and each flag is cleared once that succeeds.
+
+Revision ID: 0011_outdated_timing_fetches
+Revises: 0010_metric_rollup_state
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0011_outdated_timing_fetches"
+down_revision = "0010_metric_rollup_state"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "outdated_timing_fetches",
+        sa.Column("repo", sa.Text(), nullable=False),
+        sa.Column("run_id", sa.BigInteger(), nullable=False),
+        sa.Column("timing_table", sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint(
+            "repo", "run_id", "timing_table", name="pk_outdated_timing_fetches"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("outdated_timing_fetches")
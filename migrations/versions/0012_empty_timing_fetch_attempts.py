@@ -0,0 +1,31 @@
+"""Count how many times a timing fetch came back empty.
+
+A run is only skipped for a timing table after
+``StorageConfig.empty_timing_fetch_attempts`` empty fetches, so a transient empty
+response no longer hides the run for good. Existing markers count as one.
+
+Revision ID: 0012_empty_timing_fetch_attempts
+Revises: 0011_outdated_timing_fetches
+Create Date: 2026-10-17 00:00:00
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0012_empty_timing_fetch_attempts"
+down_revision = "0011_outdated_timing_fetches"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "empty_timing_fetches",
+        sa.Column("empty_fetches", sa.Integer(), server_default="1", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("empty_timing_fetches", "empty_fetches")
@@ -7,15 +7,20 @@ from ci_hunter.detection import (
     BASELINE_STRATEGY_MEDIAN,
     BASELINE_STRATEGY_MEAN,
     BASELINE_STRATEGY_TRIMMED_MEAN,
+    DEFAULT_CHANGE_POINT_WINDOW_SIZE,
     ChangePoint,
+    DetectionResult,
     Flake,
     Regression,
-    REASON_INSUFFICIENT_HISTORY,
+    detect_named_regressions,
+    detect_rollup_regressions,
     detect_run_duration_change_points,
-    detect_test_flakes,
+    detect_test_flakes_from_history,
     detect_run_duration_regressions,
 )
-from ci_hunter.storage import Storage
+from ci_hunter.history import DurationHistory
+from ci_hunter.rollups import rollup_history
+from ci_hunter.storage import METRIC_KIND_STEP, METRIC_KIND_TEST, Storage
 from ci_hunter.time_utils import parse_iso_datetime
 
 
@@ -35,6 +40,8 @@ class AnalysisResult:
     step_change_points: list[ChangePoint] = field(default_factory=list)
     test_change_points: list[ChangePoint] = field(default_factory=list)
     flakes: list[Flake] = field(default_factory=list)
+    step_timings_skipped: Optional[int] = None
+    test_timings_skipped: Optional[int] = None
 
 
 def analyze_repo_runs(
@@ -45,7 +52,17 @@ def analyze_repo_runs(
     baseline_strategy: str = BASELINE_STRATEGY_MEDIAN,
     min_history: int = 1,
     history_window: int | None = None,
+    use_rollups: bool = False,
 ) -> AnalysisResult:
+    """Detect run, step and test regressions, change points and flakes for ``repo``.
+
+    With ``use_rollups``, step and test checks read one rollup row per metric
+    instead of raw history (see ``detect_rollup_regressions``) when storage
+    maintains ``metric_rollups`` deep enough for ``history_window`` and flags
+    them in sync with raw history; otherwise raw history is read. Without
+    ``history_window``, rollup median and trimmed-mean baselines are sketch
+    approximations.
+    """
     _validate_baseline_strategy(baseline_strategy)
     runs = storage.list_workflow_runs(repo)
     durations = []
@@ -59,35 +76,57 @@ def analyze_repo_runs(
         min_history=min_history,
         history_window=history_window,
     )
-    step_samples = storage.list_step_durations(repo)
-    test_samples = storage.list_test_durations(repo)
-    test_outcome_samples = storage.list_test_outcomes(repo)
-    step_regressions = _detect_named_regressions(
-        step_samples,
-        min_delta_pct=min_delta_pct,
-        baseline_strategy=baseline_strategy,
-        min_history=min_history,
-        history_window=history_window,
-    )
-    test_regressions = _detect_named_regressions(
-        test_samples,
-        min_delta_pct=min_delta_pct,
-        baseline_strategy=baseline_strategy,
-        min_history=min_history,
-        history_window=history_window,
-    )
+    # Detectors read at most the baseline window plus the current run, so older rows stay in the database.
+    duration_last_n = None if history_window is None else history_window + 1
+    if use_rollups and _rollups_cover(storage, repo, history_window):
+        step_rollups = storage.list_metric_rollups(repo, METRIC_KIND_STEP)
+        test_rollups = storage.list_metric_rollups(repo, METRIC_KIND_TEST)
+        step_history = rollup_history(step_rollups)
+        test_history = rollup_history(test_rollups)
+        step_regressions = detect_rollup_regressions(
+            step_rollups,
+            min_delta_pct=min_delta_pct,
+            baseline_strategy=baseline_strategy,
+            min_history=min_history,
+            history_window=history_window,
+        )
+        test_regressions = detect_rollup_regressions(
+            test_rollups,
+            min_delta_pct=min_delta_pct,
+            baseline_strategy=baseline_strategy,
+            min_history=min_history,
+            history_window=history_window,
+        )
+    else:
+        step_history = storage.load_step_duration_history(repo, last_n=duration_last_n)
+        test_history = storage.load_test_duration_history(repo, last_n=duration_last_n)
+        step_regressions = _detect_named_regressions(
+            step_history,
+            min_delta_pct=min_delta_pct,
+            baseline_strategy=baseline_strategy,
+            min_history=min_history,
+            history_window=history_window,
+        )
+        test_regressions = _detect_named_regressions(
+            test_history,
+            min_delta_pct=min_delta_pct,
+            baseline_strategy=baseline_strategy,
+            min_history=min_history,
+            history_window=history_window,
+        )
+    test_outcome_history = storage.load_test_outcome_history(repo, last_n=history_window)
     step_change_points = _detect_named_change_points(
-        step_samples,
+        step_history,
         min_delta_pct=min_delta_pct,
         history_window=history_window,
     )
     test_change_points = _detect_named_change_points(
-        test_samples,
+        test_history,
         min_delta_pct=min_delta_pct,
         history_window=history_window,
     )
-    flakes = detect_test_flakes(
-        test_outcome_samples,
+    flakes = detect_test_flakes_from_history(
+        test_outcome_history,
         history_window=history_window,
     )
     return AnalysisResult(
@@ -124,87 +163,44 @@ def _validate_baseline_strategy(strategy: str) -> None:
         raise ValueError(f"Unknown baseline_strategy: {strategy}")
 
 
-@dataclass(frozen=True)
-class _NamedRegressionResult:
-    regressions: list[Regression]
-    reason: Optional[str]
-
-
 def _detect_named_regressions(
-    samples: list[object],
+    history: DurationHistory,
     *,
     min_delta_pct: float,
     baseline_strategy: str,
     min_history: int,
     history_window: int | None,
-) -> _NamedRegressionResult:
-    if not samples:
-        return _NamedRegressionResult(regressions=[], reason=REASON_INSUFFICIENT_HISTORY)
-
-    by_name: dict[str, list[tuple[int, float]]] = {}
-    for sample in samples:
-        run_number = getattr(sample, "run_number")
-        name = getattr(sample, "step_name", None)
-        if name is None:
-            name = getattr(sample, "test_name")
-        duration = getattr(sample, "duration_seconds")
-        by_name.setdefault(name, []).append((run_number, duration))
-
-    regressions: list[Regression] = []
-    for name, entries in by_name.items():
-        entries.sort(key=lambda item: item[0])
-        durations = [duration for _, duration in entries]
-        detection = detect_run_duration_regressions(
-            durations,
-            min_delta_pct=min_delta_pct,
-            baseline_strategy=baseline_strategy,
-            min_history=min_history,
-            history_window=history_window,
-        )
-        for regression in detection.regressions:
-            regressions.append(
-                Regression(
-                    metric=name,
-                    baseline=regression.baseline,
-                    current=regression.current,
-                    delta_pct=regression.delta_pct,
-                )
-            )
+) -> DetectionResult:
+    return detect_named_regressions(
+        history.series(),
+        min_delta_pct=min_delta_pct,
+        baseline_strategy=baseline_strategy,
+        min_history=min_history,
+        history_window=history_window,
+    )
 
-    if regressions:
-        return _NamedRegressionResult(regressions=regressions, reason=None)
-    has_history = False
-    for entries in by_name.values():
-        baseline_len = len(entries) - 1
-        if history_window is not None:
-            baseline_len = min(baseline_len, history_window)
-        if baseline_len >= min_history:
-            has_history = True
-            break
-    if has_history:
-        return _NamedRegressionResult(regressions=[], reason=None)
-    return _NamedRegressionResult(regressions=[], reason=REASON_INSUFFICIENT_HISTORY)
+
+def _rollups_cover(storage: Storage, repo: str, history_window: int | None) -> bool:
+    """Whether rollups keep enough recent values for the window and change points,
+    and are in step with raw history."""
+    rollup_window = storage.rollup_window
+    if rollup_window is None:
+        return False
+    if history_window is None:
+        deep_enough = rollup_window >= 2 * DEFAULT_CHANGE_POINT_WINDOW_SIZE
+    else:
+        deep_enough = rollup_window >= history_window + 1
+    return deep_enough and storage.metric_rollups_in_sync(repo)
 
 
 def _detect_named_change_points(
-    samples: list[object],
+    history: DurationHistory,
     *,
     min_delta_pct: float,
     history_window: int | None,
 ) -> list[ChangePoint]:
-    by_name: dict[str, list[tuple[int, float]]] = {}
-    for sample in samples:
-        run_number = getattr(sample, "run_number")
-        name = getattr(sample, "step_name", None)
-        if name is None:
-            name = getattr(sample, "test_name")
-        duration = getattr(sample, "duration_seconds")
-        by_name.setdefault(name, []).append((run_number, duration))
-
     change_points: list[ChangePoint] = []
-    for name, entries in by_name.items():
-        entries.sort(key=lambda item: item[0])
-        durations = [duration for _, duration in entries]
+    for name, durations in history.series():
         detected = detect_run_duration_change_points(
             durations,
             min_delta_pct=min_delta_pct,
@@ -221,3 +217,4 @@ def _detect_named_change_points(
                 )
             )
     return change_points
+
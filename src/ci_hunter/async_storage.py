@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+import functools
+from typing import Any, AsyncIterator, Callable, Iterable, List, Optional, TypeVar
+
+from ci_hunter.github.client import WorkflowRun
+from ci_hunter.history import DurationHistory, OutcomeHistory
+from ci_hunter.junit import TestDuration, TestOutcome
+from ci_hunter.rollups import MetricRollup
+from ci_hunter.steps import StepDuration
+from ci_hunter.storage import (
+    DEFAULT_PENDING_CURSOR_LIMIT,
+    DEFAULT_RERUN_LOOKBACK,
+    StepDurationSample,
+    Storage,
+    StorageConfig,
+    StoredTimingRunIds,
+    TestDurationSample,
+    TestOutcomeSample,
+    WorkflowRunSyncState,
+)
+
+_T = TypeVar("_T")
+
+
+class AsyncStorage:
+    """asyncio front end for ``Storage`` with the same ``save_*``/``list_*`` surface.
+
+    Calls run on a bounded pool of storage threads, so an event loop can keep
+    GitHub downloads in flight while earlier results are written. SQLite and
+    unpooled PostgreSQL get one dedicated thread (their connection is serialized
+    anyway); pooled PostgreSQL gets one thread per pooled connection.
+    """
+
+    def __init__(
+        self,
+        database_url: str | StorageConfig,
+        *,
+        max_workers: int | None = None,
+    ) -> None:
+        config = (
+            database_url
+            if isinstance(database_url, StorageConfig)
+            else StorageConfig(database_url=database_url)
+        )
+        if max_workers is None:
+            max_workers = config.postgres_pool_max_size or 1
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+        self._storage = Storage(config)
+        if self._storage.backend_name == "sqlite":
+            max_workers = 1
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="ci-hunter-storage",
+        )
+        # Saves buffered by the current task's batch(), replayed in one Storage.batch().
+        self._batch: ContextVar[list[Callable[[], None]] | None] = ContextVar(
+            "ci_hunter_async_storage_batch",
+            default=None,
+        )
+
+    @property
+    def storage(self) -> Storage:
+        return self._storage
+
+    @property
+    def backend_name(self) -> str:
+        return self._storage.backend_name
+
+    async def _run(self, func: Callable[..., _T], *args: Any, **kwargs: Any) -> _T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    @asynccontextmanager
+    async def batch(self) -> AsyncIterator[None]:
+        """Write every save made by this task inside the block in one transaction.
+
+        Saves are buffered in the task and replayed through ``Storage.batch()``
+        when the block exits, so no storage thread is held while the task awaits
+        downloads. Unlike ``Storage.batch()``, an unknown workflow run fails the
+        whole batch at exit. Nested blocks join the outermost one.
+        """
+        if self._batch.get() is not None:
+            yield
+            return
+        pending: list[Callable[[], None]] = []
+        token = self._batch.set(pending)
+        try:
+            yield
+        finally:
+            self._batch.reset(token)
+        if pending:
+            await self._run(self._replay_batch, pending)
+
+    def _replay_batch(self, pending: list[Callable[[], None]]) -> None:
+        with self._storage.batch():
+            for save in pending:
+                save()
+
+    async def _save(self, func: Callable[..., None], *args: Any) -> None:
+        pending = self._batch.get()
+        if pending is not None:
+            pending.append(functools.partial(func, *args))
+            return
+        await self._run(func, *args)
+
+    async def save_workflow_runs(self, repo: str, runs: Iterable[WorkflowRun]) -> None:
+        await self._run(self._storage.save_workflow_runs, repo, list(runs))
+
+    async def get_workflow_run_sync_state(
+        self,
+        repo: str,
+        *,
+        rerun_lookback: timedelta = DEFAULT_RERUN_LOOKBACK,
+        pending_cursor_limit: timedelta = DEFAULT_PENDING_CURSOR_LIMIT,
+    ) -> WorkflowRunSyncState:
+        return await self._run(
+            self._storage.get_workflow_run_sync_state,
+            repo,
+            rerun_lookback=rerun_lookback,
+            pending_cursor_limit=pending_cursor_limit,
+        )
+
+    async def get_stored_timing_run_ids(
+        self,
+        repo: str,
+        run_ids: Iterable[int],
+    ) -> StoredTimingRunIds:
+        return await self._run(self._storage.get_stored_timing_run_ids, repo, list(run_ids))
+
+    async def clear_outdated_timing_fetches(
+        self,
+        repo: str,
+        fetches: Iterable[tuple[int, str]],
+    ) -> None:
+        await self._run(self._storage.clear_outdated_timing_fetches, repo, list(fetches))
+
+    async def save_empty_timing_fetches(
+        self,
+        repo: str,
+        fetches: Iterable[tuple[int, str]],
+    ) -> None:
+        await self._run(self._storage.save_empty_timing_fetches, repo, list(fetches))
+
+    async def list_workflow_runs(self, repo: str) -> List[WorkflowRun]:
+        return await self._run(self._storage.list_workflow_runs, repo)
+
+    async def save_step_durations(
+        self,
+        repo: str,
+        run_id: int,
+        durations: Iterable[StepDuration],
+    ) -> None:
+        await self._save(self._storage.save_step_durations, repo, run_id, list(durations))
+
+    async def list_step_durations(
+        self,
+        repo: str,
+        *,
+        last_n: int | None = None,
+    ) -> List[StepDurationSample]:
+        return await self._run(self._storage.list_step_durations, repo, last_n=last_n)
+
+    async def load_step_duration_history(
+        self,
+        repo: str,
+        *,
+        last_n: int | None = None,
+    ) -> DurationHistory:
+        return await self._run(self._storage.load_step_duration_history, repo, last_n=last_n)
+
+    async def save_test_durations(
+        self,
+        repo: str,
+        run_id: int,
+        durations: Iterable[TestDuration],
+    ) -> None:
+        await self._save(self._storage.save_test_durations, repo, run_id, list(durations))
+
+    async def list_test_durations(
+        self,
+        repo: str,
+        *,
+        last_n: int | None = None,
+    ) -> List[TestDurationSample]:
+        return await self._run(self._storage.list_test_durations, repo, last_n=last_n)
+
+    async def load_test_duration_history(
+        self,
+        repo: str,
+        *,
+        last_n: int | None = None,
+    ) -> DurationHistory:
+        return await self._run(self._storage.load_test_duration_history, repo, last_n=last_n)
+
+    async def save_test_outcomes(
+        self,
+        repo: str,
+        run_id: int,
+        outcomes: Iterable[TestOutcome],
+    ) -> None:
+        await self._save(self._storage.save_test_outcomes, repo, run_id, list(outcomes))
+
+    async def list_test_outcomes(
+        self,
+        repo: str,
+        *,
+        last_n: int | None = None,
+    ) -> List[TestOutcomeSample]:
+        return await self._run(self._storage.list_test_outcomes, repo, last_n=last_n)
+
+    async def load_test_outcome_history(
+        self,
+        repo: str,
+        *,
+        last_n: int | None = None,
+    ) -> OutcomeHistory:
+        return await self._run(self._storage.load_test_outcome_history, repo, last_n=last_n)
+
+    async def list_metric_rollups(self, repo: str, kind: str) -> list[MetricRollup]:
+        return await self._run(self._storage.list_metric_rollups, repo, kind)
+
+    async def close(self) -> None:
+        try:
+            await self._run(self._storage.close)
+        finally:
+            self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> "AsyncStorage":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[object],
+    ) -> None:
+        await self.close()
@@ -2,15 +2,21 @@ from __future__ import annotations
 
 import argparse
 import os
-from typing import Callable, Mapping, TextIO
+from typing import Callable, Mapping, TextIO, TypeVar
 
 from ci_hunter.config import AppConfig, load_config
 from ci_hunter.detection import BASELINE_STRATEGY_MEDIAN
 from ci_hunter.github.auth import GitHubAppAuth
-from ci_hunter.github.artifacts import fetch_junit_durations_from_artifacts
-from ci_hunter.github.artifacts import fetch_junit_test_outcomes_from_artifacts
+from ci_hunter.github.artifacts import fetch_junit_report_from_artifacts
 from ci_hunter.github.client import GitHubActionsClient
 from ci_hunter.github.comments import post_pr_comment
+from ci_hunter.github.http import (
+    DEFAULT_KEEPALIVE_EXPIRY_SECONDS,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    HttpClientConfig,
+    configure_http_client,
+)
 from ci_hunter.github.logs import fetch_run_step_durations
 from ci_hunter.github.pr_infer import InferredPullRequest, infer_pr_number
 from ci_hunter.runner import fetch_store_analyze
@@ -21,9 +27,18 @@ from ci_hunter.storage import Storage, StorageConfig
 DEFAULT_MIN_DELTA_PCT = 0.2
 DEFAULT_DB = ":memory:"
 DEFAULT_TIMINGS_RUN_LIMIT = 10
+DEFAULT_FETCH_CONCURRENCY = 4
 DEFAULT_MIN_HISTORY = 1
 FORMAT_MARKDOWN = "md"
 FORMAT_JSON = "json"
+ENV_HTTP_MAX_CONNECTIONS = "CI_HUNTER_HTTP_MAX_CONNECTIONS"
+ENV_HTTP_MAX_KEEPALIVE_CONNECTIONS = "CI_HUNTER_HTTP_MAX_KEEPALIVE_CONNECTIONS"
+ENV_HTTP_KEEPALIVE_EXPIRY_SECONDS = "CI_HUNTER_HTTP_KEEPALIVE_EXPIRY_SECONDS"
+ENV_HTTP2 = "CI_HUNTER_HTTP2"
+_TRUE_VALUES = frozenset({"1", "true", "yes", "on"})
+_FALSE_VALUES = frozenset({"0", "false", "no", "off"})
+
+_T = TypeVar("_T")
 
 
 def _build_parser() -> argparse.ArgumentParser:
@@ -34,8 +49,12 @@ def _build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--baseline-strategy", default=None)
     parser.add_argument("--db", default=None)
     parser.add_argument("--timings-run-limit", type=int, default=None)
+    parser.add_argument("--fetch-concurrency", type=int, default=None)
+    parser.add_argument("--full-sync", action="store_true", default=None)
     parser.add_argument("--min-history", type=int, default=None)
     parser.add_argument("--history-window", type=int, default=None)
+    parser.add_argument("--rollup-window", type=int, default=None)
+    parser.add_argument("--use-rollups", action="store_true", default=None)
     parser.add_argument("--pr-number", type=int)
     parser.add_argument("--commit")
     parser.add_argument("--branch")
@@ -43,6 +62,10 @@ def _build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--dry-run", action="store_true", default=None)
     parser.add_argument("--output-file")
     parser.add_argument("--no-comment", action="store_true", default=None)
+    parser.add_argument("--http-max-connections", type=int, default=None)
+    parser.add_argument("--http-max-keepalive-connections", type=int, default=None)
+    parser.add_argument("--http-keepalive-expiry-seconds", type=float, default=None)
+    parser.add_argument("--http2", action=argparse.BooleanOptionalAction, default=None)
     return parser
 
 
@@ -66,6 +89,9 @@ def main(
     config = _load_optional_config(args.config)
     args = _merge_config(args, config)
     _apply_defaults(args)
+    http_config = _http_client_config(args, env)
+    if http_config is not None:
+        configure_http_client(http_config)
 
     auth_factory = auth_factory or (lambda e: GitHubAppAuth(
         app_id=e["GITHUB_APP_ID"],
@@ -77,7 +103,7 @@ def main(
     def client_factory(token: str) -> GitHubActionsClient:
         return GitHubActionsClient(token=token)
 
-    storage = Storage(StorageConfig(database_url=args.db))
+    storage = Storage(StorageConfig(database_url=args.db, rollup_window=args.rollup_window))
 
     result = runner(
         auth=auth,
@@ -88,10 +114,12 @@ def main(
         baseline_strategy=args.baseline_strategy,
         min_history=args.min_history,
         history_window=args.history_window,
+        use_rollups=args.use_rollups,
         timings_run_limit=args.timings_run_limit,
+        fetch_concurrency=args.fetch_concurrency,
+        incremental_sync=not args.full_sync,
         step_fetcher=fetch_run_step_durations,
-        test_fetcher=fetch_junit_durations_from_artifacts,
-        test_outcome_fetcher=fetch_junit_test_outcomes_from_artifacts,
+        test_report_fetcher=fetch_junit_report_from_artifacts,
     )
     if args.format == FORMAT_JSON:
         report = json_renderer(result)
@@ -132,8 +160,12 @@ def _merge_config(args: argparse.Namespace, config: AppConfig) -> argparse.Names
     _apply_if_missing(merged, "baseline_strategy", config.baseline_strategy)
     _apply_if_missing(merged, "db", config.db)
     _apply_if_missing(merged, "timings_run_limit", config.timings_run_limit)
+    _apply_if_missing(merged, "fetch_concurrency", getattr(config, "fetch_concurrency", None))
+    _apply_if_missing(merged, "full_sync", getattr(config, "full_sync", None))
     _apply_if_missing(merged, "min_history", getattr(config, "min_history", None))
     _apply_if_missing(merged, "history_window", getattr(config, "history_window", None))
+    _apply_if_missing(merged, "rollup_window", getattr(config, "rollup_window", None))
+    _apply_if_missing(merged, "use_rollups", getattr(config, "use_rollups", None))
     _apply_if_missing(merged, "format", config.format)
     _apply_if_missing(merged, "dry_run", config.dry_run)
     _apply_if_missing(merged, "pr_number", config.pr_number)
@@ -165,6 +197,10 @@ def _apply_defaults(args: argparse.Namespace) -> None:
         args.db = DEFAULT_DB
     if args.timings_run_limit is None:
         args.timings_run_limit = DEFAULT_TIMINGS_RUN_LIMIT
+    if args.fetch_concurrency is None:
+        args.fetch_concurrency = DEFAULT_FETCH_CONCURRENCY
+    if args.fetch_concurrency <= 0:
+        raise ValueError("--fetch-concurrency must be a positive integer")
     if args.min_history is None:
         args.min_history = DEFAULT_MIN_HISTORY
     if args.format is None:
@@ -173,6 +209,88 @@ def _apply_defaults(args: argparse.Namespace) -> None:
         args.dry_run = False
     if args.no_comment is None:
         args.no_comment = False
+    if args.full_sync is None:
+        args.full_sync = False
+    if args.use_rollups is None:
+        args.use_rollups = False
+
+
+def _http_client_config(
+    args: argparse.Namespace,
+    env: Mapping[str, str],
+) -> HttpClientConfig | None:
+    """Pool settings from flags, then ``CI_HUNTER_HTTP_*`` env vars; ``None`` if none are set."""
+    max_connections = _first_set(
+        args.http_max_connections, _env_int(env, ENV_HTTP_MAX_CONNECTIONS)
+    )
+    max_keepalive_connections = _first_set(
+        args.http_max_keepalive_connections,
+        _env_int(env, ENV_HTTP_MAX_KEEPALIVE_CONNECTIONS),
+    )
+    keepalive_expiry_seconds = _first_set(
+        args.http_keepalive_expiry_seconds,
+        _env_float(env, ENV_HTTP_KEEPALIVE_EXPIRY_SECONDS),
+    )
+    http2 = _first_set(args.http2, _env_bool(env, ENV_HTTP2))
+    settings = (max_connections, max_keepalive_connections, keepalive_expiry_seconds, http2)
+    if all(value is None for value in settings):
+        return None
+    config = HttpClientConfig(
+        max_connections=_first_set(max_connections, DEFAULT_MAX_CONNECTIONS),
+        max_keepalive_connections=_first_set(
+            max_keepalive_connections, DEFAULT_MAX_KEEPALIVE_CONNECTIONS
+        ),
+        keepalive_expiry_seconds=_first_set(
+            keepalive_expiry_seconds, DEFAULT_KEEPALIVE_EXPIRY_SECONDS
+        ),
+        http2=_first_set(http2, True),
+    )
+    if config.max_connections <= 0:
+        raise ValueError("--http-max-connections must be a positive integer")
+    if config.max_keepalive_connections < 0:
+        raise ValueError("--http-max-keepalive-connections must be non-negative")
+    if config.keepalive_expiry_seconds <= 0:
+        raise ValueError("--http-keepalive-expiry-seconds must be positive")
+    return config
+
+
+def _first_set(*values: _T | None) -> _T | None:
+    for value in values:
+        if value is not None:
+            return value
+    return None
+
+
+def _env_int(env: Mapping[str, str], key: str) -> int | None:
+    raw_value = env.get(key)
+    if raw_value is None or not raw_value.strip():
+        return None
+    try:
+        return int(raw_value)
+    except ValueError as exc:
+        raise ValueError(f"{key} must be an integer") from exc
+
+
+def _env_float(env: Mapping[str, str], key: str) -> float | None:
+    raw_value = env.get(key)
+    if raw_value is None or not raw_value.strip():
+        return None
+    try:
+        return float(raw_value)
+    except ValueError as exc:
+        raise ValueError(f"{key} must be a number") from exc
+
+
+def _env_bool(env: Mapping[str, str], key: str) -> bool | None:
+    raw_value = env.get(key)
+    if raw_value is None or not raw_value.strip():
+        return None
+    value = raw_value.strip().lower()
+    if value in _TRUE_VALUES:
+        return True
+    if value in _FALSE_VALUES:
+        return False
+    raise ValueError(f"{key} must be true or false")
 
 
 def _write_report(report: str, output_file: str | None, out: TextIO) -> None:
@@ -14,8 +14,12 @@ class AppConfig:
     baseline_strategy: Optional[str] = None
     db: Optional[str] = None
     timings_run_limit: Optional[int] = None
+    fetch_concurrency: Optional[int] = None
+    full_sync: Optional[bool] = None
     min_history: Optional[int] = None
     history_window: Optional[int] = None
+    rollup_window: Optional[int] = None
+    use_rollups: Optional[bool] = None
     format: Optional[str] = None
     dry_run: Optional[bool] = None
     pr_number: Optional[int] = None
@@ -34,8 +38,12 @@ def load_config(path: str | Path) -> AppConfig:
         baseline_strategy=data.get("baseline_strategy"),
         db=data.get("db"),
         timings_run_limit=_get_int(data, "timings_run_limit"),
+        fetch_concurrency=_get_int(data, "fetch_concurrency"),
+        full_sync=_get_bool(data, "full_sync"),
         min_history=_get_int(data, "min_history"),
         history_window=_get_int(data, "history_window"),
+        rollup_window=_get_int(data, "rollup_window"),
+        use_rollups=_get_bool(data, "use_rollups"),
         format=data.get("format"),
         dry_run=_get_bool(data, "dry_run"),
         pr_number=_get_int(data, "pr_number"),
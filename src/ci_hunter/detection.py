@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from itertools import islice
 import statistics
-from typing import Iterable, List, Optional
+from typing import Any, Iterable, List, Optional, Sequence
 
-from ci_hunter.junit import TEST_OUTCOME_FAILED, TEST_OUTCOME_PASSED
+from ci_hunter.history import OUTCOME_CODE_FAILED, OUTCOME_CODE_OTHER, OutcomeHistory
+from ci_hunter.rollups import MetricRollup
 
 
 @dataclass(frozen=True)
@@ -23,6 +25,8 @@ BASELINE_STRATEGY_MEDIAN = "median"
 BASELINE_STRATEGY_TRIMMED_MEAN = "trimmed_mean"
 DEFAULT_BASELINE_STRATEGY = BASELINE_STRATEGY_MEDIAN
 DEFAULT_TRIM_RATIO = 0.1
+DEFAULT_BATCH_CHUNK_SIZE = 4096
+DEFAULT_CHANGE_POINT_WINDOW_SIZE = 3
 
 
 @dataclass(frozen=True)
@@ -95,6 +99,281 @@ def detect_run_duration_regressions(
     )
 
 
+def detect_named_regressions(
+    series: Iterable[tuple[str, Sequence[float]]],
+    *,
+    min_delta_pct: float,
+    baseline_strategy: str = DEFAULT_BASELINE_STRATEGY,
+    trim_ratio: float = DEFAULT_TRIM_RATIO,
+    min_history: int = 1,
+    history_window: int | None = None,
+    chunk_size: int = DEFAULT_BATCH_CHUNK_SIZE,
+) -> DetectionResult:
+    """Run ``detect_run_duration_regressions`` over many named series at once.
+
+    Each series is ordered oldest-first; regressions are reported with the series
+    name as ``metric``. With NumPy installed, series are screened as padded
+    metrics x runs matrices ``chunk_size`` rows at a time and only the rows that
+    may regress go through the scalar detector, so results are identical either
+    way; without NumPy every series goes through the scalar detector. The reason is ``insufficient_history`` only
+    when no series has ``min_history`` baseline runs.
+    """
+    if min_history < 1:
+        raise ValueError("min_history must be >= 1")
+    if history_window is not None and history_window < 1:
+        raise ValueError("history_window must be >= 1 when set")
+    if not 0 <= trim_ratio < 0.5:
+        raise ValueError("trim_ratio must be in [0, 0.5)")
+    if baseline_strategy not in _BASELINE_STRATEGIES:
+        raise ValueError(f"Unknown baseline_strategy: {baseline_strategy}")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+
+    numpy = _import_numpy()
+    detect_chunk = _detect_chunk_scalar if numpy is None else _detect_chunk_numpy
+    regressions: list[Regression] = []
+    has_history = False
+    iterator = iter(series)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        if not has_history:
+            has_history = any(
+                _baseline_length(values, history_window) >= min_history for _, values in chunk
+            )
+        regressions.extend(
+            detect_chunk(
+                numpy,
+                chunk,
+                min_delta_pct=min_delta_pct,
+                baseline_strategy=baseline_strategy,
+                trim_ratio=trim_ratio,
+                min_history=min_history,
+                history_window=history_window,
+            )
+        )
+    if regressions or has_history:
+        return DetectionResult(regressions=regressions, reason=None)
+    return DetectionResult(regressions=[], reason=REASON_INSUFFICIENT_HISTORY)
+
+
+def detect_rollup_regressions(
+    rollups: Iterable[MetricRollup],
+    *,
+    min_delta_pct: float,
+    baseline_strategy: str = DEFAULT_BASELINE_STRATEGY,
+    trim_ratio: float = DEFAULT_TRIM_RATIO,
+    min_history: int = 1,
+    history_window: int | None = None,
+) -> DetectionResult:
+    """``detect_named_regressions`` over metric rollups instead of raw history.
+
+    With ``history_window`` the baseline comes from each rollup's recent values,
+    which matches raw history while they hold ``history_window + 1`` runs. Without
+    it the baseline covers every earlier sample: exact for ``mean``, and within the
+    sketch's relative accuracy for ``median`` and ``trimmed_mean``.
+    """
+    rollups = list(rollups)
+    if history_window is not None:
+        return detect_named_regressions(
+            ((rollup.name, rollup.values) for rollup in rollups),
+            min_delta_pct=min_delta_pct,
+            baseline_strategy=baseline_strategy,
+            trim_ratio=trim_ratio,
+            min_history=min_history,
+            history_window=history_window,
+        )
+    if min_history < 1:
+        raise ValueError("min_history must be >= 1")
+    if not 0 <= trim_ratio < 0.5:
+        raise ValueError("trim_ratio must be in [0, 0.5)")
+    if baseline_strategy not in _BASELINE_STRATEGIES:
+        raise ValueError(f"Unknown baseline_strategy: {baseline_strategy}")
+
+    regressions: list[Regression] = []
+    has_history = False
+    for rollup in rollups:
+        baseline_count = rollup.sample_count - 1
+        if not rollup.recent or baseline_count < min_history:
+            continue
+        has_history = True
+        current = rollup.recent[-1][1]
+        if baseline_strategy == BASELINE_STRATEGY_MEAN:
+            baseline = (rollup.value_sum - current) / baseline_count
+        else:
+            sketch = rollup.sketch.copy()
+            sketch.remove(current)
+            if baseline_strategy == BASELINE_STRATEGY_MEDIAN:
+                baseline = sketch.quantile(0.5)
+            else:
+                baseline = sketch.trimmed_mean(trim_ratio)
+        if baseline is None or baseline <= 0:
+            continue
+        delta_pct = (current - baseline) / baseline
+        if delta_pct >= min_delta_pct:
+            regressions.append(
+                Regression(
+                    metric=rollup.name,
+                    baseline=baseline,
+                    current=current,
+                    delta_pct=delta_pct,
+                )
+            )
+    if regressions or has_history:
+        return DetectionResult(regressions=regressions, reason=None)
+    return DetectionResult(regressions=[], reason=REASON_INSUFFICIENT_HISTORY)
+
+
+_BASELINE_STRATEGIES = {
+    BASELINE_STRATEGY_MEAN,
+    BASELINE_STRATEGY_MEDIAN,
+    BASELINE_STRATEGY_TRIMMED_MEAN,
+}
+
+
+def _baseline_length(values: Sequence[float], history_window: int | None) -> int:
+    baseline_len = len(values) - 1
+    if history_window is not None:
+        baseline_len = min(baseline_len, history_window)
+    return baseline_len
+
+
+def _import_numpy() -> Any:
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _detect_chunk_scalar(
+    numpy: Any,
+    chunk: list[tuple[str, Sequence[float]]],
+    *,
+    min_delta_pct: float,
+    baseline_strategy: str,
+    trim_ratio: float,
+    min_history: int,
+    history_window: int | None,
+) -> list[Regression]:
+    regressions: list[Regression] = []
+    for name, values in chunk:
+        if history_window is not None:
+            values = values[-(history_window + 1) :]
+        detection = detect_run_duration_regressions(
+            values,
+            min_delta_pct=min_delta_pct,
+            baseline_strategy=baseline_strategy,
+            trim_ratio=trim_ratio,
+            min_history=min_history,
+            history_window=history_window,
+        )
+        for regression in detection.regressions:
+            regressions.append(
+                Regression(
+                    metric=name,
+                    baseline=regression.baseline,
+                    current=regression.current,
+                    delta_pct=regression.delta_pct,
+                )
+            )
+    return regressions
+
+
+def _detect_chunk_numpy(
+    np: Any,
+    chunk: list[tuple[str, Sequence[float]]],
+    *,
+    min_delta_pct: float,
+    baseline_strategy: str,
+    trim_ratio: float,
+    min_history: int,
+    history_window: int | None,
+) -> list[Regression]:
+    if history_window is not None:
+        width = history_window + 1
+    else:
+        width = max(len(values) for _, values in chunk)
+    width = max(width, 1)
+    # Right-align each series so the last column is the current run; NaN pads short histories.
+    matrix = np.full((len(chunk), width), np.nan)
+    lengths = np.empty(len(chunk), dtype=np.int64)
+    for row, (_, values) in enumerate(chunk):
+        lengths[row] = len(values)
+        tail = values[-width:]
+        if len(tail):
+            matrix[row, width - len(tail) :] = np.asarray(tail, dtype=np.float64)
+
+    counts = np.clip(np.minimum(lengths - 1, width - 1), 0, None)
+    block = matrix[:, :-1]
+    baseline = _batch_baseline(np, block, counts, baseline_strategy, trim_ratio)
+    current = matrix[:, -1]
+    # The matrix baseline only pre-filters: its float rounding differs from the
+    # scalar sums, so every row that could be a regression within that rounding
+    # (or that NaN padding cannot represent) is re-checked by the scalar detector.
+    eps = np.finfo(np.float64).eps
+    abs_sums = np.nansum(np.abs(block), axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        error = 4 * eps * (width * abs_sums + np.abs(baseline)) + 1e-9 * np.abs(baseline)
+        low = baseline - error
+        delta_pct = (current - low) / low
+    screened = np.isfinite(baseline) & np.isfinite(current)
+    screened &= np.count_nonzero(~np.isnan(block), axis=1) == counts
+    possible = (lengths >= 2) & (counts >= min_history)
+    candidates = possible & ~screened
+    candidates |= possible & screened & (baseline + error > 0) & (
+        (low <= 0) | (delta_pct >= min_delta_pct - 1e-9 * (1 + abs(min_delta_pct)))
+    )
+    return _detect_chunk_scalar(
+        np,
+        [chunk[row] for row in np.flatnonzero(candidates)],
+        min_delta_pct=min_delta_pct,
+        baseline_strategy=baseline_strategy,
+        trim_ratio=trim_ratio,
+        min_history=min_history,
+        history_window=history_window,
+    )
+
+
+def _batch_baseline(
+    np: Any,
+    block: Any,
+    counts: Any,
+    strategy: str,
+    trim_ratio: float,
+) -> Any:
+    """Per-row baseline over the valid (non-NaN) trailing ``counts`` entries; NaN if undefined."""
+    rows = block.shape[0]
+    baseline = np.full(rows, np.nan)
+    if block.shape[1] == 0:
+        return baseline
+    has_values = counts > 0
+    if strategy == BASELINE_STRATEGY_MEAN:
+        sums = np.nansum(block, axis=1)
+        np.divide(sums, counts, out=baseline, where=has_values)
+        return baseline
+
+    # NaN padding sorts to the end of each row, leaving valid values in [0, count).
+    ordered = np.sort(block, axis=1)
+    if strategy == BASELINE_STRATEGY_MEDIAN:
+        low = np.clip((counts - 1) // 2, 0, None)
+        high = np.clip(counts // 2, 0, None)
+        low_values = np.take_along_axis(ordered, low[:, None], axis=1)[:, 0]
+        high_values = np.take_along_axis(ordered, high[:, None], axis=1)[:, 0]
+        baseline[has_values] = ((low_values + high_values) / 2)[has_values]
+        return baseline
+
+    trim_counts = np.floor(counts * trim_ratio).astype(np.int64)
+    kept = counts - 2 * trim_counts
+    cumulative = np.zeros((rows, ordered.shape[1] + 1))
+    np.cumsum(np.nan_to_num(ordered, nan=0.0), axis=1, out=cumulative[:, 1:])
+    upper = np.take_along_axis(cumulative, (counts - trim_counts)[:, None], axis=1)[:, 0]
+    lower = np.take_along_axis(cumulative, trim_counts[:, None], axis=1)[:, 0]
+    np.divide(upper - lower, kept, out=baseline, where=kept > 0)
+    return baseline
+
+
 def _compute_baseline(
     values: List[float],
     strategy: str,
@@ -126,6 +405,23 @@ def detect_test_flakes(
     min_failures: int = 2,
     min_runs: int = 5,
     history_window: int | None = None,
+) -> list[Flake]:
+    return detect_test_flakes_from_history(
+        OutcomeHistory.from_samples(samples),
+        min_fail_rate=min_fail_rate,
+        min_failures=min_failures,
+        min_runs=min_runs,
+        history_window=history_window,
+    )
+
+
+def detect_test_flakes_from_history(
+    history: OutcomeHistory,
+    *,
+    min_fail_rate: float = 0.2,
+    min_failures: int = 2,
+    min_runs: int = 5,
+    history_window: int | None = None,
 ) -> list[Flake]:
     if not 0 <= min_fail_rate <= 1:
         raise ValueError("min_fail_rate must be in [0, 1]")
@@ -136,37 +432,24 @@ def detect_test_flakes(
     if history_window is not None and history_window < 1:
         raise ValueError("history_window must be >= 1 when set")
 
-    by_name: dict[str, list[tuple[int, str]]] = {}
-    for sample in samples:
-        test_name = getattr(sample, "test_name")
-        run_number = getattr(sample, "run_number")
-        outcome = str(getattr(sample, "outcome")).strip().lower()
-        by_name.setdefault(test_name, []).append((run_number, outcome))
-
     flakes: list[Flake] = []
-    for test_name, entries in by_name.items():
-        entries.sort(key=lambda item: item[0])
-        outcomes = [outcome for _, outcome in entries]
+    for test_name, outcomes in history.series():
         if history_window is not None:
             outcomes = outcomes[-history_window:]
 
-        considered = [
-            outcome
-            for outcome in outcomes
-            if outcome in {TEST_OUTCOME_PASSED, TEST_OUTCOME_FAILED}
-        ]
-        if len(considered) < min_runs:
+        considered = len(outcomes) - outcomes.count(OUTCOME_CODE_OTHER)
+        if considered < min_runs:
             continue
 
-        failures = sum(1 for outcome in considered if outcome == TEST_OUTCOME_FAILED)
-        passes = len(considered) - failures
+        failures = outcomes.count(OUTCOME_CODE_FAILED)
+        passes = considered - failures
         if failures < min_failures:
             continue
         if passes == 0:
             # A consistently failing test is deterministic, not flaky.
             continue
 
-        fail_rate = failures / len(considered)
+        fail_rate = failures / considered
         if fail_rate < min_fail_rate:
             continue
         flakes.append(
@@ -174,7 +457,7 @@ def detect_test_flakes(
                 test_name=test_name,
                 fail_rate=fail_rate,
                 failures=failures,
-                total_runs=len(considered),
+                total_runs=considered,
             )
         )
 
@@ -186,7 +469,7 @@ def detect_run_duration_change_points(
     durations: Iterable[float],
     *,
     min_delta_pct: float,
-    window_size: int = 3,
+    window_size: int = DEFAULT_CHANGE_POINT_WINDOW_SIZE,
     history_window: int | None = None,
 ) -> list[ChangePoint]:
     if window_size < 1:
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import io
+import tempfile
+from typing import BinaryIO, List
 import zipfile
-from typing import List
+
+import httpx
 
 from ci_hunter.github.client import (
     AUTH_SCHEME,
@@ -14,28 +17,52 @@ from ci_hunter.github.client import (
     HEADER_API_VERSION,
     HEADER_AUTHORIZATION,
 )
-from ci_hunter.github.http import request_with_retry
+from ci_hunter.github.http import download_with_retry, request_with_retry
 from ci_hunter.junit import (
+    JUnitReport,
     TestDuration,
     TestOutcome,
-    parse_junit_durations,
-    parse_junit_test_outcomes,
+    iter_junit_results,
 )
 
+# Artifacts up to this size stay in memory; larger downloads roll over to a temp file.
+ARTIFACT_SPOOL_MAX_BYTES = 8 * 1024 * 1024
 
-def fetch_junit_durations_from_artifacts(
+
+def fetch_junit_report_from_artifacts(
     *,
     token: str,
     repo: str,
     run_id: int,
     base_url: str = DEFAULT_BASE_URL,
-) -> List[TestDuration]:
-    artifacts = _list_artifacts(token, repo, run_id, base_url)
+    http_client: httpx.Client | None = None,
+) -> JUnitReport:
+    """Download each artifact once and collect durations and outcomes in one parse."""
+    artifacts = _list_artifacts(token, repo, run_id, base_url, http_client)
     durations: list[TestDuration] = []
+    outcomes: list[TestOutcome] = []
     for artifact_id in artifacts:
-        zip_bytes = _download_artifact_zip(token, repo, artifact_id, base_url)
-        durations.extend(_parse_junit_zip(zip_bytes))
-    return durations
+        with tempfile.SpooledTemporaryFile(max_size=ARTIFACT_SPOOL_MAX_BYTES) as spool:
+            _download_artifact_zip(token, repo, artifact_id, base_url, spool, http_client)
+            _parse_junit_report_zip(spool, durations, outcomes)
+    return JUnitReport(durations=durations, outcomes=outcomes)
+
+
+def fetch_junit_durations_from_artifacts(
+    *,
+    token: str,
+    repo: str,
+    run_id: int,
+    base_url: str = DEFAULT_BASE_URL,
+    http_client: httpx.Client | None = None,
+) -> List[TestDuration]:
+    return fetch_junit_report_from_artifacts(
+        token=token,
+        repo=repo,
+        run_id=run_id,
+        base_url=base_url,
+        http_client=http_client,
+    ).durations
 
 
 def fetch_junit_test_outcomes_from_artifacts(
@@ -44,16 +71,24 @@ def fetch_junit_test_outcomes_from_artifacts(
     repo: str,
     run_id: int,
     base_url: str = DEFAULT_BASE_URL,
+    http_client: httpx.Client | None = None,
 ) -> List[TestOutcome]:
-    artifacts = _list_artifacts(token, repo, run_id, base_url)
-    outcomes: list[TestOutcome] = []
-    for artifact_id in artifacts:
-        zip_bytes = _download_artifact_zip(token, repo, artifact_id, base_url)
-        outcomes.extend(_parse_junit_outcomes_zip(zip_bytes))
-    return outcomes
+    return fetch_junit_report_from_artifacts(
+        token=token,
+        repo=repo,
+        run_id=run_id,
+        base_url=base_url,
+        http_client=http_client,
+    ).outcomes
 
 
-def _list_artifacts(token: str, repo: str, run_id: int, base_url: str) -> list[int]:
+def _list_artifacts(
+    token: str,
+    repo: str,
+    run_id: int,
+    base_url: str,
+    http_client: httpx.Client | None = None,
+) -> list[int]:
     response = request_with_retry(
         "GET",
         f"{base_url.rstrip('/')}/repos/{repo}/actions/runs/{run_id}/artifacts",
@@ -63,6 +98,7 @@ def _list_artifacts(token: str, repo: str, run_id: int, base_url: str) -> list[i
             HEADER_API_VERSION: GITHUB_API_VERSION,
         },
         timeout=DEFAULT_TIMEOUT_SECONDS,
+        client=http_client,
     )
     response.raise_for_status()
     payload = response.json()
@@ -74,44 +110,41 @@ def _download_artifact_zip(
     repo: str,
     artifact_id: int,
     base_url: str,
-) -> bytes:
-    response = request_with_retry(
+    destination: BinaryIO,
+    http_client: httpx.Client | None = None,
+) -> None:
+    download_with_retry(
         "GET",
         f"{base_url.rstrip('/')}/repos/{repo}/actions/artifacts/{artifact_id}/zip",
+        destination,
         headers={
             HEADER_AUTHORIZATION: f"{AUTH_SCHEME} {token}",
             HEADER_ACCEPT: GITHUB_ACCEPT_HEADER,
             HEADER_API_VERSION: GITHUB_API_VERSION,
         },
+        follow_redirects=True,
         timeout=DEFAULT_TIMEOUT_SECONDS,
+        client=http_client,
     )
-    response.raise_for_status()
-    return response.content
 
 
-def _parse_junit_zip(zip_bytes: bytes) -> List[TestDuration]:
-    durations: list[TestDuration] = []
-    with zipfile.ZipFile(io.BytesIO(zip_bytes), "r") as zip_file:
-        for name in zip_file.namelist():
-            if name.endswith("/"):
-                continue
-            if not name.lower().endswith(".xml"):
-                continue
-            with zip_file.open(name) as handle:
-                text = handle.read().decode("utf-8", errors="replace")
-            durations.extend(parse_junit_durations(text))
-    return durations
-
-
-def _parse_junit_outcomes_zip(zip_bytes: bytes) -> List[TestOutcome]:
-    outcomes: list[TestOutcome] = []
-    with zipfile.ZipFile(io.BytesIO(zip_bytes), "r") as zip_file:
+def _parse_junit_report_zip(
+    zip_source: BinaryIO,
+    durations: list[TestDuration],
+    outcomes: list[TestOutcome],
+) -> None:
+    with zipfile.ZipFile(zip_source, "r") as zip_file:
         for name in zip_file.namelist():
             if name.endswith("/"):
                 continue
             if not name.lower().endswith(".xml"):
                 continue
-            with zip_file.open(name) as handle:
-                text = handle.read().decode("utf-8", errors="replace")
-            outcomes.extend(parse_junit_test_outcomes(text))
-    return outcomes
+            # Decode with replacement like the text parsers, but incrementally from the member stream.
+            with zip_file.open(name) as handle, io.TextIOWrapper(
+                handle,
+                encoding="utf-8",
+                errors="replace",
+            ) as text:
+                for duration, outcome in iter_junit_results(text):
+                    durations.append(duration)
+                    outcomes.append(outcome)
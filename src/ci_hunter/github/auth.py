@@ -38,11 +38,13 @@ class GitHubAppAuth:
         installation_id: str,
         private_key_pem: str,
         base_url: str = DEFAULT_BASE_URL,
+        http_client: Optional[httpx.Client] = None,
     ) -> None:
         self._app_id = app_id
         self._installation_id = installation_id
         self._private_key_pem = private_key_pem
         self._base_url = base_url.rstrip("/")
+        self._http_client = http_client
 
     def get_installation_token(self) -> InstallationToken:
         jwt_token = self._create_jwt()
@@ -55,6 +57,7 @@ class GitHubAppAuth:
                 HEADER_API_VERSION: GITHUB_API_VERSION,
             },
             timeout=DEFAULT_TIMEOUT_SECONDS,
+            client=self._http_client,
         )
         response.raise_for_status()
         payload = response.json()
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 
 import httpx
 
@@ -16,6 +16,7 @@ HEADER_ACCEPT = "Accept"
 HEADER_AUTHORIZATION = "Authorization"
 HEADER_API_VERSION = "X-GitHub-Api-Version"
 AUTH_SCHEME = "Bearer"
+MAX_PER_PAGE = 100
 
 
 @dataclass(frozen=True)
@@ -30,42 +31,90 @@ class WorkflowRun:
 
 
 class GitHubActionsClient:
-    def __init__(self, token: str, base_url: str = DEFAULT_BASE_URL) -> None:
+    def __init__(
+        self,
+        token: str,
+        base_url: str = DEFAULT_BASE_URL,
+        *,
+        http_client: Optional[httpx.Client] = None,
+    ) -> None:
         self._token = token
         self._base_url = base_url.rstrip("/")
+        self._http_client = http_client
 
-    def list_workflow_runs(self, repo: str, per_page: int = 30) -> List[WorkflowRun]:
+    def list_workflow_runs(
+        self,
+        repo: str,
+        per_page: int = 30,
+        *,
+        created_since: Optional[str] = None,
+        stop_at_run_id: Optional[int] = None,
+    ) -> List[WorkflowRun]:
+        """List runs newest-first.
+
+        ``created_since`` narrows the listing with GitHub's ``created>=`` filter, and
+        pagination stops at the first run whose id is ``stop_at_run_id`` or older,
+        which callers pass when every run up to that id is already stored and completed.
+        """
         runs: list[WorkflowRun] = []
         page = 1
+        params: dict[str, object] = {"per_page": per_page}
+        if created_since is not None:
+            params["created"] = f">={created_since}"
         while True:
+            reached_known_run = False
             response = request_with_retry(
                 "GET",
                 f"{self._base_url}/repos/{repo}/actions/runs",
-                params={"per_page": per_page, "page": page},
+                params={**params, "page": page},
                 headers={
                     HEADER_AUTHORIZATION: f"{AUTH_SCHEME} {self._token}",
                     HEADER_ACCEPT: GITHUB_ACCEPT_HEADER,
                     HEADER_API_VERSION: GITHUB_API_VERSION,
                 },
                 timeout=DEFAULT_TIMEOUT_SECONDS,
+                client=self._http_client,
             )
             response.raise_for_status()
             payload = response.json()
 
             for run in payload.get("workflow_runs", []):
-                runs.append(
-                    WorkflowRun(
-                        id=run["id"],
-                        run_number=run["run_number"],
-                        status=run.get("status"),
-                        conclusion=run.get("conclusion"),
-                        created_at=run["created_at"],
-                        updated_at=run["updated_at"],
-                        head_sha=run["head_sha"],
-                    )
-                )
+                if stop_at_run_id is not None and run["id"] <= stop_at_run_id:
+                    reached_known_run = True
+                    break
+                runs.append(_parse_workflow_run(run))
+            if reached_known_run:
+                break
             link_header = response.headers.get("Link", "")
             if 'rel="next"' not in link_header:
                 break
             page += 1
         return runs
+
+    def get_workflow_run(self, repo: str, run_id: int) -> WorkflowRun:
+        """Fetch one run, e.g. to refresh a run that has been pending for a long time."""
+        response = request_with_retry(
+            "GET",
+            f"{self._base_url}/repos/{repo}/actions/runs/{run_id}",
+            headers={
+                HEADER_AUTHORIZATION: f"{AUTH_SCHEME} {self._token}",
+                HEADER_ACCEPT: GITHUB_ACCEPT_HEADER,
+                HEADER_API_VERSION: GITHUB_API_VERSION,
+            },
+            timeout=DEFAULT_TIMEOUT_SECONDS,
+            client=self._http_client,
+        )
+        response.raise_for_status()
+        return _parse_workflow_run(response.json())
+
+
+def _parse_workflow_run(run: dict) -> WorkflowRun:
+    return WorkflowRun(
+        id=run["id"],
+        run_number=run["run_number"],
+        status=run.get("status"),
+        conclusion=run.get("conclusion"),
+        created_at=run["created_at"],
+        updated_at=run["updated_at"],
+        head_sha=run["head_sha"],
+    )
@@ -22,6 +22,7 @@ def post_pr_comment(
     body: str,
     *,
     base_url: str = DEFAULT_BASE_URL,
+    http_client: httpx.Client | None = None,
 ) -> int:
     response = request_with_retry(
         "POST",
@@ -33,6 +34,7 @@ def post_pr_comment(
         },
         json={"body": body},
         timeout=DEFAULT_TIMEOUT_SECONDS,
+        client=http_client,
     )
     response.raise_for_status()
     payload = response.json()
@@ -1,13 +1,80 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+import importlib.util
 import random
+import threading
 import time
-from typing import Iterable, Optional
+from typing import BinaryIO, Iterable, Optional
 
 import httpx
 
 
 RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 10
+DEFAULT_KEEPALIVE_EXPIRY_SECONDS = 30.0
+DEFAULT_DOWNLOAD_CHUNK_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class HttpClientConfig:
+    max_connections: int = DEFAULT_MAX_CONNECTIONS
+    max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS
+    keepalive_expiry_seconds: float = DEFAULT_KEEPALIVE_EXPIRY_SECONDS
+    http2: bool = True
+
+
+_shared_client: Optional[httpx.Client] = None
+_shared_client_config = HttpClientConfig()
+_shared_client_lock = threading.Lock()
+
+
+def configure_http_client(config: HttpClientConfig) -> None:
+    """Replace the pool settings used by the shared GitHub HTTP client."""
+    global _shared_client, _shared_client_config
+    if config.max_connections <= 0:
+        raise ValueError("max_connections must be positive")
+    if config.max_keepalive_connections < 0:
+        raise ValueError("max_keepalive_connections must be non-negative")
+    with _shared_client_lock:
+        previous = _shared_client
+        _shared_client = None
+        _shared_client_config = config
+    if previous is not None:
+        previous.close()
+
+
+def get_http_client() -> httpx.Client:
+    """Return the process-wide pooled client, creating it on first use."""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None or _shared_client.is_closed:
+            _shared_client = build_http_client(_shared_client_config)
+        return _shared_client
+
+
+def close_http_client() -> None:
+    global _shared_client
+    with _shared_client_lock:
+        client = _shared_client
+        _shared_client = None
+    if client is not None:
+        client.close()
+
+
+def build_http_client(config: HttpClientConfig) -> httpx.Client:
+    limits = httpx.Limits(
+        max_connections=config.max_connections,
+        max_keepalive_connections=config.max_keepalive_connections,
+        keepalive_expiry=config.keepalive_expiry_seconds,
+    )
+    # HTTP/2 needs the optional ``h2`` package; fall back to HTTP/1.1 keep-alive without it.
+    return httpx.Client(limits=limits, http2=config.http2 and _http2_available())
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
 
 
 def request_with_retry(
@@ -17,13 +84,15 @@ def request_with_retry(
     max_retries: int = 2,
     retry_statuses: Iterable[int] = RETRY_STATUS_CODES,
     backoff_seconds: float = 0.5,
+    client: Optional[httpx.Client] = None,
     **kwargs,
 ) -> httpx.Response:
     attempts = 0
     retry_statuses_set = set(retry_statuses)
+    http_client = client or get_http_client()
     while True:
         try:
-            response = httpx.request(method, url, **kwargs)
+            response = http_client.request(method, url, **kwargs)
             if response.status_code in retry_statuses_set and attempts < max_retries:
                 attempts += 1
                 time.sleep(_compute_backoff(response, attempts, backoff_seconds))
@@ -37,6 +106,54 @@ def request_with_retry(
             time.sleep(_compute_backoff(None, attempts, backoff_seconds))
 
 
+def download_with_retry(
+    method: str,
+    url: str,
+    destination: BinaryIO,
+    *,
+    max_retries: int = 2,
+    retry_statuses: Iterable[int] = RETRY_STATUS_CODES,
+    backoff_seconds: float = 0.5,
+    client: Optional[httpx.Client] = None,
+    chunk_size: int = DEFAULT_DOWNLOAD_CHUNK_BYTES,
+    **kwargs,
+) -> int:
+    """Stream a response body into ``destination`` and rewind it.
+
+    Follows the same retry policy as ``request_with_retry``; a retried attempt
+    truncates whatever a failed attempt had written. Returns the byte count.
+    """
+    attempts = 0
+    retry_statuses_set = set(retry_statuses)
+    http_client = client or get_http_client()
+    while True:
+        try:
+            with http_client.stream(method, url, **kwargs) as response:
+                if response.status_code in retry_statuses_set and attempts < max_retries:
+                    attempts += 1
+                    delay = _compute_backoff(response, attempts, backoff_seconds)
+                else:
+                    response.raise_for_status()
+                    return _write_body(response, destination, chunk_size)
+            time.sleep(delay)
+        except httpx.RequestError:
+            if attempts >= max_retries:
+                raise
+            attempts += 1
+            time.sleep(_compute_backoff(None, attempts, backoff_seconds))
+
+
+def _write_body(response: httpx.Response, destination: BinaryIO, chunk_size: int) -> int:
+    destination.seek(0)
+    destination.truncate()
+    written = 0
+    for chunk in response.iter_bytes(chunk_size):
+        destination.write(chunk)
+        written += len(chunk)
+    destination.seek(0)
+    return written
+
+
 def _compute_backoff(
     response: Optional[httpx.Response],
     attempts: int,
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import io
+import tempfile
+from typing import BinaryIO, List
 import zipfile
-from typing import List
 
 import httpx
 
@@ -16,8 +17,11 @@ from ci_hunter.github.client import (
     HEADER_API_VERSION,
     HEADER_AUTHORIZATION,
 )
-from ci_hunter.github.http import request_with_retry
-from ci_hunter.steps import StepDuration, parse_step_durations
+from ci_hunter.github.http import download_with_retry
+from ci_hunter.steps import StepDuration, parse_step_duration_lines
+
+# Archives up to this size stay in memory; larger downloads roll over to a temp file.
+LOG_SPOOL_MAX_BYTES = 8 * 1024 * 1024
 
 
 def fetch_run_step_durations(
@@ -26,32 +30,40 @@ def fetch_run_step_durations(
     run_id: int,
     *,
     base_url: str = DEFAULT_BASE_URL,
+    http_client: httpx.Client | None = None,
 ) -> List[StepDuration]:
-    response = request_with_retry(
-        "GET",
-        f"{base_url.rstrip('/')}/repos/{repo}/actions/runs/{run_id}/logs",
-        headers={
-            HEADER_AUTHORIZATION: f"{AUTH_SCHEME} {token}",
-            HEADER_ACCEPT: GITHUB_ACCEPT_HEADER,
-            HEADER_API_VERSION: GITHUB_API_VERSION,
-        },
-        follow_redirects=True,
-        timeout=DEFAULT_TIMEOUT_SECONDS,
-    )
-    response.raise_for_status()
-    return _parse_zip_logs(response.content)
+    with tempfile.SpooledTemporaryFile(max_size=LOG_SPOOL_MAX_BYTES) as spool:
+        download_with_retry(
+            "GET",
+            f"{base_url.rstrip('/')}/repos/{repo}/actions/runs/{run_id}/logs",
+            spool,
+            headers={
+                HEADER_AUTHORIZATION: f"{AUTH_SCHEME} {token}",
+                HEADER_ACCEPT: GITHUB_ACCEPT_HEADER,
+                HEADER_API_VERSION: GITHUB_API_VERSION,
+            },
+            follow_redirects=True,
+            timeout=DEFAULT_TIMEOUT_SECONDS,
+            client=http_client,
+        )
+        return _parse_zip_logs(spool)
 
 
-def _parse_zip_logs(zip_bytes: bytes) -> List[StepDuration]:
+def _parse_zip_logs(zip_source: BinaryIO) -> List[StepDuration]:
     durations: list[StepDuration] = []
-    with zipfile.ZipFile(io.BytesIO(zip_bytes), "r") as zip_file:
+    with zipfile.ZipFile(zip_source, "r") as zip_file:
         for name in zip_file.namelist():
             if name.endswith("/"):
                 continue
-            with zip_file.open(name) as handle:
-                text = handle.read().decode("utf-8", errors="replace")
+            # TextIOWrapper decodes incrementally, so only the current line is held in memory.
+            with zip_file.open(name) as handle, io.TextIOWrapper(
+                handle,
+                encoding="utf-8",
+                errors="replace",
+            ) as lines:
+                steps = parse_step_duration_lines(lines)
             job_name = _derive_job_name(name)
-            durations.extend(_prefix_step_names(parse_step_durations(text), job_name))
+            durations.extend(_prefix_step_names(steps, job_name))
     return durations
 
 
@@ -32,11 +32,12 @@ def infer_pr_number(
     commit: Optional[str] = None,
     branch: Optional[str] = None,
     base_url: str = DEFAULT_BASE_URL,
+    http_client: httpx.Client | None = None,
 ) -> Optional[InferredPullRequest]:
     if commit:
-        pulls = _list_pulls_for_commit(token, repo, commit, base_url)
+        pulls = _list_pulls_for_commit(token, repo, commit, base_url, http_client)
     elif branch:
-        pulls = _list_pulls_for_branch(token, repo, branch, base_url)
+        pulls = _list_pulls_for_branch(token, repo, branch, base_url, http_client)
     else:
         raise ValueError("commit or branch is required for PR inference")
 
@@ -61,6 +62,7 @@ def _list_pulls_for_commit(
     repo: str,
     commit: str,
     base_url: str,
+    http_client: httpx.Client | None = None,
 ) -> list[dict]:
     response = request_with_retry(
         "GET",
@@ -71,6 +73,7 @@ def _list_pulls_for_commit(
             HEADER_API_VERSION: GITHUB_API_VERSION,
         },
         timeout=DEFAULT_TIMEOUT_SECONDS,
+        client=http_client,
     )
     response.raise_for_status()
     return response.json()
@@ -81,6 +84,7 @@ def _list_pulls_for_branch(
     repo: str,
     branch: str,
     base_url: str,
+    http_client: httpx.Client | None = None,
 ) -> list[dict]:
     owner = repo.split("/")[0]
     response = request_with_retry(
@@ -93,6 +97,7 @@ def _list_pulls_for_branch(
             HEADER_API_VERSION: GITHUB_API_VERSION,
         },
         timeout=DEFAULT_TIMEOUT_SECONDS,
+        client=http_client,
     )
     response.raise_for_status()
     return response.json()
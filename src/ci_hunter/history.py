@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from array import array
+from typing import Iterable, Iterator
+
+from ci_hunter.junit import TEST_OUTCOME_FAILED, TEST_OUTCOME_PASSED
+
+
+OUTCOME_CODE_FAILED = 0
+OUTCOME_CODE_PASSED = 1
+OUTCOME_CODE_OTHER = -1
+_OUTCOME_CODES = {
+    TEST_OUTCOME_FAILED: OUTCOME_CODE_FAILED,
+    TEST_OUTCOME_PASSED: OUTCOME_CODE_PASSED,
+}
+
+
+class _MetricColumns:
+    """Name-interned, per-metric columns shared by the duration and outcome histories.
+
+    Metric ids are assigned in first-seen order, so iteration follows the order rows
+    were appended (storage returns them by run number, then name).
+    """
+
+    _value_typecode = "d"
+
+    def __init__(self) -> None:
+        self._ids: dict[str, int] = {}
+        self._names: list[str] = []
+        self._run_numbers: list[array] = []
+        self._values: list[array] = []
+        self._sorted: list[bool] = []
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._names)
+
+    def metric_id(self, name: str) -> int:
+        metric_id = self._ids.get(name)
+        if metric_id is None:
+            metric_id = len(self._names)
+            self._ids[name] = metric_id
+            self._names.append(name)
+            self._run_numbers.append(array("q"))
+            self._values.append(array(self._value_typecode))
+            self._sorted.append(True)
+        return metric_id
+
+    def _append(self, name: str, run_number: int, value: float | int) -> None:
+        metric_id = self.metric_id(name)
+        run_numbers = self._run_numbers[metric_id]
+        if run_numbers and run_number < run_numbers[-1]:
+            self._sorted[metric_id] = False
+        run_numbers.append(run_number)
+        self._values[metric_id].append(value)
+
+    def _ordered_values(self, metric_id: int) -> array:
+        if not self._sorted[metric_id]:
+            run_numbers = self._run_numbers[metric_id]
+            values = self._values[metric_id]
+            order = sorted(range(len(run_numbers)), key=run_numbers.__getitem__)
+            self._run_numbers[metric_id] = array("q", (run_numbers[i] for i in order))
+            self._values[metric_id] = array(self._value_typecode, (values[i] for i in order))
+            self._sorted[metric_id] = True
+        return self._values[metric_id]
+
+    def run_numbers(self, name: str) -> array:
+        metric_id = self._ids[name]
+        self._ordered_values(metric_id)
+        return self._run_numbers[metric_id]
+
+    def values(self, name: str) -> array:
+        return self._ordered_values(self._ids[name])
+
+    def series(self) -> Iterator[tuple[str, array]]:
+        """Yield ``(name, values)`` per metric, values ordered by run number."""
+        for metric_id, name in enumerate(self._names):
+            yield name, self._ordered_values(metric_id)
+
+
+class DurationHistory(_MetricColumns):
+    """Columnar duration samples (steps or tests) grouped by metric name."""
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple[int, str, float]]) -> "DurationHistory":
+        history = cls()
+        for run_number, name, duration_seconds in rows:
+            history.append(name, run_number, duration_seconds)
+        return history
+
+    @classmethod
+    def from_samples(cls, samples: Iterable[object]) -> "DurationHistory":
+        history = cls()
+        for sample in samples:
+            name = getattr(sample, "step_name", None)
+            if name is None:
+                name = getattr(sample, "test_name")
+            history.append(name, sample.run_number, sample.duration_seconds)
+        return history
+
+    def append(self, name: str, run_number: int, duration_seconds: float) -> None:
+        self._append(name, run_number, float(duration_seconds))
+
+
+class OutcomeHistory(_MetricColumns):
+    """Columnar test outcomes encoded as ``OUTCOME_CODE_*`` values."""
+
+    _value_typecode = "b"
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple[int, str, str]]) -> "OutcomeHistory":
+        history = cls()
+        for run_number, name, outcome in rows:
+            history.append(name, run_number, outcome)
+        return history
+
+    @classmethod
+    def from_samples(cls, samples: Iterable[object]) -> "OutcomeHistory":
+        history = cls()
+        for sample in samples:
+            history.append(sample.test_name, sample.run_number, sample.outcome)
+        return history
+
+    def append(self, name: str, run_number: int, outcome: str) -> None:
+        code = _OUTCOME_CODES.get(str(outcome).strip().lower(), OUTCOME_CODE_OTHER)
+        self._append(name, run_number, code)
@@ -1,20 +1,263 @@
 from __future__ import annotations
 
+from collections.abc import Callable
+from dataclasses import dataclass
 import json
+import os
 from pathlib import Path
+import time
+from typing import IO, Iterable
+import uuid
 
 from ci_hunter.file_lock import locked_file
-from ci_hunter.queue import AnalysisJob
+from ci_hunter.queue import AnalysisJob, coalesce_jobs
+
+# Claimed jobs are journaled next to the queue file until they are acked or requeued.
+JOURNAL_SUFFIX = ".inprogress"
+
+
+@dataclass(frozen=True)
+class FileClaim:
+    """A job moved from the queue file into its in-progress journal.
+
+    ``lease`` is shared by the jobs claimed together and ``slot`` is the job's
+    position in that claim. Once ``expires_at`` passes, the next claim moves
+    the job back to the front of the queue. ``coalesced`` counts the older
+    pending jobs for the same PR that this one replaced.
+    """
+
+    lease: str
+    slot: int
+    expires_at: float
+    job: AnalysisJob
+    coalesced: int = 0
 
 
 def append_job(path: str, job: AnalysisJob) -> None:
-    payload = {
+    path_obj = Path(path)
+    path_obj.parent.mkdir(parents=True, exist_ok=True)
+    with locked_file(path_obj, "a") as handle:
+        handle.write(json.dumps(job_payload(job)) + "\n")
+
+
+def journal_path(path: Path) -> Path:
+    return path.with_name(path.name + JOURNAL_SUFFIX)
+
+
+def claim_jobs(
+    path: Path,
+    limit: int,
+    *,
+    visibility_timeout_seconds: float,
+    warn: Callable[[str], None] | None = None,
+    clock: Callable[[], float] = time.time,
+) -> list[FileClaim]:
+    """Move up to ``limit`` jobs from the head of the queue into the journal.
+
+    The queue file lock is held only while both files are rewritten, so
+    appenders never wait on a running analysis. Jobs whose lease has expired
+    are claimed again before any queued job. Waiting jobs for the same PR are
+    coalesced first (see ``coalesce_jobs``); claimed jobs are not, so a push
+    made while its PR is being analyzed still runs afterwards.
+    """
+    with locked_file(path, "a+") as handle:
+        handle.seek(0)
+        entries = load_entries(handle.read(), path.name, warn=warn)
+        journal = _read_journal(path)
+        now = clock()
+        expired = [claim for claim in journal if claim.expires_at <= now]
+        if not entries and not expired:
+            return []
+        candidates = coalesce_jobs([(claim.job, claim.coalesced) for claim in expired] + entries)
+        lease = uuid.uuid4().hex
+        claimed = [
+            FileClaim(
+                lease=lease,
+                slot=slot,
+                expires_at=now + visibility_timeout_seconds,
+                job=job,
+                coalesced=coalesced,
+            )
+            for slot, (job, coalesced) in enumerate(candidates[:limit])
+        ]
+        live = [claim for claim in journal if claim.expires_at > now]
+        # Journal before dequeue: a crash in between repeats a job rather than losing it.
+        _write_journal(path, live + claimed)
+        _rewrite_queue(handle, candidates[len(claimed) :])
+    return claimed
+
+
+def ack_job(path: Path, claim: FileClaim) -> bool:
+    """Drop a finished job from the journal; ``False`` if its lease already expired."""
+    with locked_file(path, "a+"):
+        journal = _read_journal(path)
+        remaining = [entry for entry in journal if not _same_claim(entry, claim)]
+        if len(remaining) == len(journal):
+            return False
+        _write_journal(path, remaining)
+    return True
+
+
+def requeue_jobs(path: Path, claims: Iterable[FileClaim]) -> int:
+    """Put unfinished claimed jobs back at the front of the queue, in claim order.
+
+    Jobs whose lease already expired were requeued by a later claim and are
+    skipped. Returns the number of jobs requeued.
+    """
+    claims = list(claims)
+    if not claims:
+        return 0
+    with locked_file(path, "a+") as handle:
+        journal = _read_journal(path)
+        requeued = [
+            entry for entry in journal if any(_same_claim(entry, claim) for claim in claims)
+        ]
+        if not requeued:
+            return 0
+        handle.seek(0)
+        entries = load_entries(handle.read(), path.name)
+        _rewrite_queue(handle, [(entry.job, entry.coalesced) for entry in requeued] + entries)
+        _write_journal(path, [entry for entry in journal if entry not in requeued])
+    return len(requeued)
+
+
+def pending_job_count(path: Path) -> int:
+    """Jobs waiting in the queue file, not counting claimed ones."""
+    with locked_file(path, "a+") as handle:
+        handle.seek(0)
+        return len(load_entries(handle.read(), path.name))
+
+
+def load_jobs(
+    content: str,
+    path_name: str,
+    *,
+    warn: Callable[[str], None] | None = None,
+) -> list[AnalysisJob]:
+    return [job for job, _coalesced in load_entries(content, path_name, warn=warn)]
+
+
+def load_entries(
+    content: str,
+    path_name: str,
+    *,
+    warn: Callable[[str], None] | None = None,
+) -> list[tuple[AnalysisJob, int]]:
+    """Queue lines as ``(job, coalesced)`` pairs; invalid lines are skipped."""
+    entries: list[tuple[AnalysisJob, int]] = []
+    for line_number, line in enumerate(content.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            payload = json.loads(line)
+        except json.JSONDecodeError:
+            if warn is not None:
+                warn(f"{path_name}:{line_number}: skipping invalid queue line")
+            continue
+        if not _has_required_fields(payload):
+            if warn is not None:
+                warn(f"{path_name}:{line_number}: skipping queue line missing required fields")
+            continue
+        coalesced = payload.get("coalesced")
+        entries.append((job_from_payload(payload), coalesced if isinstance(coalesced, int) else 0))
+    return entries
+
+
+def render_jobs(jobs: Iterable[AnalysisJob]) -> str:
+    return render_entries((job, 0) for job in jobs)
+
+
+def render_entries(entries: Iterable[tuple[AnalysisJob, int]]) -> str:
+    lines = []
+    for job, coalesced in entries:
+        payload = job_payload(job)
+        if coalesced:
+            payload["coalesced"] = coalesced
+        lines.append(json.dumps(payload, separators=(",", ":")) + "\n")
+    return "".join(lines)
+
+
+def job_payload(job: AnalysisJob) -> dict[str, object]:
+    return {
         "repo": job.repo,
         "pr_number": job.pr_number,
         "commit": job.commit,
         "branch": job.branch,
     }
-    path_obj = Path(path)
-    path_obj.parent.mkdir(parents=True, exist_ok=True)
-    with locked_file(path_obj, "a") as handle:
-        handle.write(json.dumps(payload) + "\n")
+
+
+def job_from_payload(payload: dict[str, object]) -> AnalysisJob:
+    return AnalysisJob(
+        repo=payload["repo"],
+        pr_number=payload["pr_number"],
+        commit=payload.get("commit"),
+        branch=payload.get("branch"),
+    )
+
+
+def claim_payload(claim: FileClaim) -> dict[str, object]:
+    return {
+        "lease": claim.lease,
+        "slot": claim.slot,
+        "expires_at": claim.expires_at,
+        "job": job_payload(claim.job),
+        "coalesced": claim.coalesced,
+    }
+
+
+def claim_from_payload(payload: dict[str, object]) -> FileClaim:
+    return FileClaim(
+        lease=payload["lease"],
+        slot=payload["slot"],
+        expires_at=payload["expires_at"],
+        job=job_from_payload(payload["job"]),
+        coalesced=payload.get("coalesced", 0),
+    )
+
+
+def _rewrite_queue(handle: IO[str], entries: list[tuple[AnalysisJob, int]]) -> None:
+    handle.seek(0)
+    handle.truncate()
+    handle.write(render_entries(entries))
+    handle.flush()
+
+
+def _read_journal(path: Path) -> list[FileClaim]:
+    try:
+        content = journal_path(path).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return []
+    claims: list[FileClaim] = []
+    for line in content.splitlines():
+        try:
+            claims.append(claim_from_payload(json.loads(line)))
+        except (json.JSONDecodeError, KeyError, TypeError):
+            # A torn line can only come from a crash mid-replace; ignore it.
+            continue
+    return claims
+
+
+def _write_journal(path: Path, claims: list[FileClaim]) -> None:
+    target = journal_path(path)
+    if not claims:
+        target.unlink(missing_ok=True)
+        return
+    lines = [json.dumps(claim_payload(claim), separators=(",", ":")) for claim in claims]
+    temp = target.with_name(target.name + ".tmp")
+    with open(temp, "w", encoding="utf-8") as handle:
+        handle.write("\n".join(lines) + "\n")
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temp, target)
+
+
+def _same_claim(entry: FileClaim, claim: FileClaim) -> bool:
+    return entry.lease == claim.lease and entry.slot == claim.slot
+
+
+def _has_required_fields(payload: object) -> bool:
+    if not isinstance(payload, dict):
+        return False
+    repo = payload.get("repo")
+    pr_number = payload.get("pr_number")
+    return isinstance(repo, str) and bool(repo.strip()) and isinstance(pr_number, int)
@@ -0,0 +1,431 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import json
+import os
+from pathlib import Path
+import re
+import time
+from typing import IO, Iterable, Iterator
+import uuid
+
+from ci_hunter.file_lock import locked_file
+from ci_hunter.job_queue_file import (
+    FileClaim,
+    claim_from_payload,
+    claim_payload,
+    job_from_payload,
+    job_payload,
+)
+from ci_hunter.queue import AnalysisJob, coalesce_jobs, job_key
+
+FSYNC_ALWAYS = "always"
+FSYNC_BATCH = "batch"
+FSYNC_NEVER = "never"
+FSYNC_POLICIES = (FSYNC_ALWAYS, FSYNC_BATCH, FSYNC_NEVER)
+DEFAULT_FSYNC_POLICY = FSYNC_BATCH
+DEFAULT_SEGMENT_MAX_BYTES = 8 * 1024 * 1024
+DEFAULT_CONSUMER_GROUP = "default"
+
+_SEGMENT_SUFFIX = ".log"
+_GROUP_SUFFIX = ".group"
+_LOCK_NAME = "queue.lock"
+_LATEST_NAME = "latest.keys"
+_GROUP_NAME = re.compile(r"[A-Za-z0-9_.-]+")
+_TAIL_CHUNK_BYTES = 4096
+# latest.keys is rewritten without superseded entries once they outnumber the rest.
+_LATEST_REWRITE_MIN_ENTRIES = 1024
+
+
+@dataclass
+class _GroupState:
+    # Read cursor: the next record is at ``position`` bytes into segment ``segment``.
+    segment: int
+    position: int
+    offset: int
+    retry: list[tuple[AnalysisJob, int]] = field(default_factory=list)
+    leases: list[FileClaim] = field(default_factory=list)
+    # Records skipped as superseded, per PR, until the group reads the newest one.
+    superseded: dict[tuple[str, int], int] = field(default_factory=dict)
+
+
+class JobLog:
+    """Append-only job queue stored as numbered segment files in ``directory``.
+
+    Producers append JSON records to the newest segment, starting a new one
+    once it reaches ``segment_max_bytes``. Each consumer group keeps its own
+    read cursor (segment, byte position, offset) plus its claimed and requeued
+    jobs in ``<group>.group``, so a claim reads only the records it hands out.
+    Segments every group has read past are deleted. ``fsync`` is ``always``
+    (every record and cursor update), ``batch`` (once per append or cursor
+    update) or ``never`` (left to the OS).
+
+    With ``coalesce`` (the default) producers also append each record's
+    (repo, pr_number, offset) to ``latest.keys``; readers skip records a newer
+    one for the same PR supersedes. Appends to it are O(1) and, being only a
+    hint (a lost entry just delivers a superseded job), fsynced only with
+    ``always``. Compaction rewrites it down to the entries still unread.
+    """
+
+    def __init__(
+        self,
+        directory: Path | str,
+        *,
+        fsync: str = DEFAULT_FSYNC_POLICY,
+        segment_max_bytes: int = DEFAULT_SEGMENT_MAX_BYTES,
+        coalesce: bool = True,
+    ) -> None:
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {', '.join(FSYNC_POLICIES)}")
+        if segment_max_bytes < 1:
+            raise ValueError("segment_max_bytes must be >= 1")
+        self.directory = Path(directory)
+        self.fsync = fsync
+        self.segment_max_bytes = segment_max_bytes
+        self.coalesce = coalesce
+
+    def append_job(self, job: AnalysisJob) -> int:
+        """Append ``job``; returns its offset in the log."""
+        [offset] = self.append_jobs([job])
+        return offset
+
+    def append_jobs(self, jobs: Iterable[AnalysisJob]) -> list[int]:
+        jobs = list(jobs)
+        if not jobs:
+            return []
+        with self._locked():
+            bases = self._segment_bases()
+            next_offset = self._end_offset(bases)
+            active = self._segment_path(bases[-1]) if bases else None
+            if active is None or active.stat().st_size >= self.segment_max_bytes:
+                bases.append(next_offset)
+            offsets = list(range(next_offset, next_offset + len(jobs)))
+            with open(self._segment_path(bases[-1]), "ab") as handle:
+                for offset, job in zip(offsets, jobs):
+                    handle.write(_encode({"offset": offset, **job_payload(job)}))
+                    if self.fsync == FSYNC_ALWAYS:
+                        _sync(handle)
+                if self.fsync == FSYNC_BATCH:
+                    _sync(handle)
+            if self.coalesce:
+                # Written after the records, so a skipped record always has a successor.
+                self._append_latest(
+                    [(*job_key(job), offset) for offset, job in zip(offsets, jobs)]
+                )
+        return offsets
+
+    def claim_jobs(
+        self,
+        group: str,
+        limit: int,
+        *,
+        visibility_timeout_seconds: float,
+        clock: Callable[[], float] = time.time,
+    ) -> list[FileClaim]:
+        """Lease up to ``limit`` jobs for ``group``.
+
+        Expired leases come first, then requeued jobs, then records read from
+        the group's cursor, so the cost grows with ``limit``, not the backlog.
+        Jobs for the same PR within one claim are coalesced as well.
+        """
+        with self._locked():
+            state = self._load_group(group)
+            now = clock()
+            expired = [
+                (claim.job, claim.coalesced) for claim in state.leases if claim.expires_at <= now
+            ]
+            waiting = expired + state.retry
+            candidates = waiting[:limit]
+            state.retry = waiting[limit:]
+            state.leases = [claim for claim in state.leases if claim.expires_at > now]
+            previous_segment, previous_offset = state.segment, state.offset
+            candidates.extend(self._read_records(state, limit - len(candidates)))
+            if not candidates:
+                if state.offset != previous_offset:
+                    # Only superseded records were read; keep the cursor past them.
+                    self._save_group(group, state)
+                return []
+            lease = uuid.uuid4().hex
+            claimed = [
+                FileClaim(
+                    lease=lease,
+                    slot=slot,
+                    expires_at=now + visibility_timeout_seconds,
+                    job=job,
+                    coalesced=coalesced,
+                )
+                for slot, (job, coalesced) in enumerate(coalesce_jobs(candidates))
+            ]
+            state.leases.extend(claimed)
+            self._save_group(group, state)
+            if state.segment != previous_segment:
+                self._compact_locked()
+        return claimed
+
+    def ack_job(self, group: str, claim: FileClaim) -> bool:
+        """Forget a finished job; ``False`` if its lease already expired."""
+        with self._locked():
+            state = self._load_group(group)
+            remaining = [entry for entry in state.leases if not _same_claim(entry, claim)]
+            if len(remaining) == len(state.leases):
+                return False
+            state.leases = remaining
+            self._save_group(group, state)
+        return True
+
+    def requeue_jobs(self, group: str, claims: Iterable[FileClaim]) -> int:
+        """Hand unfinished claimed jobs back to ``group`` ahead of unread records."""
+        claims = list(claims)
+        if not claims:
+            return 0
+        with self._locked():
+            state = self._load_group(group)
+            requeued = [
+                entry
+                for entry in state.leases
+                if any(_same_claim(entry, claim) for claim in claims)
+            ]
+            if not requeued:
+                return 0
+            state.retry = [(entry.job, entry.coalesced) for entry in requeued] + state.retry
+            state.leases = [entry for entry in state.leases if entry not in requeued]
+            self._save_group(group, state)
+        return len(requeued)
+
+    def pending_job_count(self, group: str) -> int:
+        """Jobs ``group`` has yet to claim, not counting claimed ones."""
+        with self._locked():
+            state = self._load_group(group)
+            unread = self._end_offset(self._segment_bases()) - state.offset
+        return len(state.retry) + max(0, unread)
+
+    def compact(self) -> list[Path]:
+        """Delete segments every consumer group has read past; returns the removed files."""
+        with self._locked():
+            return self._compact_locked()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with locked_file(self.directory / _LOCK_NAME, "a+"):
+            yield
+
+    def _segment_path(self, base: int) -> Path:
+        return self.directory / f"{base:020d}{_SEGMENT_SUFFIX}"
+
+    def _group_path(self, group: str) -> Path:
+        if not _GROUP_NAME.fullmatch(group):
+            raise ValueError("consumer group names may only use letters, digits, '_', '.' and '-'")
+        return self.directory / f"{group}{_GROUP_SUFFIX}"
+
+    def _segment_bases(self) -> list[int]:
+        return sorted(
+            int(path.name[: -len(_SEGMENT_SUFFIX)])
+            for path in self.directory.glob(f"*{_SEGMENT_SUFFIX}")
+        )
+
+    def _end_offset(self, bases: list[int]) -> int:
+        """Offset the next appended record gets; trims a torn final record."""
+        if not bases:
+            return 0
+        with open(self._segment_path(bases[-1]), "r+b") as handle:
+            size = handle.seek(0, os.SEEK_END)
+            start = size
+            tail = b""
+            while start > 0 and tail.count(b"\n") < 2:
+                step = min(_TAIL_CHUNK_BYTES, start)
+                start -= step
+                handle.seek(start)
+                tail = handle.read(step) + tail
+            complete = tail.rfind(b"\n") + 1
+            if start + complete < size:
+                # A crash mid-append left a partial record; nothing has read it.
+                handle.truncate(start + complete)
+            lines = tail[:complete].splitlines()
+        if not lines:
+            return bases[-1]
+        return json.loads(lines[-1])["offset"] + 1
+
+    def _read_records(self, state: _GroupState, count: int) -> list[tuple[AnalysisJob, int]]:
+        jobs: list[tuple[AnalysisJob, int]] = []
+        if count <= 0:
+            return jobs
+        bases = self._segment_bases()
+        latest = self._load_latest() if self.coalesce else {}
+        while len(jobs) < count:
+            path = self._segment_path(state.segment)
+            if path.exists():
+                with open(path, "rb") as handle:
+                    handle.seek(state.position)
+                    while len(jobs) < count:
+                        line = handle.readline()
+                        if not line.endswith(b"\n"):
+                            break
+                        state.position += len(line)
+                        payload = json.loads(line)
+                        state.offset = payload["offset"] + 1
+                        job = job_from_payload(payload)
+                        key = job_key(job)
+                        if latest.get(key, payload["offset"]) > payload["offset"]:
+                            state.superseded[key] = state.superseded.get(key, 0) + 1
+                            continue
+                        jobs.append((job, state.superseded.pop(key, 0)))
+            # Appends only go to the newest segment, so an older one read to its
+            # end is done with; moving on lets compaction drop it.
+            later = [base for base in bases if base > state.segment]
+            if not later or (path.exists() and state.position < path.stat().st_size):
+                break
+            state.segment, state.position = later[0], 0
+        return jobs
+
+    def _load_group(self, group: str) -> _GroupState:
+        path = self._group_path(group)
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            # New groups start at the oldest segment still on disk.
+            bases = self._segment_bases()
+            first = bases[0] if bases else 0
+            return _GroupState(segment=first, position=0, offset=first)
+        return _GroupState(
+            segment=payload["segment"],
+            position=payload["position"],
+            offset=payload["offset"],
+            retry=[(job_from_payload(job), job.get("coalesced", 0)) for job in payload["retry"]],
+            leases=[claim_from_payload(lease) for lease in payload["leases"]],
+            superseded={
+                (repo, pr_number): count for repo, pr_number, count in payload["superseded"]
+            },
+        )
+
+    def _save_group(self, group: str, state: _GroupState) -> None:
+        target = self._group_path(group)
+        payload = {
+            "segment": state.segment,
+            "position": state.position,
+            "offset": state.offset,
+            "retry": [
+                {**job_payload(job), "coalesced": coalesced} for job, coalesced in state.retry
+            ],
+            "leases": [claim_payload(claim) for claim in state.leases],
+            "superseded": [
+                [repo, pr_number, count] for (repo, pr_number), count in state.superseded.items()
+            ],
+        }
+        self._replace(target, payload)
+
+    def _append_latest(self, entries: list[tuple[str, int, int]]) -> None:
+        with open(self.directory / _LATEST_NAME, "a+b") as handle:
+            if handle.seek(0, os.SEEK_END) > 0:
+                handle.seek(-1, os.SEEK_END)
+                if handle.read(1) != b"\n":
+                    # Start after a torn entry rather than inside it.
+                    handle.write(b"\n")
+            handle.write(b"".join(_encode(list(entry)) for entry in entries))
+            if self.fsync == FSYNC_ALWAYS:
+                _sync(handle)
+
+    def _load_latest(self) -> dict[tuple[str, int], int]:
+        entries = self._read_latest_entries()
+        latest = _latest_offsets(entries)
+        if len(entries) >= max(_LATEST_REWRITE_MIN_ENTRIES, 2 * len(latest)):
+            # Amortized over the appends that added the superseded entries.
+            self._save_latest(latest)
+        return latest
+
+    def _read_latest_entries(self) -> list[tuple[str, int, int]]:
+        try:
+            data = (self.directory / _LATEST_NAME).read_bytes()
+        except FileNotFoundError:
+            return []
+        lines = data[: data.rfind(b"\n") + 1].splitlines()
+        try:
+            items = json.loads(b"[" + b",".join(lines) + b"]")
+        except json.JSONDecodeError:
+            items = []
+            for line in lines:
+                try:
+                    items.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn entry; its record is simply not coalesced.
+                    continue
+        entries = []
+        for item in items:
+            if item and isinstance(item[0], list):
+                # One line holding the whole map, as written before the file was append-only.
+                entries.extend(tuple(entry) for entry in item)
+            elif item:
+                entries.append(tuple(item))
+        return entries
+
+    def _save_latest(self, latest: dict[tuple[str, int], int]) -> None:
+        temp = self.directory / (_LATEST_NAME + ".tmp")
+        with open(temp, "wb") as handle:
+            handle.write(
+                b"".join(
+                    _encode([repo, pr_number, offset])
+                    for (repo, pr_number), offset in latest.items()
+                )
+            )
+            if self.fsync != FSYNC_NEVER:
+                _sync(handle)
+        os.replace(temp, self.directory / _LATEST_NAME)
+
+    def _replace(self, target: Path, payload: object) -> None:
+        temp = target.with_name(target.name + ".tmp")
+        with open(temp, "wb") as handle:
+            handle.write(_encode(payload))
+            if self.fsync != FSYNC_NEVER:
+                _sync(handle)
+        os.replace(temp, target)
+
+    def _compact_locked(self) -> list[Path]:
+        groups = [
+            path.name[: -len(_GROUP_SUFFIX)]
+            for path in self.directory.glob(f"*{_GROUP_SUFFIX}")
+        ]
+        if not groups:
+            return []
+        states = [self._load_group(group) for group in groups]
+        oldest_needed = min(state.segment for state in states)
+        if self.coalesce:
+            # Every group has read past these offsets, so nothing left to skip.
+            read_by_all = min(state.offset for state in states)
+            entries = self._read_latest_entries()
+            pruned = {
+                key: offset
+                for key, offset in _latest_offsets(entries).items()
+                if offset >= read_by_all
+            }
+            if len(pruned) < len(entries):
+                self._save_latest(pruned)
+        removed = [
+            self._segment_path(base)
+            for base in self._segment_bases()
+            if base < oldest_needed
+        ]
+        for path in removed:
+            path.unlink()
+        return removed
+
+
+def _encode(payload: object) -> bytes:
+    return (json.dumps(payload, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _latest_offsets(entries: list[tuple[str, int, int]]) -> dict[tuple[str, int], int]:
+    latest: dict[tuple[str, int], int] = {}
+    for repo, pr_number, offset in entries:
+        latest[(repo, pr_number)] = max(offset, latest.get((repo, pr_number), offset))
+    return latest
+
+
+def _sync(handle: IO[bytes]) -> None:
+    handle.flush()
+    os.fsync(handle.fileno())
+
+
+def _same_claim(entry: FileClaim, claim: FileClaim) -> bool:
+    return entry.lease == claim.lease and entry.slot == claim.slot
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 import xml.etree.ElementTree as ET
-from typing import List
+from typing import IO, Iterator, List
 
 
 @dataclass(frozen=True)
@@ -24,39 +24,96 @@ class TestOutcome:
     outcome: str
 
 
-def parse_junit_durations(xml_text: str) -> List[TestDuration]:
+@dataclass(frozen=True)
+class JUnitReport:
+    durations: List[TestDuration]
+    outcomes: List[TestOutcome]
+
+
+def parse_junit_report(xml_text: str) -> JUnitReport:
     root = ET.fromstring(xml_text)
     durations: list[TestDuration] = []
+    outcomes: list[TestOutcome] = []
     for testcase in root.iter("testcase"):
-        classname = testcase.attrib.get("classname", "").strip()
-        name = testcase.attrib.get("name", "").strip()
-        time_str = testcase.attrib.get("time", "0").strip()
-        try:
-            duration = float(time_str)
-        except ValueError:
-            duration = 0.0
-
-        if classname:
-            full_name = f"{classname}::{name}"
-        else:
-            full_name = name
-        durations.append(TestDuration(name=full_name, duration_seconds=duration))
-    return durations
+        full_name = _testcase_full_name(testcase)
+        durations.append(
+            TestDuration(name=full_name, duration_seconds=_testcase_duration(testcase))
+        )
+        outcomes.append(
+            TestOutcome(name=full_name, outcome=_resolve_testcase_outcome(testcase))
+        )
+    return JUnitReport(durations=durations, outcomes=outcomes)
+
+
+def parse_junit_report_stream(source: IO) -> JUnitReport:
+    durations: list[TestDuration] = []
+    outcomes: list[TestOutcome] = []
+    for duration, outcome in iter_junit_results(source):
+        durations.append(duration)
+        outcomes.append(outcome)
+    return JUnitReport(durations=durations, outcomes=outcomes)
+
+
+def iter_junit_results(source: IO) -> Iterator[tuple[TestDuration, TestOutcome]]:
+    """Incrementally parse a JUnit XML stream, yielding each testcase as it closes.
+
+    ``source`` may be a binary or text file object. Finished ``<testcase>`` elements
+    are detached from the tree, so memory stays flat regardless of file size.
+    """
+    parents: list[ET.Element] = []
+    for event, element in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            parents.append(element)
+            continue
+        parents.pop()
+        if element.tag != "testcase":
+            continue
+        full_name = _testcase_full_name(element)
+        yield (
+            TestDuration(name=full_name, duration_seconds=_testcase_duration(element)),
+            TestOutcome(name=full_name, outcome=_resolve_testcase_outcome(element)),
+        )
+        element.clear()
+        if parents:
+            parents[-1].remove(element)
+
+
+def parse_junit_durations(xml_text: str) -> List[TestDuration]:
+    root = ET.fromstring(xml_text)
+    return [
+        TestDuration(
+            name=_testcase_full_name(testcase),
+            duration_seconds=_testcase_duration(testcase),
+        )
+        for testcase in root.iter("testcase")
+    ]
 
 
 def parse_junit_test_outcomes(xml_text: str) -> List[TestOutcome]:
     root = ET.fromstring(xml_text)
-    outcomes: list[TestOutcome] = []
-    for testcase in root.iter("testcase"):
-        classname = testcase.attrib.get("classname", "").strip()
-        name = testcase.attrib.get("name", "").strip()
-        if classname:
-            full_name = f"{classname}::{name}"
-        else:
-            full_name = name
-        outcome = _resolve_testcase_outcome(testcase)
-        outcomes.append(TestOutcome(name=full_name, outcome=outcome))
-    return outcomes
+    return [
+        TestOutcome(
+            name=_testcase_full_name(testcase),
+            outcome=_resolve_testcase_outcome(testcase),
+        )
+        for testcase in root.iter("testcase")
+    ]
+
+
+def _testcase_full_name(testcase: ET.Element) -> str:
+    classname = testcase.attrib.get("classname", "").strip()
+    name = testcase.attrib.get("name", "").strip()
+    if classname:
+        return f"{classname}::{name}"
+    return name
+
+
+def _testcase_duration(testcase: ET.Element) -> float:
+    time_str = testcase.attrib.get("time", "0").strip()
+    try:
+        return float(time_str)
+    except ValueError:
+        return 0.0
 
 
 def _resolve_testcase_outcome(testcase: ET.Element) -> str:
@@ -5,6 +5,8 @@ from typing import Mapping
 
 
 ENV_ALEMBIC_URL = "CI_HUNTER_ALEMBIC_URL"
+ENV_PARTITION_TIMINGS = "CI_HUNTER_PARTITION_TIMINGS"
+_TRUE_VALUES = frozenset({"1", "true", "yes", "on"})
 
 
 def resolve_alembic_url(default_url: str, env: Mapping[str, str] | None = None) -> str:
@@ -18,6 +20,11 @@ def resolve_alembic_url(default_url: str, env: Mapping[str, str] | None = None)
     return _normalize_alembic_url(value)
 
 
+def partition_timings_enabled(env: Mapping[str, str] | None = None) -> bool:
+    source = os.environ if env is None else env
+    return source.get(ENV_PARTITION_TIMINGS, "").strip().lower() in _TRUE_VALUES
+
+
 def _normalize_alembic_url(url: str) -> str:
     if url.startswith("postgresql://"):
         return url.replace("postgresql://", "postgresql+psycopg://", 1)
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from collections import deque
+from collections import OrderedDict
 from dataclasses import dataclass
+from typing import Iterable
 
 
 @dataclass(frozen=True)
@@ -12,15 +13,45 @@ class AnalysisJob:
     branch: str | None
 
 
+def job_key(job: AnalysisJob) -> tuple[str, int]:
+    """Pending jobs with the same key are coalesced: only the newest one runs."""
+    return (job.repo, job.pr_number)
+
+
+def coalesce_jobs(jobs: Iterable[tuple[AnalysisJob, int]]) -> list[tuple[AnalysisJob, int]]:
+    """Fold ``(job, coalesced)`` pairs that share a ``job_key``, oldest first.
+
+    The newest job for each key takes the queue position of the oldest one, so
+    a busy PR is not pushed back by every new push; its count grows by the
+    number of jobs it replaced.
+    """
+    merged: OrderedDict[tuple[str, int], tuple[AnalysisJob, int]] = OrderedDict()
+    for job, coalesced in jobs:
+        key = job_key(job)
+        if key in merged:
+            coalesced += merged[key][1] + 1
+        merged[key] = (job, coalesced)
+    return list(merged.values())
+
+
 class InMemoryJobQueue:
     def __init__(self) -> None:
-        self._jobs: deque[AnalysisJob] = deque()
+        self._jobs: OrderedDict[tuple[str, int], AnalysisJob] = OrderedDict()
+        self._coalesced_count = 0
+
+    @property
+    def coalesced_count(self) -> int:
+        """Jobs replaced by a newer job for the same PR before being dequeued."""
+        return self._coalesced_count
 
     def enqueue(self, job: AnalysisJob) -> None:
-        self._jobs.append(job)
+        key = job_key(job)
+        if key in self._jobs:
+            self._coalesced_count += 1
+        self._jobs[key] = job
 
     def dequeue(self) -> AnalysisJob | None:
         if not self._jobs:
             return None
-        return self._jobs.popleft()
-
+        _key, job = self._jobs.popitem(last=False)
+        return job
@@ -17,6 +17,8 @@ SECTION_NO_FLAKES = "No flaky tests detected"
 REASON_PREFIX = "Reason: "
 MISSING_STEP_DATA = "Step data missing"
 MISSING_TEST_DATA = "Test data missing"
+STORED_STEP_DATA = "Step data already stored"
+STORED_TEST_DATA = "Test data already stored"
 
 
 def render_markdown_report(result: AnalysisResult) -> str:
@@ -32,6 +34,7 @@ def render_markdown_report(result: AnalysisResult) -> str:
                 result.step_timings_attempted,
                 result.step_timings_failed,
             ),
+            skipped_note=_skipped_note(STORED_STEP_DATA, result.step_timings_skipped),
         )
     )
     lines.extend(
@@ -44,6 +47,7 @@ def render_markdown_report(result: AnalysisResult) -> str:
                 result.test_timings_attempted,
                 result.test_timings_failed,
             ),
+            skipped_note=_skipped_note(STORED_TEST_DATA, result.test_timings_skipped),
         )
     )
     lines.extend(_render_change_point_section(SECTION_STEP_CHANGES, result.step_change_points))
@@ -65,6 +69,8 @@ def render_json_report(result: AnalysisResult) -> str:
         "step_timings_failed": result.step_timings_failed,
         "test_timings_attempted": result.test_timings_attempted,
         "test_timings_failed": result.test_timings_failed,
+        "step_timings_skipped": result.step_timings_skipped,
+        "test_timings_skipped": result.test_timings_skipped,
         "step_change_points": _render_change_point_payloads(result.step_change_points),
         "test_change_points": _render_change_point_payloads(result.test_change_points),
         "flakes": [
@@ -86,6 +92,7 @@ def _render_regression_section(
     reason: str | None,
     *,
     missing_data_note: str | None = None,
+    skipped_note: str | None = None,
 ) -> list[str]:
     lines = [f"## {title}"]
     if regressions:
@@ -96,13 +103,14 @@ def _render_regression_section(
                 f"{regression.current:.1f}s vs {regression.baseline:.1f}s "
                 f"({delta_pct:+.1f}%)"
             )
-        return lines
-
-    lines.append(f"- {SECTION_NONE}")
-    if reason:
-        lines.append(f"- {REASON_PREFIX}{reason}")
-    if missing_data_note:
-        lines.append(f"- {missing_data_note}")
+    else:
+        lines.append(f"- {SECTION_NONE}")
+        if reason:
+            lines.append(f"- {REASON_PREFIX}{reason}")
+        if missing_data_note:
+            lines.append(f"- {missing_data_note}")
+    if skipped_note:
+        lines.append(f"- {skipped_note}")
     return lines
 
 
@@ -166,3 +174,9 @@ def _render_change_point_section(title: str, change_points: list[ChangePoint]) -
             f"({delta_pct:+.1f}%) over last {point.window_size} runs"
         )
     return lines
+
+
+def _skipped_note(prefix: str, skipped: int | None) -> str | None:
+    if not skipped:
+        return None
+    return f"{prefix} for {skipped} runs (not fetched again)"
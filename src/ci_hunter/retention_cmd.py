@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import argparse
+from datetime import date, datetime, timedelta, timezone
+import os
+from typing import TextIO
+
+from ci_hunter.storage import Storage, StorageConfig
+
+
+DEFAULT_PARTITIONS_AHEAD = 3
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="ci-hunter-retention")
+    parser.add_argument("--db", type=_non_empty_string, required=True)
+    parser.add_argument("--older-than-days", type=_positive_int, required=True)
+    parser.add_argument("--downsample-every", type=_downsample_factor)
+    parser.add_argument(
+        "--partitions-ahead",
+        type=_non_negative_int,
+        default=DEFAULT_PARTITIONS_AHEAD,
+    )
+    parser.add_argument("--rollup-window", type=_rollup_window)
+    return parser
+
+
+def main(
+    argv: list[str] | None = None,
+    *,
+    out: TextIO | None = None,
+    today: date | None = None,
+) -> int:
+    args = _build_parser().parse_args(argv)
+    out = out or os.sys.stdout
+    today = today or datetime.now(timezone.utc).date()
+    before = today - timedelta(days=args.older_than_days)
+
+    storage = Storage(StorageConfig(database_url=args.db, rollup_window=args.rollup_window))
+    try:
+        created = storage.ensure_timing_partitions(today, args.partitions_ahead + 1)
+        result = storage.prune_timings(before, keep_every=args.downsample_every)
+    finally:
+        storage.close()
+
+    for name in created:
+        out.write(f"created partition {name}\n")
+    for name in result.dropped_partitions:
+        out.write(f"dropped partition {name}\n")
+    kept = f" (kept 1 in {args.downsample_every} runs)" if args.downsample_every else ""
+    out.write(
+        f"removed {result.deleted_rows} timing rows created before {before.isoformat()}{kept}\n"
+    )
+    return 0
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError("value must be a positive integer")
+    return number
+
+
+def _non_negative_int(value: str) -> int:
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError("value must be a non-negative integer")
+    return number
+
+
+def _downsample_factor(value: str) -> int:
+    number = int(value)
+    if number < 2:
+        raise argparse.ArgumentTypeError("downsample-every must be at least 2")
+    return number
+
+
+def _rollup_window(value: str) -> int:
+    number = int(value)
+    if number < 2:
+        raise argparse.ArgumentTypeError("rollup-window must be at least 2")
+    return number
+
+
+def _non_empty_string(value: str) -> str:
+    text = value.strip()
+    if not text:
+        raise argparse.ArgumentTypeError("db must be a non-empty string")
+    return text
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import json
+import math
+from typing import Iterable
+
+from ci_hunter.history import DurationHistory
+
+
+DEFAULT_SKETCH_RELATIVE_ACCURACY = 0.01
+# Values at or below this are counted in the sketch's zero bucket.
+_SKETCH_MIN_VALUE = 1e-9
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with bounded relative error (DDSketch-style).
+
+    Positive values fall into logarithmic bins whose width keeps every quantile
+    estimate within ``relative_accuracy`` of a true sample value; values near zero
+    share one bucket. Bins are counts, so samples can be removed again when a
+    stored value is overwritten.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_SKETCH_RELATIVE_ACCURACY) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._bins: dict[int, int] = {}
+        self._zero_count = 0
+
+    @property
+    def count(self) -> int:
+        return self._zero_count + sum(self._bins.values())
+
+    def _key(self, value: float) -> int | None:
+        if value <= _SKETCH_MIN_VALUE:
+            return None
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int | None) -> float:
+        if key is None:
+            return 0.0
+        return 2 * self._gamma**key / (self._gamma + 1)
+
+    def add(self, value: float) -> None:
+        key = self._key(value)
+        if key is None:
+            self._zero_count += 1
+        else:
+            self._bins[key] = self._bins.get(key, 0) + 1
+
+    def remove(self, value: float) -> None:
+        key = self._key(value)
+        if key is None:
+            if self._zero_count:
+                self._zero_count -= 1
+            return
+        remaining = self._bins.get(key, 0) - 1
+        if remaining > 0:
+            self._bins[key] = remaining
+        else:
+            self._bins.pop(key, None)
+
+    def _buckets(self) -> list[tuple[float, int]]:
+        buckets = [(0.0, self._zero_count)] if self._zero_count else []
+        buckets.extend((self._value(key), self._bins[key]) for key in sorted(self._bins))
+        return buckets
+
+    def quantile(self, q: float) -> float | None:
+        if not 0 <= q <= 1:
+            raise ValueError("q must be in [0, 1]")
+        count = self.count
+        if count == 0:
+            return None
+        # Interpolate between neighbouring ranks, as statistics.median does.
+        rank = q * (count - 1)
+        lower = self._value_at_rank(math.floor(rank))
+        upper = self._value_at_rank(math.ceil(rank))
+        return lower + (upper - lower) * (rank - math.floor(rank))
+
+    def _value_at_rank(self, rank: int) -> float:
+        seen = 0
+        buckets = self._buckets()
+        for value, bucket_count in buckets:
+            seen += bucket_count
+            if seen > rank:
+                return value
+        return buckets[-1][0]
+
+    def trimmed_mean(self, trim_ratio: float) -> float | None:
+        """Mean of the samples left after dropping ``trim_ratio`` of them at each end."""
+        count = self.count
+        trim_count = int(count * trim_ratio)
+        kept = count - 2 * trim_count
+        if kept <= 0:
+            return None
+        total = 0.0
+        position = 0
+        for value, bucket_count in self._buckets():
+            low = max(position, trim_count)
+            high = min(position + bucket_count, count - trim_count)
+            if high > low:
+                total += value * (high - low)
+            position += bucket_count
+        return total / kept
+
+    def copy(self) -> "QuantileSketch":
+        sketch = QuantileSketch(self.relative_accuracy)
+        sketch._bins = dict(self._bins)
+        sketch._zero_count = self._zero_count
+        return sketch
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "relative_accuracy": self.relative_accuracy,
+                "zero_count": self._zero_count,
+                "bins": {str(key): count for key, count in sorted(self._bins.items())},
+            },
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_json(cls, text: str) -> "QuantileSketch":
+        data = json.loads(text)
+        sketch = cls(data["relative_accuracy"])
+        sketch._zero_count = int(data["zero_count"])
+        sketch._bins = {int(key): int(count) for key, count in data["bins"].items()}
+        return sketch
+
+
+@dataclass
+class MetricRollup:
+    """Rolling aggregates for one (repo, metric), maintained as samples are stored.
+
+    ``recent`` holds the ``(run_number, value)`` pairs of the most recent runs,
+    oldest first; ``sample_count``, ``value_sum`` and ``sketch`` cover every sample
+    stored for the metric.
+    """
+
+    name: str
+    recent: list[tuple[int, float]] = field(default_factory=list)
+    sample_count: int = 0
+    value_sum: float = 0.0
+    sketch: QuantileSketch = field(default_factory=QuantileSketch)
+
+    @property
+    def values(self) -> list[float]:
+        return [value for _run_number, value in self.recent]
+
+    @property
+    def mean(self) -> float | None:
+        if self.sample_count == 0:
+            return None
+        return self.value_sum / self.sample_count
+
+    def record(
+        self,
+        run_number: int,
+        value: float,
+        *,
+        previous: float | None,
+        capacity: int,
+    ) -> None:
+        """Add a sample; ``previous`` is the value it overwrites, if any."""
+        if previous is not None:
+            self.sample_count -= 1
+            self.value_sum -= previous
+            self.sketch.remove(previous)
+        self.sample_count += 1
+        self.value_sum += value
+        self.sketch.add(value)
+        recent = self.recent
+        if not recent or run_number > recent[-1][0]:
+            recent.append((run_number, value))
+            del recent[:-capacity]
+        else:
+            merged = dict(recent)
+            merged[run_number] = value
+            self.recent = sorted(merged.items())[-capacity:]
+
+    def recent_to_json(self) -> str:
+        return json.dumps([list(pair) for pair in self.recent], separators=(",", ":"))
+
+    @staticmethod
+    def recent_from_json(text: str) -> list[tuple[int, float]]:
+        return [(int(run_number), float(value)) for run_number, value in json.loads(text)]
+
+
+def rollup_history(rollups: Iterable[MetricRollup]) -> DurationHistory:
+    """Columnar history of each rollup's recent values, in storage's row order."""
+    rows = sorted(
+        (run_number, rollup.name, value)
+        for rollup in rollups
+        for run_number, value in rollup.recent
+    )
+    return DurationHistory.from_rows(rows)
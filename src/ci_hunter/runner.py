@@ -1,17 +1,37 @@
 from __future__ import annotations
 
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 import logging
-from typing import Callable
+import threading
+from typing import Callable, Iterator
 
 from ci_hunter.analyze import AnalysisResult, analyze_repo_runs
 from ci_hunter.github.auth import GitHubAppAuth
-from ci_hunter.github.client import GitHubActionsClient
-from ci_hunter.storage import Storage
+from ci_hunter.github.client import MAX_PER_PAGE, GitHubActionsClient, WorkflowRun
+from ci_hunter.storage import (
+    RUN_STATUS_COMPLETED,
+    STEP_DURATIONS_TABLE,
+    TEST_DURATIONS_TABLE,
+    TEST_OUTCOMES_TABLE,
+    Storage,
+    StoredTimingRunIds,
+)
 from ci_hunter.steps import StepDuration
-from ci_hunter.junit import TestDuration, TestOutcome
+from ci_hunter.junit import JUnitReport, TestDuration, TestOutcome
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_FETCH_CONCURRENCY = 1
+DEFAULT_MAX_IN_FLIGHT_FETCHES = 16
+DEFAULT_MAX_FETCHES_PER_REPO = 8
+DEFAULT_TIMING_BATCH_RUNS = 50
+_TIMING_KIND_STEP = "step"
+_TIMING_KIND_TEST = "test"
+_TIMING_KIND_OUTCOME = "outcome"
+_TIMING_KIND_REPORT = "report"
+
+
 def fetch_store_analyze(
     *,
     auth: GitHubAppAuth,
@@ -22,17 +42,40 @@ def fetch_store_analyze(
     baseline_strategy: str,
     min_history: int = 1,
     history_window: int | None = None,
+    use_rollups: bool = False,
     step_fetcher: Callable[[str, str, int], list[StepDuration]] | None = None,
     test_fetcher: Callable[[str, str, int], list[TestDuration]] | None = None,
     test_outcome_fetcher: Callable[[str, str, int], list[TestOutcome]] | None = None,
+    test_report_fetcher: Callable[[str, str, int], JUnitReport] | None = None,
     timings_run_limit: int | None = None,
+    fetch_concurrency: int = DEFAULT_FETCH_CONCURRENCY,
+    fetch_limiter: FetchLimiter | None = None,
+    incremental_sync: bool = False,
+    timing_batch_runs: int = DEFAULT_TIMING_BATCH_RUNS,
 ) -> AnalysisResult:
+    if test_report_fetcher is not None and (test_fetcher or test_outcome_fetcher):
+        raise ValueError(
+            "test_report_fetcher replaces test_fetcher and test_outcome_fetcher; pass one or the other"
+        )
     installation = auth.get_installation_token()
     client = client_factory(installation.token)
-    runs = client.list_workflow_runs(repo)
-    storage.save_workflow_runs(repo, runs)
+    if incremental_sync:
+        sync_state = storage.get_workflow_run_sync_state(repo)
+        new_runs = client.list_workflow_runs(
+            repo,
+            per_page=MAX_PER_PAGE,
+            created_since=sync_state.created_since,
+            stop_at_run_id=sync_state.newest_completed_run_id,
+        )
+        refreshed = _refresh_pending_runs(client, repo, sync_state.pending_run_ids)
+        storage.save_workflow_runs(repo, [*new_runs, *refreshed])
+        # Timing fetches still consider the most recent stored runs, not just the new page.
+        runs = storage.list_workflow_runs(repo)
+    else:
+        runs = client.list_workflow_runs(repo)
+        storage.save_workflow_runs(repo, runs)
     timing_stats = _TimingStats()
-    if step_fetcher or test_fetcher or test_outcome_fetcher:
+    if step_fetcher or test_fetcher or test_outcome_fetcher or test_report_fetcher:
         timing_stats = _fetch_and_store_timings(
             token=installation.token,
             repo=repo,
@@ -41,7 +84,11 @@ def fetch_store_analyze(
             step_fetcher=step_fetcher,
             test_fetcher=test_fetcher,
             test_outcome_fetcher=test_outcome_fetcher,
+            test_report_fetcher=test_report_fetcher,
             run_limit=timings_run_limit,
+            concurrency=fetch_concurrency,
+            limiter=fetch_limiter,
+            batch_runs=timing_batch_runs,
         )
     analysis = analyze_repo_runs(
         storage,
@@ -50,6 +97,7 @@ def fetch_store_analyze(
         baseline_strategy=baseline_strategy,
         min_history=min_history,
         history_window=history_window,
+        use_rollups=use_rollups,
     )
     return AnalysisResult(
         repo=analysis.repo,
@@ -63,18 +111,86 @@ def fetch_store_analyze(
         step_timings_failed=timing_stats.step_failed,
         test_timings_attempted=timing_stats.test_attempted,
         test_timings_failed=timing_stats.test_failed,
+        step_timings_skipped=timing_stats.step_skipped,
+        test_timings_skipped=timing_stats.test_skipped,
         step_change_points=analysis.step_change_points,
         test_change_points=analysis.test_change_points,
         flakes=analysis.flakes,
     )
 
 
+def _refresh_pending_runs(
+    client: GitHubActionsClient,
+    repo: str,
+    run_ids: tuple[int, ...],
+) -> list[WorkflowRun]:
+    """Re-read runs pending for too long to keep holding back the listing cursor."""
+    runs = []
+    for run_id in run_ids:
+        try:
+            runs.append(client.get_workflow_run(repo, run_id))
+        except Exception:
+            logger.warning(
+                "Workflow run refresh failed for repo=%s run_id=%s",
+                repo,
+                run_id,
+                exc_info=True,
+            )
+    return runs
+
+
 class _TimingStats:
     def __init__(self) -> None:
         self.step_attempted = 0
         self.step_failed = 0
         self.test_attempted = 0
         self.test_failed = 0
+        self.step_skipped = 0
+        self.test_skipped = 0
+
+    def add(self, other: _TimingStats) -> None:
+        self.step_attempted += other.step_attempted
+        self.step_failed += other.step_failed
+        self.test_attempted += other.test_attempted
+        self.test_failed += other.test_failed
+        self.step_skipped += other.step_skipped
+        self.test_skipped += other.test_skipped
+
+
+class FetchLimiter:
+    """Caps in-flight timing fetches across the process and per repository."""
+
+    def __init__(
+        self,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT_FETCHES,
+        max_per_repo: int = DEFAULT_MAX_FETCHES_PER_REPO,
+    ) -> None:
+        if max_in_flight <= 0:
+            raise ValueError("max_in_flight must be positive")
+        if max_per_repo <= 0:
+            raise ValueError("max_per_repo must be positive")
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._max_per_repo = max_per_repo
+        self._repo_slots: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, repo: str) -> Iterator[None]:
+        # Take the repo slot first so one busy repo cannot hold every global slot while queued.
+        with self._repo_slot(repo):
+            with self._in_flight:
+                yield
+
+    def _repo_slot(self, repo: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._repo_slots.get(repo)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self._max_per_repo)
+                self._repo_slots[repo] = slot
+            return slot
+
+
+_DEFAULT_FETCH_LIMITER = FetchLimiter()
 
 
 def _fetch_and_store_timings(
@@ -87,64 +203,287 @@ def _fetch_and_store_timings(
     test_fetcher: Callable[[str, str, int], list[TestDuration]] | None,
     test_outcome_fetcher: Callable[[str, str, int], list[TestOutcome]] | None,
     run_limit: int | None,
+    test_report_fetcher: Callable[[str, str, int], JUnitReport] | None = None,
+    concurrency: int = DEFAULT_FETCH_CONCURRENCY,
+    limiter: FetchLimiter | None = None,
+    batch_runs: int = DEFAULT_TIMING_BATCH_RUNS,
 ) -> _TimingStats:
+    if concurrency <= 0:
+        raise ValueError("fetch concurrency must be positive")
+    if batch_runs <= 0:
+        raise ValueError("timing batch runs must be positive")
+    limiter = limiter or _DEFAULT_FETCH_LIMITER
     stats = _TimingStats()
     runs_sorted = sorted(runs, key=lambda run: run.run_number)
     if run_limit is not None:
         runs_sorted = runs_sorted[-run_limit:]
-    for run in runs_sorted:
-        if step_fetcher is not None:
-            stats.step_attempted += 1
-            try:
-                durations = step_fetcher(token=token, repo=repo, run_id=run.id)
-                if durations:
-                    storage.save_step_durations(repo, run.id, durations)
-                else:
-                    stats.step_failed += 1
-                    logger.info(
-                        "Step timings missing for repo=%s run_id=%s",
-                        repo,
-                        run.id,
-                    )
-            except Exception:
-                stats.step_failed += 1
-                logger.warning(
-                    "Step timings fetch failed for repo=%s run_id=%s",
-                    repo,
-                    run.id,
-                    exc_info=True,
-                )
-        if test_fetcher is not None:
-            stats.test_attempted += 1
-            try:
-                durations = test_fetcher(token=token, repo=repo, run_id=run.id)
-                if durations:
-                    storage.save_test_durations(repo, run.id, durations)
-                else:
-                    stats.test_failed += 1
-                    logger.info(
-                        "Test timings missing for repo=%s run_id=%s",
-                        repo,
-                        run.id,
+    fetchers = [
+        (kind, fetcher)
+        for kind, fetcher in (
+            (_TIMING_KIND_STEP, step_fetcher),
+            (_TIMING_KIND_TEST, test_fetcher),
+            (_TIMING_KIND_OUTCOME, test_outcome_fetcher),
+            (_TIMING_KIND_REPORT, test_report_fetcher),
+        )
+        if fetcher is not None
+    ]
+    # Completed runs never change, so timings already persisted for them are not re-fetched.
+    stored = storage.get_stored_timing_run_ids(
+        repo,
+        [run.id for run in runs_sorted if run.status == RUN_STATUS_COMPLETED],
+    )
+    # Fetches that succeeded with nothing to store are recorded so they are skipped too.
+    empty: list[tuple[int, str]] = []
+    # Fetches that succeeded at all; they bring re-run runs' timings up to date.
+    fetched: list[tuple[int, str]] = []
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending: list[list[tuple[str, WorkflowRun, Future]]] = []
+        for run in runs_sorted:
+            run_pending = []
+            for kind, fetcher in fetchers:
+                if _is_timing_stored(kind, run, stored):
+                    _count_skipped(kind, stats)
+                    continue
+                run_pending.append(
+                    (
+                        kind,
+                        run,
+                        executor.submit(_fetch_limited, limiter, fetcher, token, repo, run.id),
                     )
-            except Exception:
-                stats.test_failed += 1
-                logger.warning(
-                    "Test timings fetch failed for repo=%s run_id=%s",
-                    repo,
-                    run.id,
-                    exc_info=True,
-                )
-        if test_outcome_fetcher is not None:
-            try:
-                outcomes = test_outcome_fetcher(token=token, repo=repo, run_id=run.id)
-                if outcomes:
-                    storage.save_test_outcomes(repo, run.id, outcomes)
-            except Exception:
-                logger.warning(
-                    "Test outcomes fetch failed for repo=%s run_id=%s",
-                    repo,
-                    run.id,
-                    exc_info=True,
                 )
+            if run_pending:
+                pending.append(run_pending)
+        # Results are consumed in submission order so storage writes and counters
+        # stay on this thread and deterministic regardless of completion order.
+        # Rows are written ``batch_runs`` runs per transaction; a chunk whose write
+        # fails is retried run by run, so a bad run loses only its own timings.
+        for start in range(0, len(pending), batch_runs):
+            chunk = pending[start : start + batch_runs]
+            if _store_timing_batch(chunk, storage, repo, stats, empty, fetched):
+                continue
+            for run_pending in chunk:
+                if len(chunk) == 1 or not _store_timing_batch(
+                    [run_pending], storage, repo, stats, empty, fetched
+                ):
+                    _count_failed(run_pending, stats)
+    completed = {run.id for run in runs_sorted if run.status == RUN_STATUS_COMPLETED}
+    storage.save_empty_timing_fetches(
+        repo, [(run_id, table) for run_id, table in empty if run_id in completed]
+    )
+    storage.clear_outdated_timing_fetches(
+        repo, [fetch for fetch in fetched if fetch in stored.outdated_fetches]
+    )
     return stats
+
+
+def _store_timing_batch(
+    chunk: list[list[tuple[str, WorkflowRun, Future]]],
+    storage: Storage,
+    repo: str,
+    stats: _TimingStats,
+    empty: list[tuple[int, str]],
+    fetched: list[tuple[int, str]],
+) -> bool:
+    """Write ``chunk``'s fetch results in one transaction; counters only count if it commits."""
+    batch_stats = _TimingStats()
+    batch_empty: list[tuple[int, str]] = []
+    batch_fetched: list[tuple[int, str]] = []
+    try:
+        with storage.batch():
+            for run_pending in chunk:
+                for kind, run, future in run_pending:
+                    if kind == _TIMING_KIND_STEP:
+                        _store_step_durations(
+                            future, storage, repo, run.id, batch_stats, batch_empty, batch_fetched
+                        )
+                    elif kind == _TIMING_KIND_TEST:
+                        _store_test_durations(
+                            future, storage, repo, run.id, batch_stats, batch_empty, batch_fetched
+                        )
+                    elif kind == _TIMING_KIND_REPORT:
+                        _store_test_report(
+                            future, storage, repo, run.id, batch_stats, batch_empty, batch_fetched
+                        )
+                    else:
+                        _store_test_outcomes(
+                            future, storage, repo, run.id, batch_empty, batch_fetched
+                        )
+    except Exception:
+        logger.warning(
+            "Timing write failed for repo=%s run_ids=%s",
+            repo,
+            [run_pending[0][1].id for run_pending in chunk],
+            exc_info=True,
+        )
+        return False
+    stats.add(batch_stats)
+    empty.extend(batch_empty)
+    fetched.extend(batch_fetched)
+    return True
+
+
+def _count_failed(run_pending: list[tuple[str, WorkflowRun, Future]], stats: _TimingStats) -> None:
+    for kind, _run, _future in run_pending:
+        if kind == _TIMING_KIND_STEP:
+            stats.step_attempted += 1
+            stats.step_failed += 1
+        elif kind in (_TIMING_KIND_TEST, _TIMING_KIND_REPORT):
+            stats.test_attempted += 1
+            stats.test_failed += 1
+
+
+def _count_skipped(kind: str, stats: _TimingStats) -> None:
+    if kind == _TIMING_KIND_STEP:
+        stats.step_skipped += 1
+    elif kind in (_TIMING_KIND_TEST, _TIMING_KIND_REPORT):
+        stats.test_skipped += 1
+
+
+def _is_timing_stored(kind: str, run: WorkflowRun, stored: StoredTimingRunIds) -> bool:
+    if run.status != RUN_STATUS_COMPLETED:
+        return False
+    if kind == _TIMING_KIND_STEP:
+        return run.id in stored.step_run_ids
+    if kind == _TIMING_KIND_TEST:
+        return run.id in stored.test_run_ids
+    if kind == _TIMING_KIND_OUTCOME:
+        return run.id in stored.outcome_run_ids
+    return run.id in stored.test_run_ids and run.id in stored.outcome_run_ids
+
+
+def _fetch_limited(
+    limiter: FetchLimiter,
+    fetcher: Callable[..., object],
+    token: str,
+    repo: str,
+    run_id: int,
+) -> object:
+    with limiter.slot(repo):
+        return fetcher(token=token, repo=repo, run_id=run_id)
+
+
+def _store_step_durations(
+    future: Future,
+    storage: Storage,
+    repo: str,
+    run_id: int,
+    stats: _TimingStats,
+    empty: list[tuple[int, str]],
+    fetched: list[tuple[int, str]],
+) -> None:
+    stats.step_attempted += 1
+    try:
+        durations = future.result()
+        fetched.append((run_id, STEP_DURATIONS_TABLE))
+        if durations:
+            storage.save_step_durations(repo, run_id, durations)
+        else:
+            stats.step_failed += 1
+            empty.append((run_id, STEP_DURATIONS_TABLE))
+            logger.info(
+                "Step timings missing for repo=%s run_id=%s",
+                repo,
+                run_id,
+            )
+    except Exception:
+        stats.step_failed += 1
+        logger.warning(
+            "Step timings fetch failed for repo=%s run_id=%s",
+            repo,
+            run_id,
+            exc_info=True,
+        )
+
+
+def _store_test_durations(
+    future: Future,
+    storage: Storage,
+    repo: str,
+    run_id: int,
+    stats: _TimingStats,
+    empty: list[tuple[int, str]],
+    fetched: list[tuple[int, str]],
+) -> None:
+    stats.test_attempted += 1
+    try:
+        durations = future.result()
+        fetched.append((run_id, TEST_DURATIONS_TABLE))
+        if durations:
+            storage.save_test_durations(repo, run_id, durations)
+        else:
+            stats.test_failed += 1
+            empty.append((run_id, TEST_DURATIONS_TABLE))
+            logger.info(
+                "Test timings missing for repo=%s run_id=%s",
+                repo,
+                run_id,
+            )
+    except Exception:
+        stats.test_failed += 1
+        logger.warning(
+            "Test timings fetch failed for repo=%s run_id=%s",
+            repo,
+            run_id,
+            exc_info=True,
+        )
+
+
+def _store_test_outcomes(
+    future: Future,
+    storage: Storage,
+    repo: str,
+    run_id: int,
+    empty: list[tuple[int, str]],
+    fetched: list[tuple[int, str]],
+) -> None:
+    try:
+        outcomes = future.result()
+        fetched.append((run_id, TEST_OUTCOMES_TABLE))
+        if outcomes:
+            storage.save_test_outcomes(repo, run_id, outcomes)
+        else:
+            empty.append((run_id, TEST_OUTCOMES_TABLE))
+    except Exception:
+        logger.warning(
+            "Test outcomes fetch failed for repo=%s run_id=%s",
+            repo,
+            run_id,
+            exc_info=True,
+        )
+
+
+def _store_test_report(
+    future: Future,
+    storage: Storage,
+    repo: str,
+    run_id: int,
+    stats: _TimingStats,
+    empty: list[tuple[int, str]],
+    fetched: list[tuple[int, str]],
+) -> None:
+    stats.test_attempted += 1
+    try:
+        report = future.result()
+        fetched.extend([(run_id, TEST_DURATIONS_TABLE), (run_id, TEST_OUTCOMES_TABLE)])
+        if report.durations:
+            storage.save_test_durations(repo, run_id, report.durations)
+        else:
+            stats.test_failed += 1
+            empty.append((run_id, TEST_DURATIONS_TABLE))
+            logger.info(
+                "Test timings missing for repo=%s run_id=%s",
+                repo,
+                run_id,
+            )
+        if report.outcomes:
+            storage.save_test_outcomes(repo, run_id, report.outcomes)
+        else:
+            empty.append((run_id, TEST_OUTCOMES_TABLE))
+    except Exception:
+        stats.test_failed += 1
+        logger.warning(
+            "Test report fetch failed for repo=%s run_id=%s",
+            repo,
+            run_id,
+            exc_info=True,
+        )
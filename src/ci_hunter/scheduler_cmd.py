@@ -5,7 +5,9 @@ import os
 from typing import TextIO
 
 from ci_hunter.job_queue_file import append_job
+from ci_hunter.job_queue_log import DEFAULT_FSYNC_POLICY, FSYNC_POLICIES, JobLog
 from ci_hunter.queue import AnalysisJob, InMemoryJobQueue
+from ci_hunter.storage import Storage, StorageConfig
 
 
 def _build_parser() -> argparse.ArgumentParser:
@@ -15,6 +17,9 @@ def _build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--commit")
     parser.add_argument("--branch")
     parser.add_argument("--queue-file")
+    parser.add_argument("--queue-db")
+    parser.add_argument("--queue-log")
+    parser.add_argument("--queue-log-fsync", choices=FSYNC_POLICIES, default=DEFAULT_FSYNC_POLICY)
     return parser
 
 
@@ -26,10 +31,15 @@ def main(
 ) -> int:
     parser = _build_parser()
     args = parser.parse_args(argv)
-    if queue is not None and args.queue_file:
-        parser.error("--queue-file cannot be used when a queue is provided")
-    if queue is None and not args.queue_file:
-        parser.error("--queue-file is required when no queue is provided")
+    targets = [target for target in (args.queue_file, args.queue_db, args.queue_log) if target]
+    if len(targets) > 1:
+        parser.error("--queue-file, --queue-db and --queue-log are mutually exclusive")
+    if queue is not None and targets:
+        parser.error("--queue-file/--queue-db/--queue-log cannot be used when a queue is provided")
+    if queue is None and not targets:
+        parser.error(
+            "--queue-file, --queue-db or --queue-log is required when no queue is provided"
+        )
     out = out or os.sys.stdout
     job = AnalysisJob(
         repo=args.repo,
@@ -39,6 +49,16 @@ def main(
     )
     if queue is not None:
         queue.enqueue(job)
+    elif args.queue_db:
+        storage = Storage(StorageConfig(database_url=args.queue_db))
+        try:
+            job_id = storage.enqueue_job(job)
+        finally:
+            storage.close()
+        out.write(f"enqueued job {job_id} to analysis_jobs\n")
+    elif args.queue_log:
+        offset = JobLog(args.queue_log, fsync=args.queue_log_fsync).append_job(job)
+        out.write(f"enqueued job at offset {offset} to {args.queue_log}\n")
     else:
         append_job(args.queue_file, job)
         out.write(f"enqueued job to {args.queue_file}\n")
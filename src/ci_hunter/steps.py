@@ -3,7 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime, timezone
 import re
-from typing import List
+from typing import Iterable, List
 
 
 @dataclass(frozen=True)
@@ -24,9 +24,14 @@ def parse_step_durations(log_text: str) -> List[StepDuration]:
     This expects log lines that begin with an ISO-8601 timestamp and include
     the substring "Step:" followed by the step name.
     """
+    return parse_step_duration_lines(log_text.splitlines())
+
+
+def parse_step_duration_lines(lines: Iterable[str]) -> List[StepDuration]:
+    """Same as ``parse_step_durations`` but consumes lines lazily, one at a time."""
     steps: list[tuple[str, datetime]] = []
     last_timestamp: datetime | None = None
-    for line in log_text.splitlines():
+    for line in lines:
         line = line.strip()
         if not line:
             continue
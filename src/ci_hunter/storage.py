@@ -1,26 +1,249 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, timedelta
 from pathlib import Path
+import re
 import sqlite3
 import threading
-from typing import Any, Iterable, List, Optional
+import time
+from typing import Any, Iterable, Iterator, List, Optional
 from urllib.parse import urlparse
+import uuid
 
 from ci_hunter.github.client import WorkflowRun
+from ci_hunter.history import DurationHistory, OutcomeHistory
 from ci_hunter.junit import TestDuration, TestOutcome
+from ci_hunter.queue import AnalysisJob
+from ci_hunter.rollups import MetricRollup, QuantileSketch
 from ci_hunter.steps import StepDuration
+from ci_hunter.time_utils import format_iso_datetime, parse_iso_datetime
 
 
 WORKFLOW_RUNS_TABLE = "workflow_runs"
 STEP_DURATIONS_TABLE = "step_durations"
 TEST_DURATIONS_TABLE = "test_durations"
 TEST_OUTCOMES_TABLE = "test_outcomes"
+METRIC_NAMES_TABLE = "metric_names"
+METRIC_ROLLUPS_TABLE = "metric_rollups"
+METRIC_ROLLUP_STATE_TABLE = "metric_rollup_state"
+ANALYSIS_JOBS_TABLE = "analysis_jobs"
+EMPTY_TIMING_FETCHES_TABLE = "empty_timing_fetches"
+OUTDATED_TIMING_FETCHES_TABLE = "outdated_timing_fetches"
+DEFAULT_JOB_VISIBILITY_TIMEOUT_SECONDS = 900.0
+RUN_STATUS_COMPLETED = "completed"
+# Incremental syncs re-list runs created this long before the newest stored run, so
+# re-runs (same id and created_at, newer updated_at) of recent runs are picked up.
+DEFAULT_RERUN_LOOKBACK = timedelta(days=1)
+# Runs left pending this long before the newest stored run stop holding the listing
+# cursor back; they are refreshed one by one instead.
+DEFAULT_PENDING_CURSOR_LIMIT = timedelta(days=1)
+METRIC_KIND_STEP = "step"
+METRIC_KIND_TEST = "test"
+
+TIMING_TABLES = (STEP_DURATIONS_TABLE, TEST_DURATIONS_TABLE, TEST_OUTCOMES_TABLE)
+# Name column used before names were interned into metric_names (migration 0004).
+_LEGACY_NAME_COLUMNS = {
+    STEP_DURATIONS_TABLE: "step_name",
+    TEST_DURATIONS_TABLE: "test_name",
+    TEST_OUTCOMES_TABLE: "test_name",
+}
+_METRIC_KINDS = {
+    STEP_DURATIONS_TABLE: METRIC_KIND_STEP,
+    TEST_DURATIONS_TABLE: METRIC_KIND_TEST,
+    TEST_OUTCOMES_TABLE: METRIC_KIND_TEST,
+}
+_TIMING_VALUE_COLUMNS = {
+    STEP_DURATIONS_TABLE: "duration_seconds",
+    TEST_DURATIONS_TABLE: "duration_seconds",
+    TEST_OUTCOMES_TABLE: "outcome",
+}
+_TIMING_KEY_COLUMNS = ("repo", "run_id", "metric_id")
+# Duration tables whose samples are also aggregated into metric_rollups.
+_ROLLUP_TABLES = (STEP_DURATIONS_TABLE, TEST_DURATIONS_TABLE)
+_ROLLUP_KINDS = {METRIC_KIND_STEP: STEP_DURATIONS_TABLE, METRIC_KIND_TEST: TEST_DURATIONS_TABLE}
+_METRIC_ID_LOOKUP_CHUNK = 500
+DEFAULT_POSTGRES_COPY_THRESHOLD_ROWS = 1000
+DEFAULT_EMPTY_TIMING_FETCH_ATTEMPTS = 3
+
+# Secondary indexes for run-ordered history reads; mirrored by migrations 0002-0004.
+HISTORY_INDEXES = (
+    ("ix_workflow_runs_repo_run_number", WORKFLOW_RUNS_TABLE, ("repo", "run_number")),
+    (
+        "ix_step_durations_repo_metric_id_run_number",
+        STEP_DURATIONS_TABLE,
+        ("repo", "metric_id", "run_number", "duration_seconds"),
+    ),
+    (
+        "ix_test_durations_repo_metric_id_run_number",
+        TEST_DURATIONS_TABLE,
+        ("repo", "metric_id", "run_number", "duration_seconds"),
+    ),
+    (
+        "ix_test_outcomes_repo_metric_id_run_number",
+        TEST_OUTCOMES_TABLE,
+        ("repo", "metric_id", "run_number", "outcome"),
+    ),
+)
+# Join-support indexes made redundant once timing rows carry run_number (migration 0003).
+_RETIRED_HISTORY_INDEXES = (
+    "ix_workflow_runs_repo_run_id_run_number",
+    "ix_step_durations_repo_step_name_run_id",
+    "ix_test_durations_repo_test_name_run_id",
+    "ix_test_outcomes_repo_test_name_run_id",
+)
+
+# Optional monthly range partitions on created_at (PostgreSQL, migration 0005).
+_TIMING_PARTITION_NAME = re.compile(r"^(?P<table>[a-z_]+)_p(?P<year>\d{4})(?P<month>\d{2})$")
+
+
+def timing_partition_name(table: str, year: int, month: int) -> str:
+    return f"{table}_p{year:04d}{month:02d}"
+
+
+def _timing_partition_bounds(year: int, month: int) -> tuple[str, str]:
+    """``created_at`` range ``[start, end)`` of a monthly partition, as ISO dates."""
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return f"{year:04d}-{month:02d}-01", f"{next_year:04d}-{next_month:02d}-01"
+
+
+_SQLITE_JOURNAL_MODES = frozenset({"delete", "truncate", "persist", "memory", "wal", "off"})
+_SQLITE_SYNCHRONOUS_MODES = frozenset({"off", "normal", "full", "extra"})
+_SQLITE_TEMP_STORES = frozenset({"default", "file", "memory"})
+
+
+@dataclass(frozen=True)
+class SQLiteTuning:
+    """Connection pragmas for the SQLite backend; ``None`` keeps SQLite's default.
+
+    The defaults use WAL so another process's reads (a worker analyzing, the CLI,
+    ``sqlite3``) do not block this process's timing ingestion, and vice versa. Within
+    one ``Storage`` every operation still shares a single connection behind a lock,
+    so WAL does not add in-process concurrency. ``synchronous=NORMAL`` is durable
+    across application crashes in WAL mode. Ingest commits touch many index pages, so the WAL is checkpointed
+    every ``wal_autocheckpoint_pages`` pages (64 MiB at 4 KiB pages) rather than
+    SQLite's 1000. ``cached_statements`` sizes the per-connection prepared-statement
+    cache reused by repeated ``save_*``/``list_*`` calls.
+    """
+
+    journal_mode: Optional[str] = "wal"
+    synchronous: Optional[str] = "normal"
+    wal_autocheckpoint_pages: Optional[int] = 16384
+    mmap_size_bytes: Optional[int] = 256 * 1024 * 1024
+    cache_size_kib: Optional[int] = 64 * 1024
+    temp_store: Optional[str] = "memory"
+    cached_statements: int = 256
+
+    def __post_init__(self) -> None:
+        _check_choice("journal_mode", self.journal_mode, _SQLITE_JOURNAL_MODES)
+        _check_choice("synchronous", self.synchronous, _SQLITE_SYNCHRONOUS_MODES)
+        _check_choice("temp_store", self.temp_store, _SQLITE_TEMP_STORES)
+        if self.wal_autocheckpoint_pages is not None and self.wal_autocheckpoint_pages < 0:
+            raise ValueError("wal_autocheckpoint_pages must be >= 0 when set")
+        if self.mmap_size_bytes is not None and self.mmap_size_bytes < 0:
+            raise ValueError("mmap_size_bytes must be >= 0 when set")
+        if self.cache_size_kib is not None and self.cache_size_kib < 1:
+            raise ValueError("cache_size_kib must be >= 1 when set")
+        if self.cached_statements < 0:
+            raise ValueError("cached_statements must be >= 0")
+
+    def pragmas(self) -> list[str]:
+        pragmas = []
+        if self.journal_mode is not None:
+            pragmas.append(f"PRAGMA journal_mode = {self.journal_mode.upper()}")
+        if self.synchronous is not None:
+            pragmas.append(f"PRAGMA synchronous = {self.synchronous.upper()}")
+        if self.wal_autocheckpoint_pages is not None:
+            pragmas.append(f"PRAGMA wal_autocheckpoint = {int(self.wal_autocheckpoint_pages)}")
+        if self.mmap_size_bytes is not None:
+            pragmas.append(f"PRAGMA mmap_size = {int(self.mmap_size_bytes)}")
+        if self.cache_size_kib is not None:
+            # Negative cache_size is interpreted by SQLite as KiB rather than pages.
+            pragmas.append(f"PRAGMA cache_size = -{int(self.cache_size_kib)}")
+        if self.temp_store is not None:
+            pragmas.append(f"PRAGMA temp_store = {self.temp_store.upper()}")
+        return pragmas
+
+
+def _check_choice(name: str, value: Optional[str], choices: frozenset[str]) -> None:
+    if value is not None and value.lower() not in choices:
+        raise ValueError(f"Unsupported SQLite {name}: {value}")
 
 
 @dataclass(frozen=True)
 class StorageConfig:
+    """Storage connection settings.
+
+    ``postgres_copy_threshold_rows`` is the row count from which PostgreSQL timing
+    writes switch from batched ``INSERT ... ON CONFLICT`` to ``COPY`` into a staging
+    table plus one merge; ``None`` disables the ``COPY`` path.
+
+    Setting ``postgres_pool_max_size`` switches PostgreSQL to a ``psycopg_pool``
+    connection pool (the ``postgres-pool`` extra) so threads query in parallel;
+    otherwise one connection is shared and operations are serialized, as SQLite
+    always is.
+
+    Setting ``rollup_window`` makes duration saves also maintain ``metric_rollups``:
+    per-(repo, metric) sample count, sum, quantile sketch and the last
+    ``rollup_window`` values, so analysis need not read raw history.
+
+    ``empty_timing_fetch_attempts`` is how many times a completed run's timing fetch
+    must come back empty before the run is no longer fetched for that table.
+    """
+
     database_url: str
+    sqlite: SQLiteTuning = field(default_factory=SQLiteTuning)
+    postgres_copy_threshold_rows: Optional[int] = DEFAULT_POSTGRES_COPY_THRESHOLD_ROWS
+    postgres_pool_max_size: Optional[int] = None
+    postgres_pool_min_size: int = 1
+    postgres_pool_timeout_seconds: float = 30.0
+    rollup_window: Optional[int] = None
+    empty_timing_fetch_attempts: int = DEFAULT_EMPTY_TIMING_FETCH_ATTEMPTS
+
+    def __post_init__(self) -> None:
+        if self.postgres_copy_threshold_rows is not None and self.postgres_copy_threshold_rows < 1:
+            raise ValueError("postgres_copy_threshold_rows must be >= 1 when set")
+        if self.postgres_pool_max_size is not None:
+            if self.postgres_pool_max_size < 1:
+                raise ValueError("postgres_pool_max_size must be >= 1 when set")
+            if not 0 <= self.postgres_pool_min_size <= self.postgres_pool_max_size:
+                raise ValueError(
+                    "postgres_pool_min_size must be between 0 and postgres_pool_max_size"
+                )
+        if self.postgres_pool_timeout_seconds <= 0:
+            raise ValueError("postgres_pool_timeout_seconds must be positive")
+        if self.rollup_window is not None and self.rollup_window < 2:
+            raise ValueError("rollup_window must be >= 2 when set")
+        if self.empty_timing_fetch_attempts < 1:
+            raise ValueError("empty_timing_fetch_attempts must be >= 1")
+
+
+@dataclass(frozen=True)
+class WorkflowRunSyncState:
+    """High-water mark for incremental workflow-run listing.
+
+    ``created_since`` is the oldest ``created_at`` that still needs re-listing: the
+    newest stored run minus the re-run lookback, or the oldest stored run that is not
+    completed if that is earlier but within the pending cursor limit.
+    ``newest_completed_run_id`` is only set with no lookback and every stored run
+    completed, so pagination can safely stop once it reaches that id.
+    ``pending_run_ids`` are runs pending for longer than the cursor limit, to be
+    refreshed individually.
+    """
+
+    created_since: Optional[str]
+    newest_completed_run_id: Optional[int]
+    pending_run_ids: tuple[int, ...] = ()
+
+
+@dataclass(frozen=True)
+class StoredTimingRunIds:
+    step_run_ids: frozenset[int]
+    test_run_ids: frozenset[int]
+    outcome_run_ids: frozenset[int]
+    # (run_id, timing_table) pairs left out above because the run was re-run.
+    outdated_fetches: frozenset[tuple[int, str]] = frozenset()
 
 
 @dataclass(frozen=True)
@@ -47,12 +270,68 @@ class TestOutcomeSample:
     __test__ = False
 
 
+@dataclass(frozen=True)
+class ClaimedJob:
+    """A queued job leased to one worker until its visibility timeout passes.
+
+    ``lease_token`` identifies this claim: once the timeout passes and another
+    worker claims the job, acks and releases with the old token are ignored.
+    ``coalesced`` counts the older jobs for the same PR this one replaced.
+    """
+
+    job_id: int
+    lease_token: str
+    attempts: int
+    job: AnalysisJob
+    coalesced: int = 0
+
+
+@dataclass(frozen=True)
+class TimingRetentionResult:
+    dropped_partitions: tuple[str, ...]
+    deleted_rows: int
+
+
+def _timing_columns(table: str) -> tuple[str, ...]:
+    return ("repo", "run_id", "metric_id", _TIMING_VALUE_COLUMNS[table], "run_number", "created_at")
+
+
+class _PendingTimingRows:
+    """Timing rows buffered by ``Storage.batch()``, keyed by ``(repo, run_id, name)``.
+
+    Rows hold the metric name in place of ``metric_id`` until the batch is flushed.
+    """
+
+    def __init__(self) -> None:
+        self._rows: dict[str, dict[tuple[Any, ...], tuple[Any, ...]]] = {}
+
+    def add(self, table: str, rows: Iterable[tuple[Any, ...]]) -> None:
+        keyed = self._rows.setdefault(table, {})
+        for row in rows:
+            keyed[row[:3]] = row
+
+    def tables(self) -> Iterator[tuple[str, list[tuple[Any, ...]]]]:
+        for table, keyed in self._rows.items():
+            if keyed:
+                yield table, list(keyed.values())
+
+
+class _BatchState(threading.local):
+    batch: _PendingTimingRows | None = None
+
+
 def _import_psycopg() -> Any:
     import psycopg
 
     return psycopg
 
 
+def _import_psycopg_pool() -> Any:
+    import psycopg_pool
+
+    return psycopg_pool
+
+
 def _detect_database_scheme(database_url: str) -> str:
     if database_url == ":memory:" or "://" not in database_url:
         return "sqlite"
@@ -87,13 +366,22 @@ class _SQLiteBackend:
     name = "sqlite"
     placeholder = "?"
 
-    def __init__(self, database_url: str) -> None:
-        self._connection = sqlite3.connect(database_url, check_same_thread=False)
+    def __init__(self, database_url: str, tuning: SQLiteTuning) -> None:
+        self._connection = sqlite3.connect(
+            database_url,
+            check_same_thread=False,
+            cached_statements=tuning.cached_statements,
+        )
         self._connection.execute("PRAGMA foreign_keys = ON;")
+        for pragma in tuning.pragmas():
+            self._connection.execute(pragma)
 
     def execute(self, query: str, params: tuple[Any, ...] = ()) -> list[tuple[Any, ...]]:
         return self._connection.execute(query, params).fetchall()
 
+    def execute_rowcount(self, query: str, params: tuple[Any, ...] = ()) -> int:
+        return self._connection.execute(query, params).rowcount
+
     def executemany(self, query: str, rows: list[tuple[Any, ...]]) -> None:
         if rows:
             self._connection.executemany(query, rows)
@@ -101,6 +389,9 @@ class _SQLiteBackend:
     def commit(self) -> None:
         self._connection.commit()
 
+    def rollback(self) -> None:
+        self._connection.rollback()
+
     def close(self) -> None:
         self._connection.close()
 
@@ -109,9 +400,11 @@ class _PostgresBackend:
     name = "postgresql"
     placeholder = "%s"
 
-    def __init__(self, database_url: str) -> None:
-        psycopg = _import_psycopg()
-        self._connection = psycopg.connect(database_url)
+    def __init__(self, database_url: str | None = None, *, connection: Any = None) -> None:
+        if connection is None:
+            psycopg = _import_psycopg()
+            connection = psycopg.connect(database_url)
+        self._connection = connection
 
     def execute(self, query: str, params: tuple[Any, ...] = ()) -> list[tuple[Any, ...]]:
         with self._connection.cursor() as cursor:
@@ -120,28 +413,99 @@ class _PostgresBackend:
                 return []
             return cursor.fetchall()
 
+    def execute_rowcount(self, query: str, params: tuple[Any, ...] = ()) -> int:
+        with self._connection.cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.rowcount
+
     def executemany(self, query: str, rows: list[tuple[Any, ...]]) -> None:
         if not rows:
             return
         with self._connection.cursor() as cursor:
             cursor.executemany(query, rows)
 
+    def copy_rows(
+        self,
+        table: str,
+        columns: Iterable[str],
+        rows: Iterable[tuple[Any, ...]],
+    ) -> None:
+        with self._connection.cursor() as cursor:
+            with cursor.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+
     def commit(self) -> None:
         self._connection.commit()
 
+    def rollback(self) -> None:
+        self._connection.rollback()
+
     def close(self) -> None:
         self._connection.close()
 
 
+class _PooledPostgresBackend:
+    """PostgreSQL backend that checks a connection out of a ``psycopg_pool`` pool per
+    storage operation, so operations from different threads run in parallel."""
+
+    name = "postgresql"
+    placeholder = "%s"
+
+    def __init__(self, database_url: str, *, min_size: int, max_size: int, timeout: float) -> None:
+        psycopg_pool = _import_psycopg_pool()
+        self._pool = psycopg_pool.ConnectionPool(
+            database_url,
+            min_size=min_size,
+            max_size=max_size,
+            timeout=timeout,
+            open=True,
+        )
+
+    @contextmanager
+    def session(self) -> Iterator[_PostgresBackend]:
+        # The pool rolls back connections returned mid-transaction.
+        with self._pool.connection() as connection:
+            yield _PostgresBackend(connection=connection)
+
+    def close(self) -> None:
+        self._pool.close()
+
+
 class Storage:
     def __init__(self, database_url: str | StorageConfig) -> None:
-        if isinstance(database_url, StorageConfig):
-            database_url = database_url.database_url
+        config = (
+            database_url
+            if isinstance(database_url, StorageConfig)
+            else StorageConfig(database_url=database_url)
+        )
+        database_url = config.database_url
+        self._copy_threshold_rows = config.postgres_copy_threshold_rows
+        self._rollup_window = config.rollup_window
+        self._empty_fetch_attempts = config.empty_timing_fetch_attempts
         self._database_url = database_url
         self._lock = threading.Lock()
+        # (kind, name) -> metric_names.metric_id; ids are never reassigned.
+        self._metric_ids: dict[tuple[str, str], int] = {}
+        self._local = _BatchState()
+        # Timing tables converted to monthly partitions; detected on first use.
+        self._partitioned_tables: frozenset[str] | None = None
         scheme = _detect_database_scheme(self._database_url)
         if scheme == "sqlite":
-            self._backend = _SQLiteBackend(_resolve_sqlite_path(self._database_url))
+            self._backend = _SQLiteBackend(_resolve_sqlite_path(self._database_url), config.sqlite)
+        elif scheme == "postgresql" and config.postgres_pool_max_size is not None:
+            try:
+                self._backend = _PooledPostgresBackend(
+                    self._database_url,
+                    min_size=config.postgres_pool_min_size,
+                    max_size=config.postgres_pool_max_size,
+                    timeout=config.postgres_pool_timeout_seconds,
+                )
+            except ImportError as exc:
+                raise RuntimeError(
+                    "Pooled PostgreSQL storage requires 'psycopg_pool'. "
+                    "Install it (pip install -e \".[postgres-pool]\") and retry."
+                ) from exc
         elif scheme == "postgresql":
             try:
                 self._backend = _PostgresBackend(self._database_url)
@@ -157,9 +521,29 @@ class Storage:
     def backend_name(self) -> str:
         return self._backend.name
 
+    @property
+    def rollup_window(self) -> int | None:
+        """Recent values kept per metric in ``metric_rollups``; ``None`` if not maintained."""
+        return self._rollup_window
+
     def _placeholder(self) -> str:
         return self._backend.placeholder
 
+    @contextmanager
+    def _session(self) -> Iterator[Any]:
+        """Yield the connection-level backend for one storage operation.
+
+        Pooled backends hand out a connection per operation; single-connection
+        backends (SQLite, unpooled PostgreSQL) serialize operations on ``_lock``.
+        """
+        session = getattr(self._backend, "session", None)
+        if session is not None:
+            with session() as backend:
+                yield backend
+            return
+        with self._lock:
+            yield self._backend
+
     def _init_schema(self) -> None:
         if self.backend_name != "sqlite":
             # Postgres schema is owned by Alembic migrations.
@@ -167,6 +551,11 @@ class Storage:
         run_id_type = "INTEGER" if self.backend_name == "sqlite" else "BIGINT"
         run_number_type = "INTEGER" if self.backend_name == "sqlite" else "BIGINT"
         duration_type = "REAL" if self.backend_name == "sqlite" else "DOUBLE PRECISION"
+        timing_columns = (
+            (STEP_DURATIONS_TABLE, "duration_seconds", duration_type),
+            (TEST_DURATIONS_TABLE, "duration_seconds", duration_type),
+            (TEST_OUTCOMES_TABLE, "outcome", "TEXT"),
+        )
         with self._lock:
             self._backend.execute(
                 f"""
@@ -185,45 +574,232 @@ class Storage:
             )
             self._backend.execute(
                 f"""
-                CREATE TABLE IF NOT EXISTS {STEP_DURATIONS_TABLE} (
+                CREATE TABLE IF NOT EXISTS {METRIC_NAMES_TABLE} (
+                    metric_id INTEGER PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    UNIQUE (kind, name)
+                )
+                """
+            )
+            self._backend.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {METRIC_ROLLUPS_TABLE} (
                     repo TEXT NOT NULL,
-                    run_id {run_id_type} NOT NULL,
-                    step_name TEXT NOT NULL,
-                    duration_seconds {duration_type} NOT NULL,
-                    PRIMARY KEY (repo, run_id, step_name),
-                    FOREIGN KEY (repo, run_id)
-                        REFERENCES {WORKFLOW_RUNS_TABLE}(repo, run_id)
+                    metric_id INTEGER NOT NULL,
+                    recent TEXT NOT NULL,
+                    sample_count INTEGER NOT NULL,
+                    value_sum {duration_type} NOT NULL,
+                    sketch TEXT NOT NULL,
+                    PRIMARY KEY (repo, metric_id),
+                    FOREIGN KEY (metric_id) REFERENCES {METRIC_NAMES_TABLE} (metric_id)
+                )
+                """
+            )
+            self._backend.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {METRIC_ROLLUP_STATE_TABLE} (
+                    repo TEXT PRIMARY KEY,
+                    in_sync INTEGER NOT NULL
                 )
                 """
             )
+            for table, value_column, value_type in timing_columns:
+                self._create_sqlite_timing_table(
+                    table,
+                    value_column=value_column,
+                    value_type=value_type,
+                    run_id_type=run_id_type,
+                    run_number_type=run_number_type,
+                )
+            for table in TIMING_TABLES:
+                self._add_run_columns_to_legacy_sqlite_table(table, run_number_type)
+            for table, value_column, value_type in timing_columns:
+                self._intern_legacy_sqlite_metric_names(
+                    table,
+                    value_column=value_column,
+                    value_type=value_type,
+                    run_id_type=run_id_type,
+                    run_number_type=run_number_type,
+                )
             self._backend.execute(
                 f"""
-                CREATE TABLE IF NOT EXISTS {TEST_DURATIONS_TABLE} (
+                CREATE TABLE IF NOT EXISTS {EMPTY_TIMING_FETCHES_TABLE} (
                     repo TEXT NOT NULL,
                     run_id {run_id_type} NOT NULL,
-                    test_name TEXT NOT NULL,
-                    duration_seconds {duration_type} NOT NULL,
-                    PRIMARY KEY (repo, run_id, test_name),
-                    FOREIGN KEY (repo, run_id)
-                        REFERENCES {WORKFLOW_RUNS_TABLE}(repo, run_id)
+                    timing_table TEXT NOT NULL,
+                    empty_fetches INTEGER NOT NULL DEFAULT 1,
+                    PRIMARY KEY (repo, run_id, timing_table)
                 )
                 """
             )
+            empty_fetch_columns = {
+                row[1]
+                for row in self._backend.execute(
+                    f"PRAGMA table_info({EMPTY_TIMING_FETCHES_TABLE})"
+                )
+            }
+            if "empty_fetches" not in empty_fetch_columns:
+                self._backend.execute(
+                    f"ALTER TABLE {EMPTY_TIMING_FETCHES_TABLE} "
+                    "ADD COLUMN empty_fetches INTEGER NOT NULL DEFAULT 1"
+                )
             self._backend.execute(
                 f"""
-                CREATE TABLE IF NOT EXISTS {TEST_OUTCOMES_TABLE} (
+                CREATE TABLE IF NOT EXISTS {OUTDATED_TIMING_FETCHES_TABLE} (
                     repo TEXT NOT NULL,
                     run_id {run_id_type} NOT NULL,
-                    test_name TEXT NOT NULL,
-                    outcome TEXT NOT NULL,
-                    PRIMARY KEY (repo, run_id, test_name),
-                    FOREIGN KEY (repo, run_id)
-                        REFERENCES {WORKFLOW_RUNS_TABLE}(repo, run_id)
+                    timing_table TEXT NOT NULL,
+                    PRIMARY KEY (repo, run_id, timing_table)
                 )
                 """
             )
+            self._backend.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {ANALYSIS_JOBS_TABLE} (
+                    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    repo TEXT NOT NULL,
+                    pr_number INTEGER NOT NULL,
+                    commit_sha TEXT,
+                    branch TEXT,
+                    visible_at REAL NOT NULL,
+                    lease_token TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    coalesced INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            job_columns = {
+                row[1] for row in self._backend.execute(f"PRAGMA table_info({ANALYSIS_JOBS_TABLE})")
+            }
+            if "coalesced" not in job_columns:
+                self._backend.execute(
+                    f"ALTER TABLE {ANALYSIS_JOBS_TABLE} "
+                    "ADD COLUMN coalesced INTEGER NOT NULL DEFAULT 0"
+                )
+            self._backend.execute(
+                f"""
+                CREATE INDEX IF NOT EXISTS ix_{ANALYSIS_JOBS_TABLE}_repo_pr_number
+                ON {ANALYSIS_JOBS_TABLE} (repo, pr_number)
+                """
+            )
+            self._backend.execute(
+                f"""
+                CREATE INDEX IF NOT EXISTS ix_{ANALYSIS_JOBS_TABLE}_visible_at_job_id
+                ON {ANALYSIS_JOBS_TABLE} (visible_at, job_id)
+                """
+            )
+            for index_name in _RETIRED_HISTORY_INDEXES:
+                self._backend.execute(f"DROP INDEX IF EXISTS {index_name}")
+            for index_name, table, columns in HISTORY_INDEXES:
+                self._backend.execute(
+                    f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({', '.join(columns)})"
+                )
             self._backend.commit()
 
+    def _create_sqlite_timing_table(
+        self,
+        table: str,
+        *,
+        value_column: str,
+        value_type: str,
+        run_id_type: str,
+        run_number_type: str,
+    ) -> None:
+        self._backend.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                repo TEXT NOT NULL,
+                run_id {run_id_type} NOT NULL,
+                metric_id INTEGER NOT NULL,
+                {value_column} {value_type} NOT NULL,
+                run_number {run_number_type} NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (repo, run_id, metric_id),
+                FOREIGN KEY (repo, run_id)
+                    REFERENCES {WORKFLOW_RUNS_TABLE}(repo, run_id),
+                FOREIGN KEY (metric_id)
+                    REFERENCES {METRIC_NAMES_TABLE}(metric_id)
+            )
+            """
+        )
+
+    def _intern_legacy_sqlite_metric_names(
+        self,
+        table: str,
+        *,
+        value_column: str,
+        value_type: str,
+        run_id_type: str,
+        run_number_type: str,
+    ) -> None:
+        """Rebuild a pre-interning table so rows reference ``metric_names`` by id."""
+        name_column = _LEGACY_NAME_COLUMNS[table]
+        columns = {row[1] for row in self._backend.execute(f"PRAGMA table_info({table})")}
+        if name_column not in columns:
+            return
+        kind = _METRIC_KINDS[table]
+        legacy_table = f"{table}_legacy"
+        self._backend.execute(
+            f"""
+            INSERT OR IGNORE INTO {METRIC_NAMES_TABLE} (kind, name)
+            SELECT DISTINCT ?, {name_column} FROM {table}
+            """,
+            (kind,),
+        )
+        self._backend.execute(f"ALTER TABLE {table} RENAME TO {legacy_table}")
+        self._create_sqlite_timing_table(
+            table,
+            value_column=value_column,
+            value_type=value_type,
+            run_id_type=run_id_type,
+            run_number_type=run_number_type,
+        )
+        self._backend.execute(
+            f"""
+            INSERT INTO {table} (repo, run_id, metric_id, {value_column}, run_number, created_at)
+            SELECT
+                legacy.repo,
+                legacy.run_id,
+                names.metric_id,
+                legacy.{value_column},
+                legacy.run_number,
+                legacy.created_at
+            FROM {legacy_table} AS legacy
+            JOIN {METRIC_NAMES_TABLE} AS names
+              ON names.kind = ?
+             AND names.name = legacy.{name_column}
+            """,
+            (kind,),
+        )
+        self._backend.execute(f"DROP TABLE {legacy_table}")
+
+    def _add_run_columns_to_legacy_sqlite_table(self, table: str, run_number_type: str) -> None:
+        """Add and backfill ``run_number``/``created_at`` on tables created before they existed."""
+        columns = {row[1] for row in self._backend.execute(f"PRAGMA table_info({table})")}
+        if "run_number" in columns:
+            return
+        self._backend.execute(f"ALTER TABLE {table} ADD COLUMN run_number {run_number_type}")
+        self._backend.execute(f"ALTER TABLE {table} ADD COLUMN created_at TEXT")
+        self._backend.execute(
+            f"""
+            UPDATE {table}
+            SET
+                run_number = (
+                    SELECT runs.run_number
+                    FROM {WORKFLOW_RUNS_TABLE} AS runs
+                    WHERE runs.repo = {table}.repo
+                      AND runs.run_id = {table}.run_id
+                ),
+                created_at = (
+                    SELECT runs.created_at
+                    FROM {WORKFLOW_RUNS_TABLE} AS runs
+                    WHERE runs.repo = {table}.repo
+                      AND runs.run_id = {table}.run_id
+                )
+            """
+        )
+
     def save_workflow_runs(self, repo: str, runs: Iterable[WorkflowRun]) -> None:
         placeholder = self._placeholder()
         values = [
@@ -239,7 +815,7 @@ class Storage:
             )
             for run in runs
         ]
-        with self._lock:
+        with self._session() as backend:
             if self.backend_name == "sqlite":
                 query = f"""
                     INSERT OR REPLACE INTO {WORKFLOW_RUNS_TABLE} (
@@ -273,13 +849,984 @@ class Storage:
                         updated_at = EXCLUDED.updated_at,
                         head_sha = EXCLUDED.head_sha
                 """
-            self._backend.executemany(query, values)
-            self._backend.commit()
+            stored = self._select_stored_runs(backend, repo, [row[1] for row in values])
+            backend.executemany(query, values)
+            self._sync_timing_run_columns(backend, repo, values, stored)
+            # A stored run whose updated_at moved was re-run: its timings are re-fetched.
+            self._mark_timing_runs_outdated(
+                backend,
+                repo,
+                [
+                    run_id
+                    for _repo, run_id, *_rest, updated_at, _sha in values
+                    if run_id in stored and stored[run_id][2] != updated_at
+                ],
+            )
+            backend.commit()
+
+    def _select_stored_runs(
+        self, backend: Any, repo: str, run_ids: list[int]
+    ) -> dict[int, tuple[int, str, str]]:
+        """``(run_number, created_at, updated_at)`` of the stored runs among ``run_ids``."""
+        placeholder = self._placeholder()
+        ordered = sorted(set(run_ids))
+        stored = {}
+        for start in range(0, len(ordered), _METRIC_ID_LOOKUP_CHUNK):
+            chunk = ordered[start : start + _METRIC_ID_LOOKUP_CHUNK]
+            for run_id, run_number, created_at, updated_at in backend.execute(
+                f"""
+                SELECT run_id, run_number, created_at, updated_at
+                FROM {WORKFLOW_RUNS_TABLE}
+                WHERE repo = {placeholder}
+                  AND run_id IN ({", ".join([placeholder] * len(chunk))})
+                """,
+                (repo, *chunk),
+            ):
+                stored[run_id] = (run_number, created_at, updated_at)
+        return stored
+
+    def _mark_timing_runs_outdated(self, backend: Any, repo: str, run_ids: list[int]) -> None:
+        if not run_ids:
+            return
+        placeholder = self._placeholder()
+        rows = [(repo, run_id) for run_id in dict.fromkeys(run_ids)]
+        backend.executemany(
+            f"""
+            INSERT INTO {OUTDATED_TIMING_FETCHES_TABLE} (repo, run_id, timing_table)
+            VALUES ({placeholder}, {placeholder}, {placeholder})
+            ON CONFLICT (repo, run_id, timing_table) DO NOTHING
+            """,
+            [(repo, run_id, table) for _repo, run_id in rows for table in TIMING_TABLES],
+        )
+        backend.executemany(
+            f"""
+            DELETE FROM {EMPTY_TIMING_FETCHES_TABLE}
+            WHERE repo = {placeholder} AND run_id = {placeholder}
+            """,
+            rows,
+        )
+
+    def _sync_timing_run_columns(
+        self,
+        backend: Any,
+        repo: str,
+        values: list[tuple[Any, ...]],
+        stored: dict[int, tuple[int, str, str]],
+    ) -> None:
+        """Copy changed run columns from ``workflow_runs`` onto the runs' timing rows.
+
+        Only runs already ``stored`` whose ``run_number`` or ``created_at`` moved are
+        touched, with one set-based ``UPDATE`` per timing table and id chunk.
+        """
+        placeholder = self._placeholder()
+        changed = sorted(
+            {
+                run_id
+                for _repo, run_id, run_number, _status, _conclusion, created_at, _updated_at, _sha in values
+                if run_id in stored and stored[run_id][:2] != (run_number, created_at)
+            }
+        )
+        for start in range(0, len(changed), _METRIC_ID_LOOKUP_CHUNK):
+            chunk = changed[start : start + _METRIC_ID_LOOKUP_CHUNK]
+            for table in TIMING_TABLES:
+                backend.execute(
+                    f"""
+                    UPDATE {table}
+                    SET
+                        run_number = (
+                            SELECT runs.run_number
+                            FROM {WORKFLOW_RUNS_TABLE} AS runs
+                            WHERE runs.repo = {table}.repo
+                              AND runs.run_id = {table}.run_id
+                        ),
+                        created_at = (
+                            SELECT runs.created_at
+                            FROM {WORKFLOW_RUNS_TABLE} AS runs
+                            WHERE runs.repo = {table}.repo
+                              AND runs.run_id = {table}.run_id
+                        )
+                    WHERE repo = {placeholder}
+                      AND run_id IN ({", ".join([placeholder] * len(chunk))})
+                    """,
+                    (repo, *chunk),
+                )
+
+    def _get_run_columns(self, backend: Any, repo: str, run_id: int) -> tuple[Any, Any]:
+        """Return ``(run_number, created_at)`` for a stored run, or ``(None, None)``."""
+        placeholder = self._placeholder()
+        rows = backend.execute(
+            f"""
+            SELECT run_number, created_at
+            FROM {WORKFLOW_RUNS_TABLE}
+            WHERE repo = {placeholder}
+              AND run_id = {placeholder}
+            """,
+            (repo, run_id),
+        )
+        if not rows:
+            return None, None
+        return rows[0][0], rows[0][1]
+
+    def _resolve_metric_ids(self, backend: Any, kind: str, names: Iterable[str]) -> dict[str, int]:
+        """Map metric names to ``metric_names`` ids, interning unseen names.
+
+        Known names are served from the in-process cache; the rest are inserted
+        (ignoring ones another writer already added) and looked up in chunks.
+        """
+        resolved: dict[str, int] = {}
+        missing: list[str] = []
+        for name in dict.fromkeys(names):
+            metric_id = self._metric_ids.get((kind, name))
+            if metric_id is None:
+                missing.append(name)
+            else:
+                resolved[name] = metric_id
+        if not missing:
+            return resolved
+        placeholder = self._placeholder()
+        if self.backend_name == "sqlite":
+            insert = f"""
+                INSERT OR IGNORE INTO {METRIC_NAMES_TABLE} (kind, name)
+                VALUES ({placeholder}, {placeholder})
+            """
+        else:
+            insert = f"""
+                INSERT INTO {METRIC_NAMES_TABLE} (kind, name)
+                VALUES ({placeholder}, {placeholder})
+                ON CONFLICT (kind, name) DO NOTHING
+            """
+        backend.executemany(insert, [(kind, name) for name in missing])
+        for start in range(0, len(missing), _METRIC_ID_LOOKUP_CHUNK):
+            chunk = missing[start : start + _METRIC_ID_LOOKUP_CHUNK]
+            rows = backend.execute(
+                f"""
+                SELECT name, metric_id
+                FROM {METRIC_NAMES_TABLE}
+                WHERE kind = {placeholder}
+                  AND name IN ({", ".join([placeholder] * len(chunk))})
+                """,
+                (kind, *chunk),
+            )
+            for name, metric_id in rows:
+                self._metric_ids[(kind, name)] = metric_id
+                resolved[name] = metric_id
+        return resolved
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Collect ``save_step_durations``/``save_test_durations``/``save_test_outcomes``
+        rows and write them in one transaction when the block exits.
+
+        Rows are keyed like the tables' primary keys, so a later save of the same
+        ``(repo, run_id, name)`` within the batch replaces an earlier one. PostgreSQL
+        loads each table through ``COPY`` into a temp staging table and merges from
+        there once the batch reaches ``postgres_copy_threshold_rows``. Nested
+        ``batch()`` blocks join the outermost one. A batch belongs to the thread that
+        opened it; saves from other threads are written as usual. If the block
+        raises, nothing it saved is written; if the flush fails, it is rolled back.
+        """
+        if self._local.batch is not None:
+            yield
+            return
+        pending = self._local.batch = _PendingTimingRows()
+        try:
+            yield
+        finally:
+            self._local.batch = None
+        with self._session() as backend:
+            try:
+                for table, named_rows in pending.tables():
+                    metric_ids = self._resolve_metric_ids(
+                        backend,
+                        _METRIC_KINDS[table],
+                        [row[2] for row in named_rows],
+                    )
+                    self._upsert_timing_rows(
+                        backend,
+                        table,
+                        [
+                            (repo, run_id, metric_ids[name], *rest)
+                            for repo, run_id, name, *rest in named_rows
+                        ],
+                    )
+                backend.commit()
+            except BaseException:
+                self._rollback(backend)
+                raise
+
+    def _rollback(self, backend: Any) -> None:
+        backend.rollback()
+        # Names interned by the rolled-back transaction no longer exist.
+        self._metric_ids.clear()
+
+    def _save_timing_rows(
+        self,
+        table: str,
+        repo: str,
+        run_id: int,
+        named_values: list[tuple[str, Any]],
+    ) -> None:
+        with self._session() as backend:
+            run_number, created_at = self._get_run_columns(backend, repo, run_id)
+            pending = self._local.batch
+            if pending is not None:
+                if run_number is None:
+                    # Fail this save now rather than the whole batch at flush time.
+                    raise ValueError(f"Unknown workflow run {run_id} for {repo}")
+                # Names are interned at flush so no write transaction stays open meanwhile.
+                pending.add(
+                    table,
+                    [
+                        (repo, run_id, name, value, run_number, created_at)
+                        for name, value in named_values
+                    ],
+                )
+                return
+            # Repeated names (parameterized cases, several report files) keep the last
+            # value, as batches do; one statement cannot upsert a key twice on PostgreSQL.
+            values = dict(named_values)
+            metric_ids = self._resolve_metric_ids(backend, _METRIC_KINDS[table], list(values))
+            rows = [
+                (repo, run_id, metric_ids[name], value, run_number, created_at)
+                for name, value in values.items()
+            ]
+            self._upsert_timing_rows(backend, table, rows)
+            backend.commit()
+
+    def _timing_upsert_query(
+        self,
+        table: str,
+        *,
+        source: str | None = None,
+        partitioned: bool = False,
+    ) -> str:
+        """Upsert into a timing table from ``VALUES`` placeholders or a ``source`` table.
+
+        Unique keys on a partitioned table must include the ``created_at`` partition key.
+        """
+        value_column = _TIMING_VALUE_COLUMNS[table]
+        columns = ", ".join(_timing_columns(table))
+        if source is None:
+            placeholder = self._placeholder()
+            rows = f"VALUES ({', '.join([placeholder] * 6)})"
+        else:
+            rows = f"SELECT {columns} FROM {source}"
+        if self.backend_name == "sqlite":
+            return f"INSERT OR REPLACE INTO {table} ({columns}) {rows}"
+        conflict_columns = _TIMING_KEY_COLUMNS + (("created_at",) if partitioned else ())
+        return f"""
+            INSERT INTO {table} ({columns}) {rows}
+            ON CONFLICT ({", ".join(conflict_columns)}) DO UPDATE SET
+                {value_column} = EXCLUDED.{value_column},
+                run_number = EXCLUDED.run_number,
+                created_at = EXCLUDED.created_at
+        """
+
+    def _upsert_timing_rows(self, backend: Any, table: str, rows: list[tuple[Any, ...]]) -> None:
+        if table not in _ROLLUP_TABLES:
+            self._write_timing_rows(backend, table, rows)
+            return
+        repos = sorted({row[0] for row in rows})
+        if self._rollup_window is None:
+            self._write_timing_rows(backend, table, rows)
+            self._mark_rollups_stale(backend, repos)
+            return
+        # Lock first so the overwritten values read next cannot change under us.
+        rollups = self._lock_rollups(backend, rows)
+        self._start_rollup_state(backend, repos)
+        previous = self._select_stored_values(backend, table, rows)
+        self._write_timing_rows(backend, table, rows)
+        self._update_metric_rollups(backend, rows, previous, rollups)
+
+    def _start_rollup_state(self, backend: Any, repos: list[str]) -> None:
+        """Record whether each repo's rollups start out covering its raw history.
+
+        Only the first rollup-maintaining write for a repo inserts its state: the
+        rollups are in sync if no step/test rows were stored before them.
+        """
+        placeholder = self._placeholder()
+        history = " OR ".join(
+            f"EXISTS (SELECT 1 FROM {table} WHERE repo = {placeholder})" for table in _ROLLUP_TABLES
+        )
+        backend.executemany(
+            f"""
+            INSERT INTO {METRIC_ROLLUP_STATE_TABLE} (repo, in_sync)
+            SELECT {placeholder}, NOT ({history})
+            WHERE TRUE
+            ON CONFLICT (repo) DO NOTHING
+            """,
+            [(repo,) + (repo,) * len(_ROLLUP_TABLES) for repo in repos],
+        )
+
+    def _mark_rollups_stale(self, backend: Any, repos: list[str] | None = None) -> None:
+        """Flag rollups (of ``repos``, or all) as no longer covering raw history."""
+        placeholder = self._placeholder()
+        query = f"""
+            UPDATE {METRIC_ROLLUP_STATE_TABLE}
+            SET in_sync = {placeholder}
+            WHERE in_sync = {placeholder}
+        """
+        if repos is None:
+            backend.execute(query, (False, True))
+            return
+        backend.executemany(
+            f"{query} AND repo = {placeholder}", [(False, True, repo) for repo in repos]
+        )
+
+    def _write_timing_rows(self, backend: Any, table: str, rows: list[tuple[Any, ...]]) -> None:
+        partitioned = table in self._partitioned_timing_tables(backend)
+        if (
+            self.backend_name == "sqlite"
+            or self._copy_threshold_rows is None
+            or len(rows) < self._copy_threshold_rows
+        ):
+            backend.executemany(self._timing_upsert_query(table, partitioned=partitioned), rows)
+            return
+        # COPY streams rows in one round trip; the staging table lets the merge keep
+        # upsert semantics, which COPY into the target table could not.
+        staging = f"{table}_staging"
+        backend.execute(
+            f"""
+            CREATE TEMP TABLE IF NOT EXISTS {staging}
+                (LIKE {table} INCLUDING DEFAULTS)
+                ON COMMIT DELETE ROWS
+            """
+        )
+        backend.copy_rows(staging, _timing_columns(table), rows)
+        backend.execute(
+            self._timing_upsert_query(table, source=staging, partitioned=partitioned)
+        )
+
+    def _select_stored_values(
+        self,
+        backend: Any,
+        table: str,
+        rows: list[tuple[Any, ...]],
+    ) -> dict[tuple[str, int, int], float]:
+        """Values the upsert of ``rows`` will overwrite, by (repo, run_id, metric_id)."""
+        placeholder = self._placeholder()
+        value_column = _TIMING_VALUE_COLUMNS[table]
+        run_ids: dict[str, set[int]] = {}
+        for repo, run_id, *_rest in rows:
+            run_ids.setdefault(repo, set()).add(run_id)
+        stored = {}
+        for repo, repo_run_ids in run_ids.items():
+            ordered = sorted(repo_run_ids)
+            for start in range(0, len(ordered), _METRIC_ID_LOOKUP_CHUNK):
+                chunk = ordered[start : start + _METRIC_ID_LOOKUP_CHUNK]
+                for run_id, metric_id, value in backend.execute(
+                    f"""
+                    SELECT run_id, metric_id, {value_column} FROM {table}
+                    WHERE repo = {placeholder}
+                      AND run_id IN ({", ".join([placeholder] * len(chunk))})
+                    """,
+                    (repo, *chunk),
+                ):
+                    stored[(repo, run_id, metric_id)] = value
+        return stored
+
+    def _lock_rollups(
+        self,
+        backend: Any,
+        rows: list[tuple[Any, ...]],
+    ) -> dict[str, dict[int, MetricRollup]]:
+        """Lock and read the rollups ``rows`` will update, by repo and metric id.
+
+        Missing rollup rows are inserted empty first, so two writers saving the
+        first sample of a metric contend on one row instead of both finding none
+        and the later one overwriting the other. On SQLite the insert also takes
+        the database write lock before anything is read.
+        """
+        metric_ids: dict[str, set[int]] = {}
+        for repo, _run_id, metric_id, *_rest in rows:
+            metric_ids.setdefault(repo, set()).add(metric_id)
+        placeholder = self._placeholder()
+        empty = MetricRollup(name="")
+        backend.executemany(
+            f"""
+            INSERT INTO {METRIC_ROLLUPS_TABLE}
+                (repo, metric_id, recent, sample_count, value_sum, sketch)
+            VALUES ({", ".join([placeholder] * 6)})
+            ON CONFLICT (repo, metric_id) DO NOTHING
+            """,
+            [
+                (
+                    repo,
+                    metric_id,
+                    empty.recent_to_json(),
+                    empty.sample_count,
+                    empty.value_sum,
+                    empty.sketch.to_json(),
+                )
+                # A fixed order keeps concurrent writers from deadlocking on each other's rows.
+                for repo in sorted(metric_ids)
+                for metric_id in sorted(metric_ids[repo])
+            ],
+        )
+        return {
+            repo: self._select_rollups(backend, repo, sorted(repo_metric_ids))
+            for repo, repo_metric_ids in sorted(metric_ids.items())
+        }
+
+    def _select_rollups(
+        self,
+        backend: Any,
+        repo: str,
+        metric_ids: list[int],
+    ) -> dict[int, MetricRollup]:
+        placeholder = self._placeholder()
+        # Rows are locked so concurrent pooled writers do not lose each other's updates.
+        lock = "" if self.backend_name == "sqlite" else "FOR UPDATE"
+        rollups = {}
+        for start in range(0, len(metric_ids), _METRIC_ID_LOOKUP_CHUNK):
+            chunk = metric_ids[start : start + _METRIC_ID_LOOKUP_CHUNK]
+            for metric_id, recent, sample_count, value_sum, sketch in backend.execute(
+                f"""
+                SELECT metric_id, recent, sample_count, value_sum, sketch
+                FROM {METRIC_ROLLUPS_TABLE}
+                WHERE repo = {placeholder}
+                  AND metric_id IN ({", ".join([placeholder] * len(chunk))})
+                {lock}
+                """,
+                (repo, *chunk),
+            ):
+                rollups[metric_id] = MetricRollup(
+                    name="",
+                    recent=MetricRollup.recent_from_json(recent),
+                    sample_count=sample_count,
+                    value_sum=value_sum,
+                    sketch=QuantileSketch.from_json(sketch),
+                )
+        return rollups
+
+    def _update_metric_rollups(
+        self,
+        backend: Any,
+        rows: list[tuple[Any, ...]],
+        previous: dict[tuple[str, int, int], float],
+        locked: dict[str, dict[int, MetricRollup]],
+    ) -> None:
+        by_repo: dict[str, list[tuple[Any, ...]]] = {}
+        for row in rows:
+            by_repo.setdefault(row[0], []).append(row)
+        for repo, repo_rows in by_repo.items():
+            rollups = locked[repo]
+            for _repo, run_id, metric_id, value, run_number, _created_at in repo_rows:
+                rollup = rollups.get(metric_id)
+                if rollup is None:
+                    rollup = rollups[metric_id] = MetricRollup(name="")
+                key = (repo, run_id, metric_id)
+                rollup.record(
+                    run_number,
+                    value,
+                    previous=previous.get(key),
+                    capacity=self._rollup_window,
+                )
+                # A key written twice in one upsert ends up stored once, with the later value.
+                previous[key] = value
+            self._write_rollups(backend, repo, rollups)
+
+    def _write_rollups(self, backend: Any, repo: str, rollups: dict[int, MetricRollup]) -> None:
+        placeholder = self._placeholder()
+        columns = "repo, metric_id, recent, sample_count, value_sum, sketch"
+        values = f"VALUES ({', '.join([placeholder] * 6)})"
+        if self.backend_name == "sqlite":
+            query = f"INSERT OR REPLACE INTO {METRIC_ROLLUPS_TABLE} ({columns}) {values}"
+        else:
+            query = f"""
+                INSERT INTO {METRIC_ROLLUPS_TABLE} ({columns}) {values}
+                ON CONFLICT (repo, metric_id) DO UPDATE SET
+                    recent = EXCLUDED.recent,
+                    sample_count = EXCLUDED.sample_count,
+                    value_sum = EXCLUDED.value_sum,
+                    sketch = EXCLUDED.sketch
+            """
+        backend.executemany(
+            query,
+            [
+                (
+                    repo,
+                    metric_id,
+                    rollup.recent_to_json(),
+                    rollup.sample_count,
+                    rollup.value_sum,
+                    rollup.sketch.to_json(),
+                )
+                for metric_id, rollup in sorted(rollups.items())
+            ],
+        )
+
+    def list_metric_rollups(self, repo: str, kind: str) -> list[MetricRollup]:
+        """Rollups of ``kind`` (``METRIC_KIND_STEP``/``METRIC_KIND_TEST``) metrics, by name."""
+        if kind not in _ROLLUP_KINDS:
+            raise ValueError(f"Unknown metric kind: {kind}")
+        placeholder = self._placeholder()
+        with self._session() as backend:
+            rows = backend.execute(
+                f"""
+                SELECT names.name, rollups.recent, rollups.sample_count,
+                       rollups.value_sum, rollups.sketch
+                FROM {METRIC_ROLLUPS_TABLE} AS rollups
+                JOIN {METRIC_NAMES_TABLE} AS names
+                  ON names.metric_id = rollups.metric_id
+                WHERE rollups.repo = {placeholder}
+                  AND names.kind = {placeholder}
+                ORDER BY names.name
+                """,
+                (repo, kind),
+            )
+        return [
+            MetricRollup(
+                name=name,
+                recent=MetricRollup.recent_from_json(recent),
+                sample_count=sample_count,
+                value_sum=value_sum,
+                sketch=QuantileSketch.from_json(sketch),
+            )
+            for name, recent, sample_count, value_sum, sketch in rows
+        ]
+
+    def metric_rollups_in_sync(self, repo: str) -> bool:
+        """Whether ``repo``'s rollups cover every stored step/test sample.
+
+        ``False`` when rollups were enabled after samples were stored, another
+        writer saved samples without ``rollup_window``, or raw rows were pruned
+        or renumbered without a rebuild; rollup baselines would then be stale or
+        incomplete until ``rebuild_metric_rollups`` runs. Writers keep this flag
+        up to date, so the check is one primary-key read.
+        """
+        placeholder = self._placeholder()
+        with self._session() as backend:
+            rows = backend.execute(
+                f"SELECT in_sync FROM {METRIC_ROLLUP_STATE_TABLE} WHERE repo = {placeholder}",
+                (repo,),
+            )
+        return bool(rows and rows[0][0])
+
+    def rebuild_metric_rollups(self, repo: str) -> None:
+        """Recompute ``repo``'s rollups from raw history, e.g. after enabling them."""
+        if self._rollup_window is None:
+            raise RuntimeError("rollup_window is not configured")
+        with self._session() as backend:
+            try:
+                self._rebuild_rollups(backend, repo)
+                backend.commit()
+            except BaseException:
+                self._rollback(backend)
+                raise
+
+    def _rebuild_rollups(self, backend: Any, repo: str) -> None:
+        placeholder = self._placeholder()
+        backend.execute(f"DELETE FROM {METRIC_ROLLUPS_TABLE} WHERE repo = {placeholder}", (repo,))
+        backend.execute(
+            f"DELETE FROM {METRIC_ROLLUP_STATE_TABLE} WHERE repo = {placeholder}", (repo,)
+        )
+        backend.execute(
+            f"INSERT INTO {METRIC_ROLLUP_STATE_TABLE} (repo, in_sync) "
+            f"VALUES ({placeholder}, {placeholder})",
+            (repo, True),
+        )
+        for table in _ROLLUP_TABLES:
+            rollups: dict[int, MetricRollup] = {}
+            for metric_id, run_number, value in backend.execute(
+                f"""
+                SELECT metric_id, run_number, {_TIMING_VALUE_COLUMNS[table]}
+                FROM {table}
+                WHERE repo = {placeholder}
+                ORDER BY metric_id, run_number
+                """,
+                (repo,),
+            ):
+                rollup = rollups.get(metric_id)
+                if rollup is None:
+                    rollup = rollups[metric_id] = MetricRollup(name="")
+                rollup.record(run_number, value, previous=None, capacity=self._rollup_window)
+            self._write_rollups(backend, repo, rollups)
+
+    def _partitioned_timing_tables(self, backend: Any) -> frozenset[str]:
+        if self._partitioned_tables is None:
+            if self.backend_name == "sqlite":
+                self._partitioned_tables = frozenset()
+            else:
+                placeholder = self._placeholder()
+                rows = backend.execute(
+                    f"""
+                    SELECT relname FROM pg_class
+                    WHERE relkind = 'p'
+                      AND pg_table_is_visible(oid)
+                      AND relname IN ({", ".join([placeholder] * len(TIMING_TABLES))})
+                    """,
+                    TIMING_TABLES,
+                )
+                self._partitioned_tables = frozenset(row[0] for row in rows)
+        return self._partitioned_tables
+
+    def _timing_partitions(self, backend: Any, table: str) -> dict[str, tuple[str, str]]:
+        """Monthly partitions of ``table`` by name, with their ``created_at`` bounds."""
+        rows = backend.execute(
+            f"""
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class AS parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = {self._placeholder()}
+              AND pg_table_is_visible(parent.oid)
+            """,
+            (table,),
+        )
+        partitions = {}
+        for (name,) in rows:
+            match = _TIMING_PARTITION_NAME.match(name)
+            # The DEFAULT partition (and anything hand-made) has no monthly bounds.
+            if match is not None and match["table"] == table:
+                partitions[name] = _timing_partition_bounds(int(match["year"]), int(match["month"]))
+        return partitions
+
+    def ensure_timing_partitions(self, start: date, months: int) -> list[str]:
+        """Create missing monthly partitions for ``months`` months from ``start``'s month.
+
+        A no-op unless the timing tables are partitioned (PostgreSQL migration 0005).
+        Run it ahead of time: rows for a month without a partition land in the
+        ``<table>_default`` partition, and a month's partition cannot be created
+        while the default partition holds rows for it.
+        """
+        if months < 0:
+            raise ValueError("months must be >= 0")
+        created = []
+        with self._session() as backend:
+            try:
+                for table in sorted(self._partitioned_timing_tables(backend)):
+                    existing = self._timing_partitions(backend, table)
+                    year, month = start.year, start.month
+                    for _ in range(months):
+                        name = timing_partition_name(table, year, month)
+                        lower, upper = _timing_partition_bounds(year, month)
+                        if name not in existing:
+                            backend.execute(
+                                f"CREATE TABLE {name} PARTITION OF {table} "
+                                f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+                            )
+                            created.append(name)
+                        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+                backend.commit()
+            except BaseException:
+                self._rollback(backend)
+                raise
+        return created
+
+    def prune_timings(
+        self,
+        before: date,
+        *,
+        keep_every: int | None = None,
+    ) -> TimingRetentionResult:
+        """Drop or downsample timing rows of runs created before ``before``.
+
+        Without ``keep_every`` the rows are deleted; on partitioned tables, monthly
+        partitions ending on or before ``before`` are dropped whole first, so old
+        months go without row-by-row deletes or vacuum work. With ``keep_every``,
+        only rows whose ``run_number`` is a multiple of it are kept, thinning old
+        history to one run in ``keep_every``. ``workflow_runs`` is left untouched.
+
+        With ``rollup_window`` set, ``metric_rollups`` of every repo that has them
+        are rebuilt from the remaining rows in the same transaction. Otherwise
+        they are flagged out of sync, so analysis reads raw rows until
+        ``rebuild_metric_rollups`` runs.
+        """
+        if keep_every is not None and keep_every < 2:
+            raise ValueError("keep_every must be >= 2 when set")
+        horizon = before.isoformat()
+        placeholder = self._placeholder()
+        condition = f"created_at < {placeholder}"
+        params: tuple[Any, ...] = (horizon,)
+        if keep_every is not None:
+            condition += f" AND run_number % {placeholder} <> 0"
+            params += (keep_every,)
+        dropped = []
+        deleted_rows = 0
+        with self._session() as backend:
+            try:
+                partitioned = self._partitioned_timing_tables(backend)
+                for table in TIMING_TABLES:
+                    if keep_every is None and table in partitioned:
+                        partitions = self._timing_partitions(backend, table)
+                        for name, (_lower, upper) in sorted(partitions.items()):
+                            if upper <= horizon:
+                                backend.execute(f"DROP TABLE {name}")
+                                dropped.append(name)
+                    deleted_rows += backend.execute_rowcount(
+                        f"DELETE FROM {table} WHERE {condition}", params
+                    )
+                if (dropped or deleted_rows) and self._rollup_window is None:
+                    self._mark_rollups_stale(backend)
+                elif dropped or deleted_rows:
+                    for (repo,) in backend.execute(
+                        f"""
+                        SELECT repo FROM {METRIC_ROLLUPS_TABLE}
+                        UNION
+                        SELECT repo FROM {METRIC_ROLLUP_STATE_TABLE}
+                        ORDER BY repo
+                        """
+                    ):
+                        self._rebuild_rollups(backend, repo)
+                backend.commit()
+            except BaseException:
+                self._rollback(backend)
+                raise
+        return TimingRetentionResult(dropped_partitions=tuple(dropped), deleted_rows=deleted_rows)
+
+    def enqueue_job(self, job: AnalysisJob) -> int:
+        """Add ``job`` to the ``analysis_jobs`` queue; returns its job id.
+
+        If a job for the same (repo, pr_number) is still waiting to be claimed,
+        that row takes the new commit and branch instead, keeping its place in
+        the queue, and its ``coalesced`` count goes up by one.
+        """
+        placeholder = self._placeholder()
+        with self._session() as backend:
+            try:
+                self._lock_job_key(backend, job)
+                waiting = self._waiting_job(backend, job)
+                if waiting is not None:
+                    job_id = waiting[0]
+                    backend.execute_rowcount(
+                        f"""
+                        UPDATE {ANALYSIS_JOBS_TABLE}
+                        SET commit_sha = {placeholder},
+                            branch = {placeholder},
+                            coalesced = coalesced + 1
+                        WHERE job_id = {placeholder}
+                        """,
+                        (job.commit, job.branch, job_id),
+                    )
+                else:
+                    job_id = self._insert_job(backend, job)
+                backend.commit()
+            except BaseException:
+                self._rollback(backend)
+                raise
+        return job_id
+
+    def _lock_job_key(self, backend: Any, job: AnalysisJob) -> None:
+        """Serialize queue writers that may coalesce jobs for ``job``'s PR."""
+        if self.backend_name == "sqlite":
+            backend.execute("BEGIN IMMEDIATE")
+        else:
+            backend.execute(
+                "SELECT pg_advisory_xact_lock(hashtext(%s), %s::integer)",
+                (job.repo, job.pr_number),
+            )
+
+    def _waiting_job(
+        self,
+        backend: Any,
+        job: AnalysisJob,
+        *,
+        exclude_job_id: int | None = None,
+    ) -> tuple[Any, ...] | None:
+        placeholder = self._placeholder()
+        params: tuple[Any, ...] = (job.repo, job.pr_number)
+        excluded = ""
+        if exclude_job_id is not None:
+            excluded = f"AND job_id <> {placeholder}"
+            params += (exclude_job_id,)
+        rows = backend.execute(
+            f"""
+            SELECT job_id, commit_sha, branch, coalesced
+            FROM {ANALYSIS_JOBS_TABLE}
+            WHERE repo = {placeholder}
+              AND pr_number = {placeholder}
+              AND lease_token IS NULL
+              {excluded}
+            ORDER BY job_id
+            LIMIT 1
+            """,
+            params,
+        )
+        return rows[0] if rows else None
+
+    def _insert_job(self, backend: Any, job: AnalysisJob) -> int:
+        placeholder = self._placeholder()
+        values = ", ".join([placeholder] * 5)
+        columns = "repo, pr_number, commit_sha, branch, visible_at"
+        params = (job.repo, job.pr_number, job.commit, job.branch, time.time())
+        if self.backend_name == "sqlite":
+            backend.execute(
+                f"INSERT INTO {ANALYSIS_JOBS_TABLE} ({columns}) VALUES ({values})", params
+            )
+            [(job_id,)] = backend.execute("SELECT last_insert_rowid()")
+            return job_id
+        [(job_id,)] = backend.execute(
+            f"""
+            INSERT INTO {ANALYSIS_JOBS_TABLE} ({columns}) VALUES ({values})
+            RETURNING job_id
+            """,
+            params,
+        )
+        return job_id
+
+    def claim_jobs(
+        self,
+        limit: int,
+        *,
+        visibility_timeout_seconds: float = DEFAULT_JOB_VISIBILITY_TIMEOUT_SECONDS,
+    ) -> list[ClaimedJob]:
+        """Lease up to ``limit`` visible jobs, oldest first.
+
+        Claimed jobs stay invisible to other workers for ``visibility_timeout_seconds``;
+        a job that is neither acked nor released by then is handed out again.
+        PostgreSQL claims with ``FOR UPDATE SKIP LOCKED`` so concurrent workers take
+        disjoint jobs without waiting on each other; SQLite claims inside
+        ``BEGIN IMMEDIATE``, which serializes claimers across processes.
+        """
+        if limit < 1:
+            raise ValueError("limit must be >= 1")
+        if visibility_timeout_seconds < 0:
+            raise ValueError("visibility_timeout_seconds must be >= 0")
+        placeholder = self._placeholder()
+        lease_token = uuid.uuid4().hex
+        now = time.time()
+        lease = (now + visibility_timeout_seconds, lease_token)
+        with self._session() as backend:
+            try:
+                if self.backend_name == "sqlite":
+                    backend.execute("BEGIN IMMEDIATE")
+                    rows = backend.execute(
+                        f"""
+                        SELECT job_id, repo, pr_number, commit_sha, branch, attempts, coalesced
+                        FROM {ANALYSIS_JOBS_TABLE}
+                        WHERE visible_at <= ?
+                        ORDER BY visible_at, job_id
+                        LIMIT ?
+                        """,
+                        (now, limit),
+                    )
+                    backend.executemany(
+                        f"""
+                        UPDATE {ANALYSIS_JOBS_TABLE}
+                        SET visible_at = ?, lease_token = ?, attempts = attempts + 1
+                        WHERE job_id = ?
+                        """,
+                        [(*lease, row[0]) for row in rows],
+                    )
+                    rows = [(*row[:5], row[5] + 1, row[6]) for row in rows]
+                else:
+                    rows = backend.execute(
+                        f"""
+                        UPDATE {ANALYSIS_JOBS_TABLE} AS jobs
+                        SET visible_at = {placeholder},
+                            lease_token = {placeholder},
+                            attempts = jobs.attempts + 1
+                        FROM (
+                            SELECT job_id FROM {ANALYSIS_JOBS_TABLE}
+                            WHERE visible_at <= {placeholder}
+                            ORDER BY visible_at, job_id
+                            LIMIT {placeholder}
+                            FOR UPDATE SKIP LOCKED
+                        ) AS visible
+                        WHERE jobs.job_id = visible.job_id
+                        RETURNING jobs.job_id, jobs.repo, jobs.pr_number, jobs.commit_sha,
+                                  jobs.branch, jobs.attempts, jobs.coalesced
+                        """,
+                        (*lease, now, limit),
+                    )
+                backend.commit()
+            except BaseException:
+                self._rollback(backend)
+                raise
+        return sorted(
+            (
+                ClaimedJob(
+                    job_id=job_id,
+                    lease_token=lease_token,
+                    attempts=attempts,
+                    job=AnalysisJob(repo=repo, pr_number=pr_number, commit=commit, branch=branch),
+                    coalesced=coalesced,
+                )
+                for job_id, repo, pr_number, commit, branch, attempts, coalesced in rows
+            ),
+            key=lambda claimed: claimed.job_id,
+        )
+
+    def ack_job(self, claimed: ClaimedJob) -> bool:
+        """Delete a finished job; ``False`` if its lease was lost to another worker."""
+        placeholder = self._placeholder()
+        return self._update_claimed_job(
+            f"""
+            DELETE FROM {ANALYSIS_JOBS_TABLE}
+            WHERE job_id = {placeholder} AND lease_token = {placeholder}
+            """,
+            (claimed.job_id, claimed.lease_token),
+        )
+
+    def release_job(self, claimed: ClaimedJob, *, delay_seconds: float = 0.0) -> bool:
+        """Return a claimed job to the queue, visible again after ``delay_seconds``.
+
+        A newer job for the same PR enqueued meanwhile is folded into the
+        released row, which keeps its earlier place in the queue.
+        """
+        if delay_seconds < 0:
+            raise ValueError("delay_seconds must be >= 0")
+        placeholder = self._placeholder()
+        with self._session() as backend:
+            try:
+                self._lock_job_key(backend, claimed.job)
+                waiting = self._waiting_job(backend, claimed.job, exclude_job_id=claimed.job_id)
+                if waiting is None:
+                    commit, branch, coalesced = claimed.job.commit, claimed.job.branch, 0
+                else:
+                    _waiting_id, commit, branch, waiting_coalesced = waiting
+                    coalesced = waiting_coalesced + 1
+                updated = backend.execute_rowcount(
+                    f"""
+                    UPDATE {ANALYSIS_JOBS_TABLE}
+                    SET visible_at = {placeholder},
+                        lease_token = NULL,
+                        commit_sha = {placeholder},
+                        branch = {placeholder},
+                        coalesced = coalesced + {placeholder}
+                    WHERE job_id = {placeholder} AND lease_token = {placeholder}
+                    """,
+                    (
+                        time.time() + delay_seconds,
+                        commit,
+                        branch,
+                        coalesced,
+                        claimed.job_id,
+                        claimed.lease_token,
+                    ),
+                )
+                if updated and waiting is not None:
+                    backend.execute_rowcount(
+                        f"DELETE FROM {ANALYSIS_JOBS_TABLE} WHERE job_id = {placeholder}",
+                        (waiting[0],),
+                    )
+                backend.commit()
+            except BaseException:
+                self._rollback(backend)
+                raise
+        return updated > 0
+
+    def _update_claimed_job(self, query: str, params: tuple[Any, ...]) -> bool:
+        with self._session() as backend:
+            try:
+                updated = backend.execute_rowcount(query, params)
+                backend.commit()
+            except BaseException:
+                self._rollback(backend)
+                raise
+        return updated > 0
+
+    def count_queued_jobs(self) -> int:
+        """Jobs in the queue, claimed or not."""
+        with self._session() as backend:
+            [(count,)] = backend.execute(f"SELECT COUNT(*) FROM {ANALYSIS_JOBS_TABLE}")
+        return count
 
     def list_workflow_runs(self, repo: str) -> List[WorkflowRun]:
         placeholder = self._placeholder()
-        with self._lock:
-            rows = self._backend.execute(
+        with self._session() as backend:
+            rows = backend.execute(
                 f"""
                 SELECT
                     run_id,
@@ -309,211 +1856,347 @@ class Storage:
             for row in rows
         ]
 
-    def save_step_durations(
+    def get_workflow_run_sync_state(
         self,
         repo: str,
-        run_id: int,
-        durations: Iterable[StepDuration],
-    ) -> None:
+        *,
+        rerun_lookback: timedelta = DEFAULT_RERUN_LOOKBACK,
+        pending_cursor_limit: timedelta = DEFAULT_PENDING_CURSOR_LIMIT,
+    ) -> WorkflowRunSyncState:
         placeholder = self._placeholder()
-        values = [
-            (
-                repo,
-                run_id,
-                duration.name,
-                duration.duration_seconds,
+        with self._session() as backend:
+            newest_rows = backend.execute(
+                f"""
+                SELECT MAX(created_at), MAX(run_id)
+                FROM {WORKFLOW_RUNS_TABLE}
+                WHERE repo = {placeholder}
+                """,
+                (repo,),
             )
-            for duration in durations
+            pending_rows = backend.execute(
+                f"""
+                SELECT run_id, created_at
+                FROM {WORKFLOW_RUNS_TABLE}
+                WHERE repo = {placeholder}
+                  AND (status IS NULL OR status <> {placeholder})
+                ORDER BY created_at
+                """,
+                (repo, RUN_STATUS_COMPLETED),
+            )
+
+        newest_created_at, newest_run_id = newest_rows[0] if newest_rows else (None, None)
+        if newest_created_at is None:
+            return WorkflowRunSyncState(created_since=None, newest_completed_run_id=None)
+        newest = parse_iso_datetime(newest_created_at)
+        pending_cutoff = newest - pending_cursor_limit
+        stale_pending = tuple(
+            run_id
+            for run_id, created_at in pending_rows
+            if parse_iso_datetime(created_at) < pending_cutoff
+        )
+        recent_pending = [
+            created_at
+            for _run_id, created_at in pending_rows
+            if parse_iso_datetime(created_at) >= pending_cutoff
         ]
-        with self._lock:
-            if self.backend_name == "sqlite":
-                query = f"""
-                    INSERT OR REPLACE INTO {STEP_DURATIONS_TABLE} (
-                        repo,
-                        run_id,
-                        step_name,
-                        duration_seconds
-                    ) VALUES ({placeholder}, {placeholder}, {placeholder}, {placeholder})
-                """
-            else:
-                query = f"""
-                    INSERT INTO {STEP_DURATIONS_TABLE} (
-                        repo,
-                        run_id,
-                        step_name,
-                        duration_seconds
-                    ) VALUES ({placeholder}, {placeholder}, {placeholder}, {placeholder})
-                    ON CONFLICT (repo, run_id, step_name) DO UPDATE SET
-                        duration_seconds = EXCLUDED.duration_seconds
-                """
-            self._backend.executemany(query, values)
-            self._backend.commit()
+        created_since = newest_created_at
+        if rerun_lookback:
+            created_since = format_iso_datetime(newest - rerun_lookback)
+        if recent_pending and parse_iso_datetime(recent_pending[0]) < parse_iso_datetime(
+            created_since
+        ):
+            created_since = recent_pending[0]
+        return WorkflowRunSyncState(
+            created_since=created_since,
+            newest_completed_run_id=(
+                newest_run_id if not rerun_lookback and not pending_rows else None
+            ),
+            pending_run_ids=stale_pending,
+        )
 
-    def list_step_durations(self, repo: str) -> List[StepDurationSample]:
+    def get_stored_timing_run_ids(
+        self,
+        repo: str,
+        run_ids: Iterable[int],
+    ) -> StoredTimingRunIds:
+        """Return which of ``run_ids`` already have step, test, and outcome rows.
+
+        Runs recorded by ``save_empty_timing_fetches`` for a table count as stored
+        for it once the fetch has come back empty ``empty_timing_fetch_attempts``
+        times, so a run without logs or test reports is not downloaded forever while
+        a transiently empty response is still retried. Runs
+        re-run since their timings were stored count as missing until
+        ``clear_outdated_timing_fetches`` is called for them.
+        """
+        run_ids = list(dict.fromkeys(run_ids))
         placeholder = self._placeholder()
-        with self._lock:
-            rows = self._backend.execute(
+        found: dict[str, set[int]] = {table: set() for table in TIMING_TABLES}
+        outdated: set[tuple[int, str]] = set()
+        with self._session() as backend:
+            for start in range(0, len(run_ids), _METRIC_ID_LOOKUP_CHUNK):
+                chunk = run_ids[start : start + _METRIC_ID_LOOKUP_CHUNK]
+                run_id_placeholders = ", ".join([placeholder] * len(chunk))
+                for table in TIMING_TABLES:
+                    rows = backend.execute(
+                        f"""
+                        SELECT DISTINCT run_id
+                        FROM {table}
+                        WHERE repo = {placeholder}
+                          AND run_id IN ({run_id_placeholders})
+                        UNION
+                        SELECT run_id
+                        FROM {EMPTY_TIMING_FETCHES_TABLE}
+                        WHERE repo = {placeholder}
+                          AND timing_table = {placeholder}
+                          AND empty_fetches >= {placeholder}
+                          AND run_id IN ({run_id_placeholders})
+                        """,
+                        (repo, *chunk, repo, table, self._empty_fetch_attempts, *chunk),
+                    )
+                    found[table].update(row[0] for row in rows)
+                outdated.update(
+                    (run_id, table)
+                    for run_id, table in backend.execute(
+                        f"""
+                        SELECT run_id, timing_table
+                        FROM {OUTDATED_TIMING_FETCHES_TABLE}
+                        WHERE repo = {placeholder}
+                          AND run_id IN ({run_id_placeholders})
+                        """,
+                        (repo, *chunk),
+                    )
+                )
+        for run_id, table in outdated:
+            found[table].discard(run_id)
+        return StoredTimingRunIds(
+            step_run_ids=frozenset(found[STEP_DURATIONS_TABLE]),
+            test_run_ids=frozenset(found[TEST_DURATIONS_TABLE]),
+            outcome_run_ids=frozenset(found[TEST_OUTCOMES_TABLE]),
+            outdated_fetches=frozenset(outdated),
+        )
+
+    def clear_outdated_timing_fetches(
+        self,
+        repo: str,
+        fetches: Iterable[tuple[int, str]],
+    ) -> None:
+        """Mark re-run runs' ``(run_id, timing_table)`` timings current once re-fetched."""
+        rows = [(repo, run_id, table) for run_id, table in dict.fromkeys(fetches)]
+        if not rows:
+            return
+        placeholder = self._placeholder()
+        with self._session() as backend:
+            backend.executemany(
                 f"""
-                SELECT
-                    runs.run_number,
-                    steps.step_name,
-                    steps.duration_seconds
-                FROM {STEP_DURATIONS_TABLE} AS steps
-                JOIN {WORKFLOW_RUNS_TABLE} AS runs
-                  ON runs.repo = steps.repo
-                 AND runs.run_id = steps.run_id
-                WHERE steps.repo = {placeholder}
-                ORDER BY runs.run_number, steps.step_name
+                DELETE FROM {OUTDATED_TIMING_FETCHES_TABLE}
+                WHERE repo = {placeholder}
+                  AND run_id = {placeholder}
+                  AND timing_table = {placeholder}
                 """,
-                (repo,),
+                rows,
+            )
+            backend.commit()
+
+    def save_empty_timing_fetches(
+        self,
+        repo: str,
+        fetches: Iterable[tuple[int, str]],
+    ) -> None:
+        """Record ``(run_id, timing_table)`` fetches that succeeded but returned no rows.
+
+        Each call counts once per fetch; see ``get_stored_timing_run_ids``.
+        """
+        rows = [(repo, run_id, table) for run_id, table in dict.fromkeys(fetches)]
+        if not rows:
+            return
+        placeholder = self._placeholder()
+        with self._session() as backend:
+            backend.executemany(
+                f"""
+                INSERT INTO {EMPTY_TIMING_FETCHES_TABLE} (repo, run_id, timing_table)
+                VALUES ({placeholder}, {placeholder}, {placeholder})
+                ON CONFLICT (repo, run_id, timing_table) DO UPDATE SET
+                    empty_fetches = {EMPTY_TIMING_FETCHES_TABLE}.empty_fetches + 1
+                """,
+                rows,
             )
+            backend.commit()
+
+    def save_step_durations(
+        self,
+        repo: str,
+        run_id: int,
+        durations: Iterable[StepDuration],
+    ) -> None:
+        self._save_timing_rows(
+            STEP_DURATIONS_TABLE,
+            repo,
+            run_id,
+            [(duration.name, duration.duration_seconds) for duration in durations],
+        )
 
+    def list_step_durations(
+        self,
+        repo: str,
+        *,
+        last_n: int | None = None,
+    ) -> List[StepDurationSample]:
         return [
             StepDurationSample(
                 run_number=row[0],
                 step_name=row[1],
                 duration_seconds=row[2],
             )
-            for row in rows
+            for row in self._select_step_duration_rows(repo, last_n)
         ]
 
+    def load_step_duration_history(self, repo: str, *, last_n: int | None = None) -> DurationHistory:
+        return DurationHistory.from_rows(self._select_step_duration_rows(repo, last_n))
+
+    def _select_step_duration_rows(self, repo: str, last_n: int | None) -> list[tuple[Any, ...]]:
+        return self._select_metric_rows(
+            STEP_DURATIONS_TABLE,
+            value_column="duration_seconds",
+            repo=repo,
+            last_n=last_n,
+        )
+
     def save_test_durations(
         self,
         repo: str,
         run_id: int,
         durations: Iterable[TestDuration],
     ) -> None:
-        placeholder = self._placeholder()
-        values = [
-            (
-                repo,
-                run_id,
-                duration.name,
-                duration.duration_seconds,
-            )
-            for duration in durations
-        ]
-        with self._lock:
-            if self.backend_name == "sqlite":
-                query = f"""
-                    INSERT OR REPLACE INTO {TEST_DURATIONS_TABLE} (
-                        repo,
-                        run_id,
-                        test_name,
-                        duration_seconds
-                    ) VALUES ({placeholder}, {placeholder}, {placeholder}, {placeholder})
-                """
-            else:
-                query = f"""
-                    INSERT INTO {TEST_DURATIONS_TABLE} (
-                        repo,
-                        run_id,
-                        test_name,
-                        duration_seconds
-                    ) VALUES ({placeholder}, {placeholder}, {placeholder}, {placeholder})
-                    ON CONFLICT (repo, run_id, test_name) DO UPDATE SET
-                        duration_seconds = EXCLUDED.duration_seconds
-                """
-            self._backend.executemany(query, values)
-            self._backend.commit()
-
-    def list_test_durations(self, repo: str) -> List[TestDurationSample]:
-        placeholder = self._placeholder()
-        with self._lock:
-            rows = self._backend.execute(
-                f"""
-                SELECT
-                    runs.run_number,
-                    tests.test_name,
-                    tests.duration_seconds
-                FROM {TEST_DURATIONS_TABLE} AS tests
-                JOIN {WORKFLOW_RUNS_TABLE} AS runs
-                  ON runs.repo = tests.repo
-                 AND runs.run_id = tests.run_id
-                WHERE tests.repo = {placeholder}
-                ORDER BY runs.run_number, tests.test_name
-                """,
-                (repo,),
-            )
+        self._save_timing_rows(
+            TEST_DURATIONS_TABLE,
+            repo,
+            run_id,
+            [(duration.name, duration.duration_seconds) for duration in durations],
+        )
 
+    def list_test_durations(
+        self,
+        repo: str,
+        *,
+        last_n: int | None = None,
+    ) -> List[TestDurationSample]:
         return [
             TestDurationSample(
                 run_number=row[0],
                 test_name=row[1],
                 duration_seconds=row[2],
             )
-            for row in rows
+            for row in self._select_test_duration_rows(repo, last_n)
         ]
 
+    def load_test_duration_history(self, repo: str, *, last_n: int | None = None) -> DurationHistory:
+        return DurationHistory.from_rows(self._select_test_duration_rows(repo, last_n))
+
+    def _select_test_duration_rows(self, repo: str, last_n: int | None) -> list[tuple[Any, ...]]:
+        return self._select_metric_rows(
+            TEST_DURATIONS_TABLE,
+            value_column="duration_seconds",
+            repo=repo,
+            last_n=last_n,
+        )
+
     def save_test_outcomes(
         self,
         repo: str,
         run_id: int,
         outcomes: Iterable[TestOutcome],
     ) -> None:
-        placeholder = self._placeholder()
-        values = [
-            (
-                repo,
-                run_id,
-                outcome.name,
-                outcome.outcome,
-            )
-            for outcome in outcomes
-        ]
-        with self._lock:
-            if self.backend_name == "sqlite":
-                query = f"""
-                    INSERT OR REPLACE INTO {TEST_OUTCOMES_TABLE} (
-                        repo,
-                        run_id,
-                        test_name,
-                        outcome
-                    ) VALUES ({placeholder}, {placeholder}, {placeholder}, {placeholder})
-                """
-            else:
-                query = f"""
-                    INSERT INTO {TEST_OUTCOMES_TABLE} (
-                        repo,
-                        run_id,
-                        test_name,
-                        outcome
-                    ) VALUES ({placeholder}, {placeholder}, {placeholder}, {placeholder})
-                    ON CONFLICT (repo, run_id, test_name) DO UPDATE SET
-                        outcome = EXCLUDED.outcome
-                """
-            self._backend.executemany(query, values)
-            self._backend.commit()
-
-    def list_test_outcomes(self, repo: str) -> List[TestOutcomeSample]:
-        placeholder = self._placeholder()
-        with self._lock:
-            rows = self._backend.execute(
-                f"""
-                SELECT
-                    runs.run_number,
-                    outcomes.test_name,
-                    outcomes.outcome
-                FROM {TEST_OUTCOMES_TABLE} AS outcomes
-                JOIN {WORKFLOW_RUNS_TABLE} AS runs
-                  ON runs.repo = outcomes.repo
-                 AND runs.run_id = outcomes.run_id
-                WHERE outcomes.repo = {placeholder}
-                ORDER BY runs.run_number, outcomes.test_name
-                """,
-                (repo,),
-            )
+        self._save_timing_rows(
+            TEST_OUTCOMES_TABLE,
+            repo,
+            run_id,
+            [(outcome.name, outcome.outcome) for outcome in outcomes],
+        )
 
+    def list_test_outcomes(
+        self,
+        repo: str,
+        *,
+        last_n: int | None = None,
+    ) -> List[TestOutcomeSample]:
         return [
             TestOutcomeSample(
                 run_number=row[0],
                 test_name=row[1],
                 outcome=row[2],
             )
-            for row in rows
+            for row in self._select_test_outcome_rows(repo, last_n)
         ]
 
+    def load_test_outcome_history(self, repo: str, *, last_n: int | None = None) -> OutcomeHistory:
+        return OutcomeHistory.from_rows(self._select_test_outcome_rows(repo, last_n))
+
+    def _select_test_outcome_rows(self, repo: str, last_n: int | None) -> list[tuple[Any, ...]]:
+        return self._select_metric_rows(
+            TEST_OUTCOMES_TABLE,
+            value_column="outcome",
+            repo=repo,
+            last_n=last_n,
+        )
+
+    def _select_metric_rows(
+        self,
+        table: str,
+        *,
+        value_column: str,
+        repo: str,
+        last_n: int | None,
+    ) -> list[tuple[Any, ...]]:
+        """Select ``(run_number, name, value)`` rows ordered by run number, then name.
+
+        Timing rows carry their run's ``run_number`` and an interned ``metric_id``,
+        so filtering and windowing scan one table; ``metric_names`` is joined only
+        to label the surviving rows. With ``last_n`` the database keeps only each
+        metric's ``last_n`` most recent runs (by run number) via ``ROW_NUMBER()``,
+        so old history never leaves it.
+        """
+        if last_n is not None and last_n < 1:
+            raise ValueError("last_n must be >= 1 when set")
+        placeholder = self._placeholder()
+        if last_n is None:
+            metrics = f"""
+                SELECT run_number, metric_id, {value_column} AS metric_value
+                FROM {table}
+                WHERE repo = {placeholder}
+            """
+            params: tuple[Any, ...] = (repo,)
+        else:
+            metrics = f"""
+                SELECT run_number, metric_id, metric_value
+                FROM (
+                    SELECT
+                        run_number,
+                        metric_id,
+                        {value_column} AS metric_value,
+                        ROW_NUMBER() OVER (
+                            PARTITION BY metric_id
+                            ORDER BY run_number DESC
+                        ) AS recency
+                    FROM {table}
+                    WHERE repo = {placeholder}
+                ) AS ranked
+                WHERE recency <= {placeholder}
+            """
+            params = (repo, last_n)
+        query = f"""
+            SELECT metrics.run_number, names.name, metrics.metric_value
+            FROM ({metrics}) AS metrics
+            JOIN {METRIC_NAMES_TABLE} AS names
+              ON names.metric_id = metrics.metric_id
+            ORDER BY metrics.run_number, names.name
+        """
+        with self._session() as backend:
+            return backend.execute(query, params)
+
     def close(self) -> None:
+        if getattr(self._backend, "session", None) is not None:
+            self._backend.close()
+            return
         with self._lock:
             self._backend.close()
 
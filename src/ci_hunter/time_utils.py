@@ -10,3 +10,8 @@ def parse_iso_datetime(value: str) -> datetime:
     if parsed.tzinfo is None:
         return parsed.replace(tzinfo=timezone.utc)
     return parsed
+
+
+def format_iso_datetime(value: datetime) -> str:
+    """Format as GitHub does, e.g. ``2024-01-01T00:00:00Z``."""
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -7,7 +7,9 @@ from typing import TextIO
 
 from ci_hunter.github.webhook_queue import enqueue_webhook_event
 from ci_hunter.job_queue_file import append_job
+from ci_hunter.job_queue_log import DEFAULT_FSYNC_POLICY, FSYNC_POLICIES, JobLog
 from ci_hunter.queue import InMemoryJobQueue
+from ci_hunter.storage import Storage, StorageConfig
 from ci_hunter.webhook_httpd_httpserver import serve_http
 
 DEFAULT_HOST = "127.0.0.1"
@@ -22,7 +24,11 @@ DEFAULT_MAX_BODY_BYTES = 1024 * 1024
 
 def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="ci-hunter-webhook-listener")
-    parser.add_argument("--queue-file", required=True)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--queue-file")
+    source.add_argument("--queue-db")
+    source.add_argument("--queue-log")
+    parser.add_argument("--queue-log-fsync", choices=FSYNC_POLICIES, default=DEFAULT_FSYNC_POLICY)
     parser.add_argument("--host", default=os.environ.get(ENV_HOST, DEFAULT_HOST))
     parser.add_argument("--port", type=_port_value, default=_default_port())
     parser.add_argument("--once", action="store_true")
@@ -37,6 +43,8 @@ def main(
 ) -> int:
     args = _build_parser().parse_args(argv)
     out = out or os.sys.stdout
+    storage = Storage(StorageConfig(database_url=args.queue_db)) if args.queue_db else None
+    log = JobLog(args.queue_log, fsync=args.queue_log_fsync) if args.queue_log else None
 
     def enqueue_handler(event: str, payload: dict[str, object]) -> bool:
         queue = InMemoryJobQueue()
@@ -50,18 +58,28 @@ def main(
         job = queue.dequeue()
         if job is None:
             return False
-        append_job(args.queue_file, job)
+        if storage is not None:
+            storage.enqueue_job(job)
+        elif log is not None:
+            log.append_job(job)
+        else:
+            append_job(args.queue_file, job)
         return True
 
-    server = server_factory(
-        host=args.host,
-        port=args.port,
-        enqueue_handler=enqueue_handler,
-        log_fn=lambda message: out.write(f"{message}\n"),
-        shared_secret=os.environ.get(ENV_SECRET),
-        auth_token=os.environ.get(ENV_AUTH_TOKEN),
-        max_body_bytes=_default_max_body_bytes(),
-    )
+    try:
+        server = server_factory(
+            host=args.host,
+            port=args.port,
+            enqueue_handler=enqueue_handler,
+            log_fn=lambda message: out.write(f"{message}\n"),
+            shared_secret=os.environ.get(ENV_SECRET),
+            auth_token=os.environ.get(ENV_AUTH_TOKEN),
+            max_body_bytes=_default_max_body_bytes(),
+        )
+    except BaseException:
+        if storage is not None:
+            storage.close()
+        raise
     host, port = server.server_address
     out.write(f"listening on {host}:{port}\n")
     try:
@@ -73,6 +91,8 @@ def main(
         out.write("shutting down\n")
     finally:
         server.server_close()
+        if storage is not None:
+            storage.close()
     return 0
 
 
@@ -1,25 +1,68 @@
 from __future__ import annotations
 
 import argparse
-import json
+import functools
 import os
 import time
 from collections.abc import Callable
 from pathlib import Path
-from typing import Iterable, TextIO
+from typing import TextIO, TypeVar
 
 from ci_hunter.cli import main as cli_main
-from ci_hunter.file_lock import locked_file
+from ci_hunter.job_queue_file import (
+    FileClaim,
+    ack_job,
+    claim_jobs,
+    pending_job_count,
+    requeue_jobs,
+)
+from ci_hunter.job_queue_log import (
+    DEFAULT_CONSUMER_GROUP,
+    DEFAULT_FSYNC_POLICY,
+    FSYNC_POLICIES,
+    JobLog,
+)
 from ci_hunter.queue import AnalysisJob
+from ci_hunter.storage import (
+    DEFAULT_JOB_VISIBILITY_TIMEOUT_SECONDS,
+    ClaimedJob,
+    Storage,
+    StorageConfig,
+)
+from ci_hunter.worker_pool import (
+    DEFAULT_MAX_RESTARTS,
+    DEFAULT_SHUTDOWN_TIMEOUT_SECONDS,
+    WorkerContext,
+    run_worker_pool,
+)
+
+_Claim = TypeVar("_Claim", FileClaim, ClaimedJob)
 
 
 def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="ci-hunter-worker")
-    parser.add_argument("--queue-file", required=True)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--queue-file")
+    source.add_argument("--queue-db")
+    source.add_argument("--queue-log")
     parser.add_argument("--max-jobs", type=_positive_int, default=1)
     parser.add_argument("--loop", action="store_true")
     parser.add_argument("--max-loops", type=_positive_int, default=1)
     parser.add_argument("--sleep-seconds", type=_positive_float, default=1.0)
+    parser.add_argument(
+        "--visibility-timeout-seconds",
+        type=_visibility_timeout,
+        default=DEFAULT_JOB_VISIBILITY_TIMEOUT_SECONDS,
+    )
+    parser.add_argument("--consumer-group", default=DEFAULT_CONSUMER_GROUP)
+    parser.add_argument("--queue-log-fsync", choices=FSYNC_POLICIES, default=DEFAULT_FSYNC_POLICY)
+    parser.add_argument("--concurrency", type=_concurrency, default=1)
+    parser.add_argument("--max-restarts", type=_max_restarts, default=DEFAULT_MAX_RESTARTS)
+    parser.add_argument(
+        "--shutdown-timeout-seconds",
+        type=_shutdown_timeout,
+        default=DEFAULT_SHUTDOWN_TIMEOUT_SECONDS,
+    )
     return parser
 
 
@@ -32,20 +75,96 @@ def main(
 ) -> int:
     args = _build_parser().parse_args(argv)
     out = out or os.sys.stdout
-    path = Path(args.queue_file)
-    loops = args.max_loops if args.loop else 1
-    exit_code = 0
-    for index in range(loops):
-        exit_code, remaining = _process_once(
-            path,
-            max_jobs=args.max_jobs,
-            cli_entry=cli_entry,
+    if args.concurrency > 1:
+        return run_worker_pool(
+            args.concurrency,
+            functools.partial(_run_pool_worker, args, cli_entry),
             out=out,
+            max_restarts=args.max_restarts,
+            shutdown_timeout_seconds=args.shutdown_timeout_seconds,
         )
-        if exit_code != 0:
-            break
-        if index < loops - 1 and remaining == 0:
-            sleep(args.sleep_seconds)
+    return _run_worker(args, cli_entry=cli_entry, out=out, sleep=sleep)
+
+
+def _run_pool_worker(
+    args: argparse.Namespace,
+    cli_entry: Callable[[list[str]], int],
+    context: WorkerContext,
+) -> int:
+    # Module-level, so platforms that spawn pool children can pickle it.
+    return _run_worker(
+        args,
+        cli_entry=cli_entry,
+        out=context.out,
+        sleep=context.sleep,
+        context=context,
+    )
+
+
+def _run_worker(
+    args: argparse.Namespace,
+    *,
+    cli_entry: Callable[[list[str]], int],
+    out: TextIO,
+    sleep: Callable[[float], None],
+    context: WorkerContext | None = None,
+) -> int:
+    """One worker's claim loop; pool children each run their own, with their own connections."""
+    storage: Storage | None = None
+    if args.queue_db:
+        storage = Storage(StorageConfig(database_url=args.queue_db))
+
+        def process() -> tuple[int, int]:
+            return _process_db_once(
+                storage,
+                max_jobs=args.max_jobs,
+                visibility_timeout_seconds=args.visibility_timeout_seconds,
+                cli_entry=cli_entry,
+                out=out,
+                context=context,
+            )
+
+    elif args.queue_log:
+        log = JobLog(args.queue_log, fsync=args.queue_log_fsync)
+
+        def process() -> tuple[int, int]:
+            return _process_log_once(
+                log,
+                group=args.consumer_group,
+                max_jobs=args.max_jobs,
+                visibility_timeout_seconds=args.visibility_timeout_seconds,
+                cli_entry=cli_entry,
+                out=out,
+                context=context,
+            )
+
+    else:
+        path = Path(args.queue_file)
+
+        def process() -> tuple[int, int]:
+            return _process_once(
+                path,
+                max_jobs=args.max_jobs,
+                visibility_timeout_seconds=args.visibility_timeout_seconds,
+                cli_entry=cli_entry,
+                out=out,
+                context=context,
+            )
+
+    loops = args.max_loops if args.loop else 1
+    exit_code = 0
+    try:
+        for index in range(loops):
+            if context is not None and context.stop_requested():
+                break
+            exit_code, remaining = process()
+            if exit_code != 0:
+                break
+            if index < loops - 1 and remaining == 0:
+                sleep(args.sleep_seconds)
+    finally:
+        if storage is not None:
+            storage.close()
     return exit_code
 
 
@@ -53,83 +172,144 @@ def _process_once(
     path: Path,
     *,
     max_jobs: int,
+    visibility_timeout_seconds: float,
     cli_entry: Callable[[list[str]], int],
     out: TextIO,
+    context: WorkerContext | None = None,
 ) -> tuple[int, int]:
-    with locked_file(path, "a+") as handle:
-        handle.seek(0)
-        content = handle.read()
-        jobs = _load_jobs_from_content(content, path.name, out=out)
-        if not jobs:
-            out.write(f"{path.name}: no jobs found\n")
-            return 0, 0
-        processed: list[AnalysisJob] = []
-        exit_code = 0
-        for job in jobs[:max_jobs]:
-            cli_argv = [
-                "--repo",
-                job.repo,
-                "--pr-number",
-                str(job.pr_number),
-            ]
-            if job.commit:
-                cli_argv.extend(["--commit", job.commit])
-            if job.branch:
-                cli_argv.extend(["--branch", job.branch])
-            exit_code = cli_entry(cli_argv)
+    claimed = claim_jobs(
+        path,
+        max_jobs,
+        visibility_timeout_seconds=visibility_timeout_seconds,
+        warn=lambda message: out.write(f"{message}\n"),
+    )
+    return _run_claimed(
+        path.name,
+        claimed,
+        ack=lambda claim: ack_job(path, claim),
+        release=lambda claims: requeue_jobs(path, claims),
+        pending_count=lambda: pending_job_count(path),
+        cli_entry=cli_entry,
+        out=out,
+        context=context,
+    )
+
+
+def _process_log_once(
+    log: JobLog,
+    *,
+    group: str,
+    max_jobs: int,
+    visibility_timeout_seconds: float,
+    cli_entry: Callable[[list[str]], int],
+    out: TextIO,
+    context: WorkerContext | None = None,
+) -> tuple[int, int]:
+    claimed = log.claim_jobs(
+        group,
+        max_jobs,
+        visibility_timeout_seconds=visibility_timeout_seconds,
+    )
+    return _run_claimed(
+        log.directory.name,
+        claimed,
+        ack=lambda claim: log.ack_job(group, claim),
+        release=lambda claims: log.requeue_jobs(group, claims),
+        pending_count=lambda: log.pending_job_count(group),
+        cli_entry=cli_entry,
+        out=out,
+        context=context,
+    )
+
+
+def _process_db_once(
+    storage: Storage,
+    *,
+    max_jobs: int,
+    visibility_timeout_seconds: float,
+    cli_entry: Callable[[list[str]], int],
+    out: TextIO,
+    context: WorkerContext | None = None,
+) -> tuple[int, int]:
+    claimed = storage.claim_jobs(
+        max_jobs,
+        visibility_timeout_seconds=visibility_timeout_seconds,
+    )
+
+    def release(claims: list[ClaimedJob]) -> None:
+        for claim in claims:
+            storage.release_job(claim)
+
+    return _run_claimed(
+        "analysis_jobs",
+        claimed,
+        ack=storage.ack_job,
+        release=release,
+        pending_count=storage.count_queued_jobs,
+        cli_entry=cli_entry,
+        out=out,
+        context=context,
+    )
+
+
+def _run_claimed(
+    source: str,
+    claimed: list[_Claim],
+    *,
+    ack: Callable[[_Claim], bool],
+    release: Callable[[list[_Claim]], object],
+    pending_count: Callable[[], int],
+    cli_entry: Callable[[list[str]], int],
+    out: TextIO,
+    context: WorkerContext | None = None,
+) -> tuple[int, int]:
+    """Run claimed jobs in order, acking each success; returns (exit code, jobs left).
+
+    In a worker pool, ``context`` receives per-job metrics and a stop request
+    ends the batch after the current job.
+    """
+    if not claimed:
+        out.write(f"{source}: no jobs found\n")
+        return 0, 0
+    exit_code = 0
+    pending = list(claimed)
+    try:
+        while pending:
+            if context is not None and context.stop_requested():
+                break
+            started = time.monotonic()
+            exit_code = cli_entry(_cli_argv(pending[0].job))
+            if context is not None:
+                context.record_job(
+                    exit_code,
+                    time.monotonic() - started,
+                    superseded=pending[0].coalesced,
+                )
             if exit_code != 0:
                 break
-            processed.append(job)
-        remaining = jobs[len(processed) :]
-        new_content = _render_jobs(remaining)
-        handle.seek(0)
-        handle.truncate()
-        handle.write(new_content)
-    return exit_code, len(remaining)
-
-
-def _load_jobs_from_content(content: str, path_name: str, *, out: TextIO) -> list[AnalysisJob]:
-    lines = list(enumerate(content.splitlines(), start=1))
-    jobs: list[AnalysisJob] = []
-    for line_number, line in lines:
-        if not line.strip():
-            continue
-        try:
-            payload = json.loads(line)
-        except json.JSONDecodeError:
-            out.write(f"{path_name}:{line_number}: skipping invalid queue line\n")
-            continue
-        if not _has_required_fields(payload):
-            out.write(f"{path_name}:{line_number}: skipping queue line missing required fields\n")
-            continue
-        jobs.append(
-            AnalysisJob(
-                repo=payload["repo"],
-                pr_number=payload["pr_number"],
-                commit=payload.get("commit"),
-                branch=payload.get("branch"),
-            )
-    )
-    return jobs
-
-
-def _render_jobs(jobs: Iterable[AnalysisJob]) -> str:
-    lines = [
-        json.dumps(
-            {
-                "repo": job.repo,
-                "pr_number": job.pr_number,
-                "commit": job.commit,
-                "branch": job.branch,
-            },
-            separators=(",", ":"),
-        )
-        for job in jobs
+            if not ack(pending.pop(0)):
+                out.write(f"{source}: lease expired before ack; job may run again\n")
+    finally:
+        # A failed or interrupted batch hands its unfinished jobs straight back.
+        release(pending)
+    coalesced = sum(claim.coalesced for claim in claimed[: len(claimed) - len(pending)])
+    if coalesced:
+        out.write(f"{source}: skipped {coalesced} superseded jobs\n")
+    return exit_code, pending_count()
+
+
+def _cli_argv(job: AnalysisJob) -> list[str]:
+    cli_argv = [
+        "--repo",
+        job.repo,
+        "--pr-number",
+        str(job.pr_number),
     ]
-    content = "\n".join(lines)
-    if content:
-        content += "\n"
-    return content
+    if job.commit:
+        cli_argv.extend(["--commit", job.commit])
+    if job.branch:
+        cli_argv.extend(["--branch", job.branch])
+    return cli_argv
 
 
 def _positive_int(value: str) -> int:
@@ -146,9 +326,29 @@ def _positive_float(value: str) -> float:
     return number
 
 
-def _has_required_fields(payload: object) -> bool:
-    if not isinstance(payload, dict):
-        return False
-    repo = payload.get("repo")
-    pr_number = payload.get("pr_number")
-    return isinstance(repo, str) and bool(repo.strip()) and isinstance(pr_number, int)
+def _visibility_timeout(value: str) -> float:
+    number = float(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError("visibility-timeout-seconds must be positive")
+    return number
+
+
+def _concurrency(value: str) -> int:
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError("concurrency must be a positive integer")
+    return number
+
+
+def _max_restarts(value: str) -> int:
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError("max-restarts must not be negative")
+    return number
+
+
+def _shutdown_timeout(value: str) -> float:
+    number = float(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError("shutdown-timeout-seconds must be positive")
+    return number
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+import contextlib
+from dataclasses import asdict, dataclass, replace
+import multiprocessing
+import pickle
+import queue
+import signal
+import threading
+import time
+from typing import Any, TextIO
+
+DEFAULT_MAX_RESTARTS = 5
+DEFAULT_SHUTDOWN_TIMEOUT_SECONDS = 60.0
+_EVENT_POLL_SECONDS = 0.1
+
+
+@dataclass
+class WorkerMetrics:
+    processed: int = 0
+    failed: int = 0
+    superseded: int = 0
+    busy_seconds: float = 0.0
+    restarts: int = 0
+
+    def plus(self, snapshot: dict[str, Any]) -> WorkerMetrics:
+        """These totals plus a child's job counters; ``restarts`` stays as is."""
+        return WorkerMetrics(
+            processed=self.processed + snapshot["processed"],
+            failed=self.failed + snapshot["failed"],
+            superseded=self.superseded + snapshot["superseded"],
+            busy_seconds=self.busy_seconds + snapshot["busy_seconds"],
+            restarts=self.restarts,
+        )
+
+    def summary(self) -> str:
+        return (
+            f"processed {self.processed}, failed {self.failed}, "
+            f"superseded {self.superseded}, busy {self.busy_seconds:.2f}s, "
+            f"restarts {self.restarts}"
+        )
+
+
+class WorkerContext:
+    """A pool worker's link to its supervisor: output, metrics and the stop flag."""
+
+    def __init__(self, worker_id: int, events: Any, stop: Any) -> None:
+        self.worker_id = worker_id
+        self.metrics = WorkerMetrics()
+        self.out = _EventWriter(worker_id, events)
+        self._events = events
+        self._stop = stop
+
+    def stop_requested(self) -> bool:
+        return self._stop.is_set()
+
+    def sleep(self, seconds: float) -> None:
+        self._stop.wait(seconds)
+
+    def record_job(self, exit_code: int, seconds: float, *, superseded: int = 0) -> None:
+        if exit_code == 0:
+            self.metrics.processed += 1
+            self.metrics.superseded += superseded
+        else:
+            self.metrics.failed += 1
+        self.metrics.busy_seconds += seconds
+        self._events.put(("metrics", self.worker_id, asdict(self.metrics)))
+
+
+WorkerTarget = Callable[[WorkerContext], int]
+
+
+def run_worker_pool(
+    concurrency: int,
+    target: WorkerTarget,
+    *,
+    out: TextIO,
+    max_restarts: int = DEFAULT_MAX_RESTARTS,
+    shutdown_timeout_seconds: float = DEFAULT_SHUTDOWN_TIMEOUT_SECONDS,
+) -> int:
+    """Run ``target`` in ``concurrency`` child processes until they all finish.
+
+    SIGINT/SIGTERM ask every child to stop after its current job. A child
+    that dies without reporting an exit code (an uncaught exception or a
+    signal) is restarted, up to ``max_restarts`` times per worker. A child
+    that returns non-zero (a failed job) stops the whole pool, as a single
+    worker stops. Children's output is prefixed with ``[worker N]``; each
+    worker's metrics are printed on exit. Returns the first non-zero exit code.
+
+    Children are forked where the platform allows it. Elsewhere (e.g. Windows)
+    they are spawned, and ``target`` must be picklable: a module-level function,
+    or a ``functools.partial`` of one with picklable arguments.
+    """
+    context = _mp_context()
+    _check_target(target, context.get_start_method())
+    events = context.Queue()
+    stop = context.Event()
+    metrics = {worker_id: WorkerMetrics() for worker_id in range(concurrency)}
+    # Totals of a worker's earlier children; a restarted child counts from zero.
+    carried = {worker_id: WorkerMetrics() for worker_id in range(concurrency)}
+    exited: dict[int, int] = {}
+
+    def start(worker_id: int) -> Any:
+        process = context.Process(
+            target=_child_main,
+            args=(target, worker_id, events, stop),
+            name=f"ci-hunter-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    def handle_event(event: tuple[Any, ...]) -> None:
+        kind, worker_id, value = event
+        if kind == "out":
+            out.write(f"[worker {worker_id}] {value}")
+        elif kind == "metrics":
+            metrics[worker_id] = carried[worker_id].plus(value)
+        elif kind == "exit":
+            exited[worker_id] = value
+
+    def drain(timeout: float) -> None:
+        try:
+            handle_event(events.get(timeout=timeout))
+            while True:
+                handle_event(events.get_nowait())
+        except queue.Empty:
+            return
+
+    restore_signals = _forward_stop_signals(stop)
+    children = {worker_id: start(worker_id) for worker_id in range(concurrency)}
+    exit_code = 0
+    shutdown_deadline: float | None = None
+    try:
+        while children:
+            drain(_EVENT_POLL_SECONDS)
+            if stop.is_set() and shutdown_deadline is None:
+                shutdown_deadline = time.monotonic() + shutdown_timeout_seconds
+            if shutdown_deadline is not None and time.monotonic() > shutdown_deadline:
+                for process in children.values():
+                    process.terminate()
+            for worker_id, process in list(children.items()):
+                if process.is_alive():
+                    continue
+                process.join()
+                # The child's last events may still be in the pipe.
+                drain(_EVENT_POLL_SECONDS)
+                del children[worker_id]
+                if worker_id in exited:
+                    code = exited.pop(worker_id)
+                    if code != 0 and exit_code == 0:
+                        exit_code = code
+                        stop.set()
+                    continue
+                if stop.is_set():
+                    continue
+                if metrics[worker_id].restarts >= max_restarts:
+                    out.write(
+                        f"worker {worker_id} died {max_restarts + 1} times "
+                        f"(exit code {process.exitcode}); not restarting\n"
+                    )
+                    exit_code = exit_code or 1
+                    continue
+                metrics[worker_id].restarts += 1
+                carried[worker_id] = replace(metrics[worker_id])
+                out.write(
+                    f"worker {worker_id} died (exit code {process.exitcode}); restarting\n"
+                )
+                children[worker_id] = start(worker_id)
+    finally:
+        stop.set()
+        for process in children.values():
+            process.terminate()
+            process.join()
+        restore_signals()
+        for worker_id, worker_metrics in sorted(metrics.items()):
+            out.write(f"worker {worker_id}: {worker_metrics.summary()}\n")
+    return exit_code
+
+
+def _child_main(target: WorkerTarget, worker_id: int, events: Any, stop: Any) -> None:
+    # The supervisor owns shutdown: Ctrl-C in the terminal reaches every process
+    # in the group, and SIGTERM should finish the current job, not abort it.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda _signum, _frame: stop.set())
+    worker = WorkerContext(worker_id, events, stop)
+    # Reports printed by the job code reach the supervisor with this worker's prefix.
+    with contextlib.redirect_stdout(worker.out):
+        exit_code = target(worker)
+    worker.out.close()
+    events.put(("exit", worker_id, exit_code))
+    events.close()
+    events.join_thread()
+
+
+def _forward_stop_signals(stop: Any) -> Callable[[], None]:
+    if threading.current_thread() is not threading.main_thread():
+        return lambda: None
+    previous = {
+        signum: signal.signal(signum, lambda _signum, _frame: stop.set())
+        for signum in (signal.SIGINT, signal.SIGTERM)
+    }
+
+    def restore() -> None:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+    return restore
+
+
+def _mp_context() -> Any:
+    # fork keeps an injected cli_entry usable in children without pickling it.
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context("spawn")
+
+
+def _check_target(target: WorkerTarget, start_method: str) -> None:
+    if start_method == "fork":
+        return
+    try:
+        pickle.dumps(target)
+    except (pickle.PicklingError, AttributeError, TypeError) as error:
+        raise ValueError(
+            f"worker target must be picklable with the {start_method!r} start method "
+            f"(use a module-level function): {error}"
+        ) from error
+
+
+class _EventWriter:
+    """Sends whole lines to the supervisor, which prefixes each with the worker id."""
+
+    def __init__(self, worker_id: int, events: Any) -> None:
+        self._worker_id = worker_id
+        self._events = events
+        self._partial = ""
+
+    def write(self, text: str) -> int:
+        *lines, self._partial = (self._partial + text).split("\n")
+        for line in lines:
+            self._events.put(("out", self._worker_id, f"{line}\n"))
+        return len(text)
+
+    def flush(self) -> None:
+        return None
+
+    def close(self) -> None:
+        if self._partial:
+            self.write("\n")
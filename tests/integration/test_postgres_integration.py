@@ -4,6 +4,7 @@ import subprocess
 import pytest
 
 from ci_hunter.github.client import WorkflowRun
+from ci_hunter.junit import TestDuration
 from ci_hunter.storage import Storage, StorageConfig
 
 
@@ -45,3 +46,141 @@ def test_postgres_migration_and_storage_flow():
 
     assert len(runs) == 1
     assert runs[0].head_sha == "abc123"
+
+
+@pytest.mark.integration
+def test_postgres_copy_path_upserts_timings():
+    if TEST_DB_ENV not in os.environ:
+        pytest.skip(
+            f"Set {TEST_DB_ENV} to run Postgres integration tests "
+            "(for example with docker-compose.postgres.yml)."
+        )
+
+    env = os.environ.copy()
+    env[ALEMBIC_URL_ENV] = _test_db_url()
+    subprocess.run(["alembic", "upgrade", "head"], check=True, env=env)
+
+    storage = Storage(StorageConfig(database_url=_test_db_url(), postgres_copy_threshold_rows=1))
+    storage.save_workflow_runs(
+        REPO,
+        [
+            WorkflowRun(
+                id=2,
+                run_number=2,
+                status="completed",
+                conclusion="success",
+                created_at="2024-01-02T00:00:00Z",
+                updated_at="2024-01-02T00:00:05Z",
+                head_sha="def456",
+            )
+        ],
+    )
+    storage.save_test_durations(REPO, 2, [TestDuration(name="tests.copy::test_a", duration_seconds=1.0)])
+    with storage.batch():
+        storage.save_test_durations(
+            REPO,
+            2,
+            [TestDuration(name="tests.copy::test_a", duration_seconds=2.0)],
+        )
+    samples = [
+        sample for sample in storage.list_test_durations(REPO) if sample.test_name == "tests.copy::test_a"
+    ]
+    storage.close()
+
+    assert [(sample.run_number, sample.duration_seconds) for sample in samples] == [(2, 2.0)]
+
+
+@pytest.mark.integration
+def test_postgres_copy_path_accepts_repeated_names():
+    if TEST_DB_ENV not in os.environ:
+        pytest.skip(
+            f"Set {TEST_DB_ENV} to run Postgres integration tests "
+            "(for example with docker-compose.postgres.yml)."
+        )
+
+    env = os.environ.copy()
+    env[ALEMBIC_URL_ENV] = _test_db_url()
+    subprocess.run(["alembic", "upgrade", "head"], check=True, env=env)
+
+    storage = Storage(StorageConfig(database_url=_test_db_url(), postgres_copy_threshold_rows=2))
+    storage.save_workflow_runs(
+        REPO,
+        [
+            WorkflowRun(
+                id=3,
+                run_number=3,
+                status="completed",
+                conclusion="success",
+                created_at="2024-01-02T00:00:00Z",
+                updated_at="2024-01-02T00:00:05Z",
+                head_sha="fed789",
+            )
+        ],
+    )
+    name = "tests.copy::test_param"
+    storage.save_test_durations(
+        REPO,
+        3,
+        [
+            TestDuration(name=name, duration_seconds=1.0),
+            TestDuration(name="tests.copy::test_other", duration_seconds=1.5),
+            TestDuration(name=name, duration_seconds=2.0),
+        ],
+    )
+    samples = [
+        sample
+        for sample in storage.list_test_durations(REPO)
+        if sample.test_name == name and sample.run_number == 3
+    ]
+    storage.close()
+
+    assert [sample.duration_seconds for sample in samples] == [2.0]
+
+
+@pytest.mark.integration
+def test_postgres_pooled_writers_share_first_rollup_row():
+    if TEST_DB_ENV not in os.environ:
+        pytest.skip(
+            f"Set {TEST_DB_ENV} to run Postgres integration tests "
+            "(for example with docker-compose.postgres.yml)."
+        )
+    pytest.importorskip("psycopg_pool")
+    from concurrent.futures import ThreadPoolExecutor
+
+    env = os.environ.copy()
+    env[ALEMBIC_URL_ENV] = _test_db_url()
+    subprocess.run(["alembic", "upgrade", "head"], check=True, env=env)
+
+    repo = "acme/rollup-race"
+    storage = Storage(
+        StorageConfig(database_url=_test_db_url(), postgres_pool_max_size=8, rollup_window=4)
+    )
+    runs = [
+        WorkflowRun(
+            id=1000 + number,
+            run_number=number,
+            status="completed",
+            conclusion="success",
+            created_at="2024-01-03T00:00:00Z",
+            updated_at="2024-01-03T00:00:05Z",
+            head_sha=f"sha-{number}",
+        )
+        for number in range(1, 9)
+    ]
+    storage.save_workflow_runs(repo, runs)
+    metric = f"tests.race::test_{os.getpid()}"
+
+    def save(run: WorkflowRun) -> None:
+        storage.save_test_durations(
+            repo, run.id, [TestDuration(name=metric, duration_seconds=float(run.run_number))]
+        )
+
+    with ThreadPoolExecutor(max_workers=len(runs)) as executor:
+        list(executor.map(save, runs))
+    [rollup] = [
+        rollup for rollup in storage.list_metric_rollups(repo, "test") if rollup.name == metric
+    ]
+    storage.close()
+
+    assert rollup.sample_count == len(runs)
+    assert rollup.value_sum == sum(float(run.run_number) for run in runs)
@@ -1,9 +1,13 @@
+import random
+
+import pytest
+
 from ci_hunter.analyze import AnalysisResult, analyze_repo_runs
 from ci_hunter.detection import BASELINE_STRATEGY_MEDIAN, ChangePoint, Flake
 from ci_hunter.github.client import WorkflowRun
 from ci_hunter.junit import TEST_OUTCOME_FAILED, TestDuration, TestOutcome
 from ci_hunter.steps import StepDuration
-from ci_hunter.storage import Storage
+from ci_hunter.storage import Storage, StorageConfig
 
 REPO = "acme/repo"
 MIN_DELTA_PCT = 0.2
@@ -395,3 +399,114 @@ def test_analyze_repo_runs_detects_step_and_test_change_points():
             window_size=3,
         )
     ]
+
+
+def _save_rollup_history(storage: Storage) -> None:
+    rng = random.Random(3)
+    runs = [
+        WorkflowRun(
+            id=run_number,
+            run_number=run_number,
+            status=STATUS_COMPLETED,
+            conclusion=CONCLUSION_SUCCESS,
+            created_at=CREATED_AT,
+            updated_at=UPDATED_AT_BASELINE,
+            head_sha=f"sha-{run_number}",
+        )
+        for run_number in range(1, 21)
+    ]
+    storage.save_workflow_runs(REPO, runs)
+    for run in runs:
+        slow = 3.0 if run.run_number > 17 else 1.0
+        storage.save_step_durations(
+            REPO,
+            run.id,
+            [
+                StepDuration(name=f"step-{index}", duration_seconds=rng.uniform(9, 11) * slow)
+                for index in range(3)
+            ],
+        )
+        storage.save_test_durations(
+            REPO,
+            run.id,
+            [
+                TestDuration(name=f"tests.t{index}", duration_seconds=rng.uniform(1, 2) * slow)
+                for index in range(4)
+            ],
+        )
+
+
+@pytest.mark.parametrize("history_window", [5, None])
+def test_analyze_repo_runs_from_rollups_matches_raw_history(history_window):
+    storage = Storage(StorageConfig(database_url=":memory:", rollup_window=8))
+    _save_rollup_history(storage)
+    kwargs = dict(
+        min_delta_pct=MIN_DELTA_PCT,
+        baseline_strategy=BASELINE_STRATEGY_MEDIAN,
+        history_window=history_window,
+    )
+
+    from_rollups = analyze_repo_runs(storage, REPO, use_rollups=True, **kwargs)
+    from_raw = analyze_repo_runs(storage, REPO, **kwargs)
+
+    assert from_rollups.step_change_points == from_raw.step_change_points
+    assert from_rollups.test_change_points == from_raw.test_change_points
+    assert len(from_raw.test_regressions) == 4
+    if history_window is not None:
+        assert from_rollups == from_raw
+    else:
+        assert [r.metric for r in from_rollups.test_regressions] == [
+            r.metric for r in from_raw.test_regressions
+        ]
+        for rolled, raw in zip(from_rollups.step_regressions, from_raw.step_regressions):
+            assert rolled.metric == raw.metric
+            assert rolled.baseline == pytest.approx(raw.baseline, rel=0.02)
+
+
+def _fail_raw_history_reads(monkeypatch, storage: Storage) -> None:
+    def fail(*args, **kwargs):
+        raise AssertionError("raw history read")
+
+    monkeypatch.setattr(storage, "load_step_duration_history", fail)
+    monkeypatch.setattr(storage, "load_test_duration_history", fail)
+
+
+def test_analyze_repo_runs_reads_raw_history_unless_rollups_requested(monkeypatch):
+    storage = Storage(StorageConfig(database_url=":memory:", rollup_window=8))
+    _save_rollup_history(storage)
+    from_raw = analyze_repo_runs(storage, REPO, min_delta_pct=MIN_DELTA_PCT)
+
+    _fail_raw_history_reads(monkeypatch, storage)
+    from_rollups = analyze_repo_runs(
+        storage, REPO, min_delta_pct=MIN_DELTA_PCT, history_window=5, use_rollups=True
+    )
+    with pytest.raises(AssertionError, match="raw history read"):
+        analyze_repo_runs(storage, REPO, min_delta_pct=MIN_DELTA_PCT)
+
+    assert from_rollups.test_regressions
+    assert from_raw.test_regressions
+
+
+def test_analyze_repo_runs_falls_back_to_raw_history_when_rollups_lag(tmp_path):
+    path = str(tmp_path / "ci_hunter.db")
+    _save_rollup_history(Storage(StorageConfig(database_url=path)))
+    storage = Storage(StorageConfig(database_url=path, rollup_window=8))
+    kwargs = dict(min_delta_pct=MIN_DELTA_PCT, history_window=5)
+    from_raw = analyze_repo_runs(storage, REPO, **kwargs)
+
+    # Rollups turned on after the samples were stored: empty until rebuilt.
+    assert storage.metric_rollups_in_sync(REPO) is False
+    assert analyze_repo_runs(storage, REPO, use_rollups=True, **kwargs) == from_raw
+
+    storage.rebuild_metric_rollups(REPO)
+    assert storage.metric_rollups_in_sync(REPO) is True
+    assert analyze_repo_runs(storage, REPO, use_rollups=True, **kwargs) == from_raw
+
+    # A writer without rollup_window saves a sample the rollups never see.
+    Storage(StorageConfig(database_url=path)).save_test_durations(
+        REPO, 20, [TestDuration(name="tests.late", duration_seconds=1.0)]
+    )
+    assert storage.metric_rollups_in_sync(REPO) is False
+    assert analyze_repo_runs(storage, REPO, use_rollups=True, **kwargs) == analyze_repo_runs(
+        storage, REPO, **kwargs
+    )
@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from ci_hunter.async_storage import AsyncStorage
+from ci_hunter.github.client import WorkflowRun
+from ci_hunter.junit import TEST_OUTCOME_FAILED, TestDuration, TestOutcome
+from ci_hunter.steps import StepDuration
+from ci_hunter.storage import StorageConfig, TestDurationSample
+
+REPO = "acme/repo"
+CREATED_AT = "2024-01-01T00:00:00Z"
+TEST_ALPHA = "tests.test_alpha"
+STEP_CHECKOUT = "Checkout"
+
+
+def _run(run_id: int) -> WorkflowRun:
+    return WorkflowRun(
+        id=run_id,
+        run_number=run_id,
+        status="completed",
+        conclusion="success",
+        created_at=CREATED_AT,
+        updated_at=CREATED_AT,
+        head_sha=f"sha-{run_id}",
+    )
+
+
+def test_async_storage_round_trips_through_storage_thread():
+    async def scenario():
+        async with AsyncStorage(":memory:") as storage:
+            await storage.save_workflow_runs(REPO, (_run(run_id) for run_id in (1, 2)))
+            await asyncio.gather(
+                storage.save_step_durations(
+                    REPO, 1, [StepDuration(name=STEP_CHECKOUT, duration_seconds=2.0)]
+                ),
+                storage.save_test_durations(
+                    REPO, 2, [TestDuration(name=TEST_ALPHA, duration_seconds=1.5)]
+                ),
+                storage.save_test_outcomes(
+                    REPO, 2, [TestOutcome(name=TEST_ALPHA, outcome=TEST_OUTCOME_FAILED)]
+                ),
+            )
+            return (
+                await storage.list_workflow_runs(REPO),
+                await storage.list_step_durations(REPO),
+                await storage.list_test_durations(REPO),
+                await storage.load_test_outcome_history(REPO),
+                await storage.get_stored_timing_run_ids(REPO, [1, 2]),
+            )
+
+    runs, steps, tests, outcomes, stored = asyncio.run(scenario())
+
+    assert [run.id for run in runs] == [1, 2]
+    assert [(sample.run_number, sample.step_name) for sample in steps] == [(1, STEP_CHECKOUT)]
+    assert tests == [TestDurationSample(run_number=2, test_name=TEST_ALPHA, duration_seconds=1.5)]
+    assert outcomes.names == [TEST_ALPHA]
+    assert stored.step_run_ids == {1}
+    assert stored.outcome_run_ids == {2}
+
+
+def test_async_storage_batch_writes_on_exit(tmp_path):
+    async def scenario():
+        async with AsyncStorage(StorageConfig(database_url=str(tmp_path / "ci.db"))) as storage:
+            await storage.save_workflow_runs(REPO, [_run(1), _run(2)])
+            async with storage.batch():
+                for run_id in (1, 2):
+                    await storage.save_test_durations(
+                        REPO, run_id, [TestDuration(name=TEST_ALPHA, duration_seconds=run_id)]
+                    )
+                inside = await storage.list_test_durations(REPO)
+            return inside, await storage.list_test_durations(REPO)
+
+    inside, after = asyncio.run(scenario())
+
+    assert inside == []
+    assert [sample.run_number for sample in after] == [1, 2]
+
+
+def test_async_storage_batch_discards_saves_when_block_raises():
+    async def scenario():
+        async with AsyncStorage(":memory:") as storage:
+            await storage.save_workflow_runs(REPO, [_run(1)])
+            with pytest.raises(RuntimeError):
+                async with storage.batch():
+                    await storage.save_test_durations(
+                        REPO, 1, [TestDuration(name=TEST_ALPHA, duration_seconds=1.0)]
+                    )
+                    raise RuntimeError("download failed")
+            return await storage.list_test_durations(REPO)
+
+    assert asyncio.run(scenario()) == []
+
+
+def test_async_storage_batch_is_per_task():
+    async def scenario():
+        async with AsyncStorage(":memory:") as storage:
+            await storage.save_workflow_runs(REPO, [_run(1)])
+            release = asyncio.Event()
+
+            async def batched():
+                async with storage.batch():
+                    await storage.save_test_durations(
+                        REPO, 1, [TestDuration(name=TEST_ALPHA, duration_seconds=1.0)]
+                    )
+                    await release.wait()
+
+            async def unbatched():
+                await storage.save_step_durations(
+                    REPO, 1, [StepDuration(name=STEP_CHECKOUT, duration_seconds=2.0)]
+                )
+                seen = (
+                    await storage.list_step_durations(REPO),
+                    await storage.list_test_durations(REPO),
+                )
+                release.set()
+                return seen
+
+            _, (steps, tests) = await asyncio.gather(batched(), unbatched())
+            return steps, tests, await storage.list_test_durations(REPO)
+
+    steps, tests_during, tests_after = asyncio.run(scenario())
+
+    assert len(steps) == 1
+    assert tests_during == []
+    assert len(tests_after) == 1
+
+
+def test_async_storage_uses_one_thread_for_sqlite():
+    async def scenario():
+        storage = AsyncStorage(":memory:", max_workers=4)
+        try:
+            return storage._executor._max_workers
+        finally:
+            await storage.close()
+
+    assert asyncio.run(scenario()) == 1
+    with pytest.raises(ValueError):
+        AsyncStorage(":memory:", max_workers=0)
@@ -1,9 +1,12 @@
 import io
 from dataclasses import dataclass
 
+import pytest
+
 from ci_hunter.analyze import AnalysisResult
 from ci_hunter.cli import main
 from ci_hunter.detection import BASELINE_STRATEGY_MEDIAN
+from ci_hunter.github.http import DEFAULT_MAX_KEEPALIVE_CONNECTIONS, HttpClientConfig
 
 REPO = "acme/repo"
 MIN_DELTA_PCT = 0.2
@@ -59,6 +62,8 @@ def test_cli_dry_run_outputs_report():
             "5",
             "--timings-run-limit",
             "5",
+            "--fetch-concurrency",
+            "3",
             "--dry-run",
         ],
         env=env,
@@ -74,10 +79,14 @@ def test_cli_dry_run_outputs_report():
     assert captured["min_delta_pct"] == MIN_DELTA_PCT
     assert captured["baseline_strategy"] == BASELINE_STRATEGY_MEDIAN
     assert captured["timings_run_limit"] == 5
+    assert captured["fetch_concurrency"] == 3
+    assert captured["incremental_sync"] is True
     assert captured["min_history"] == 2
     assert captured["history_window"] == 5
+    assert captured["use_rollups"] is False
+    assert captured["storage"].rollup_window is None
     assert callable(captured["step_fetcher"])
-    assert callable(captured["test_fetcher"])
+    assert callable(captured["test_report_fetcher"])
 
 
 def test_cli_posts_comment_when_pr_number_set():
@@ -264,6 +273,8 @@ db: "ci_hunter.db"
 timings_run_limit: 3
 min_history: 4
 history_window: 8
+rollup_window: 9
+use_rollups: true
 format: json
 dry_run: false
 """
@@ -316,6 +327,8 @@ dry_run: false
     assert captured["timings_run_limit"] == 3
     assert captured["min_history"] == 4
     assert captured["history_window"] == 8
+    assert captured["use_rollups"] is True
+    assert captured["storage"].rollup_window == 9
 
 
 def test_cli_writes_report_to_output_file(tmp_path):
@@ -409,3 +422,75 @@ def test_cli_no_comment_skips_posting(tmp_path):
     assert exit_code == 0
     assert output_path.read_text() == "report body\n"
     assert posted == {}
+
+
+def _dry_run_result(**_kwargs):
+    return AnalysisResult(
+        repo=REPO,
+        regressions=[],
+        reason=None,
+        step_regressions=[],
+        test_regressions=[],
+        step_reason=None,
+        test_reason=None,
+        step_timings_attempted=0,
+        step_timings_failed=0,
+        test_timings_attempted=0,
+        test_timings_failed=0,
+    )
+
+
+def test_cli_configures_http_pool_from_flags_and_env(monkeypatch):
+    configured = []
+    monkeypatch.setattr("ci_hunter.cli.configure_http_client", configured.append)
+    env = {
+        "CI_HUNTER_HTTP_MAX_CONNECTIONS": "50",
+        "CI_HUNTER_HTTP_KEEPALIVE_EXPIRY_SECONDS": "5",
+        "CI_HUNTER_HTTP2": "false",
+    }
+
+    exit_code = main(
+        ["--repo", REPO, "--dry-run", "--http-max-connections", "8"],
+        env=env,
+        runner=_dry_run_result,
+        auth_factory=lambda _env: DummyAuth(),
+        markdown_renderer=lambda _: "report",
+        out=io.StringIO(),
+    )
+
+    assert exit_code == 0
+    assert configured == [
+        HttpClientConfig(
+            max_connections=8,
+            max_keepalive_connections=DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry_seconds=5.0,
+            http2=False,
+        )
+    ]
+
+
+def test_cli_leaves_http_pool_alone_without_settings(monkeypatch):
+    configured = []
+    monkeypatch.setattr("ci_hunter.cli.configure_http_client", configured.append)
+
+    main(
+        ["--repo", REPO, "--dry-run"],
+        env={},
+        runner=_dry_run_result,
+        auth_factory=lambda _env: DummyAuth(),
+        markdown_renderer=lambda _: "report",
+        out=io.StringIO(),
+    )
+
+    assert configured == []
+
+
+def test_cli_rejects_invalid_http_pool_env():
+    with pytest.raises(ValueError, match="CI_HUNTER_HTTP_MAX_CONNECTIONS"):
+        main(
+            ["--repo", REPO, "--dry-run"],
+            env={"CI_HUNTER_HTTP_MAX_CONNECTIONS": "many"},
+            runner=_dry_run_result,
+            auth_factory=lambda _env: DummyAuth(),
+            out=io.StringIO(),
+        )
@@ -12,6 +12,8 @@ db: ":memory:"
 timings_run_limit: 5
 min_history: 2
 history_window: 10
+rollup_window: 12
+use_rollups: true
 format: md
 dry_run: true
 commit: abc123
@@ -29,6 +31,8 @@ branch: feature-1
         timings_run_limit=5,
         min_history=2,
         history_window=10,
+        rollup_window=12,
+        use_rollups=True,
         format="md",
         dry_run=True,
         commit="abc123",
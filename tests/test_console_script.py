@@ -11,3 +11,4 @@ def test_console_scripts_declared_in_pyproject():
     assert scripts["ci-hunter-webhook-listener"] == "ci_hunter.webhook_listener_cmd:main"
     assert scripts["ci-hunter-scheduler"] == "ci_hunter.scheduler_cmd:main"
     assert scripts["ci-hunter-worker"] == "ci_hunter.worker_cmd:main"
+    assert scripts["ci-hunter-retention"] == "ci_hunter.retention_cmd:main"
@@ -1,6 +1,12 @@
+import math
+import random
+
 import pytest
 
+from ci_hunter import detection
+from ci_hunter.rollups import MetricRollup
 from ci_hunter.detection import (
+    BASELINE_STRATEGY_MEAN,
     BASELINE_STRATEGY_MEDIAN,
     BASELINE_STRATEGY_TRIMMED_MEAN,
     ChangePoint,
@@ -10,6 +16,8 @@ from ci_hunter.detection import (
     REASON_INSUFFICIENT_HISTORY,
     REASON_NON_POSITIVE_BASELINE,
     Regression,
+    detect_named_regressions,
+    detect_rollup_regressions,
     detect_run_duration_change_points,
     detect_test_flakes,
     detect_run_duration_regressions,
@@ -248,3 +256,155 @@ def test_change_point_history_window_is_respected():
             window_size=3,
         )
     ]
+
+
+def _random_series(seed: int, count: int) -> list[tuple[str, list[float]]]:
+    rng = random.Random(seed)
+    series = []
+    for index in range(count):
+        length = rng.randint(0, 12)
+        values = [rng.choice([0.0, rng.uniform(0.5, 5.0)]) for _ in range(length)]
+        series.append((f"metric_{index}", values))
+    return series
+
+
+@pytest.mark.parametrize(
+    "baseline_strategy",
+    [BASELINE_STRATEGY_MEAN, BASELINE_STRATEGY_MEDIAN, BASELINE_STRATEGY_TRIMMED_MEAN],
+)
+@pytest.mark.parametrize("history_window", [None, 1, 4])
+@pytest.mark.parametrize("min_history", [1, 3])
+def test_detect_named_regressions_batch_matches_scalar_path(
+    monkeypatch,
+    baseline_strategy,
+    history_window,
+    min_history,
+):
+    pytest.importorskip("numpy")
+    series = _random_series(seed=7, count=300)
+    kwargs = dict(
+        min_delta_pct=0.2,
+        baseline_strategy=baseline_strategy,
+        trim_ratio=0.25,
+        min_history=min_history,
+        history_window=history_window,
+        chunk_size=64,
+    )
+
+    batched = detect_named_regressions(series, **kwargs)
+    monkeypatch.setattr(detection, "_import_numpy", lambda: None)
+    scalar = detect_named_regressions(series, **kwargs)
+
+    assert batched == scalar
+
+
+def _threshold_series(
+    seed: int,
+    count: int,
+    baseline_strategy: str,
+    trim_ratio: float,
+    min_delta_pct: float,
+) -> list[tuple[str, list[float]]]:
+    """Histories whose current run sits exactly on, or one ulp around, the threshold."""
+    rng = random.Random(seed)
+    series = []
+    for index in range(count):
+        history = [rng.uniform(0.1, 500.0) for _ in range(rng.randint(1, 40))]
+        if rng.random() < 0.2:
+            history[rng.randrange(len(history))] = rng.uniform(1e6, 1e12)
+        baseline = detection._compute_baseline(history, baseline_strategy, trim_ratio)
+        current = baseline * (1 + min_delta_pct)
+        current = rng.choice(
+            [current, math.nextafter(current, 0.0), math.nextafter(current, math.inf)]
+        )
+        series.append((f"metric_{index}", history + [current]))
+    return series
+
+
+@pytest.mark.parametrize(
+    "baseline_strategy",
+    [BASELINE_STRATEGY_MEAN, BASELINE_STRATEGY_MEDIAN, BASELINE_STRATEGY_TRIMMED_MEAN],
+)
+def test_detect_named_regressions_batch_matches_scalar_at_threshold(
+    monkeypatch,
+    baseline_strategy,
+):
+    pytest.importorskip("numpy")
+    series = _threshold_series(
+        seed=13,
+        count=2000,
+        baseline_strategy=baseline_strategy,
+        trim_ratio=0.1,
+        min_delta_pct=0.2,
+    )
+    kwargs = dict(
+        min_delta_pct=0.2,
+        baseline_strategy=baseline_strategy,
+        trim_ratio=0.1,
+        chunk_size=256,
+    )
+
+    batched = detect_named_regressions(series, **kwargs)
+    monkeypatch.setattr(detection, "_import_numpy", lambda: None)
+    scalar = detect_named_regressions(series, **kwargs)
+
+    assert scalar.regressions
+    assert batched == scalar
+
+
+def test_detect_named_regressions_reports_insufficient_history(monkeypatch):
+    monkeypatch.setattr(detection, "_import_numpy", lambda: None)
+
+    result = detect_named_regressions(
+        [("build/Checkout", [1.0]), ("build/Tests", [])],
+        min_delta_pct=0.2,
+    )
+
+    assert result == DetectionResult(regressions=[], reason=REASON_INSUFFICIENT_HISTORY)
+
+
+def _rollup(name: str, values: list[float], capacity: int) -> MetricRollup:
+    rollup = MetricRollup(name=name)
+    for run_number, value in enumerate(values, start=1):
+        rollup.record(run_number, value, previous=None, capacity=capacity)
+    return rollup
+
+
+@pytest.mark.parametrize(
+    "baseline_strategy",
+    [BASELINE_STRATEGY_MEAN, BASELINE_STRATEGY_MEDIAN, BASELINE_STRATEGY_TRIMMED_MEAN],
+)
+def test_detect_rollup_regressions_matches_raw_history(baseline_strategy):
+    rng = random.Random(11)
+    series = [
+        (f"metric_{index}", [rng.uniform(5.0, 15.0) for _ in range(40)] + [rng.uniform(5.0, 40.0)])
+        for index in range(25)
+    ]
+    rollups = [_rollup(name, values, capacity=8) for name, values in series]
+    kwargs = dict(min_delta_pct=MIN_DELTA_PCT, baseline_strategy=baseline_strategy)
+
+    windowed = detect_rollup_regressions(rollups, history_window=7, **kwargs)
+    assert windowed == detect_named_regressions(series, history_window=7, **kwargs)
+
+    full = detect_rollup_regressions(rollups, **kwargs)
+    expected = detect_named_regressions(series, **kwargs)
+    if baseline_strategy == BASELINE_STRATEGY_MEAN:
+        assert [r.metric for r in full.regressions] == [r.metric for r in expected.regressions]
+        assert [r.baseline for r in full.regressions] == pytest.approx(
+            [r.baseline for r in expected.regressions]
+        )
+    else:
+        # Sketch baselines are within its relative accuracy of the exact ones.
+        exact = {regression.metric: regression.baseline for regression in expected.regressions}
+        for regression in full.regressions:
+            if regression.metric in exact:
+                assert regression.baseline == pytest.approx(exact[regression.metric], rel=0.02)
+
+
+def test_detect_rollup_regressions_reports_insufficient_history():
+    result = detect_rollup_regressions(
+        [_rollup("metric", [DURATION_BASELINE], capacity=4)],
+        min_delta_pct=MIN_DELTA_PCT,
+    )
+
+    assert result == DetectionResult(regressions=[], reason=REASON_INSUFFICIENT_HISTORY)
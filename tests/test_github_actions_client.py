@@ -136,3 +136,81 @@ def test_list_workflow_runs_follows_pagination():
     assert first_route.called
     assert second_route.called
     assert [run.id for run in runs] == [RUN_ID, RUN_ID + 1]
+
+
+@respx.mock
+def test_list_workflow_runs_incremental_filters_and_stops_at_known_run():
+    client = GitHubActionsClient(token=TOKEN)
+    created_since = "2024-01-01T00:00:00Z"
+
+    def _run_payload(run_id: int) -> dict:
+        return {
+            "id": run_id,
+            "run_number": run_id,
+            "status": STATUS_COMPLETED,
+            "conclusion": CONCLUSION_SUCCESS,
+            "created_at": CREATED_AT,
+            "updated_at": UPDATED_AT,
+            "head_sha": HEAD_SHA,
+        }
+
+    first_route = respx.get(
+        f"{DEFAULT_BASE_URL}/repos/{REPO}/actions/runs",
+        params={"per_page": 100, "page": 1, "created": f">={created_since}"},
+    ).mock(
+        return_value=httpx.Response(
+            200,
+            json={"workflow_runs": [_run_payload(12), _run_payload(11), _run_payload(10)]},
+            headers={"Link": "<https://api.github.com/resource?page=2>; rel=\"next\""},
+        )
+    )
+    second_route = respx.get(
+        f"{DEFAULT_BASE_URL}/repos/{REPO}/actions/runs",
+        params={"page": 2},
+    ).mock(return_value=httpx.Response(200, json={"workflow_runs": []}))
+
+    runs = client.list_workflow_runs(
+        REPO,
+        per_page=100,
+        created_since=created_since,
+        stop_at_run_id=11,
+    )
+
+    assert first_route.called
+    assert not second_route.called
+    assert [run.id for run in runs] == [12]
+
+
+@respx.mock
+def test_get_workflow_run_fetches_one_run():
+    client = GitHubActionsClient(token=TOKEN)
+    route = respx.get(
+        f"{DEFAULT_BASE_URL}/repos/{REPO}/actions/runs/{RUN_ID}",
+        headers={HEADER_AUTHORIZATION: f"{AUTH_SCHEME} {TOKEN}"},
+    ).mock(
+        return_value=httpx.Response(
+            200,
+            json={
+                "id": RUN_ID,
+                "run_number": RUN_NUMBER,
+                "status": STATUS_COMPLETED,
+                "conclusion": CONCLUSION_SUCCESS,
+                "created_at": CREATED_AT,
+                "updated_at": UPDATED_AT,
+                "head_sha": HEAD_SHA,
+            },
+        )
+    )
+
+    run = client.get_workflow_run(REPO, RUN_ID)
+
+    assert route.called
+    assert run == WorkflowRun(
+        id=RUN_ID,
+        run_number=RUN_NUMBER,
+        status=STATUS_COMPLETED,
+        conclusion=CONCLUSION_SUCCESS,
+        created_at=CREATED_AT,
+        updated_at=UPDATED_AT,
+        head_sha=HEAD_SHA,
+    )
@@ -6,6 +6,7 @@ import respx
 
 from ci_hunter.github.artifacts import (
     fetch_junit_durations_from_artifacts,
+    fetch_junit_report_from_artifacts,
     fetch_junit_test_outcomes_from_artifacts,
 )
 from ci_hunter.github.client import (
@@ -17,7 +18,7 @@ from ci_hunter.github.client import (
     HEADER_API_VERSION,
     HEADER_AUTHORIZATION,
 )
-from ci_hunter.junit import TEST_OUTCOME_FAILED, TestDuration, TestOutcome
+from ci_hunter.junit import TEST_OUTCOME_FAILED, TEST_OUTCOME_PASSED, TestDuration, TestOutcome
 
 REPO = "acme/repo"
 RUN_ID = 123
@@ -142,3 +143,75 @@ def test_fetch_junit_test_outcomes_from_artifacts():
     assert outcomes == [
         TestOutcome(name="pkg.test_a::test_one", outcome=TEST_OUTCOME_FAILED)
     ]
+
+
+@respx.mock
+def test_fetch_junit_report_from_artifacts_downloads_each_artifact_once():
+    list_route = respx.get(
+        f"{DEFAULT_BASE_URL}/repos/{REPO}/actions/runs/{RUN_ID}/artifacts",
+    ).mock(
+        return_value=httpx.Response(
+            200,
+            json={"artifacts": [{"id": ARTIFACT_ID, "name": "junit-report"}]},
+        )
+    )
+
+    xml_text = """<?xml version="1.0" encoding="UTF-8"?>
+<testsuite name="suite" tests="2" time="2.0">
+  <testcase classname="pkg.test_a" name="test_one" time="1.5">
+    <failure message="boom">trace</failure>
+  </testcase>
+  <testcase classname="pkg.test_a" name="test_two" time="0.5" />
+</testsuite>
+"""
+    download_route = respx.get(
+        f"{DEFAULT_BASE_URL}/repos/{REPO}/actions/artifacts/{ARTIFACT_ID}/zip",
+    ).mock(
+        return_value=httpx.Response(
+            200,
+            content=_make_zip_bytes("junit.xml", xml_text),
+            headers={"Content-Type": "application/zip"},
+        )
+    )
+
+    report = fetch_junit_report_from_artifacts(
+        token=TOKEN,
+        repo=REPO,
+        run_id=RUN_ID,
+    )
+
+    assert list_route.call_count == 1
+    assert download_route.call_count == 1
+    assert report.durations == [
+        TestDuration(name="pkg.test_a::test_one", duration_seconds=1.5),
+        TestDuration(name="pkg.test_a::test_two", duration_seconds=0.5),
+    ]
+    assert report.outcomes == [
+        TestOutcome(name="pkg.test_a::test_one", outcome=TEST_OUTCOME_FAILED),
+        TestOutcome(name="pkg.test_a::test_two", outcome=TEST_OUTCOME_PASSED),
+    ]
+
+
+@respx.mock
+def test_fetch_junit_report_from_artifacts_follows_redirect_to_signed_url():
+    signed_url = "https://pipelines.actions.githubusercontent.com/artifact.zip?sig=abc"
+    respx.get(f"{DEFAULT_BASE_URL}/repos/{REPO}/actions/runs/{RUN_ID}/artifacts").mock(
+        return_value=httpx.Response(200, json={"artifacts": [{"id": ARTIFACT_ID}]})
+    )
+    respx.get(f"{DEFAULT_BASE_URL}/repos/{REPO}/actions/artifacts/{ARTIFACT_ID}/zip").mock(
+        return_value=httpx.Response(302, headers={"Location": signed_url})
+    )
+    xml_bytes = b'<testsuite><testcase classname="pkg" name="t\xff" time="2" /></testsuite>'
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        zip_file.writestr("reports/junit.xml", xml_bytes)
+        zip_file.writestr("reports/readme.txt", "not junit")
+    signed_route = respx.get(signed_url).mock(
+        return_value=httpx.Response(200, content=buffer.getvalue())
+    )
+
+    report = fetch_junit_report_from_artifacts(token=TOKEN, repo=REPO, run_id=RUN_ID)
+
+    assert signed_route.called
+    assert report.durations == [TestDuration(name="pkg::t�", duration_seconds=2.0)]
+    assert report.outcomes == [TestOutcome(name="pkg::t�", outcome=TEST_OUTCOME_PASSED)]
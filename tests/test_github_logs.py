@@ -104,3 +104,27 @@ def test_fetch_run_step_durations_follows_redirect_to_signed_url():
         StepDuration(name="build_job/Install deps", duration_seconds=25.0),
         StepDuration(name="build_job/Run tests", duration_seconds=20.0),
     ]
+
+
+@respx.mock
+def test_fetch_run_step_durations_streams_multiple_members():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        zip_file.writestr(
+            "build.txt",
+            "2024-01-01T00:00:00.0000000Z  Step: Checkout\r\n"
+            + "2024-01-01T00:00:01.0000000Z  noise\r\n" * 5000
+            + "2024-01-01T00:00:30.0000000Z  [command] done\r\n",
+        )
+        zip_file.writestr("logs/", "")
+        zip_file.writestr("lint.txt", b"2024-01-01T00:00:00Z  Step: Lint \xff\n2024-01-01T00:00:04Z  end\n")
+    respx.get(f"{DEFAULT_BASE_URL}/repos/{REPO}/actions/runs/{RUN_ID}/logs").mock(
+        return_value=httpx.Response(200, content=buffer.getvalue())
+    )
+
+    durations = fetch_run_step_durations(TOKEN, REPO, RUN_ID)
+
+    assert durations == [
+        StepDuration(name="build/Checkout", duration_seconds=30.0),
+        StepDuration(name="lint/Lint �", duration_seconds=4.0),
+    ]
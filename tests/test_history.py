@@ -0,0 +1,58 @@
+from ci_hunter.history import (
+    OUTCOME_CODE_FAILED,
+    OUTCOME_CODE_OTHER,
+    OUTCOME_CODE_PASSED,
+    DurationHistory,
+    OutcomeHistory,
+)
+from ci_hunter.storage import StepDurationSample, TestOutcomeSample
+
+STEP_CHECKOUT = "build/Checkout"
+STEP_TESTS = "build/Run tests"
+
+
+def test_duration_history_groups_rows_by_interned_name():
+    history = DurationHistory.from_rows(
+        [
+            (1, STEP_CHECKOUT, 5.0),
+            (1, STEP_TESTS, 30.0),
+            (2, STEP_CHECKOUT, 6.0),
+        ]
+    )
+
+    assert len(history) == 2
+    assert history.names == [STEP_CHECKOUT, STEP_TESTS]
+    assert history.metric_id(STEP_TESTS) == 1
+    assert [(name, list(values)) for name, values in history.series()] == [
+        (STEP_CHECKOUT, [5.0, 6.0]),
+        (STEP_TESTS, [30.0]),
+    ]
+
+
+def test_duration_history_orders_out_of_order_samples_by_run_number():
+    history = DurationHistory.from_samples(
+        [
+            StepDurationSample(run_number=3, step_name=STEP_CHECKOUT, duration_seconds=3.0),
+            StepDurationSample(run_number=1, step_name=STEP_CHECKOUT, duration_seconds=1.0),
+            StepDurationSample(run_number=2, step_name=STEP_CHECKOUT, duration_seconds=2.0),
+        ]
+    )
+
+    assert list(history.run_numbers(STEP_CHECKOUT)) == [1, 2, 3]
+    assert list(history.values(STEP_CHECKOUT)) == [1.0, 2.0, 3.0]
+
+
+def test_outcome_history_encodes_outcomes():
+    history = OutcomeHistory.from_samples(
+        [
+            TestOutcomeSample(run_number=1, test_name="t", outcome="passed"),
+            TestOutcomeSample(run_number=2, test_name="t", outcome=" FAILED "),
+            TestOutcomeSample(run_number=3, test_name="t", outcome="skipped"),
+        ]
+    )
+
+    assert list(history.values("t")) == [
+        OUTCOME_CODE_PASSED,
+        OUTCOME_CODE_FAILED,
+        OUTCOME_CODE_OTHER,
+    ]
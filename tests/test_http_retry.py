@@ -1,9 +1,18 @@
+import io
 from unittest import mock
 
 import httpx
 import respx
 
-from ci_hunter.github.http import request_with_retry, RETRY_STATUS_CODES
+from ci_hunter.github.http import (
+    HttpClientConfig,
+    RETRY_STATUS_CODES,
+    close_http_client,
+    configure_http_client,
+    download_with_retry,
+    get_http_client,
+    request_with_retry,
+)
 
 
 @respx.mock
@@ -76,3 +85,80 @@ def test_request_with_retry_honors_retry_after_header():
     sleeper.assert_called()
     assert sleeper.call_args.args[0] >= 2
     assert response.json() == {"ok": True}
+
+
+def test_get_http_client_reuses_shared_pooled_client():
+    close_http_client()
+    try:
+        first = get_http_client()
+        second = get_http_client()
+    finally:
+        close_http_client()
+
+    assert first is second
+    assert first.is_closed
+
+
+def test_configure_http_client_replaces_shared_client():
+    close_http_client()
+    try:
+        original = get_http_client()
+        configure_http_client(HttpClientConfig(max_connections=4, max_keepalive_connections=2))
+        replacement = get_http_client()
+    finally:
+        configure_http_client(HttpClientConfig())
+        close_http_client()
+
+    assert original.is_closed
+    assert replacement is not original
+
+
+def test_configure_http_client_rejects_non_positive_pool():
+    try:
+        configure_http_client(HttpClientConfig(max_connections=0))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Expected ValueError")
+
+
+def test_request_with_retry_uses_explicit_client():
+    url = "https://api.github.com/explicit"
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"ok": True}))
+
+    with httpx.Client(transport=transport) as client:
+        response = request_with_retry("GET", url, client=client)
+
+    assert response.json() == {"ok": True}
+
+
+@respx.mock
+def test_download_with_retry_streams_body_and_rewinds_destination():
+    url = "https://api.github.com/download"
+    route = respx.get(url).mock(
+        side_effect=[
+            httpx.Response(503),
+            httpx.Response(200, content=b"zip-bytes"),
+        ]
+    )
+    destination = io.BytesIO(b"stale data from a previous attempt")
+
+    with mock.patch("time.sleep"):
+        written = download_with_retry("GET", url, destination, max_retries=1, chunk_size=4)
+
+    assert route.call_count == 2
+    assert written == len(b"zip-bytes")
+    assert destination.read() == b"zip-bytes"
+
+
+@respx.mock
+def test_download_with_retry_raises_on_non_retryable_status():
+    url = "https://api.github.com/download-missing"
+    respx.get(url).mock(return_value=httpx.Response(404))
+
+    try:
+        download_with_retry("GET", url, io.BytesIO())
+    except httpx.HTTPStatusError as exc:
+        assert exc.response.status_code == 404
+    else:
+        raise AssertionError("Expected HTTPStatusError")
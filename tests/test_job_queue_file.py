@@ -0,0 +1,102 @@
+from dataclasses import replace
+from pathlib import Path
+
+from ci_hunter.job_queue_file import (
+    ack_job,
+    append_job,
+    claim_jobs,
+    journal_path,
+    pending_job_count,
+    requeue_jobs,
+)
+from ci_hunter.queue import AnalysisJob
+
+REPO = "acme/repo"
+
+
+def _job(pr_number: int) -> AnalysisJob:
+    return AnalysisJob(repo=REPO, pr_number=pr_number, commit=None, branch=None)
+
+
+def _fill(path: Path, *pr_numbers: int) -> None:
+    for pr_number in pr_numbers:
+        append_job(str(path), _job(pr_number))
+
+
+def test_claim_moves_jobs_into_the_journal(tmp_path):
+    path = tmp_path / "queue.jsonl"
+    _fill(path, 1, 2, 3)
+
+    first = claim_jobs(path, 2, visibility_timeout_seconds=60)
+    second = claim_jobs(path, 2, visibility_timeout_seconds=60)
+
+    assert [claim.job for claim in first] == [_job(1), _job(2)]
+    assert [claim.job for claim in second] == [_job(3)]
+    assert first[0].lease != second[0].lease
+    assert pending_job_count(path) == 0
+    assert len(journal_path(path).read_text(encoding="utf-8").splitlines()) == 3
+
+
+def test_ack_removes_only_the_acked_claim(tmp_path):
+    path = tmp_path / "queue.jsonl"
+    _fill(path, 1, 2)
+    done, unfinished = claim_jobs(path, 2, visibility_timeout_seconds=60)
+
+    assert ack_job(path, done) is True
+    assert ack_job(path, done) is False
+    assert requeue_jobs(path, [unfinished]) == 1
+    assert not journal_path(path).exists()
+    assert [claim.job for claim in claim_jobs(path, 5, visibility_timeout_seconds=60)] == [_job(2)]
+
+
+def test_expired_claims_are_claimed_again_first(tmp_path):
+    path = tmp_path / "queue.jsonl"
+    _fill(path, 1)
+    clock = [1000.0]
+    [stale] = claim_jobs(path, 1, visibility_timeout_seconds=30, clock=lambda: clock[0])
+    _fill(path, 2)
+
+    clock[0] += 31
+    reclaimed = claim_jobs(path, 5, visibility_timeout_seconds=30, clock=lambda: clock[0])
+
+    assert [claim.job for claim in reclaimed] == [_job(1), _job(2)]
+    assert ack_job(path, stale) is False
+    assert requeue_jobs(path, [stale]) == 0
+    assert all(ack_job(path, claim) for claim in reclaimed)
+
+
+def test_claim_reports_invalid_lines(tmp_path):
+    path = tmp_path / "queue.jsonl"
+    path.write_text('not-json\n{"repo":"acme/repo","pr_number":1}\n', encoding="utf-8")
+    warnings: list[str] = []
+
+    [claim] = claim_jobs(path, 5, visibility_timeout_seconds=60, warn=warnings.append)
+
+    assert claim.job == _job(1)
+    assert warnings == ["queue.jsonl:1: skipping invalid queue line"]
+
+
+def test_claim_coalesces_waiting_jobs_for_the_same_pr(tmp_path):
+    path = tmp_path / "queue.jsonl"
+    older = AnalysisJob(repo=REPO, pr_number=1, commit="old", branch=None)
+    newer = AnalysisJob(repo=REPO, pr_number=1, commit="new", branch=None)
+    for job in (older, _job(2), newer, _job(3), replace(newer, commit="newest")):
+        append_job(str(path), job)
+
+    [claim] = claim_jobs(path, 1, visibility_timeout_seconds=60)
+
+    assert claim.job == replace(newer, commit="newest")
+    assert claim.coalesced == 2
+    assert pending_job_count(path) == 2
+
+
+def test_coalesced_counts_survive_requeue(tmp_path):
+    path = tmp_path / "queue.jsonl"
+    _fill(path, 2, 1, 1)
+    first, second = claim_jobs(path, 2, visibility_timeout_seconds=60)
+    requeue_jobs(path, [first, second])
+    _fill(path, 1)
+
+    claimed = claim_jobs(path, 5, visibility_timeout_seconds=60)
+
+    assert [(claim.job, claim.coalesced) for claim in claimed] == [(_job(2), 0), (_job(1), 2)]
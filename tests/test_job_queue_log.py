@@ -0,0 +1,200 @@
+from dataclasses import replace
+
+import pytest
+
+from ci_hunter.job_queue_log import JobLog
+from ci_hunter.queue import AnalysisJob
+
+REPO = "acme/repo"
+
+
+def _job(pr_number: int) -> AnalysisJob:
+    return AnalysisJob(repo=REPO, pr_number=pr_number, commit=None, branch=None)
+
+
+def _segments(log: JobLog) -> list[str]:
+    return sorted(path.name for path in log.directory.glob("*.log"))
+
+
+def test_append_assigns_sequential_offsets(tmp_path):
+    log = JobLog(tmp_path / "queue")
+
+    assert log.append_job(_job(1)) == 0
+    assert log.append_jobs([_job(2), _job(3)]) == [1, 2]
+    assert log.pending_job_count("default") == 3
+
+
+def test_claims_read_from_each_group_cursor(tmp_path):
+    log = JobLog(tmp_path / "queue")
+    log.append_jobs([_job(1), _job(2), _job(3)])
+
+    first = log.claim_jobs("default", 2, visibility_timeout_seconds=60)
+    second = log.claim_jobs("default", 2, visibility_timeout_seconds=60)
+    other_group = log.claim_jobs("audit", 5, visibility_timeout_seconds=60)
+
+    assert [claim.job for claim in first] == [_job(1), _job(2)]
+    assert [claim.job for claim in second] == [_job(3)]
+    assert [claim.job for claim in other_group] == [_job(1), _job(2), _job(3)]
+    assert log.claim_jobs("default", 2, visibility_timeout_seconds=60) == []
+    assert log.pending_job_count("default") == 0
+
+
+def test_requeued_and_expired_jobs_are_claimed_before_unread_records(tmp_path):
+    log = JobLog(tmp_path / "queue")
+    log.append_jobs([_job(1), _job(2), _job(3)])
+    clock = [1000.0]
+    [stale] = log.claim_jobs("default", 1, visibility_timeout_seconds=30, clock=lambda: clock[0])
+    [failed] = log.claim_jobs("default", 1, visibility_timeout_seconds=30, clock=lambda: clock[0])
+    assert log.requeue_jobs("default", [failed]) == 1
+
+    clock[0] += 31
+    claimed = log.claim_jobs("default", 5, visibility_timeout_seconds=30, clock=lambda: clock[0])
+
+    assert [claim.job for claim in claimed] == [_job(1), _job(2), _job(3)]
+    assert log.ack_job("default", stale) is False
+    assert all(log.ack_job("default", claim) for claim in claimed)
+
+
+def test_segments_rotate_and_are_compacted_once_every_group_reads_past(tmp_path):
+    log = JobLog(tmp_path / "queue", segment_max_bytes=1)
+    log.append_jobs([_job(1), _job(2)])
+    log.append_job(_job(3))
+    log.append_job(_job(4))
+    assert _segments(log) == [f"{0:020d}.log", f"{2:020d}.log", f"{3:020d}.log"]
+    log.claim_jobs("audit", 1, visibility_timeout_seconds=60)
+
+    claimed = log.claim_jobs("default", 3, visibility_timeout_seconds=60)
+
+    assert [claim.job for claim in claimed] == [_job(1), _job(2), _job(3)]
+    # "audit" still reads the first segment.
+    assert len(_segments(log)) == 3
+    log.claim_jobs("audit", 3, visibility_timeout_seconds=60)
+    assert _segments(log) == [f"{3:020d}.log"]
+    assert [claim.job for claim in log.claim_jobs("default", 3, visibility_timeout_seconds=60)] == [
+        _job(4)
+    ]
+
+
+def test_torn_final_record_is_ignored_and_overwritten(tmp_path):
+    log = JobLog(tmp_path / "queue")
+    log.append_job(_job(1))
+    [segment] = log.directory.glob("*.log")
+    with open(segment, "ab") as handle:
+        handle.write(b'{"offset":1,"repo":"acme/re')
+
+    assert [claim.job for claim in log.claim_jobs("default", 5, visibility_timeout_seconds=60)] == [
+        _job(1)
+    ]
+    assert log.append_job(_job(2)) == 1
+    assert [claim.job for claim in log.claim_jobs("default", 5, visibility_timeout_seconds=60)] == [
+        _job(2)
+    ]
+
+
+def test_claim_cost_is_independent_of_backlog(tmp_path, monkeypatch):
+    import json
+
+    import ci_hunter.job_queue_log as job_queue_log
+
+    log = JobLog(tmp_path / "queue")
+    log.append_jobs(_job(number) for number in range(1, 1001))
+    log.claim_jobs("default", 1, visibility_timeout_seconds=60)
+    decoded = [0]
+    real_loads = json.loads
+
+    def counting_loads(text, *args, **kwargs):
+        decoded[0] += 1
+        return real_loads(text, *args, **kwargs)
+
+    monkeypatch.setattr(job_queue_log.json, "loads", counting_loads)
+    log.claim_jobs("default", 2, visibility_timeout_seconds=60)
+
+    # The group state, the latest-offset index and the two records read.
+    assert decoded[0] == 4
+
+
+def test_rejects_invalid_options(tmp_path):
+    with pytest.raises(ValueError, match="fsync"):
+        JobLog(tmp_path, fsync="sometimes")
+    with pytest.raises(ValueError, match="consumer group"):
+        JobLog(tmp_path).claim_jobs("../other", 1, visibility_timeout_seconds=60)
+
+
+def test_newer_records_for_a_pr_supersede_unread_older_ones(tmp_path):
+    log = JobLog(tmp_path / "queue")
+    older = AnalysisJob(repo=REPO, pr_number=1, commit="old", branch=None)
+    newer = AnalysisJob(repo=REPO, pr_number=1, commit="new", branch=None)
+    log.append_jobs([older, _job(2), replace(older, commit="mid")])
+    log.append_job(newer)
+
+    first = log.claim_jobs("default", 1, visibility_timeout_seconds=60)
+    rest = log.claim_jobs("default", 5, visibility_timeout_seconds=60)
+
+    assert [(claim.job, claim.coalesced) for claim in first] == [(_job(2), 0)]
+    assert [(claim.job, claim.coalesced) for claim in rest] == [(newer, 2)]
+
+
+def test_claimed_jobs_are_not_superseded(tmp_path):
+    log = JobLog(tmp_path / "queue")
+    log.append_job(AnalysisJob(repo=REPO, pr_number=1, commit="old", branch=None))
+    [running] = log.claim_jobs("default", 1, visibility_timeout_seconds=60)
+    log.append_job(AnalysisJob(repo=REPO, pr_number=1, commit="new", branch=None))
+
+    [queued] = log.claim_jobs("default", 1, visibility_timeout_seconds=60)
+
+    assert running.job.commit == "old"
+    assert queued.job.commit == "new"
+
+
+def test_appends_add_to_the_latest_index_without_rewriting_it(tmp_path):
+    log = JobLog(tmp_path / "queue")
+    log.append_job(_job(1))
+    latest = log.directory / "latest.keys"
+    inode = latest.stat().st_ino
+
+    log.append_job(_job(2))
+    log.append_job(_job(1))
+
+    # Rewrites replace the file, so the same inode means the entries were appended.
+    assert latest.stat().st_ino == inode
+    assert latest.read_bytes().count(b"\n") == 3
+    assert [claim.job for claim in log.claim_jobs("default", 5, visibility_timeout_seconds=60)] == [
+        _job(2),
+        _job(1),
+    ]
+
+
+def test_reads_drop_superseded_entries_from_the_latest_index(tmp_path):
+    log = JobLog(tmp_path / "queue")
+    log.append_jobs(_job(1) for _ in range(1500))
+    latest = log.directory / "latest.keys"
+    assert latest.read_bytes().count(b"\n") == 1500
+
+    [claim] = log.claim_jobs("default", 5, visibility_timeout_seconds=60)
+
+    assert claim.coalesced == 1499
+    assert latest.read_bytes() == b'["acme/repo",1,1499]\n'
+
+
+def test_latest_index_survives_a_torn_entry_and_the_old_format(tmp_path):
+    log = JobLog(tmp_path / "queue")
+    log.append_jobs([_job(1), _job(2)])
+    latest = log.directory / "latest.keys"
+    # A map written in one line, as before appends, followed by a torn append.
+    latest.write_bytes(b'[["acme/repo",1,0],["acme/repo",2,1]]\n["acme/re')
+    log.append_job(_job(1))
+
+    claimed = log.claim_jobs("default", 5, visibility_timeout_seconds=60)
+
+    assert [(claim.job, claim.coalesced) for claim in claimed] == [(_job(2), 0), (_job(1), 1)]
+
+
+def test_coalescing_can_be_disabled(tmp_path):
+    log = JobLog(tmp_path / "queue", coalesce=False)
+    log.append_jobs([_job(1), _job(1)])
+
+    claimed = log.claim_jobs("default", 1, visibility_timeout_seconds=60)
+    claimed += log.claim_jobs("default", 1, visibility_timeout_seconds=60)
+
+    assert [claim.job for claim in claimed] == [_job(1), _job(1)]
+    assert not (log.directory / "latest.keys").exists()
@@ -1,10 +1,15 @@
+import io
+
 from ci_hunter.junit import (
     TEST_OUTCOME_FAILED,
     TEST_OUTCOME_PASSED,
     TEST_OUTCOME_SKIPPED,
     TestDuration,
     TestOutcome,
+    iter_junit_results,
     parse_junit_durations,
+    parse_junit_report,
+    parse_junit_report_stream,
     parse_junit_test_outcomes,
 )
 
@@ -45,3 +50,59 @@ def test_parse_junit_test_outcomes_from_xml():
         TestOutcome(name="pkg.test_b::test_fail", outcome=TEST_OUTCOME_FAILED),
         TestOutcome(name="pkg.test_c::test_skip", outcome=TEST_OUTCOME_SKIPPED),
     ]
+
+
+def test_parse_junit_report_returns_durations_and_outcomes():
+    xml_text = """<?xml version="1.0" encoding="UTF-8"?>
+<testsuites>
+  <testsuite name="suite">
+    <testcase classname="pkg.test_a" name="test_pass" time="bad" />
+    <testcase name="test_skip" time="0.25">
+      <skipped />
+    </testcase>
+  </testsuite>
+</testsuites>
+"""
+
+    report = parse_junit_report(xml_text)
+
+    assert report.durations == [
+        TestDuration(name="pkg.test_a::test_pass", duration_seconds=0.0),
+        TestDuration(name="test_skip", duration_seconds=0.25),
+    ]
+    assert report.outcomes == [
+        TestOutcome(name="pkg.test_a::test_pass", outcome=TEST_OUTCOME_PASSED),
+        TestOutcome(name="test_skip", outcome=TEST_OUTCOME_SKIPPED),
+    ]
+
+
+def test_parse_junit_report_stream_reads_binary_source():
+    xml_bytes = b"""<?xml version="1.0" encoding="UTF-8"?>
+<testsuite name="suite">
+  <testcase classname="pkg.test_a" name="test_fail" time="1.0">
+    <error message="boom" />
+  </testcase>
+</testsuite>
+"""
+
+    report = parse_junit_report_stream(io.BytesIO(xml_bytes))
+
+    assert report.durations == [TestDuration(name="pkg.test_a::test_fail", duration_seconds=1.0)]
+    assert report.outcomes == [TestOutcome(name="pkg.test_a::test_fail", outcome=TEST_OUTCOME_FAILED)]
+
+
+def test_iter_junit_results_yields_testcases_incrementally():
+    count = 2000
+    cases = "".join(
+        f'<testcase classname="pkg" name="test_{index}" time="0.5"><skipped /></testcase>'
+        for index in range(count)
+    )
+    source = io.StringIO(f"<testsuites><testsuite>{cases}</testsuite></testsuites>")
+
+    results = iter_junit_results(source)
+    first_duration, first_outcome = next(results)
+    remaining = list(results)
+
+    assert first_duration == TestDuration(name="pkg::test_0", duration_seconds=0.5)
+    assert first_outcome == TestOutcome(name="pkg::test_0", outcome=TEST_OUTCOME_SKIPPED)
+    assert len(remaining) == count - 1
@@ -1,3 +1,4 @@
+import importlib.util
 from pathlib import Path
 
 
@@ -19,3 +20,116 @@ def test_initial_migration_defines_core_tables():
     assert "step_durations" in initial_text
     assert "test_durations" in initial_text
     assert "test_outcomes" in initial_text
+
+
+def _load_migration(filename: str):
+    spec = importlib.util.spec_from_file_location(
+        filename.removesuffix(".py"),
+        REPO_ROOT / "migrations" / "versions" / filename,
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_history_index_migrations_cover_sqlite_indexes():
+    from ci_hunter.storage import HISTORY_INDEXES
+
+    index_migration = _load_migration("0002_history_indexes.py")
+    run_columns_migration = _load_migration("0003_timing_run_columns.py")
+    metric_names_migration = _load_migration("0004_metric_names.py")
+
+    assert index_migration.down_revision == "0001_initial_schema"
+    assert run_columns_migration.down_revision == index_migration.revision
+    assert metric_names_migration.down_revision == run_columns_migration.revision
+    migrated = {
+        (f"ix_{table}_repo_metric_id_run_number", table, ("repo", "metric_id", "run_number", value_column))
+        for table, _name_column, value_column, _kind in metric_names_migration.TIMING_TABLES
+    }
+    index_text = (REPO_ROOT / "migrations" / "versions" / "0002_history_indexes.py").read_text(
+        encoding="utf-8"
+    )
+    for index_name, table, columns in HISTORY_INDEXES:
+        if table == "workflow_runs":
+            assert index_name in index_text
+        else:
+            assert (index_name, table, columns) in migrated
+
+
+def test_timing_partition_migration_is_opt_in_and_matches_storage_naming():
+    from ci_hunter.storage import TIMING_TABLES, timing_partition_name
+
+    metric_names_migration = _load_migration("0004_metric_names.py")
+    partition_migration = _load_migration("0005_timing_partitions.py")
+
+    assert partition_migration.down_revision == metric_names_migration.revision
+    assert [table for table, _value, _type in partition_migration.TIMING_TABLES] == list(
+        TIMING_TABLES
+    )
+    assert partition_migration.partition_name("test_durations", 2024, 3) == timing_partition_name(
+        "test_durations", 2024, 3
+    )
+    migration_text = (REPO_ROOT / "migrations" / "versions" / "0005_timing_partitions.py").read_text(
+        encoding="utf-8"
+    )
+    assert "if not partition_timings_enabled():" in migration_text
+    assert "PARTITION BY RANGE (created_at)" in migration_text
+
+
+def test_metric_rollups_migration_follows_partitions():
+    partition_migration = _load_migration("0005_timing_partitions.py")
+    rollups_migration = _load_migration("0006_metric_rollups.py")
+
+    assert rollups_migration.down_revision == partition_migration.revision
+    rollups_text = (REPO_ROOT / "migrations" / "versions" / "0006_metric_rollups.py").read_text(
+        encoding="utf-8"
+    )
+    for column in ("recent", "sample_count", "value_sum", "sketch"):
+        assert f'"{column}"' in rollups_text
+
+
+def test_analysis_jobs_migration_follows_rollups():
+    rollups_migration = _load_migration("0006_metric_rollups.py")
+    jobs_migration = _load_migration("0007_analysis_jobs.py")
+
+    assert jobs_migration.down_revision == rollups_migration.revision
+    jobs_text = (REPO_ROOT / "migrations" / "versions" / "0007_analysis_jobs.py").read_text(
+        encoding="utf-8"
+    )
+    for column in ("visible_at", "lease_token", "attempts"):
+        assert f'"{column}"' in jobs_text
+
+
+def test_analysis_job_coalescing_migration_follows_jobs_table():
+    jobs_migration = _load_migration("0007_analysis_jobs.py")
+    coalescing_migration = _load_migration("0008_analysis_job_coalescing.py")
+
+    assert coalescing_migration.down_revision == jobs_migration.revision
+
+
+def test_empty_timing_fetches_migration_follows_job_coalescing():
+    coalescing_migration = _load_migration("0008_analysis_job_coalescing.py")
+    empty_fetches_migration = _load_migration("0009_empty_timing_fetches.py")
+
+    assert empty_fetches_migration.down_revision == coalescing_migration.revision
+
+
+def test_metric_rollup_state_migration_follows_empty_timing_fetches():
+    empty_fetches_migration = _load_migration("0009_empty_timing_fetches.py")
+    rollup_state_migration = _load_migration("0010_metric_rollup_state.py")
+
+    assert rollup_state_migration.down_revision == empty_fetches_migration.revision
+
+
+def test_outdated_timing_fetches_migration_follows_rollup_state():
+    rollup_state_migration = _load_migration("0010_metric_rollup_state.py")
+    outdated_migration = _load_migration("0011_outdated_timing_fetches.py")
+
+    assert outdated_migration.down_revision == rollup_state_migration.revision
+
+
+def test_empty_timing_fetch_attempts_migration_follows_outdated_timing_fetches():
+    outdated_migration = _load_migration("0011_outdated_timing_fetches.py")
+    attempts_migration = _load_migration("0012_empty_timing_fetch_attempts.py")
+
+    assert attempts_migration.down_revision == outdated_migration.revision
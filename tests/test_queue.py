@@ -1,4 +1,4 @@
-from ci_hunter.queue import AnalysisJob, InMemoryJobQueue
+from ci_hunter.queue import AnalysisJob, InMemoryJobQueue, coalesce_jobs
 
 REPO = "acme/repo"
 PR_NUMBER = 11
@@ -18,3 +18,31 @@ def test_in_memory_queue_is_fifo():
     assert queue.dequeue() == second
     assert queue.dequeue() is None
 
+
+
+def test_in_memory_queue_coalesces_pending_jobs_for_the_same_pr():
+    queue = InMemoryJobQueue()
+    older = AnalysisJob(repo=REPO, pr_number=PR_NUMBER, commit="old", branch=BRANCH)
+    other = AnalysisJob(repo=REPO, pr_number=PR_NUMBER + 1, commit=None, branch=None)
+    newer = AnalysisJob(repo=REPO, pr_number=PR_NUMBER, commit="new", branch=BRANCH)
+
+    queue.enqueue(older)
+    queue.enqueue(other)
+    queue.enqueue(newer)
+
+    assert queue.coalesced_count == 1
+    assert queue.dequeue() == newer
+    assert queue.dequeue() == other
+    assert queue.dequeue() is None
+
+
+def test_coalesce_jobs_keeps_newest_job_at_oldest_position():
+    first = AnalysisJob(repo=REPO, pr_number=PR_NUMBER, commit="a", branch=None)
+    other = AnalysisJob(repo=REPO, pr_number=PR_NUMBER + 1, commit=None, branch=None)
+    second = AnalysisJob(repo=REPO, pr_number=PR_NUMBER, commit="b", branch=None)
+    third = AnalysisJob(repo=REPO, pr_number=PR_NUMBER, commit="c", branch=None)
+
+    assert coalesce_jobs([(first, 2), (other, 0), (second, 0), (third, 1)]) == [
+        (third, 5),
+        (other, 0),
+    ]
@@ -23,6 +23,8 @@ def test_render_markdown_report():
         step_timings_failed=3,
         test_timings_attempted=10,
         test_timings_failed=4,
+        step_timings_skipped=6,
+        test_timings_skipped=0,
         flakes=[
             Flake(
                 test_name="tests.alpha::test_x",
@@ -61,6 +63,8 @@ def test_render_markdown_report():
     assert "+50.0%" in report
     assert "Step data missing for 3/10 runs" in report
     assert "Test data missing for 4/10 runs" in report
+    assert "Step data already stored for 6 runs" in report
+    assert "Test data already stored" not in report
     assert "Flaky tests" in report
     assert "tests.alpha::test_x" in report
     assert "Step change points" in report
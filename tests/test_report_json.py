@@ -39,6 +39,8 @@ def test_render_json_report():
         step_timings_failed=3,
         test_timings_attempted=10,
         test_timings_failed=4,
+        step_timings_skipped=6,
+        test_timings_skipped=0,
         flakes=[
             Flake(
                 test_name="tests.alpha::test_x",
@@ -79,6 +81,8 @@ def test_render_json_report():
     assert payload["step_timings_failed"] == 3
     assert payload["test_timings_attempted"] == 10
     assert payload["test_timings_failed"] == 4
+    assert payload["step_timings_skipped"] == 6
+    assert payload["test_timings_skipped"] == 0
     assert payload["flakes"][0]["test_name"] == "tests.alpha::test_x"
     assert payload["step_change_points"][0]["metric"] == "Checkout"
     assert payload["test_change_points"][0]["metric"] == "tests.alpha"
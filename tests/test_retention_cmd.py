@@ -0,0 +1,109 @@
+import io
+from datetime import date
+
+import pytest
+
+from ci_hunter.github.client import WorkflowRun
+from ci_hunter.junit import TestDuration
+from ci_hunter.retention_cmd import main
+from ci_hunter.storage import METRIC_KIND_TEST, Storage, StorageConfig
+
+REPO = "acme/repo"
+TEST_NAME = "tests.test_alpha"
+TODAY = date(2024, 4, 1)
+
+
+def _seed(db_path: str) -> None:
+    storage = Storage(StorageConfig(database_url=db_path))
+    storage.save_workflow_runs(
+        REPO,
+        [
+            WorkflowRun(
+                id=run_number,
+                run_number=run_number,
+                status="completed",
+                conclusion="success",
+                created_at=created_at,
+                updated_at=created_at,
+                head_sha=f"sha-{run_number}",
+            )
+            for run_number, created_at in (
+                (1, "2024-01-01T00:00:00Z"),
+                (2, "2024-01-02T00:00:00Z"),
+                (3, "2024-03-30T00:00:00Z"),
+            )
+        ],
+    )
+    for run_number in range(1, 4):
+        storage.save_test_durations(
+            REPO, run_number, [TestDuration(name=TEST_NAME, duration_seconds=1.0)]
+        )
+    storage.close()
+
+
+def _remaining_run_numbers(db_path: str) -> list[int]:
+    storage = Storage(StorageConfig(database_url=db_path))
+    try:
+        return [sample.run_number for sample in storage.list_test_durations(REPO)]
+    finally:
+        storage.close()
+
+
+def test_retention_cmd_deletes_rows_older_than_horizon(tmp_path):
+    db_path = str(tmp_path / "ci_hunter.db")
+    _seed(db_path)
+    out = io.StringIO()
+
+    exit_code = main(["--db", db_path, "--older-than-days", "30"], out=out, today=TODAY)
+
+    assert exit_code == 0
+    assert out.getvalue() == "removed 2 timing rows created before 2024-03-02\n"
+    assert _remaining_run_numbers(db_path) == [3]
+
+
+def test_retention_cmd_downsamples_old_runs(tmp_path):
+    db_path = str(tmp_path / "ci_hunter.db")
+    _seed(db_path)
+    out = io.StringIO()
+
+    exit_code = main(
+        ["--db", db_path, "--older-than-days", "30", "--downsample-every", "2"],
+        out=out,
+        today=TODAY,
+    )
+
+    assert exit_code == 0
+    assert "(kept 1 in 2 runs)" in out.getvalue()
+    assert _remaining_run_numbers(db_path) == [2, 3]
+
+
+def test_retention_cmd_rebuilds_metric_rollups(tmp_path):
+    db_path = str(tmp_path / "ci_hunter.db")
+    _seed(db_path)
+    storage = Storage(StorageConfig(database_url=db_path, rollup_window=3))
+    storage.rebuild_metric_rollups(REPO)
+
+    main(
+        ["--db", db_path, "--older-than-days", "30", "--rollup-window", "3"],
+        out=io.StringIO(),
+        today=TODAY,
+    )
+
+    [rollup] = storage.list_metric_rollups(REPO, METRIC_KIND_TEST)
+    assert (rollup.recent, rollup.sample_count) == ([(3, 1.0)], 1)
+    storage.close()
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["--db", "x.db", "--older-than-days", "0"],
+        ["--db", "x.db", "--older-than-days", "30", "--downsample-every", "1"],
+        ["--db", "x.db", "--older-than-days", "30", "--partitions-ahead", "-1"],
+        ["--db", "x.db", "--older-than-days", "30", "--rollup-window", "1"],
+        ["--db", " ", "--older-than-days", "30"],
+    ],
+)
+def test_retention_cmd_rejects_invalid_arguments(argv):
+    with pytest.raises(SystemExit):
+        main(argv)
@@ -0,0 +1,72 @@
+import random
+import statistics
+
+import pytest
+
+from ci_hunter.rollups import MetricRollup, QuantileSketch, rollup_history
+
+RELATIVE_ACCURACY = 0.01
+CAPACITY = 4
+
+
+def test_quantile_sketch_stays_within_relative_accuracy():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(2.0, 0.8) for _ in range(5000)]
+    sketch = QuantileSketch(RELATIVE_ACCURACY)
+    for value in values:
+        sketch.add(value)
+
+    ordered = sorted(values)
+    for q in (0.1, 0.5, 0.9, 0.99):
+        expected = ordered[int(q * (len(ordered) - 1))]
+        assert sketch.quantile(q) == pytest.approx(expected, rel=RELATIVE_ACCURACY * 2)
+    assert sketch.count == len(values)
+
+
+def test_quantile_sketch_remove_and_json_round_trip():
+    sketch = QuantileSketch()
+    for value in (0.0, 1.0, 2.0, 3.0, 100.0):
+        sketch.add(value)
+    sketch.remove(100.0)
+    sketch.remove(0.0)
+
+    restored = QuantileSketch.from_json(sketch.to_json())
+
+    assert restored.count == 3
+    assert restored.quantile(0.5) == pytest.approx(2.0, rel=RELATIVE_ACCURACY)
+    assert restored.quantile(0.0) == pytest.approx(1.0, rel=RELATIVE_ACCURACY)
+
+
+def test_quantile_sketch_trimmed_mean_drops_outliers():
+    sketch = QuantileSketch()
+    for value in [10.0] * 8 + [1.0, 1000.0]:
+        sketch.add(value)
+
+    assert sketch.trimmed_mean(0.1) == pytest.approx(10.0, rel=RELATIVE_ACCURACY)
+    assert QuantileSketch().trimmed_mean(0.1) is None
+    assert QuantileSketch().quantile(0.5) is None
+
+
+def test_metric_rollup_keeps_latest_runs_and_replaces_overwrites():
+    rollup = MetricRollup(name="tests.test_alpha")
+    for run_number in (1, 2, 3, 4, 5):
+        rollup.record(run_number, float(run_number), previous=None, capacity=CAPACITY)
+    rollup.record(3, 30.0, previous=3.0, capacity=CAPACITY)
+    rollup.record(1, 10.0, previous=1.0, capacity=CAPACITY)
+
+    assert rollup.recent == [(2, 2.0), (3, 30.0), (4, 4.0), (5, 5.0)]
+    assert rollup.sample_count == 5
+    assert rollup.value_sum == pytest.approx(2.0 + 30.0 + 4.0 + 5.0 + 10.0)
+    assert rollup.mean == pytest.approx(51.0 / 5)
+    assert MetricRollup.recent_from_json(rollup.recent_to_json()) == rollup.recent
+
+
+def test_rollup_history_orders_rows_like_storage():
+    first = MetricRollup(name="b", recent=[(1, 1.0), (2, 2.0)])
+    second = MetricRollup(name="a", recent=[(2, 3.0)])
+
+    history = rollup_history([first, second])
+
+    assert history.names == ["b", "a"]
+    assert list(history.values("b")) == [1.0, 2.0]
+    assert statistics.fmean(history.values("a")) == 3.0
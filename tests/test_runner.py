@@ -1,9 +1,10 @@
 from dataclasses import dataclass
+import threading
 
 from ci_hunter.detection import BASELINE_STRATEGY_MEDIAN
 from ci_hunter.github.client import WorkflowRun
-from ci_hunter.junit import TEST_OUTCOME_FAILED, TestDuration, TestOutcome
-from ci_hunter.runner import fetch_store_analyze
+from ci_hunter.junit import TEST_OUTCOME_FAILED, JUnitReport, TestDuration, TestOutcome
+from ci_hunter.runner import FetchLimiter, fetch_store_analyze
 from ci_hunter.steps import StepDuration
 from ci_hunter.storage import Storage, StorageConfig
 
@@ -381,3 +382,504 @@ def test_fetch_store_analyze_supports_keyword_only_fetchers():
     assert [sample.run_number for sample in storage.list_test_outcomes(REPO)] == [
         RUN_NUMBER_BASELINE,
     ]
+
+
+def _completed_runs(count: int) -> list[WorkflowRun]:
+    return [
+        WorkflowRun(
+            id=index,
+            run_number=index,
+            status=STATUS_COMPLETED,
+            conclusion=CONCLUSION_SUCCESS,
+            created_at=CREATED_AT,
+            updated_at=UPDATED_AT_BASELINE,
+            head_sha=HEAD_SHA_BASELINE,
+        )
+        for index in range(1, count + 1)
+    ]
+
+
+def test_fetch_store_analyze_fetches_timings_concurrently_within_limits():
+    storage = Storage(StorageConfig(database_url=":memory:"))
+    runs = _completed_runs(6)
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+    release = threading.Event()
+
+    def client_factory(token: str) -> DummyClient:
+        return DummyClient(runs)
+
+    def step_fetcher(token: str, repo: str, run_id: int) -> list[StepDuration]:
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+            if in_flight >= 2:
+                release.set()
+        release.wait(timeout=1)
+        with lock:
+            in_flight -= 1
+        if run_id == 3:
+            raise RuntimeError("log missing")
+        return [StepDuration(name="Checkout", duration_seconds=float(run_id))]
+
+    result = fetch_store_analyze(
+        auth=DummyAuth(),
+        client_factory=client_factory,
+        storage=storage,
+        repo=REPO,
+        min_delta_pct=MIN_DELTA_PCT,
+        baseline_strategy=BASELINE_STRATEGY_MEDIAN,
+        step_fetcher=step_fetcher,
+        fetch_concurrency=4,
+        fetch_limiter=FetchLimiter(max_in_flight=4, max_per_repo=2),
+    )
+
+    assert peak == 2
+    assert result.step_timings_attempted == 6
+    assert result.step_timings_failed == 1
+    assert [sample.run_number for sample in storage.list_step_durations(REPO)] == [
+        1,
+        2,
+        4,
+        5,
+        6,
+    ]
+
+
+def test_fetch_limiter_rejects_non_positive_caps():
+    for kwargs in ({"max_in_flight": 0}, {"max_per_repo": 0}):
+        try:
+            FetchLimiter(**kwargs)
+        except ValueError:
+            continue
+        raise AssertionError("Expected ValueError")
+
+
+def test_fetch_store_analyze_stores_durations_and_outcomes_from_report_fetcher():
+    storage = Storage(StorageConfig(database_url=":memory:"))
+    runs = _completed_runs(2)
+    report_calls: list[int] = []
+
+    def client_factory(token: str) -> DummyClient:
+        return DummyClient(runs)
+
+    def report_fetcher(token: str, repo: str, run_id: int) -> JUnitReport:
+        report_calls.append(run_id)
+        if run_id == 1:
+            raise RuntimeError("artifact missing")
+        return JUnitReport(
+            durations=[TestDuration(name="tests.alpha::test_x", duration_seconds=1.0)],
+            outcomes=[TestOutcome(name="tests.alpha::test_x", outcome=TEST_OUTCOME_FAILED)],
+        )
+
+    result = fetch_store_analyze(
+        auth=DummyAuth(),
+        client_factory=client_factory,
+        storage=storage,
+        repo=REPO,
+        min_delta_pct=MIN_DELTA_PCT,
+        baseline_strategy=BASELINE_STRATEGY_MEDIAN,
+        test_report_fetcher=report_fetcher,
+    )
+
+    assert report_calls == [1, 2]
+    assert result.test_timings_attempted == 2
+    assert result.test_timings_failed == 1
+    assert [sample.run_number for sample in storage.list_test_durations(REPO)] == [2]
+    assert [sample.run_number for sample in storage.list_test_outcomes(REPO)] == [2]
+
+
+def test_fetch_store_analyze_rejects_report_fetcher_with_test_fetchers():
+    storage = Storage(StorageConfig(database_url=":memory:"))
+
+    def report_fetcher(token: str, repo: str, run_id: int) -> JUnitReport:
+        return JUnitReport(durations=[], outcomes=[])
+
+    def test_fetcher(token: str, repo: str, run_id: int) -> list[TestDuration]:
+        return []
+
+    try:
+        fetch_store_analyze(
+            auth=DummyAuth(),
+            client_factory=lambda token: DummyClient([]),
+            storage=storage,
+            repo=REPO,
+            min_delta_pct=MIN_DELTA_PCT,
+            baseline_strategy=BASELINE_STRATEGY_MEDIAN,
+            test_fetcher=test_fetcher,
+            test_report_fetcher=report_fetcher,
+        )
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Expected ValueError")
+
+
+class IncrementalClient:
+    def __init__(self, runs: list[WorkflowRun]) -> None:
+        self._runs = runs
+        self.calls: list[dict] = []
+
+    def list_workflow_runs(self, repo: str, **kwargs) -> list[WorkflowRun]:
+        self.calls.append(kwargs)
+        return self._runs
+
+    def get_workflow_run(self, repo: str, run_id: int) -> WorkflowRun:
+        self.calls.append({"run_id": run_id})
+        return next(run for run in self._runs if run.id == run_id)
+
+
+def test_fetch_store_analyze_incremental_sync_uses_stored_high_water_mark():
+    storage = Storage(StorageConfig(database_url=":memory:"))
+    stored = _completed_runs(2)
+    storage.save_workflow_runs(REPO, stored)
+    new_run = WorkflowRun(
+        id=3,
+        run_number=3,
+        status=STATUS_COMPLETED,
+        conclusion=CONCLUSION_SUCCESS,
+        created_at=UPDATED_AT_THIRD,
+        updated_at=UPDATED_AT_THIRD,
+        head_sha=HEAD_SHA_THIRD,
+    )
+    client = IncrementalClient([new_run])
+    step_calls: list[int] = []
+
+    def step_fetcher(token: str, repo: str, run_id: int) -> list[StepDuration]:
+        step_calls.append(run_id)
+        return [StepDuration(name="Checkout", duration_seconds=1.0)]
+
+    fetch_store_analyze(
+        auth=DummyAuth(),
+        client_factory=lambda token: client,
+        storage=storage,
+        repo=REPO,
+        min_delta_pct=MIN_DELTA_PCT,
+        baseline_strategy=BASELINE_STRATEGY_MEDIAN,
+        step_fetcher=step_fetcher,
+        timings_run_limit=2,
+        incremental_sync=True,
+    )
+
+    # Runs created up to a day before the newest stored one are re-listed for re-runs.
+    assert client.calls == [
+        {"per_page": 100, "created_since": "2023-12-31T00:00:00Z", "stop_at_run_id": None},
+    ]
+    assert [run.id for run in storage.list_workflow_runs(REPO)] == [1, 2, 3]
+    assert step_calls == [2, 3]
+
+
+def test_fetch_store_analyze_incremental_sync_refetches_rerun_timings():
+    storage = Storage(StorageConfig(database_url=":memory:"))
+    stored = _completed_runs(2)
+    storage.save_workflow_runs(REPO, stored)
+    for run in stored:
+        storage.save_step_durations(
+            REPO, run.id, [StepDuration(name="Checkout", duration_seconds=1.0)]
+        )
+    rerun = WorkflowRun(
+        id=2,
+        run_number=2,
+        status=STATUS_COMPLETED,
+        conclusion=CONCLUSION_SUCCESS,
+        created_at=CREATED_AT,
+        updated_at=UPDATED_AT_THIRD,
+        head_sha=HEAD_SHA_BASELINE,
+    )
+    client = IncrementalClient([rerun, stored[0]])
+    step_calls: list[int] = []
+
+    def step_fetcher(token: str, repo: str, run_id: int) -> list[StepDuration]:
+        step_calls.append(run_id)
+        return [StepDuration(name="Checkout", duration_seconds=5.0)]
+
+    for _ in range(2):
+        fetch_store_analyze(
+            auth=DummyAuth(),
+            client_factory=lambda token: client,
+            storage=storage,
+            repo=REPO,
+            min_delta_pct=MIN_DELTA_PCT,
+            baseline_strategy=BASELINE_STRATEGY_MEDIAN,
+            step_fetcher=step_fetcher,
+            incremental_sync=True,
+        )
+
+    # Only the re-run is fetched again, and only once.
+    assert step_calls == [2]
+    assert [
+        sample.duration_seconds for sample in storage.list_step_durations(REPO)
+    ] == [1.0, 5.0]
+
+
+def test_fetch_store_analyze_incremental_sync_refreshes_long_pending_runs():
+    storage = Storage(StorageConfig(database_url=":memory:"))
+    queued = WorkflowRun(
+        id=1,
+        run_number=1,
+        status="queued",
+        conclusion=None,
+        created_at=CREATED_AT,
+        updated_at=CREATED_AT,
+        head_sha=HEAD_SHA_BASELINE,
+    )
+    newest = WorkflowRun(
+        id=2,
+        run_number=2,
+        status=STATUS_COMPLETED,
+        conclusion=CONCLUSION_SUCCESS,
+        created_at="2024-01-05T00:00:00Z",
+        updated_at="2024-01-05T00:00:00Z",
+        head_sha=HEAD_SHA_CURRENT,
+    )
+    storage.save_workflow_runs(REPO, [queued, newest])
+    cancelled = WorkflowRun(
+        id=1,
+        run_number=1,
+        status=STATUS_COMPLETED,
+        conclusion="cancelled",
+        created_at=CREATED_AT,
+        updated_at="2024-01-05T00:00:00Z",
+        head_sha=HEAD_SHA_BASELINE,
+    )
+    client = IncrementalClient([cancelled])
+
+    fetch_store_analyze(
+        auth=DummyAuth(),
+        client_factory=lambda token: client,
+        storage=storage,
+        repo=REPO,
+        min_delta_pct=MIN_DELTA_PCT,
+        baseline_strategy=BASELINE_STRATEGY_MEDIAN,
+        incremental_sync=True,
+    )
+
+    # The queued run no longer pins the listing cursor; it is refreshed by id.
+    assert client.calls == [
+        {"per_page": 100, "created_since": "2024-01-04T00:00:00Z", "stop_at_run_id": None},
+        {"run_id": 1},
+    ]
+    assert storage.list_workflow_runs(REPO) == [cancelled, newest]
+
+
+def test_fetch_store_analyze_skips_timings_already_stored_for_completed_runs():
+    storage = Storage(StorageConfig(database_url=":memory:"))
+    runs = _completed_runs(2) + [
+        WorkflowRun(
+            id=3,
+            run_number=3,
+            status="in_progress",
+            conclusion=None,
+            created_at=CREATED_AT,
+            updated_at=UPDATED_AT_THIRD,
+            head_sha=HEAD_SHA_THIRD,
+        )
+    ]
+    storage.save_workflow_runs(REPO, runs)
+    storage.save_step_durations(REPO, 1, [StepDuration(name="Checkout", duration_seconds=1.0)])
+    storage.save_step_durations(REPO, 3, [StepDuration(name="Checkout", duration_seconds=1.0)])
+    storage.save_test_durations(REPO, 2, [TestDuration(name="tests.alpha", duration_seconds=1.0)])
+    step_calls: list[int] = []
+    report_calls: list[int] = []
+
+    def step_fetcher(token: str, repo: str, run_id: int) -> list[StepDuration]:
+        step_calls.append(run_id)
+        return [StepDuration(name="Checkout", duration_seconds=2.0)]
+
+    def report_fetcher(token: str, repo: str, run_id: int) -> JUnitReport:
+        report_calls.append(run_id)
+        return JUnitReport(
+            durations=[TestDuration(name="tests.alpha", duration_seconds=1.0)],
+            outcomes=[TestOutcome(name="tests.alpha", outcome=TEST_OUTCOME_FAILED)],
+        )
+
+    result = fetch_store_analyze(
+        auth=DummyAuth(),
+        client_factory=lambda token: DummyClient(runs),
+        storage=storage,
+        repo=REPO,
+        min_delta_pct=MIN_DELTA_PCT,
+        baseline_strategy=BASELINE_STRATEGY_MEDIAN,
+        step_fetcher=step_fetcher,
+        test_report_fetcher=report_fetcher,
+    )
+
+    assert step_calls == [2, 3]
+    assert report_calls == [1, 2, 3]
+    assert result.step_timings_attempted == 2
+
+    report_calls.clear()
+    step_calls.clear()
+    fetch_store_analyze(
+        auth=DummyAuth(),
+        client_factory=lambda token: DummyClient(runs),
+        storage=storage,
+        repo=REPO,
+        min_delta_pct=MIN_DELTA_PCT,
+        baseline_strategy=BASELINE_STRATEGY_MEDIAN,
+        step_fetcher=step_fetcher,
+        test_report_fetcher=report_fetcher,
+    )
+
+    assert step_calls == [3]
+    assert report_calls == [3]
+    assert result.step_timings_skipped == 1
+
+
+def test_fetch_store_analyze_does_not_refetch_runs_without_artifacts():
+    storage = Storage(StorageConfig(database_url=":memory:"))
+    runs = _completed_runs(2) + [
+        WorkflowRun(
+            id=3,
+            run_number=3,
+            status="in_progress",
+            conclusion=None,
+            created_at=CREATED_AT,
+            updated_at=UPDATED_AT_THIRD,
+            head_sha=HEAD_SHA_THIRD,
+        )
+    ]
+    step_calls: list[int] = []
+    report_calls: list[int] = []
+
+    def step_fetcher(token: str, repo: str, run_id: int) -> list[StepDuration]:
+        step_calls.append(run_id)
+        return [StepDuration(name="Checkout", duration_seconds=1.0)]
+
+    def report_fetcher(token: str, repo: str, run_id: int) -> JUnitReport:
+        # No test-report artifact was uploaded for any run.
+        report_calls.append(run_id)
+        return JUnitReport(durations=[], outcomes=[])
+
+    def sync() -> object:
+        return fetch_store_analyze(
+            auth=DummyAuth(),
+            client_factory=lambda token: DummyClient(runs),
+            storage=storage,
+            repo=REPO,
+            min_delta_pct=MIN_DELTA_PCT,
+            baseline_strategy=BASELINE_STRATEGY_MEDIAN,
+            step_fetcher=step_fetcher,
+            test_report_fetcher=report_fetcher,
+        )
+
+    first = sync()
+    # An empty fetch may be transient, so it is retried until it came back empty 3 times.
+    step_calls.clear()
+    report_calls.clear()
+    sync()
+    assert report_calls == [1, 2, 3]
+    sync()
+    step_calls.clear()
+    report_calls.clear()
+    last = sync()
+
+    assert first.test_timings_attempted == 3
+    assert first.test_timings_failed == 3
+    assert first.test_timings_skipped == 0
+    assert step_calls == [3]
+    assert report_calls == [3]
+    assert last.step_timings_attempted == 1
+    assert last.step_timings_skipped == 2
+    assert last.test_timings_attempted == 1
+    assert last.test_timings_skipped == 2
+
+
+def test_fetch_store_analyze_retries_a_transiently_empty_fetch():
+    storage = Storage(StorageConfig(database_url=":memory:"))
+    runs = _completed_runs(1)
+    responses = [[], [StepDuration(name="Checkout", duration_seconds=1.0)]]
+
+    def step_fetcher(token: str, repo: str, run_id: int) -> list[StepDuration]:
+        return responses.pop(0)
+
+    for _ in range(3):
+        fetch_store_analyze(
+            auth=DummyAuth(),
+            client_factory=lambda token: DummyClient(runs),
+            storage=storage,
+            repo=REPO,
+            min_delta_pct=MIN_DELTA_PCT,
+            baseline_strategy=BASELINE_STRATEGY_MEDIAN,
+            step_fetcher=step_fetcher,
+        )
+
+    assert responses == []
+    assert [sample.run_number for sample in storage.list_step_durations(REPO)] == [1]
+
+
+def test_fetch_store_analyze_writes_timings_in_one_transaction():
+    storage = Storage(StorageConfig(database_url=":memory:"))
+    runs = _completed_runs(5)
+    commits = 0
+    backend_commit = storage._backend.commit
+
+    def counting_commit() -> None:
+        nonlocal commits
+        commits += 1
+        backend_commit()
+
+    storage._backend.commit = counting_commit
+
+    def client_factory(token: str) -> DummyClient:
+        return DummyClient(runs)
+
+    def step_fetcher(token: str, repo: str, run_id: int) -> list[StepDuration]:
+        return [StepDuration(name="Checkout", duration_seconds=float(run_id))]
+
+    def report_fetcher(token: str, repo: str, run_id: int) -> JUnitReport:
+        return JUnitReport(
+            durations=[TestDuration(name="tests.alpha::test_x", duration_seconds=1.0)],
+            outcomes=[TestOutcome(name="tests.alpha::test_x", outcome="passed")],
+        )
+
+    fetch_store_analyze(
+        auth=DummyAuth(),
+        client_factory=client_factory,
+        storage=storage,
+        repo=REPO,
+        min_delta_pct=MIN_DELTA_PCT,
+        baseline_strategy=BASELINE_STRATEGY_MEDIAN,
+        step_fetcher=step_fetcher,
+        test_report_fetcher=report_fetcher,
+    )
+
+    # One commit for the workflow runs, one for every run's timings.
+    assert commits == 2
+    assert len(storage.list_step_durations(REPO)) == 5
+    assert len(storage.list_test_durations(REPO)) == 5
+    assert len(storage.list_test_outcomes(REPO)) == 5
+
+
+def test_fetch_store_analyze_isolates_a_run_whose_timing_write_fails():
+    storage = Storage(StorageConfig(database_url=":memory:"))
+    runs = _completed_runs(5)
+    upsert_timing_rows = storage._upsert_timing_rows
+
+    def failing_upsert(backend, table, rows):
+        if any(row[1] == 2 for row in rows):
+            raise RuntimeError("bad row")
+        upsert_timing_rows(backend, table, rows)
+
+    storage._upsert_timing_rows = failing_upsert
+
+    def step_fetcher(token: str, repo: str, run_id: int) -> list[StepDuration]:
+        return [StepDuration(name="Checkout", duration_seconds=float(run_id))]
+
+    result = fetch_store_analyze(
+        auth=DummyAuth(),
+        client_factory=lambda token: DummyClient(runs),
+        storage=storage,
+        repo=REPO,
+        min_delta_pct=MIN_DELTA_PCT,
+        baseline_strategy=BASELINE_STRATEGY_MEDIAN,
+        step_fetcher=step_fetcher,
+        timing_batch_runs=2,
+    )
+
+    # Runs 1-2 are retried one by one after their chunk fails; runs 3-5 are unaffected.
+    assert [sample.run_number for sample in storage.list_step_durations(REPO)] == [1, 3, 4, 5]
+    assert result.step_timings_attempted == 5
+    assert result.step_timings_failed == 1
@@ -6,6 +6,7 @@ import pytest
 
 from ci_hunter.queue import AnalysisJob, InMemoryJobQueue
 from ci_hunter.scheduler_cmd import main
+from ci_hunter.storage import Storage, StorageConfig
 
 REPO = "acme/repo"
 PR_NUMBER = 42
@@ -70,6 +71,65 @@ def test_scheduler_cmd_writes_job_to_queue_file(tmp_path):
     }
 
 
+def test_scheduler_cmd_writes_job_to_queue_db(tmp_path):
+    db_path = tmp_path / "queue.db"
+    output = io.StringIO()
+
+    exit_code = main(
+        [
+            "--repo",
+            REPO,
+            "--pr-number",
+            str(PR_NUMBER),
+            "--commit",
+            COMMIT,
+            "--queue-db",
+            str(db_path),
+        ],
+        out=output,
+    )
+
+    assert exit_code == 0
+    assert "enqueued job 1 to analysis_jobs" in output.getvalue()
+    storage = Storage(StorageConfig(database_url=str(db_path)))
+    [claimed] = storage.claim_jobs(1)
+    storage.close()
+    assert claimed.job == AnalysisJob(repo=REPO, pr_number=PR_NUMBER, commit=COMMIT, branch=None)
+
+
+def test_scheduler_cmd_appends_job_to_queue_log(tmp_path):
+    from ci_hunter.job_queue_log import JobLog
+
+    log_dir = tmp_path / "queue"
+    output = io.StringIO()
+
+    exit_code = main(
+        ["--repo", REPO, "--pr-number", str(PR_NUMBER), "--queue-log", str(log_dir)],
+        out=output,
+    )
+
+    assert exit_code == 0
+    assert f"enqueued job at offset 0 to {log_dir}" in output.getvalue()
+    [claim] = JobLog(log_dir).claim_jobs("default", 5, visibility_timeout_seconds=60)
+    assert claim.job == AnalysisJob(repo=REPO, pr_number=PR_NUMBER, commit=None, branch=None)
+
+
+def test_scheduler_cmd_rejects_queue_file_and_queue_db_together(tmp_path):
+    with pytest.raises(SystemExit):
+        main(
+            [
+                "--repo",
+                REPO,
+                "--pr-number",
+                str(PR_NUMBER),
+                "--queue-file",
+                str(tmp_path / "queue.jsonl"),
+                "--queue-db",
+                str(tmp_path / "queue.db"),
+            ]
+        )
+
+
 def test_scheduler_cmd_uses_file_lock(tmp_path, monkeypatch):
     queue_path = tmp_path / "queue.jsonl"
     calls: list[Path] = []
@@ -1,4 +1,4 @@
-from ci_hunter.steps import StepDuration, parse_step_durations
+from ci_hunter.steps import StepDuration, parse_step_duration_lines, parse_step_durations
 
 
 def test_parse_step_durations_from_github_log():
@@ -32,3 +32,21 @@ def test_parse_step_durations_handles_utf8_bom_timestamp():
         StepDuration(name="Checkout", duration_seconds=10.0),
         StepDuration(name="Install deps", duration_seconds=10.0),
     ]
+
+
+def test_parse_step_duration_lines_accepts_line_iterator():
+    lines = iter(
+        [
+            "2024-01-01T00:00:05.0000000Z  Step: Checkout\n",
+            "\n",
+            "2024-01-01T00:00:15.0000000Z  Step: Install deps\n",
+            "2024-01-01T00:00:20.0000000Z  [command] echo done\n",
+        ]
+    )
+
+    durations = parse_step_duration_lines(lines)
+
+    assert durations == [
+        StepDuration(name="Checkout", duration_seconds=10.0),
+        StepDuration(name="Install deps", duration_seconds=5.0),
+    ]
@@ -1,15 +1,33 @@
 import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import replace
+from datetime import date, timedelta
+from types import SimpleNamespace
 import pytest
 
 from ci_hunter.github.client import WorkflowRun
 from ci_hunter.junit import TEST_OUTCOME_FAILED, TestDuration, TestOutcome
+from ci_hunter.queue import AnalysisJob
 from ci_hunter.steps import StepDuration
 from ci_hunter.storage import (
+    METRIC_KIND_STEP,
+    METRIC_KIND_TEST,
+    STEP_DURATIONS_TABLE,
+    TEST_DURATIONS_TABLE,
+    TEST_OUTCOMES_TABLE,
     StepDurationSample,
     Storage,
+    HISTORY_INDEXES,
+    SQLiteTuning,
     StorageConfig,
+    StoredTimingRunIds,
     TestDurationSample,
     TestOutcomeSample,
+    TimingRetentionResult,
+    WorkflowRunSyncState,
+    timing_partition_name,
 )
 
 REPO = "acme/repo"
@@ -85,6 +103,225 @@ def test_save_workflow_runs_overwrites_existing_entry():
     assert storage.list_workflow_runs(REPO) == [updated]
 
 
+def test_save_workflow_runs_updates_timing_rows_of_changed_runs_only():
+    storage = Storage(StorageConfig(database_url=":memory:"))
+    runs = [
+        WorkflowRun(
+            id=run_id,
+            run_number=run_number,
+            status=STATUS_COMPLETED,
+            conclusion=CONCLUSION_SUCCESS,
+            created_at=CREATED_AT,
+            updated_at=UPDATED_AT,
+            head_sha=HEAD_SHA_ORIGINAL,
+        )
+        for run_id, run_number in ((RUN_ID, RUN_NUMBER), (RUN_ID_SECOND, RUN_NUMBER_SECOND))
+    ]
+    storage.save_workflow_runs(REPO, runs)
+    for run in runs:
+        storage.save_step_durations(
+            REPO,
+            run.id,
+            [StepDuration(name=STEP_CHECKOUT, duration_seconds=DURATION_CHECKOUT_SHORT)],
+        )
+    updates: list[str] = []
+    storage._backend._connection.set_trace_callback(
+        lambda query: updates.append(query) if query.lstrip().startswith("UPDATE") else None
+    )
+
+    storage.save_workflow_runs(REPO, runs)
+
+    assert updates == []
+
+    storage.save_workflow_runs(
+        REPO,
+        [runs[0], replace(runs[1], run_number=RUN_NUMBER_SECOND + 10, created_at=UPDATED_AT_LATE)],
+    )
+
+    # One UPDATE per timing table, for the renumbered run only.
+    assert len(updates) == 3
+    assert storage._backend.execute(
+        f"SELECT run_id, run_number, created_at FROM {STEP_DURATIONS_TABLE} ORDER BY run_id"
+    ) == [
+        (RUN_ID, RUN_NUMBER, CREATED_AT),
+        (RUN_ID_SECOND, RUN_NUMBER_SECOND + 10, UPDATED_AT_LATE),
+    ]
+
+
+def test_workflow_run_sync_state_tracks_newest_completed_run():
+    storage = Storage(StorageConfig(database_url=":memory:"))
+
+    assert storage.get_workflow_run_sync_state(REPO) == WorkflowRunSyncState(
+        created_since=None,
+        newest_completed_run_id=None,
+    )
+
+    storage.save_workflow_runs(
+        REPO,
+        [
+            WorkflowRun(
+                id=RUN_ID,
+                run_number=RUN_NUMBER,
+                status=STATUS_COMPLETED,
+                conclusion=CONCLUSION_SUCCESS,
+                created_at=CREATED_AT,
+                updated_at=UPDATED_AT,
+                head_sha=HEAD_SHA_ORIGINAL,
+            ),
+            WorkflowRun(
+                id=RUN_ID_SECOND,
+                run_number=RUN_NUMBER_SECOND,
+                status=STATUS_COMPLETED,
+                conclusion=CONCLUSION_SUCCESS,
+                created_at=UPDATED_AT_LATE,
+                updated_at=UPDATED_AT_LATE,
+                head_sha=HEAD_SHA_UPDATED,
+            ),
+        ],
+    )
+
+    assert storage.get_workflow_run_sync_state(
+        REPO, rerun_lookback=timedelta(0)
+    ) == WorkflowRunSyncState(
+        created_since=UPDATED_AT_LATE,
+        newest_completed_run_id=RUN_ID_SECOND,
+    )
+    # Re-runs keep their id, so with a lookback pagination cannot stop at known runs.
+    assert storage.get_workflow_run_sync_state(REPO) == WorkflowRunSyncState(
+        created_since="2023-12-31T00:01:00Z",
+        newest_completed_run_id=None,
+    )
+
+
+def test_workflow_run_sync_state_rewinds_to_oldest_pending_run():
+    storage = Storage(StorageConfig(database_url=":memory:"))
+    storage.save_workflow_runs(
+        REPO,
+        [
+            WorkflowRun(
+                id=RUN_ID,
+                run_number=RUN_NUMBER,
+                status="in_progress",
+                conclusion=None,
+                created_at=CREATED_AT,
+                updated_at=UPDATED_AT,
+                head_sha=HEAD_SHA_ORIGINAL,
+            ),
+            WorkflowRun(
+                id=RUN_ID_SECOND,
+                run_number=RUN_NUMBER_SECOND,
+                status=STATUS_COMPLETED,
+                conclusion=CONCLUSION_SUCCESS,
+                created_at=UPDATED_AT_LATE,
+                updated_at=UPDATED_AT_LATE,
+                head_sha=HEAD_SHA_UPDATED,
+            ),
+        ],
+    )
+
+    assert storage.get_workflow_run_sync_state(
+        REPO, rerun_lookback=timedelta(0)
+    ) == WorkflowRunSyncState(
+        created_since=CREATED_AT,
+        newest_completed_run_id=None,
+    )
+
+
+def test_workflow_run_sync_state_caps_how_long_pending_runs_hold_the_cursor():
+    storage = Storage(StorageConfig(database_url=":memory:"))
+    storage.save_workflow_runs(
+        REPO,
+        [
+            WorkflowRun(
+                id=RUN_ID,
+                run_number=RUN_NUMBER,
+                status="queued",
+                conclusion=None,
+                created_at=CREATED_AT,
+                updated_at=CREATED_AT,
+                head_sha=HEAD_SHA_ORIGINAL,
+            ),
+            WorkflowRun(
+                id=RUN_ID_SECOND,
+                run_number=RUN_NUMBER_SECOND,
+                status=STATUS_COMPLETED,
+                conclusion=CONCLUSION_SUCCESS,
+                created_at="2024-01-05T00:00:00Z",
+                updated_at="2024-01-05T00:00:00Z",
+                head_sha=HEAD_SHA_UPDATED,
+            ),
+        ],
+    )
+
+    assert storage.get_workflow_run_sync_state(REPO) == WorkflowRunSyncState(
+        created_since="2024-01-04T00:00:00Z",
+        newest_completed_run_id=None,
+        pending_run_ids=(RUN_ID,),
+    )
+    assert storage.get_workflow_run_sync_state(
+        REPO, pending_cursor_limit=timedelta(days=7)
+    ) == WorkflowRunSyncState(
+        created_since=CREATED_AT,
+        newest_completed_run_id=None,
+    )
+
+
+def test_rerun_runs_count_as_missing_until_their_timings_are_refetched():
+    storage = Storage(StorageConfig(database_url=":memory:", empty_timing_fetch_attempts=1))
+    run = WorkflowRun(
+        id=RUN_ID,
+        run_number=RUN_NUMBER,
+        status=STATUS_COMPLETED,
+        conclusion=CONCLUSION_FAILURE,
+        created_at=CREATED_AT,
+        updated_at=UPDATED_AT,
+        head_sha=HEAD_SHA_ORIGINAL,
+    )
+    storage.save_workflow_runs(REPO, [run])
+    storage.save_step_durations(
+        REPO,
+        RUN_ID,
+        [StepDuration(name=STEP_CHECKOUT, duration_seconds=DURATION_CHECKOUT_SHORT)],
+    )
+    storage.save_empty_timing_fetches(REPO, [(RUN_ID, TEST_DURATIONS_TABLE)])
+    storage.save_workflow_runs(REPO, [run])
+
+    assert storage.get_stored_timing_run_ids(REPO, [RUN_ID]) == StoredTimingRunIds(
+        step_run_ids=frozenset({RUN_ID}),
+        test_run_ids=frozenset({RUN_ID}),
+        outcome_run_ids=frozenset(),
+    )
+
+    storage.save_workflow_runs(
+        REPO, [replace(run, conclusion=CONCLUSION_SUCCESS, updated_at=UPDATED_AT_LATE)]
+    )
+
+    assert storage.get_stored_timing_run_ids(REPO, [RUN_ID]) == StoredTimingRunIds(
+        step_run_ids=frozenset(),
+        test_run_ids=frozenset(),
+        outcome_run_ids=frozenset(),
+        outdated_fetches=frozenset(
+            {
+                (RUN_ID, STEP_DURATIONS_TABLE),
+                (RUN_ID, TEST_DURATIONS_TABLE),
+                (RUN_ID, TEST_OUTCOMES_TABLE),
+            }
+        ),
+    )
+
+    storage.clear_outdated_timing_fetches(REPO, [(RUN_ID, STEP_DURATIONS_TABLE)])
+
+    # The empty-fetch marker went with the re-run, so the test report is fetched again.
+    assert storage.get_stored_timing_run_ids(REPO, [RUN_ID]) == StoredTimingRunIds(
+        step_run_ids=frozenset({RUN_ID}),
+        test_run_ids=frozenset(),
+        outcome_run_ids=frozenset(),
+        outdated_fetches=frozenset(
+            {(RUN_ID, TEST_DURATIONS_TABLE), (RUN_ID, TEST_OUTCOMES_TABLE)}
+        ),
+    )
+
+
 def test_storage_enforces_foreign_keys():
     storage = Storage(StorageConfig(database_url=":memory:"))
 
@@ -342,3 +579,1254 @@ def test_resolve_sqlite_absolute_url_path():
     import ci_hunter.storage as storage_module
 
     assert storage_module._resolve_sqlite_path("sqlite:////tmp/ci_hunter.db") == "/tmp/ci_hunter.db"
+
+
+def test_get_stored_timing_run_ids_reports_existing_rows():
+    storage = Storage(StorageConfig(database_url=":memory:"))
+    storage.save_workflow_runs(
+        REPO,
+        [
+            WorkflowRun(
+                id=run_id,
+                run_number=run_number,
+                status=STATUS_COMPLETED,
+                conclusion=CONCLUSION_SUCCESS,
+                created_at=CREATED_AT,
+                updated_at=UPDATED_AT,
+                head_sha=HEAD_SHA_ORIGINAL,
+            )
+            for run_id, run_number in ((RUN_ID, RUN_NUMBER), (RUN_ID_SECOND, RUN_NUMBER_SECOND))
+        ],
+    )
+    storage.save_step_durations(
+        REPO,
+        RUN_ID,
+        [StepDuration(name=STEP_CHECKOUT, duration_seconds=DURATION_CHECKOUT_SHORT)],
+    )
+    storage.save_test_outcomes(
+        REPO,
+        RUN_ID_SECOND,
+        [TestOutcome(name=TEST_OUTCOME_ALPHA, outcome=TEST_OUTCOME_FAILED)],
+    )
+
+    stored = storage.get_stored_timing_run_ids(REPO, [RUN_ID, RUN_ID_SECOND])
+
+    assert stored == StoredTimingRunIds(
+        step_run_ids=frozenset({RUN_ID}),
+        test_run_ids=frozenset(),
+        outcome_run_ids=frozenset({RUN_ID_SECOND}),
+    )
+    assert storage.get_stored_timing_run_ids(REPO, []).step_run_ids == frozenset()
+
+
+def test_get_stored_timing_run_ids_includes_repeatedly_empty_fetches():
+    storage = Storage(StorageConfig(database_url=":memory:", empty_timing_fetch_attempts=2))
+
+    # A repeated pair within one call counts as one empty fetch.
+    storage.save_empty_timing_fetches(
+        REPO,
+        [
+            (RUN_ID, TEST_DURATIONS_TABLE),
+            (RUN_ID, TEST_OUTCOMES_TABLE),
+            (RUN_ID, TEST_DURATIONS_TABLE),
+        ],
+    )
+    storage.save_empty_timing_fetches(REPO, [(RUN_ID, TEST_DURATIONS_TABLE)])
+    storage.save_empty_timing_fetches("other/repo", [(RUN_ID_SECOND, STEP_DURATIONS_TABLE)])
+    storage.save_empty_timing_fetches("other/repo", [(RUN_ID_SECOND, STEP_DURATIONS_TABLE)])
+
+    stored = storage.get_stored_timing_run_ids(REPO, [RUN_ID, RUN_ID_SECOND])
+
+    assert stored == StoredTimingRunIds(
+        step_run_ids=frozenset(),
+        test_run_ids=frozenset({RUN_ID}),
+        outcome_run_ids=frozenset(),
+    )
+
+
+def test_list_metric_rows_limits_each_metric_to_last_n_runs():
+    storage = Storage(StorageConfig(database_url=":memory:"))
+    storage.save_workflow_runs(
+        REPO,
+        [
+            WorkflowRun(
+                id=run_number,
+                run_number=run_number,
+                status=STATUS_COMPLETED,
+                conclusion=CONCLUSION_SUCCESS,
+                created_at=CREATED_AT,
+                updated_at=UPDATED_AT,
+                head_sha=HEAD_SHA_ORIGINAL,
+            )
+            for run_number in range(1, 5)
+        ],
+    )
+    for run_number in range(1, 5):
+        storage.save_step_durations(
+            REPO,
+            run_number,
+            [StepDuration(name=STEP_CHECKOUT, duration_seconds=float(run_number))],
+        )
+        storage.save_test_outcomes(
+            REPO,
+            run_number,
+            [TestOutcome(name=TEST_OUTCOME_ALPHA, outcome=TEST_OUTCOME_FAILED)],
+        )
+    storage.save_step_durations(
+        REPO,
+        2,
+        [StepDuration(name=STEP_TESTS, duration_seconds=DURATION_TESTS)],
+    )
+
+    assert storage.list_step_durations(REPO, last_n=2) == [
+        StepDurationSample(run_number=2, step_name=STEP_TESTS, duration_seconds=DURATION_TESTS),
+        StepDurationSample(run_number=3, step_name=STEP_CHECKOUT, duration_seconds=3.0),
+        StepDurationSample(run_number=4, step_name=STEP_CHECKOUT, duration_seconds=4.0),
+    ]
+    history = storage.load_test_outcome_history(REPO, last_n=3)
+    assert list(history.run_numbers(TEST_OUTCOME_ALPHA)) == [2, 3, 4]
+    with pytest.raises(ValueError):
+        storage.list_test_durations(REPO, last_n=0)
+
+
+def test_sqlite_schema_creates_history_indexes():
+    storage = Storage(StorageConfig(database_url=":memory:"))
+
+    rows = storage._backend.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+
+    assert {index_name for index_name, _table, _columns in HISTORY_INDEXES} <= {
+        row[0] for row in rows
+    }
+
+
+def test_timing_rows_store_run_number_and_created_at():
+    storage = Storage(StorageConfig(database_url=":memory:"))
+    run = WorkflowRun(
+        id=RUN_ID,
+        run_number=RUN_NUMBER,
+        status=STATUS_COMPLETED,
+        conclusion=CONCLUSION_SUCCESS,
+        created_at=CREATED_AT,
+        updated_at=UPDATED_AT,
+        head_sha=HEAD_SHA_ORIGINAL,
+    )
+    storage.save_workflow_runs(REPO, [run])
+    storage.save_step_durations(
+        REPO,
+        RUN_ID,
+        [StepDuration(name=STEP_CHECKOUT, duration_seconds=DURATION_CHECKOUT_SHORT)],
+    )
+    storage.save_test_outcomes(
+        REPO,
+        RUN_ID,
+        [TestOutcome(name=TEST_OUTCOME_ALPHA, outcome=TEST_OUTCOME_FAILED)],
+    )
+
+    storage.save_workflow_runs(REPO, [replace(run, run_number=RUN_NUMBER_SECOND)])
+
+    for table in ("step_durations", "test_outcomes"):
+        assert storage._backend.execute(f"SELECT run_number, created_at FROM {table}") == [
+            (RUN_NUMBER_SECOND, CREATED_AT)
+        ]
+    assert storage.list_step_durations(REPO)[0].run_number == RUN_NUMBER_SECOND
+
+
+def test_sqlite_bootstrap_backfills_run_columns_on_legacy_tables(tmp_path):
+    database_path = tmp_path / "legacy.db"
+    connection = sqlite3.connect(database_path)
+    connection.executescript(
+        f"""
+        CREATE TABLE workflow_runs (
+            repo TEXT NOT NULL,
+            run_id INTEGER NOT NULL,
+            run_number INTEGER NOT NULL,
+            status TEXT,
+            conclusion TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            head_sha TEXT NOT NULL,
+            PRIMARY KEY (repo, run_id)
+        );
+        CREATE TABLE step_durations (
+            repo TEXT NOT NULL,
+            run_id INTEGER NOT NULL,
+            step_name TEXT NOT NULL,
+            duration_seconds REAL NOT NULL,
+            PRIMARY KEY (repo, run_id, step_name)
+        );
+        CREATE TABLE test_durations (
+            repo TEXT NOT NULL,
+            run_id INTEGER NOT NULL,
+            test_name TEXT NOT NULL,
+            duration_seconds REAL NOT NULL,
+            PRIMARY KEY (repo, run_id, test_name)
+        );
+        CREATE TABLE test_outcomes (
+            repo TEXT NOT NULL,
+            run_id INTEGER NOT NULL,
+            test_name TEXT NOT NULL,
+            outcome TEXT NOT NULL,
+            PRIMARY KEY (repo, run_id, test_name)
+        );
+        INSERT INTO workflow_runs VALUES (
+            '{REPO}', {RUN_ID}, {RUN_NUMBER}, 'completed', 'success',
+            '{CREATED_AT}', '{UPDATED_AT}', '{HEAD_SHA_ORIGINAL}'
+        );
+        INSERT INTO test_durations VALUES ('{REPO}', {RUN_ID}, '{TEST_ALPHA}', {DURATION_TEST_ALPHA});
+        """
+    )
+    connection.close()
+
+    storage = Storage(StorageConfig(database_url=str(database_path)))
+
+    assert storage.list_test_durations(REPO) == [
+        TestDurationSample(
+            run_number=RUN_NUMBER,
+            test_name=TEST_ALPHA,
+            duration_seconds=DURATION_TEST_ALPHA,
+        )
+    ]
+    assert storage._backend.execute("SELECT created_at FROM test_durations") == [(CREATED_AT,)]
+    storage.close()
+
+
+def test_metric_names_are_interned_once_per_kind():
+    storage = Storage(StorageConfig(database_url=":memory:"))
+    storage.save_workflow_runs(
+        REPO,
+        [
+            WorkflowRun(
+                id=run_id,
+                run_number=run_number,
+                status=STATUS_COMPLETED,
+                conclusion=CONCLUSION_SUCCESS,
+                created_at=CREATED_AT,
+                updated_at=UPDATED_AT,
+                head_sha=HEAD_SHA_ORIGINAL,
+            )
+            for run_id, run_number in ((RUN_ID, RUN_NUMBER), (RUN_ID_SECOND, RUN_NUMBER_SECOND))
+        ],
+    )
+    for run_id in (RUN_ID, RUN_ID_SECOND):
+        storage.save_step_durations(
+            REPO,
+            run_id,
+            [StepDuration(name=TEST_ALPHA, duration_seconds=DURATION_CHECKOUT_SHORT)],
+        )
+        storage.save_test_durations(
+            REPO,
+            run_id,
+            [TestDuration(name=TEST_ALPHA, duration_seconds=DURATION_TEST_ALPHA)],
+        )
+        storage.save_test_outcomes(
+            REPO,
+            run_id,
+            [TestOutcome(name=TEST_ALPHA, outcome=TEST_OUTCOME_FAILED)],
+        )
+
+    names = storage._backend.execute("SELECT kind, name FROM metric_names ORDER BY kind")
+    assert names == [("step", TEST_ALPHA), ("test", TEST_ALPHA)]
+    test_metric_ids = {
+        row[0]
+        for table in ("test_durations", "test_outcomes")
+        for row in storage._backend.execute(f"SELECT metric_id FROM {table}")
+    }
+    assert len(test_metric_ids) == 1
+    assert [sample.test_name for sample in storage.list_test_outcomes(REPO)] == [
+        TEST_ALPHA,
+        TEST_ALPHA,
+    ]
+
+
+def test_sqlite_tuning_applies_pragmas(tmp_path):
+    storage = Storage(StorageConfig(database_url=str(tmp_path / "tuned.db")))
+
+    def pragma(name):
+        return storage._backend.execute(f"PRAGMA {name}")[0][0]
+
+    assert pragma("journal_mode") == "wal"
+    assert pragma("synchronous") == 1
+    assert pragma("wal_autocheckpoint") == 16384
+    assert pragma("cache_size") == -64 * 1024
+    assert pragma("temp_store") == 2
+    assert pragma("foreign_keys") == 1
+    storage.close()
+
+
+def test_sqlite_tuning_none_keeps_sqlite_defaults(tmp_path):
+    tuning = SQLiteTuning(
+        journal_mode=None,
+        synchronous=None,
+        wal_autocheckpoint_pages=None,
+        mmap_size_bytes=None,
+        cache_size_kib=None,
+        temp_store=None,
+    )
+    storage = Storage(StorageConfig(database_url=str(tmp_path / "plain.db"), sqlite=tuning))
+
+    assert storage._backend.execute("PRAGMA journal_mode")[0][0] == "delete"
+    assert storage._backend.execute("PRAGMA synchronous")[0][0] == 2
+    storage.close()
+
+
+def test_sqlite_tuning_rejects_unknown_pragma_values():
+    with pytest.raises(ValueError):
+        SQLiteTuning(journal_mode="wal; DROP TABLE workflow_runs")
+    with pytest.raises(ValueError):
+        SQLiteTuning(synchronous="sometimes")
+    with pytest.raises(ValueError):
+        SQLiteTuning(cache_size_kib=0)
+
+
+def test_sqlite_wal_reader_does_not_block_writer(tmp_path):
+    database_url = str(tmp_path / "shared.db")
+    writer = Storage(StorageConfig(database_url=database_url))
+    reader = sqlite3.connect(database_url, timeout=0)
+    reader.execute("BEGIN")
+    assert reader.execute("SELECT COUNT(*) FROM workflow_runs").fetchone() == (0,)
+
+    writer.save_workflow_runs(
+        REPO,
+        [
+            WorkflowRun(
+                id=RUN_ID,
+                run_number=RUN_NUMBER,
+                status=STATUS_COMPLETED,
+                conclusion=CONCLUSION_SUCCESS,
+                created_at=CREATED_AT,
+                updated_at=UPDATED_AT,
+                head_sha=HEAD_SHA_ORIGINAL,
+            )
+        ],
+    )
+
+    # The open read transaction keeps its snapshot; new reads see the commit.
+    assert reader.execute("SELECT COUNT(*) FROM workflow_runs").fetchone() == (0,)
+    reader.execute("COMMIT")
+    assert reader.execute("SELECT COUNT(*) FROM workflow_runs").fetchone() == (1,)
+    reader.close()
+    writer.close()
+
+
+def _save_two_runs(storage: Storage) -> None:
+    storage.save_workflow_runs(
+        REPO,
+        [
+            WorkflowRun(
+                id=run_id,
+                run_number=run_number,
+                status=STATUS_COMPLETED,
+                conclusion=CONCLUSION_SUCCESS,
+                created_at=CREATED_AT,
+                updated_at=UPDATED_AT,
+                head_sha=HEAD_SHA_ORIGINAL,
+            )
+            for run_id, run_number in ((RUN_ID, RUN_NUMBER), (RUN_ID_SECOND, RUN_NUMBER_SECOND))
+        ],
+    )
+
+
+def test_batch_writes_rows_once_the_block_exits():
+    storage = Storage(StorageConfig(database_url=":memory:"))
+    _save_two_runs(storage)
+
+    with storage.batch():
+        storage.save_step_durations(
+            REPO,
+            RUN_ID,
+            [StepDuration(name=STEP_CHECKOUT, duration_seconds=DURATION_CHECKOUT_SHORT)],
+        )
+        with storage.batch():
+            storage.save_step_durations(
+                REPO,
+                RUN_ID_SECOND,
+                [StepDuration(name=STEP_CHECKOUT, duration_seconds=DURATION_CHECKOUT_SHORT)],
+            )
+        storage.save_step_durations(
+            REPO,
+            RUN_ID_SECOND,
+            [StepDuration(name=STEP_CHECKOUT, duration_seconds=DURATION_CHECKOUT_LONG)],
+        )
+        storage.save_test_outcomes(
+            REPO,
+            RUN_ID,
+            [TestOutcome(name=TEST_OUTCOME_ALPHA, outcome=TEST_OUTCOME_FAILED)],
+        )
+        assert storage.list_step_durations(REPO) == []
+
+    assert storage.list_step_durations(REPO) == [
+        StepDurationSample(
+            run_number=RUN_NUMBER,
+            step_name=STEP_CHECKOUT,
+            duration_seconds=DURATION_CHECKOUT_SHORT,
+        ),
+        StepDurationSample(
+            run_number=RUN_NUMBER_SECOND,
+            step_name=STEP_CHECKOUT,
+            duration_seconds=DURATION_CHECKOUT_LONG,
+        ),
+    ]
+    assert storage.list_test_outcomes(REPO) == [
+        TestOutcomeSample(
+            run_number=RUN_NUMBER,
+            test_name=TEST_OUTCOME_ALPHA,
+            outcome=TEST_OUTCOME_FAILED,
+        )
+    ]
+
+
+def test_batch_discards_rows_when_the_block_raises():
+    storage = Storage(StorageConfig(database_url=":memory:"))
+    _save_two_runs(storage)
+
+    with pytest.raises(RuntimeError):
+        with storage.batch():
+            storage.save_test_durations(
+                REPO,
+                RUN_ID,
+                [TestDuration(name=TEST_ALPHA, duration_seconds=DURATION_TEST_ALPHA)],
+            )
+            raise RuntimeError("abort")
+
+    assert storage.list_test_durations(REPO) == []
+    with storage.batch():
+        with pytest.raises(ValueError, match="Unknown workflow run"):
+            storage.save_test_durations(
+                REPO,
+                99,
+                [TestDuration(name=TEST_ALPHA, duration_seconds=DURATION_TEST_ALPHA)],
+            )
+
+
+class RecordingPostgresBackend:
+    name = "postgresql"
+    placeholder = "%s"
+
+    def __init__(self, database_url: str) -> None:
+        self.queries: list[str] = []
+        self.executemany_queries: list[str] = []
+        self.statements: list[str] = []
+        self.copied: list[tuple[str, tuple[str, ...], list[tuple[object, ...]]]] = []
+        self.commits = 0
+
+    def execute(self, query: str, params: tuple[object, ...] = ()) -> list[tuple[object, ...]]:
+        self.queries.append(" ".join(query.split()))
+        self.statements.append(self.queries[-1])
+        if "FROM workflow_runs" in query:
+            return [(RUN_NUMBER, CREATED_AT)]
+        if "FROM metric_names" in query:
+            return [(name, index) for index, name in enumerate(params[1:], start=1)]
+        return []
+
+    def executemany(self, query: str, rows: list[tuple[object, ...]]) -> None:
+        self.executemany_queries.append(" ".join(query.split()))
+        self.statements.append(self.executemany_queries[-1])
+
+    def copy_rows(self, table, columns, rows) -> None:
+        self.copied.append((table, tuple(columns), list(rows)))
+
+    def commit(self) -> None:
+        self.commits += 1
+
+    def rollback(self) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
+
+
+def _recording_postgres_storage(monkeypatch, **config) -> Storage:
+    import ci_hunter.storage as storage_module
+
+    monkeypatch.setattr(storage_module, "_PostgresBackend", RecordingPostgresBackend)
+    return Storage(StorageConfig(database_url=POSTGRES_URL, **config))
+
+
+def test_get_stored_timing_run_ids_chunks_long_run_id_lists(monkeypatch):
+    storage = _recording_postgres_storage(monkeypatch)
+
+    storage.get_stored_timing_run_ids(REPO, range(1, 1202))
+
+    # Three chunks of at most 500 ids, each read for every timing table and the re-run flags.
+    lookups = [query for query in storage._backend.queries if "FROM empty_timing_fetches" in query]
+    assert len(lookups) == 9
+    assert max(query.count("%s") for query in storage._backend.queries) <= 2 * 500 + 4
+
+
+def test_batch_copies_rows_through_staging_table_on_postgres(monkeypatch):
+    storage = _recording_postgres_storage(monkeypatch, postgres_copy_threshold_rows=2)
+
+    with storage.batch():
+        storage.save_test_durations(
+            REPO,
+            RUN_ID,
+            [
+                TestDuration(name=TEST_ALPHA, duration_seconds=DURATION_TEST_ALPHA),
+                TestDuration(name=TEST_BETA, duration_seconds=DURATION_TEST_BETA),
+            ],
+        )
+
+    backend = storage._backend
+    assert backend.copied == [
+        (
+            "test_durations_staging",
+            ("repo", "run_id", "metric_id", "duration_seconds", "run_number", "created_at"),
+            [
+                (REPO, RUN_ID, 1, DURATION_TEST_ALPHA, RUN_NUMBER, CREATED_AT),
+                (REPO, RUN_ID, 2, DURATION_TEST_BETA, RUN_NUMBER, CREATED_AT),
+            ],
+        )
+    ]
+    merge = backend.queries[-1]
+    assert merge.startswith("INSERT INTO test_durations")
+    assert (
+        "SELECT repo, run_id, metric_id, duration_seconds, run_number, created_at "
+        "FROM test_durations_staging" in merge
+    )
+    assert "ON CONFLICT (repo, run_id, metric_id) DO UPDATE SET" in merge
+    assert backend.commits == 1
+
+
+def test_postgres_saves_switch_to_copy_at_row_threshold(monkeypatch):
+    storage = _recording_postgres_storage(monkeypatch, postgres_copy_threshold_rows=3)
+    outcomes = [
+        TestOutcome(name=f"tests.test_{index}", outcome=TEST_OUTCOME_FAILED) for index in range(3)
+    ]
+
+    storage.save_test_outcomes(REPO, RUN_ID, outcomes[:2])
+    backend = storage._backend
+    assert backend.copied == []
+    assert backend.executemany_queries[-1].startswith("INSERT INTO test_outcomes")
+
+    storage.save_test_outcomes(REPO, RUN_ID, outcomes)
+    assert [table for table, _columns, _rows in backend.copied] == ["test_outcomes_staging"]
+    assert len(backend.copied[0][2]) == 3
+
+
+def test_postgres_copy_save_keeps_last_value_of_repeated_names(monkeypatch):
+    storage = _recording_postgres_storage(monkeypatch, postgres_copy_threshold_rows=2)
+
+    storage.save_test_durations(
+        REPO,
+        RUN_ID,
+        [
+            TestDuration(name=TEST_ALPHA, duration_seconds=DURATION_TEST_ALPHA),
+            TestDuration(name=TEST_BETA, duration_seconds=DURATION_TEST_BETA),
+            TestDuration(name=TEST_ALPHA, duration_seconds=DURATION_TEST_BETA),
+        ],
+    )
+
+    [(_table, _columns, rows)] = storage._backend.copied
+    assert rows == [
+        (REPO, RUN_ID, 1, DURATION_TEST_BETA, RUN_NUMBER, CREATED_AT),
+        (REPO, RUN_ID, 2, DURATION_TEST_BETA, RUN_NUMBER, CREATED_AT),
+    ]
+
+
+def test_repeated_names_keep_last_value_below_copy_threshold(tmp_path):
+    storage = Storage(StorageConfig(database_url=str(tmp_path / "ci_hunter.db")))
+    _save_two_runs(storage)
+
+    storage.save_step_durations(
+        REPO,
+        RUN_ID,
+        [
+            StepDuration(name=STEP_CHECKOUT, duration_seconds=DURATION_CHECKOUT_SHORT),
+            StepDuration(name=STEP_CHECKOUT, duration_seconds=DURATION_CHECKOUT_LONG),
+        ],
+    )
+
+    assert [sample.duration_seconds for sample in storage.list_step_durations(REPO)] == [
+        DURATION_CHECKOUT_LONG
+    ]
+    storage.close()
+
+
+def test_storage_config_rejects_non_positive_copy_threshold():
+    with pytest.raises(ValueError):
+        StorageConfig(database_url=POSTGRES_URL, postgres_copy_threshold_rows=0)
+
+
+class FakePooledCursor:
+    def __init__(self, barrier) -> None:
+        self._barrier = barrier
+        self.description = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+    def execute(self, query: str, params: tuple[object, ...] = ()) -> None:
+        # Every checked-out connection must be mid-query at once, or this times out.
+        self._barrier.wait()
+
+
+class FakeConnectionPool:
+    instances: list["FakeConnectionPool"] = []
+
+    def __init__(self, conninfo: str, **kwargs) -> None:
+        self.conninfo = conninfo
+        self.kwargs = kwargs
+        self.barrier = None
+        self.closed = False
+        FakeConnectionPool.instances.append(self)
+
+    @contextmanager
+    def connection(self):
+        pool = self
+
+        class FakeConnection:
+            def cursor(self):
+                return FakePooledCursor(pool.barrier)
+
+        yield FakeConnection()
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_pooled_postgres_storage_runs_queries_in_parallel(monkeypatch):
+    import ci_hunter.storage as storage_module
+
+    FakeConnectionPool.instances.clear()
+    monkeypatch.setattr(
+        storage_module,
+        "_import_psycopg_pool",
+        lambda: SimpleNamespace(ConnectionPool=FakeConnectionPool),
+    )
+    storage = Storage(
+        StorageConfig(database_url=POSTGRES_URL, postgres_pool_max_size=4, postgres_pool_min_size=2)
+    )
+    [pool] = FakeConnectionPool.instances
+    assert pool.conninfo == POSTGRES_URL
+    assert pool.kwargs["min_size"] == 2
+    assert pool.kwargs["max_size"] == 4
+
+    pool.barrier = threading.Barrier(3, timeout=5)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(lambda _: storage.list_workflow_runs(REPO), range(3)))
+
+    assert results == [[], [], []]
+    storage.close()
+    assert pool.closed
+
+
+def test_pooled_postgres_storage_requires_psycopg_pool(monkeypatch):
+    import ci_hunter.storage as storage_module
+
+    def fail_import_psycopg_pool():
+        raise ModuleNotFoundError("No module named 'psycopg_pool'")
+
+    monkeypatch.setattr(storage_module, "_import_psycopg_pool", fail_import_psycopg_pool)
+
+    with pytest.raises(RuntimeError, match="psycopg_pool"):
+        Storage(StorageConfig(database_url=POSTGRES_URL, postgres_pool_max_size=2))
+
+
+def test_storage_config_validates_pool_sizes():
+    with pytest.raises(ValueError):
+        StorageConfig(database_url=POSTGRES_URL, postgres_pool_max_size=0)
+    with pytest.raises(ValueError):
+        StorageConfig(database_url=POSTGRES_URL, postgres_pool_max_size=2, postgres_pool_min_size=3)
+    with pytest.raises(ValueError):
+        StorageConfig(database_url=POSTGRES_URL, postgres_pool_timeout_seconds=0)
+
+
+def test_batch_state_is_per_thread(tmp_path):
+    storage = Storage(StorageConfig(database_url=str(tmp_path / "ci_hunter.db")))
+    _save_two_runs(storage)
+    seen_in_thread: list[object] = []
+
+    with storage.batch():
+        storage.save_test_durations(
+            REPO, RUN_ID, [TestDuration(name=TEST_ALPHA, duration_seconds=DURATION_TEST_ALPHA)]
+        )
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(lambda: seen_in_thread.append(storage._local.batch)).result()
+        assert storage.list_test_durations(REPO) == []
+
+    assert seen_in_thread == [None]
+    assert len(storage.list_test_durations(REPO)) == 1
+    storage.close()
+
+
+def _save_runs_by_month(storage: Storage) -> None:
+    storage.save_workflow_runs(
+        REPO,
+        [
+            WorkflowRun(
+                id=run_number,
+                run_number=run_number,
+                status=STATUS_COMPLETED,
+                conclusion=CONCLUSION_SUCCESS,
+                created_at=created_at,
+                updated_at=created_at,
+                head_sha=HEAD_SHA_ORIGINAL,
+            )
+            for run_number, created_at in (
+                (1, "2024-01-10T00:00:00Z"),
+                (2, "2024-01-20T00:00:00Z"),
+                (3, "2024-02-10T00:00:00Z"),
+                (4, "2024-03-10T00:00:00Z"),
+            )
+        ],
+    )
+    for run_number in range(1, 5):
+        storage.save_test_durations(
+            REPO, run_number, [TestDuration(name=TEST_ALPHA, duration_seconds=float(run_number))]
+        )
+        storage.save_test_outcomes(
+            REPO, run_number, [TestOutcome(name=TEST_ALPHA, outcome=TEST_OUTCOME_FAILED)]
+        )
+
+
+def test_prune_timings_deletes_rows_before_horizon(tmp_path):
+    storage = Storage(StorageConfig(database_url=str(tmp_path / "ci_hunter.db")))
+    _save_runs_by_month(storage)
+
+    result = storage.prune_timings(date(2024, 2, 1))
+
+    assert result == TimingRetentionResult(dropped_partitions=(), deleted_rows=4)
+    assert [sample.run_number for sample in storage.list_test_durations(REPO)] == [3, 4]
+    assert [sample.run_number for sample in storage.list_test_outcomes(REPO)] == [3, 4]
+    assert len(storage.list_workflow_runs(REPO)) == 4
+    storage.close()
+
+
+def test_prune_timings_downsamples_old_runs(tmp_path):
+    storage = Storage(StorageConfig(database_url=str(tmp_path / "ci_hunter.db")))
+    _save_runs_by_month(storage)
+
+    result = storage.prune_timings(date(2024, 3, 1), keep_every=2)
+
+    assert result.deleted_rows == 4
+    assert [sample.run_number for sample in storage.list_test_durations(REPO)] == [2, 4]
+    with pytest.raises(ValueError):
+        storage.prune_timings(date(2024, 3, 1), keep_every=1)
+    storage.close()
+
+
+def test_prune_timings_rebuilds_metric_rollups(tmp_path):
+    path = str(tmp_path / "ci_hunter.db")
+    storage = Storage(StorageConfig(database_url=path, rollup_window=3))
+    _save_runs_by_month(storage)
+
+    storage.prune_timings(date(2024, 2, 1))
+
+    assert storage.list_metric_rollups(REPO, METRIC_KIND_TEST)[0].sample_count == 2
+    assert storage.metric_rollups_in_sync(REPO) is True
+    pruned = _rollup_state(storage, METRIC_KIND_TEST)
+    storage.rebuild_metric_rollups(REPO)
+    assert _rollup_state(storage, METRIC_KIND_TEST) == pruned
+
+    # Without rollup_window the rollups are left alone and flagged out of sync.
+    Storage(StorageConfig(database_url=path)).prune_timings(date(2024, 3, 1))
+    assert _rollup_state(storage, METRIC_KIND_TEST) == pruned
+    assert storage.metric_rollups_in_sync(REPO) is False
+    storage.close()
+
+
+def test_timing_partitions_are_a_no_op_on_sqlite(tmp_path):
+    storage = Storage(StorageConfig(database_url=str(tmp_path / "ci_hunter.db")))
+
+    assert storage.ensure_timing_partitions(date(2024, 1, 1), 3) == []
+    storage.close()
+
+
+class PartitionedPostgresBackend(RecordingPostgresBackend):
+    def __init__(self, database_url: str) -> None:
+        super().__init__(database_url)
+        self.partitions = {
+            table: [
+                timing_partition_name(table, 2023, 12),
+                timing_partition_name(table, 2024, 1),
+                f"{table}_default",
+            ]
+            for table in ("step_durations", "test_durations", "test_outcomes")
+        }
+        self.deletes: list[tuple[str, tuple[object, ...]]] = []
+
+    def execute(self, query: str, params: tuple[object, ...] = ()) -> list[tuple[object, ...]]:
+        if "FROM pg_class" in query and "relkind = 'p'" in query:
+            super().execute(query, params)
+            return [(table,) for table in params]
+        if "FROM pg_inherits" in query:
+            super().execute(query, params)
+            return [(name,) for name in self.partitions[params[0]]]
+        return super().execute(query, params)
+
+    def execute_rowcount(self, query: str, params: tuple[object, ...] = ()) -> int:
+        self.deletes.append((" ".join(query.split()), params))
+        return 1
+
+
+def test_partitioned_postgres_upserts_include_partition_key(monkeypatch):
+    import ci_hunter.storage as storage_module
+
+    monkeypatch.setattr(storage_module, "_PostgresBackend", PartitionedPostgresBackend)
+    storage = Storage(StorageConfig(database_url=POSTGRES_URL))
+
+    storage.save_test_durations(
+        REPO, RUN_ID, [TestDuration(name=TEST_ALPHA, duration_seconds=DURATION_TEST_ALPHA)]
+    )
+
+    [upsert] = [
+        query
+        for query in storage._backend.executemany_queries
+        if query.startswith("INSERT INTO test_durations")
+    ]
+    assert "ON CONFLICT (repo, run_id, metric_id, created_at) DO UPDATE SET" in upsert
+
+
+def test_partitioned_postgres_retention_drops_old_partitions(monkeypatch):
+    import ci_hunter.storage as storage_module
+
+    monkeypatch.setattr(storage_module, "_PostgresBackend", PartitionedPostgresBackend)
+    storage = Storage(StorageConfig(database_url=POSTGRES_URL))
+    backend = storage._backend
+
+    created = storage.ensure_timing_partitions(date(2024, 1, 15), 2)
+    result = storage.prune_timings(date(2024, 1, 15))
+
+    assert created == [timing_partition_name(table, 2024, 2) for table in sorted(backend.partitions)]
+    assert (
+        "CREATE TABLE step_durations_p202402 PARTITION OF step_durations "
+        "FOR VALUES FROM ('2024-02-01') TO ('2024-03-01')"
+    ) in backend.queries
+    assert result.dropped_partitions == (
+        "step_durations_p202312",
+        "test_durations_p202312",
+        "test_outcomes_p202312",
+    )
+    assert "DROP TABLE test_durations_p202312" in backend.queries
+    assert backend.deletes[0] == (
+        "DELETE FROM step_durations WHERE created_at < %s",
+        ("2024-01-15",),
+    )
+    assert result.deleted_rows == 3
+    assert backend.commits == 2
+
+
+def _rollup_state(storage: Storage, kind: str) -> list[tuple[object, ...]]:
+    return [
+        (rollup.name, rollup.recent, rollup.sample_count, rollup.value_sum, rollup.sketch.count)
+        for rollup in storage.list_metric_rollups(REPO, kind)
+    ]
+
+
+def test_metric_rollups_are_maintained_on_save(tmp_path):
+    storage = Storage(
+        StorageConfig(database_url=str(tmp_path / "ci_hunter.db"), rollup_window=3)
+    )
+    _save_runs_by_month(storage)
+    storage.save_step_durations(
+        REPO, 4, [StepDuration(name=STEP_CHECKOUT, duration_seconds=DURATION_CHECKOUT_SHORT)]
+    )
+    # Overwriting a stored sample replaces it instead of counting it twice.
+    storage.save_test_durations(REPO, 2, [TestDuration(name=TEST_ALPHA, duration_seconds=20.0)])
+
+    assert _rollup_state(storage, METRIC_KIND_TEST) == [
+        (TEST_ALPHA, [(2, 20.0), (3, 3.0), (4, 4.0)], 4, 28.0, 4)
+    ]
+    assert _rollup_state(storage, METRIC_KIND_STEP) == [
+        (STEP_CHECKOUT, [(4, DURATION_CHECKOUT_SHORT)], 1, DURATION_CHECKOUT_SHORT, 1)
+    ]
+
+    incremental = _rollup_state(storage, METRIC_KIND_TEST)
+    storage.rebuild_metric_rollups(REPO)
+    assert _rollup_state(storage, METRIC_KIND_TEST) == incremental
+    storage.close()
+
+
+def test_metric_rollups_are_maintained_by_batches(tmp_path):
+    storage = Storage(
+        StorageConfig(database_url=str(tmp_path / "ci_hunter.db"), rollup_window=2)
+    )
+    _save_two_runs(storage)
+
+    with storage.batch():
+        for run_id, duration in ((RUN_ID, DURATION_TEST_ALPHA), (RUN_ID_SECOND, DURATION_TEST_BETA)):
+            storage.save_test_durations(
+                REPO, run_id, [TestDuration(name=TEST_ALPHA, duration_seconds=duration)]
+            )
+
+    assert _rollup_state(storage, METRIC_KIND_TEST) == [
+        (
+            TEST_ALPHA,
+            [(RUN_NUMBER, DURATION_TEST_ALPHA), (RUN_NUMBER_SECOND, DURATION_TEST_BETA)],
+            2,
+            DURATION_TEST_ALPHA + DURATION_TEST_BETA,
+            2,
+        )
+    ]
+    storage.close()
+
+
+def test_metric_rollups_count_repeated_names_once(tmp_path):
+    storage = Storage(
+        StorageConfig(database_url=str(tmp_path / "ci_hunter.db"), rollup_window=20)
+    )
+    _save_two_runs(storage)
+
+    storage.save_test_durations(
+        REPO,
+        RUN_ID,
+        [
+            TestDuration(name=TEST_ALPHA, duration_seconds=DURATION_TEST_ALPHA),
+            TestDuration(name=TEST_ALPHA, duration_seconds=DURATION_TEST_BETA),
+        ],
+    )
+    with storage.batch():
+        storage.save_test_durations(
+            REPO,
+            RUN_ID_SECOND,
+            [
+                TestDuration(name=TEST_ALPHA, duration_seconds=DURATION_TEST_ALPHA),
+                TestDuration(name=TEST_ALPHA, duration_seconds=DURATION_TEST_ALPHA),
+            ],
+        )
+
+    assert _rollup_state(storage, METRIC_KIND_TEST) == [
+        (
+            TEST_ALPHA,
+            [(RUN_NUMBER, DURATION_TEST_BETA), (RUN_NUMBER_SECOND, DURATION_TEST_ALPHA)],
+            2,
+            DURATION_TEST_BETA + DURATION_TEST_ALPHA,
+            2,
+        )
+    ]
+    assert storage.metric_rollups_in_sync(REPO) is True
+    storage.close()
+
+
+def test_metric_rollups_record_repeated_keys_in_one_upsert_once(tmp_path):
+    storage = Storage(
+        StorageConfig(database_url=str(tmp_path / "ci_hunter.db"), rollup_window=20)
+    )
+    _save_two_runs(storage)
+    storage.save_test_durations(
+        REPO, RUN_ID, [TestDuration(name=TEST_ALPHA, duration_seconds=DURATION_TEST_ALPHA)]
+    )
+    [metric_id] = [
+        row[0]
+        for row in storage._backend.execute(
+            "SELECT metric_id FROM metric_names WHERE name = ?", (TEST_ALPHA,)
+        )
+    ]
+    row = (REPO, RUN_ID, metric_id, DURATION_TEST_BETA, RUN_NUMBER, CREATED_AT)
+
+    with storage._session() as backend:
+        storage._upsert_timing_rows(backend, TEST_DURATIONS_TABLE, [row, row])
+        backend.commit()
+
+    assert _rollup_state(storage, METRIC_KIND_TEST) == [
+        (TEST_ALPHA, [(RUN_NUMBER, DURATION_TEST_BETA)], 1, DURATION_TEST_BETA, 1)
+    ]
+    storage.close()
+
+
+def test_metric_rollups_survive_concurrent_saves_of_one_sample(tmp_path, monkeypatch):
+    path = str(tmp_path / "ci_hunter.db")
+    writers = [Storage(StorageConfig(database_url=path, rollup_window=3)) for _ in range(2)]
+    _save_two_runs(writers[0])
+    writers[0].save_test_durations(
+        REPO, RUN_ID_SECOND, [TestDuration(name=TEST_ALPHA, duration_seconds=DURATION_TEST_BETA)]
+    )
+    barrier = threading.Barrier(2, timeout=0.5)
+    select_stored_values = Storage._select_stored_values
+
+    def racing_select(self, backend, table, rows):
+        # Without the rollup lock both writers would read "nothing stored" here.
+        try:
+            barrier.wait()
+        except threading.BrokenBarrierError:
+            pass
+        return select_stored_values(self, backend, table, rows)
+
+    monkeypatch.setattr(Storage, "_select_stored_values", racing_select)
+
+    def save(storage: Storage, duration: float) -> None:
+        storage.save_test_durations(
+            REPO, RUN_ID, [TestDuration(name=TEST_ALPHA, duration_seconds=duration)]
+        )
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(save, writers, (DURATION_TEST_ALPHA, DURATION_TEST_BETA)))
+
+    [(_name, recent, sample_count, value_sum, sketch_count)] = _rollup_state(
+        writers[0], METRIC_KIND_TEST
+    )
+    stored = [sample.duration_seconds for sample in writers[0].list_test_durations(REPO)]
+    assert (sample_count, sketch_count) == (2, 2)
+    assert [value for _run_number, value in recent] == stored
+    assert value_sum == sum(stored)
+    for storage in writers:
+        storage.close()
+
+
+def test_metric_rollups_insert_missing_rows_before_locking_on_postgres(monkeypatch):
+    storage = _recording_postgres_storage(monkeypatch, rollup_window=3)
+
+    storage.save_test_durations(
+        REPO, RUN_ID, [TestDuration(name=TEST_ALPHA, duration_seconds=DURATION_TEST_ALPHA)]
+    )
+
+    backend = storage._backend
+    [create] = [
+        query
+        for query in backend.executemany_queries
+        if query.startswith("INSERT INTO metric_rollups")
+        and query.endswith("ON CONFLICT (repo, metric_id) DO NOTHING")
+    ]
+    [lock] = [query for query in backend.queries if query.endswith("FOR UPDATE")]
+    assert "FROM metric_rollups" in lock
+    statements = backend.statements
+    assert statements.index(create) < statements.index(lock)
+    assert statements.index(lock) < statements.index(
+        next(query for query in statements if query.startswith("INSERT INTO test_durations"))
+    )
+
+
+def test_metric_rollups_in_sync_tracks_writers_and_rebuilds(tmp_path):
+    path = str(tmp_path / "ci_hunter.db")
+    plain = Storage(StorageConfig(database_url=path))
+    _save_runs_by_month(plain)
+    storage = Storage(StorageConfig(database_url=path, rollup_window=3))
+
+    assert storage.metric_rollups_in_sync(REPO) is False
+    # Rollups started after raw samples were stored miss those samples.
+    storage.save_test_durations(REPO, 4, [TestDuration(name=TEST_BETA, duration_seconds=1.0)])
+    assert storage.metric_rollups_in_sync(REPO) is False
+
+    storage.rebuild_metric_rollups(REPO)
+    assert storage.metric_rollups_in_sync(REPO) is True
+    storage.save_test_durations(REPO, 4, [TestDuration(name=TEST_BETA, duration_seconds=2.0)])
+    assert storage.metric_rollups_in_sync(REPO) is True
+
+    # Outcomes have no rollups, so they leave the flag alone.
+    plain.save_test_outcomes(REPO, 4, [TestOutcome(name=TEST_BETA, outcome=TEST_OUTCOME_FAILED)])
+    assert storage.metric_rollups_in_sync(REPO) is True
+    plain.save_step_durations(
+        REPO, 4, [StepDuration(name=STEP_CHECKOUT, duration_seconds=DURATION_CHECKOUT_SHORT)]
+    )
+    assert storage.metric_rollups_in_sync(REPO) is False
+    plain.close()
+    storage.close()
+
+
+def test_metric_rollups_start_in_sync_on_a_new_repo(tmp_path):
+    storage = Storage(StorageConfig(database_url=str(tmp_path / "ci_hunter.db"), rollup_window=3))
+    _save_runs_by_month(storage)
+
+    assert storage.metric_rollups_in_sync(REPO) is True
+    assert storage.metric_rollups_in_sync("acme/other") is False
+    storage.close()
+
+
+def test_metric_rollups_are_not_maintained_by_default(tmp_path):
+    storage = Storage(StorageConfig(database_url=str(tmp_path / "ci_hunter.db")))
+    _save_runs_by_month(storage)
+
+    assert storage.rollup_window is None
+    assert storage.list_metric_rollups(REPO, METRIC_KIND_TEST) == []
+    with pytest.raises(RuntimeError, match="rollup_window"):
+        storage.rebuild_metric_rollups(REPO)
+    with pytest.raises(ValueError):
+        StorageConfig(database_url=POSTGRES_URL, rollup_window=1)
+    storage.close()
+
+
+def test_job_queue_claims_oldest_jobs_and_hides_them_until_timeout(tmp_path):
+    storage = Storage(StorageConfig(database_url=str(tmp_path / "ci_hunter.db")))
+    jobs = [AnalysisJob(repo=REPO, pr_number=number, commit=None, branch=None) for number in (1, 2, 3)]
+    job_ids = [storage.enqueue_job(job) for job in jobs]
+
+    first = storage.claim_jobs(2, visibility_timeout_seconds=60)
+    second = storage.claim_jobs(2, visibility_timeout_seconds=60)
+
+    assert [claimed.job_id for claimed in first] == job_ids[:2]
+    assert [claimed.job for claimed in first] == jobs[:2]
+    assert [claimed.attempts for claimed in first] == [1, 1]
+    assert [claimed.job for claimed in second] == jobs[2:]
+    assert storage.claim_jobs(2, visibility_timeout_seconds=60) == []
+    assert storage.count_queued_jobs() == 3
+    storage.close()
+
+
+def test_job_queue_ack_and_release(tmp_path):
+    storage = Storage(StorageConfig(database_url=str(tmp_path / "ci_hunter.db")))
+    storage.enqueue_job(AnalysisJob(repo=REPO, pr_number=1, commit="abc", branch="main"))
+    storage.enqueue_job(AnalysisJob(repo=REPO, pr_number=2, commit=None, branch=None))
+    done, failed = storage.claim_jobs(2, visibility_timeout_seconds=60)
+
+    assert storage.ack_job(done) is True
+    assert storage.release_job(failed) is True
+    [retried] = storage.claim_jobs(2, visibility_timeout_seconds=60)
+
+    assert retried.job_id == failed.job_id
+    assert retried.attempts == 2
+    assert storage.ack_job(done) is False
+    # The retry holds a new lease, so the first claim can no longer touch the job.
+    assert storage.ack_job(failed) is False
+    assert storage.count_queued_jobs() == 1
+    storage.close()
+
+
+def test_job_queue_reclaims_jobs_after_visibility_timeout(tmp_path, monkeypatch):
+    import ci_hunter.storage as storage_module
+
+    clock = [1000.0]
+    monkeypatch.setattr(storage_module.time, "time", lambda: clock[0])
+    storage = Storage(StorageConfig(database_url=str(tmp_path / "ci_hunter.db")))
+    storage.enqueue_job(AnalysisJob(repo=REPO, pr_number=1, commit=None, branch=None))
+    [stale] = storage.claim_jobs(1, visibility_timeout_seconds=30)
+
+    clock[0] += 31
+    [reclaimed] = storage.claim_jobs(1, visibility_timeout_seconds=30)
+
+    assert reclaimed.job_id == stale.job_id
+    assert reclaimed.lease_token != stale.lease_token
+    assert storage.release_job(stale) is False
+    assert storage.ack_job(reclaimed) is True
+    storage.close()
+
+
+def test_job_queue_concurrent_claims_are_disjoint(tmp_path):
+    db_path = str(tmp_path / "ci_hunter.db")
+    setup = Storage(StorageConfig(database_url=db_path))
+    for number in range(1, 41):
+        setup.enqueue_job(AnalysisJob(repo=REPO, pr_number=number, commit=None, branch=None))
+    setup.close()
+
+    def drain() -> list[int]:
+        storage = Storage(StorageConfig(database_url=db_path))
+        claimed_ids: list[int] = []
+        try:
+            while claimed := storage.claim_jobs(3, visibility_timeout_seconds=60):
+                claimed_ids.extend(job.job_id for job in claimed)
+        finally:
+            storage.close()
+        return claimed_ids
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda _index: drain(), range(4)))
+
+    claimed_ids = [job_id for result in results for job_id in result]
+    assert sorted(claimed_ids) == list(range(1, 41))
+
+
+def test_job_queue_claims_with_skip_locked_on_postgres(monkeypatch):
+    storage = _recording_postgres_storage(monkeypatch)
+
+    assert storage.claim_jobs(5, visibility_timeout_seconds=60) == []
+
+    claim = storage._backend.queries[-1]
+    assert "FOR UPDATE SKIP LOCKED" in claim
+    assert claim.startswith("UPDATE analysis_jobs AS jobs SET visible_at = %s")
+    assert "RETURNING jobs.job_id" in claim
+    assert storage._backend.commits == 1
+
+
+def test_job_queue_coalesces_waiting_jobs_for_the_same_pr(tmp_path):
+    storage = Storage(StorageConfig(database_url=str(tmp_path / "ci_hunter.db")))
+    first_id = storage.enqueue_job(AnalysisJob(repo=REPO, pr_number=1, commit="a", branch="x"))
+    other_id = storage.enqueue_job(AnalysisJob(repo=REPO, pr_number=2, commit=None, branch=None))
+
+    for commit, branch in (("b", "x"), ("c", "y")):
+        job = AnalysisJob(repo=REPO, pr_number=1, commit=commit, branch=branch)
+        assert storage.enqueue_job(job) == first_id
+    assert storage.count_queued_jobs() == 2
+    newest, other = storage.claim_jobs(5)
+
+    assert (newest.job_id, newest.job.commit, newest.job.branch) == (first_id, "c", "y")
+    assert newest.coalesced == 2
+    assert (other.job_id, other.coalesced) == (other_id, 0)
+    storage.close()
+
+
+def test_job_queue_does_not_coalesce_into_claimed_jobs(tmp_path):
+    storage = Storage(StorageConfig(database_url=str(tmp_path / "ci_hunter.db")))
+    storage.enqueue_job(AnalysisJob(repo=REPO, pr_number=1, commit="a", branch=None))
+    [running] = storage.claim_jobs(1)
+
+    storage.enqueue_job(AnalysisJob(repo=REPO, pr_number=1, commit="b", branch=None))
+
+    assert storage.count_queued_jobs() == 2
+    [waiting] = storage.claim_jobs(1)
+    assert waiting.job.commit == "b"
+    storage.close()
+
+
+def test_job_queue_release_folds_in_newer_waiting_job(tmp_path):
+    storage = Storage(StorageConfig(database_url=str(tmp_path / "ci_hunter.db")))
+    storage.enqueue_job(AnalysisJob(repo=REPO, pr_number=1, commit="a", branch=None))
+    [running] = storage.claim_jobs(1)
+    storage.enqueue_job(AnalysisJob(repo=REPO, pr_number=1, commit="b", branch=None))
+
+    assert storage.release_job(running) is True
+
+    assert storage.count_queued_jobs() == 1
+    [retried] = storage.claim_jobs(5)
+    assert (retried.job_id, retried.job.commit, retried.coalesced) == (running.job_id, "b", 1)
+    storage.close()
+
+
+def test_job_queue_adds_coalesced_column_to_existing_sqlite_table(tmp_path):
+    db_path = tmp_path / "ci_hunter.db"
+    connection = sqlite3.connect(db_path)
+    connection.execute(
+        """
+        CREATE TABLE analysis_jobs (
+            job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            repo TEXT NOT NULL,
+            pr_number INTEGER NOT NULL,
+            commit_sha TEXT,
+            branch TEXT,
+            visible_at REAL NOT NULL,
+            lease_token TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    connection.execute(
+        "INSERT INTO analysis_jobs (repo, pr_number, visible_at) VALUES (?, 1, 0)", (REPO,)
+    )
+    connection.commit()
+    connection.close()
+
+    storage = Storage(StorageConfig(database_url=str(db_path)))
+
+    [claimed] = storage.claim_jobs(1)
+    assert claimed.coalesced == 0
+    storage.close()
+
+
+class JobQueuePostgresBackend(RecordingPostgresBackend):
+    def execute(self, query: str, params: tuple[object, ...] = ()) -> list[tuple[object, ...]]:
+        rows = super().execute(query, params)
+        return [(1,)] if "RETURNING job_id" in query else rows
+
+
+def test_job_queue_enqueue_takes_advisory_lock_on_postgres(monkeypatch):
+    import ci_hunter.storage as storage_module
+
+    monkeypatch.setattr(storage_module, "_PostgresBackend", JobQueuePostgresBackend)
+    storage = Storage(StorageConfig(database_url=POSTGRES_URL))
+
+    assert storage.enqueue_job(AnalysisJob(repo=REPO, pr_number=7, commit=None, branch=None)) == 1
+
+    assert storage._backend.queries[0] == "SELECT pg_advisory_xact_lock(hashtext(%s), %s::integer)"
+    assert "AND lease_token IS NULL" in storage._backend.queries[1]
+    assert storage._backend.queries[2].startswith("INSERT INTO analysis_jobs")
+
+
+def test_job_queue_rejects_invalid_claim_arguments(tmp_path):
+    storage = Storage(StorageConfig(database_url=str(tmp_path / "ci_hunter.db")))
+
+    with pytest.raises(ValueError, match="limit"):
+        storage.claim_jobs(0)
+    with pytest.raises(ValueError, match="visibility_timeout_seconds"):
+        storage.claim_jobs(1, visibility_timeout_seconds=-1)
+    storage.close()
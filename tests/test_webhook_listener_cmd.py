@@ -5,6 +5,8 @@ from pathlib import Path
 
 import pytest
 
+from ci_hunter.queue import AnalysisJob
+from ci_hunter.storage import Storage, StorageConfig
 from ci_hunter.webhook_listener_cmd import main
 
 
@@ -82,6 +84,54 @@ def test_webhook_listener_once_processes_single_request(tmp_path):
     assert payload["pr_number"] == 7
 
 
+def test_webhook_listener_enqueues_to_queue_db(tmp_path):
+    db_path = tmp_path / "queue.db"
+    captured = {}
+
+    class FakeServer:
+        server_address = ("127.0.0.1", 9000)
+
+        def __init__(self, enqueue_handler):
+            self._enqueue_handler = enqueue_handler
+
+        def handle_request(self):
+            captured["handled"] = self._enqueue_handler(
+                "pull_request",
+                {
+                    "action": "synchronize",
+                    "repository": {"full_name": "acme/repo"},
+                    "pull_request": {
+                        "number": 7,
+                        "head": {"sha": "abc123", "ref": "feature-x"},
+                    },
+                },
+            )
+
+        def server_close(self):
+            return None
+
+    def factory(*, host, port, enqueue_handler, log_fn, shared_secret, auth_token, max_body_bytes):
+        return FakeServer(enqueue_handler)
+
+    exit_code = main(
+        ["--queue-db", str(db_path), "--once"],
+        server_factory=factory,
+        out=io.StringIO(),
+    )
+
+    assert exit_code == 0
+    assert captured["handled"] is True
+    storage = Storage(StorageConfig(database_url=str(db_path)))
+    [claimed] = storage.claim_jobs(1)
+    storage.close()
+    assert claimed.job == AnalysisJob(
+        repo="acme/repo",
+        pr_number=7,
+        commit="abc123",
+        branch="feature-x",
+    )
+
+
 def test_webhook_listener_serve_forever_and_graceful_shutdown(tmp_path):
     queue_path = tmp_path / "queue.jsonl"
 
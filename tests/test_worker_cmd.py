@@ -1,6 +1,14 @@
 import io
+import json
+import multiprocessing
+import os
 from pathlib import Path
 
+import pytest
+
+import ci_hunter.worker_pool as worker_pool
+from ci_hunter.queue import AnalysisJob
+from ci_hunter.storage import Storage, StorageConfig
 from ci_hunter.worker_cmd import main
 
 
@@ -190,30 +198,350 @@ def test_worker_cmd_loop_sleeps_only_when_no_jobs(tmp_path):
     assert slept == [0.01]
 
 
-def test_worker_cmd_uses_file_lock(tmp_path, monkeypatch):
+def test_worker_cmd_releases_file_lock_while_jobs_run(tmp_path, monkeypatch):
     queue_path = tmp_path / "queue.jsonl"
     queue_path.write_text(
         '{"repo":"acme/repo","pr_number":1,"commit":"abc","branch":"feature"}\n',
         encoding="utf-8",
     )
     calls: list[Path] = []
+    held = [False]
 
-    import ci_hunter.worker_cmd as worker_cmd
+    import ci_hunter.job_queue_file as job_queue_file
 
     from contextlib import contextmanager
 
     @contextmanager
     def fake_locked_file(path: Path, mode: str, **_kwargs):
         calls.append(path)
-        with open(path, mode, encoding="utf-8") as handle:
-            yield handle
+        held[0] = True
+        try:
+            with open(path, mode, encoding="utf-8") as handle:
+                yield handle
+        finally:
+            held[0] = False
 
-    monkeypatch.setattr(worker_cmd, "locked_file", fake_locked_file)
+    monkeypatch.setattr(job_queue_file, "locked_file", fake_locked_file)
+    held_during_run: list[bool] = []
 
     exit_code = main(
         ["--queue-file", str(queue_path)],
-        cli_entry=lambda _argv: 0,
+        cli_entry=lambda _argv: held_during_run.append(held[0]) or 0,
+    )
+
+    assert exit_code == 0
+    assert held_during_run == [False]
+    # Claim, ack and the final pending count each take the lock briefly.
+    assert calls == [queue_path] * 3
+
+
+def test_worker_cmd_journals_file_jobs_while_they_run(tmp_path):
+    queue_path = tmp_path / "queue.jsonl"
+    queue_path.write_text(
+        '{"repo":"acme/repo","pr_number":1,"commit":null,"branch":null}\n'
+        '{"repo":"acme/repo","pr_number":2,"commit":null,"branch":null}\n',
+        encoding="utf-8",
+    )
+    journal = tmp_path / "queue.jsonl.inprogress"
+    seen: list[tuple[str, bool]] = []
+
+    def cli_main(argv: list[str]) -> int:
+        seen.append((queue_path.read_text(encoding="utf-8"), journal.exists()))
+        return 0
+
+    exit_code = main(["--queue-file", str(queue_path)], cli_entry=cli_main)
+
+    assert exit_code == 0
+    assert seen == [('{"repo":"acme/repo","pr_number":2,"commit":null,"branch":null}\n', True)]
+    assert not journal.exists()
+
+
+def test_worker_cmd_requeues_failed_file_jobs_at_the_front(tmp_path):
+    queue_path = tmp_path / "queue.jsonl"
+    queue_path.write_text(
+        '{"repo":"acme/repo","pr_number":1,"commit":null,"branch":null}\n'
+        '{"repo":"acme/repo","pr_number":2,"commit":null,"branch":null}\n'
+        '{"repo":"acme/repo","pr_number":3,"commit":null,"branch":null}\n',
+        encoding="utf-8",
+    )
+    calls: list[list[str]] = []
+
+    def cli_main(argv: list[str]) -> int:
+        calls.append(argv)
+        return 1
+
+    exit_code = main(["--queue-file", str(queue_path), "--max-jobs", "2"], cli_entry=cli_main)
+
+    assert exit_code == 1
+    assert len(calls) == 1
+    remaining = [json.loads(line)["pr_number"] for line in queue_path.read_text().splitlines()]
+    assert remaining == [1, 2, 3]
+    assert not (tmp_path / "queue.jsonl.inprogress").exists()
+
+
+def _enqueue_db_jobs(db_path, *pr_numbers):
+    storage = Storage(StorageConfig(database_url=str(db_path)))
+    try:
+        for pr_number in pr_numbers:
+            storage.enqueue_job(
+                AnalysisJob(repo="acme/repo", pr_number=pr_number, commit=None, branch=None)
+            )
+    finally:
+        storage.close()
+
+
+def _queued_db_jobs(db_path):
+    storage = Storage(StorageConfig(database_url=str(db_path)))
+    try:
+        return storage.count_queued_jobs()
+    finally:
+        storage.close()
+
+
+def test_worker_cmd_processes_and_acks_database_jobs(tmp_path):
+    db_path = tmp_path / "queue.db"
+    _enqueue_db_jobs(db_path, 1, 2, 3)
+    calls: list[list[str]] = []
+
+    exit_code = main(
+        ["--queue-db", str(db_path), "--max-jobs", "2"],
+        cli_entry=lambda argv: calls.append(argv) or 0,
+    )
+
+    assert exit_code == 0
+    assert calls == [
+        ["--repo", "acme/repo", "--pr-number", "1"],
+        ["--repo", "acme/repo", "--pr-number", "2"],
+    ]
+    assert _queued_db_jobs(db_path) == 1
+
+
+def test_worker_cmd_releases_database_jobs_on_failure(tmp_path):
+    db_path = tmp_path / "queue.db"
+    _enqueue_db_jobs(db_path, 1, 2)
+
+    exit_code = main(
+        ["--queue-db", str(db_path), "--max-jobs", "2"],
+        cli_entry=lambda argv: 1,
+    )
+
+    assert exit_code == 1
+    storage = Storage(StorageConfig(database_url=str(db_path)))
+    claimed = storage.claim_jobs(2)
+    storage.close()
+    assert [job.job.pr_number for job in claimed] == [1, 2]
+    assert [job.attempts for job in claimed] == [2, 2]
+
+
+def test_worker_cmd_reports_empty_database_queue(tmp_path):
+    output = io.StringIO()
+
+    exit_code = main(
+        ["--queue-db", str(tmp_path / "queue.db")],
+        cli_entry=lambda argv: 0,
+        out=output,
+    )
+
+    assert exit_code == 0
+    assert "analysis_jobs: no jobs found" in output.getvalue()
+
+
+def test_worker_cmd_rejects_both_queue_sources(tmp_path):
+    with pytest.raises(SystemExit):
+        main(
+            ["--queue-file", str(tmp_path / "queue.jsonl"), "--queue-db", str(tmp_path / "q.db")],
+            cli_entry=lambda argv: 0,
+        )
+
+
+def test_worker_cmd_processes_queue_log_per_consumer_group(tmp_path):
+    from ci_hunter.job_queue_log import JobLog
+
+    log_dir = tmp_path / "queue"
+    JobLog(log_dir).append_jobs(
+        [
+            AnalysisJob(repo="acme/repo", pr_number=1, commit=None, branch=None),
+            AnalysisJob(repo="acme/repo", pr_number=2, commit=None, branch="main"),
+        ]
+    )
+    calls: list[list[str]] = []
+
+    exit_code = main(
+        ["--queue-log", str(log_dir), "--max-jobs", "5"],
+        cli_entry=lambda argv: calls.append(argv) or 0,
+    )
+    other_group_code = main(
+        ["--queue-log", str(log_dir), "--consumer-group", "backfill", "--max-jobs", "1"],
+        cli_entry=lambda argv: calls.append(argv) or 0,
+    )
+
+    assert exit_code == 0
+    assert other_group_code == 0
+    assert calls == [
+        ["--repo", "acme/repo", "--pr-number", "1"],
+        ["--repo", "acme/repo", "--pr-number", "2", "--branch", "main"],
+        ["--repo", "acme/repo", "--pr-number", "1"],
+    ]
+    assert JobLog(log_dir).pending_job_count("default") == 0
+    assert JobLog(log_dir).pending_job_count("backfill") == 1
+
+
+def test_worker_cmd_runs_only_the_newest_job_per_pr(tmp_path):
+    queue_path = tmp_path / "queue.jsonl"
+    queue_path.write_text(
+        '{"repo":"acme/repo","pr_number":1,"commit":"a","branch":null}\n'
+        '{"repo":"acme/repo","pr_number":2,"commit":null,"branch":null}\n'
+        '{"repo":"acme/repo","pr_number":1,"commit":"b","branch":null}\n'
+        '{"repo":"acme/repo","pr_number":1,"commit":"c","branch":null}\n',
+        encoding="utf-8",
+    )
+    calls: list[list[str]] = []
+    output = io.StringIO()
+
+    exit_code = main(
+        ["--queue-file", str(queue_path), "--max-jobs", "5"],
+        cli_entry=lambda argv: calls.append(argv) or 0,
+        out=output,
+    )
+
+    assert exit_code == 0
+    assert calls == [
+        ["--repo", "acme/repo", "--pr-number", "1", "--commit", "c"],
+        ["--repo", "acme/repo", "--pr-number", "2"],
+    ]
+    assert "queue.jsonl: skipped 2 superseded jobs" in output.getvalue()
+
+
+def test_worker_cmd_pool_runs_each_job_once(tmp_path):
+    queue_path = tmp_path / "queue.jsonl"
+    queue_path.write_text(
+        "".join(
+            json.dumps({"repo": "acme/repo", "pr_number": number}) + "\n"
+            for number in range(1, 9)
+        ),
+        encoding="utf-8",
+    )
+    ran_path = tmp_path / "ran.txt"
+
+    def cli_main(argv: list[str]) -> int:
+        with ran_path.open("a", encoding="utf-8") as handle:
+            handle.write(argv[3] + "\n")
+        return 0
+
+    output = io.StringIO()
+    exit_code = main(
+        [
+            "--queue-file",
+            str(queue_path),
+            "--concurrency",
+            "3",
+            "--loop",
+            "--max-loops",
+            "4",
+            "--sleep-seconds",
+            "0.01",
+        ],
+        cli_entry=cli_main,
+        out=output,
+    )
+
+    assert exit_code == 0
+    ran = ran_path.read_text(encoding="utf-8").split()
+    assert sorted(ran, key=int) == [str(number) for number in range(1, 9)]
+    assert queue_path.read_text(encoding="utf-8") == ""
+    summaries = [line for line in output.getvalue().splitlines() if line.startswith("worker ")]
+    assert len(summaries) == 3
+    processed = sum(int(line.split("processed ")[1].split(",")[0]) for line in summaries)
+    assert processed == 8
+
+
+def test_worker_cmd_pool_restarts_crashed_workers(tmp_path):
+    queue_path = tmp_path / "queue.jsonl"
+    queue_path.write_text('{"repo":"acme/repo","pr_number":1}\n', encoding="utf-8")
+    crashed = tmp_path / "crashed"
+    ran_path = tmp_path / "ran.txt"
+
+    def cli_main(argv: list[str]) -> int:
+        if not crashed.exists():
+            crashed.touch()
+            os._exit(3)
+        ran_path.write_text(argv[3], encoding="utf-8")
+        return 0
+
+    output = io.StringIO()
+    exit_code = main(
+        [
+            "--queue-file",
+            str(queue_path),
+            "--concurrency",
+            "2",
+            "--loop",
+            "--max-loops",
+            "40",
+            "--sleep-seconds",
+            "0.02",
+            "--visibility-timeout-seconds",
+            "0.2",
+        ],
+        cli_entry=cli_main,
+        out=output,
+    )
+
+    assert exit_code == 0
+    assert ran_path.read_text(encoding="utf-8") == "1"
+    assert "died (exit code 3); restarting" in output.getvalue()
+    assert "restarts 1" in output.getvalue()
+
+
+def test_worker_cmd_pool_stops_on_failed_job(tmp_path):
+    queue_path = tmp_path / "queue.jsonl"
+    queue_path.write_text('{"repo":"acme/repo","pr_number":1}\n', encoding="utf-8")
+
+    exit_code = main(
+        ["--queue-file", str(queue_path), "--concurrency", "2", "--loop", "--max-loops", "1000"],
+        cli_entry=lambda argv: 5,
+        out=io.StringIO(),
+    )
+
+    assert exit_code == 5
+    assert "pr_number" in queue_path.read_text(encoding="utf-8")
+
+
+def test_worker_cmd_pool_prefixes_job_reports(tmp_path):
+    queue_path = tmp_path / "queue.jsonl"
+    queue_path.write_text('{"repo":"acme/repo","pr_number":1}\n', encoding="utf-8")
+    output = io.StringIO()
+
+    exit_code = main(
+        ["--queue-file", str(queue_path), "--concurrency", "2"],
+        cli_entry=lambda argv: print(f"report for {argv[1]}\nsecond line") or 0,
+        out=output,
+    )
+
+    lines = output.getvalue().splitlines()
+    assert exit_code == 0
+    assert sum(line.endswith("] report for acme/repo") for line in lines) == 1
+    assert sum(line.endswith("] second line") for line in lines) == 1
+    assert all(line.startswith(("[worker ", "worker ")) for line in lines)
+
+
+def _succeed(argv: list[str]) -> int:
+    print(f"analyzed {argv[1]}")
+    return 0
+
+
+def test_worker_cmd_pool_runs_with_spawned_children(tmp_path, monkeypatch):
+    monkeypatch.setattr(worker_pool, "_mp_context", lambda: multiprocessing.get_context("spawn"))
+    queue_path = tmp_path / "queue.jsonl"
+    queue_path.write_text('{"repo":"acme/repo","pr_number":1}\n', encoding="utf-8")
+    output = io.StringIO()
+
+    exit_code = main(
+        ["--queue-file", str(queue_path), "--concurrency", "2"],
+        cli_entry=_succeed,
+        out=output,
     )
 
     assert exit_code == 0
-    assert calls == [queue_path]
+    assert "] analyzed acme/repo" in output.getvalue()
+    assert queue_path.read_text(encoding="utf-8") == ""
@@ -0,0 +1,157 @@
+import io
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+
+import pytest
+
+import ci_hunter.worker_pool as worker_pool
+from ci_hunter.worker_pool import WorkerMetrics, run_worker_pool
+
+
+def test_run_worker_pool_prefixes_output_and_reports_metrics():
+    def target(context):
+        context.out.write(f"hello from {context.worker_id}\n")
+        context.record_job(0, 0.5, superseded=2)
+        context.record_job(1, 0.25)
+        return 0
+
+    output = io.StringIO()
+
+    exit_code = run_worker_pool(2, target, out=output)
+
+    lines = output.getvalue().splitlines()
+    assert exit_code == 0
+    assert "[worker 0] hello from 0" in lines
+    assert "[worker 1] hello from 1" in lines
+    assert lines[-2:] == [
+        "worker 0: processed 1, failed 1, superseded 2, busy 0.75s, restarts 0",
+        "worker 1: processed 1, failed 1, superseded 2, busy 0.75s, restarts 0",
+    ]
+
+
+def test_run_worker_pool_gives_up_after_max_restarts():
+    def target(context):
+        os._exit(9)
+
+    output = io.StringIO()
+
+    exit_code = run_worker_pool(1, target, out=output, max_restarts=2)
+
+    assert exit_code == 1
+    assert output.getvalue().count("); restarting") == 2
+    assert "worker 0 died 3 times (exit code 9); not restarting" in output.getvalue()
+    assert "restarts 2" in output.getvalue()
+
+
+def test_run_worker_pool_keeps_job_counts_across_restarts(tmp_path):
+    crashed = tmp_path / "crashed"
+
+    def target(context):
+        context.record_job(0, 0.5, superseded=1)
+        context.record_job(1, 0.25)
+        if not crashed.exists():
+            crashed.touch()
+            raise RuntimeError("worker crashed")
+        return 0
+
+    output = io.StringIO()
+
+    exit_code = run_worker_pool(1, target, out=output)
+
+    assert exit_code == 0
+    assert output.getvalue().splitlines()[-1] == (
+        "worker 0: processed 2, failed 2, superseded 2, busy 1.50s, restarts 1"
+    )
+
+
+def test_run_worker_pool_stops_other_workers_on_failure():
+    def target(context):
+        if context.worker_id == 0:
+            return 4
+        while not context.stop_requested():
+            context.sleep(0.01)
+        return 0
+
+    assert run_worker_pool(2, target, out=io.StringIO()) == 4
+
+
+def _spawned_target(context):
+    print(f"spawned {context.worker_id}", end="")
+    print(" done")
+    context.record_job(0, 0.5)
+    return 0
+
+
+def test_run_worker_pool_spawns_module_level_targets(monkeypatch):
+    monkeypatch.setattr(worker_pool, "_mp_context", lambda: multiprocessing.get_context("spawn"))
+    output = io.StringIO()
+
+    exit_code = run_worker_pool(2, _spawned_target, out=output)
+
+    lines = output.getvalue().splitlines()
+    assert exit_code == 0
+    assert "[worker 0] spawned 0 done" in lines
+    assert "[worker 1] spawned 1 done" in lines
+    assert "worker 1: processed 1, failed 0, superseded 0, busy 0.50s, restarts 0" in lines
+
+
+def test_run_worker_pool_rejects_unpicklable_targets_without_fork(monkeypatch):
+    monkeypatch.setattr(worker_pool, "_mp_context", lambda: multiprocessing.get_context("spawn"))
+
+    with pytest.raises(ValueError, match="picklable with the 'spawn' start method"):
+        run_worker_pool(1, lambda context: 0, out=io.StringIO())
+
+
+def test_worker_metrics_summary():
+    metrics = WorkerMetrics(processed=3, failed=1, superseded=0, busy_seconds=1.234, restarts=1)
+
+    assert metrics.summary() == (
+        "processed 3, failed 1, superseded 0, busy 1.23s, restarts 1"
+    )
+
+
+# The supervisor runs in its own process so SIGTERM never reaches pytest.
+_SIGTERM_SUPERVISOR = """
+import signal
+import sys
+
+from ci_hunter.worker_pool import run_worker_pool
+
+
+def target(context):
+    context.out.write("ready\\n")
+    while not context.stop_requested():
+        context.sleep(0.01)
+    context.out.write("finished\\n")
+    return 0
+
+
+exit_code = run_worker_pool(2, target, out=sys.stdout)
+print(f"sigterm restored: {signal.getsignal(signal.SIGTERM) is signal.SIG_DFL}")
+sys.exit(exit_code)
+"""
+
+
+def test_run_worker_pool_sigterm_lets_workers_finish():
+    supervisor = subprocess.Popen(
+        [sys.executable, "-u", "-c", _SIGTERM_SUPERVISOR],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        ready = 0
+        while ready < 2:
+            line = supervisor.stdout.readline()
+            assert line, "supervisor exited before its workers started"
+            ready += line.endswith("ready\n")
+        supervisor.send_signal(signal.SIGTERM)
+        output, _ = supervisor.communicate(timeout=30)
+    finally:
+        supervisor.kill()
+
+    assert supervisor.returncode == 0
+    assert output.count("finished") == 2
+    assert "sigterm restored: True" in output